@@ -0,0 +1,134 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+# Add a tenant to an Odoo instance running in tenant mode (ODOO_TENANT_MODE=1 at install time):
+# one more database on the same Odoo service (shared workers), selected by hostname through the
+# dbfilter, with its own Nginx server block and certificate. Reuses the install steps:
+#   09_init_database.sh → 11_ngnix.sh → 09_cache_warmup.sh
+#
+# Usage (from repo root):
+#   sudo -E ./add_tenant.sh DOMAIN [LETSENCRYPT_EMAIL]
+#   sudo ./add_tenant.sh --list
+#   sudo ./add_tenant.sh --enable-tenant-mode CURRENT_DOMAIN
+#       Switch an existing single-database install to tenant mode: the current database is
+#       renamed after CURRENT_DOMAIN (with its filestore) so the hostname dbfilter still finds it.
+#
+# Module list, language and country come from the same env vars as install.sh
+# (ODOO_EXTRA_MODULES, ODOO_INIT_MODULES, ODOO_LANG, ODOO_COUNTRY_CODE, ODOO_SSL_*).
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+REPO_ROOT="${SCRIPT_DIR}"
+cd "${REPO_ROOT}"
+
+ODOO_VERSION="${ODOO_VERSION:-19}"
+ODOO_CONF="/etc/odoo${ODOO_VERSION}.conf"
+ODOO_SERVICE="odoo${ODOO_VERSION}"
+ODOO_DATA_DIR="/var/lib/odoo"
+
+source "${REPO_ROOT}/install/lib/tenant.sh"
+
+usage() {
+  echo "Usage: sudo -E $0 DOMAIN [LETSENCRYPT_EMAIL]"
+  echo "       sudo $0 --list"
+  echo "       sudo $0 --enable-tenant-mode CURRENT_DOMAIN"
+}
+
+conf_value() {
+  sudo awk -F '=' -v k="$1" '$1 ~ "^[[:space:]]*"k"[[:space:]]*$" { sub(/^[[:space:]]+/, "", $2); print $2; exit }' "${ODOO_CONF}"
+}
+
+run_tenant_step() {
+  local script_rel="$1"
+  local title="$2"
+  echo
+  echo ">>> ${title}"
+  echo "    Script: ${script_rel}"
+  bash "${REPO_ROOT}/${script_rel}"
+}
+
+[[ -f "${ODOO_CONF}" ]] || { echo "ERROR: Missing ${ODOO_CONF}. Run install.sh first."; exit 1; }
+
+case "${1:-}" in
+  ""|-h|--help)
+    usage
+    exit 0
+    ;;
+
+  --list)
+    if [[ -s "${ODOO_TENANTS_FILE}" ]]; then
+      printf '%-40s %-40s %s\n' "DOMAIN" "DATABASE" "ADDED"
+      sudo awk '{ printf "%-40s %-40s %s\n", $1, $2, $3 }' "${ODOO_TENANTS_FILE}"
+    else
+      echo "No tenants registered in ${ODOO_TENANTS_FILE}."
+    fi
+    exit 0
+    ;;
+
+  --enable-tenant-mode)
+    CURRENT_DOMAIN="${2:-}"
+    [[ -n "${CURRENT_DOMAIN}" ]] || { usage; exit 1; }
+    if [[ "$(conf_value dbfilter)" == *%* ]]; then
+      echo "Tenant mode already enabled (dbfilter = $(conf_value dbfilter))."
+      exit 0
+    fi
+    OLD_DB="$(conf_value db_name)"
+    NEW_DB="$(tenant_db_name "${CURRENT_DOMAIN}")"
+    [[ -n "${OLD_DB}" && "${OLD_DB}" != "False" ]] || { echo "ERROR: no db_name in ${ODOO_CONF}."; exit 1; }
+
+    echo "Switching to tenant mode: database '${OLD_DB}' → '${NEW_DB}', dbfilter $(tenant_dbfilter)."
+    sudo systemctl stop "${ODOO_SERVICE}"
+    if [[ "${OLD_DB}" != "${NEW_DB}" ]]; then
+      sudo -u postgres psql -v ON_ERROR_STOP=1 -c "ALTER DATABASE \"${OLD_DB}\" RENAME TO \"${NEW_DB}\";"
+      if [[ -d "${ODOO_DATA_DIR}/filestore/${OLD_DB}" ]]; then
+        sudo mv "${ODOO_DATA_DIR}/filestore/${OLD_DB}" "${ODOO_DATA_DIR}/filestore/${NEW_DB}"
+      fi
+    fi
+    sudo sed -i \
+      -e "s|^db_name *=.*|db_name = False|" \
+      -e "s|^dbfilter *=.*|dbfilter = $(tenant_dbfilter)|" \
+      "${ODOO_CONF}"
+    sudo systemctl start "${ODOO_SERVICE}"
+    tenant_register "${CURRENT_DOMAIN}" "${NEW_DB}"
+    echo "✅ Tenant mode enabled. Add tenants with: sudo -E $0 NEW_DOMAIN"
+    exit 0
+    ;;
+
+  -*)
+    echo "ERROR: unknown option: $1"
+    usage
+    exit 1
+    ;;
+esac
+
+DOMAIN="${1,,}"
+LETSENCRYPT_EMAIL="${2:-${LETSENCRYPT_EMAIL:-}}"
+while [[ -z "${LETSENCRYPT_EMAIL}" ]]; do
+  if [[ ! -t 0 ]]; then echo "ERROR: LETSENCRYPT_EMAIL is required."; exit 1; fi
+  read -r -p "Email for Let's Encrypt notifications: " LETSENCRYPT_EMAIL
+done
+
+if [[ "$(conf_value dbfilter)" != *%* ]]; then
+  echo "ERROR: ${ODOO_CONF} is not in tenant mode (dbfilter = $(conf_value dbfilter))."
+  echo "Install with ODOO_TENANT_MODE=1, or switch with: sudo $0 --enable-tenant-mode CURRENT_DOMAIN"
+  exit 1
+fi
+
+DB_NAME="$(tenant_db_name "${DOMAIN}")"
+ODOO_EXTRA_MODULES="${ODOO_EXTRA_MODULES-sale,purchase,crm,stock,contacts,account}"
+ODOO_TENANT_MODE=1
+
+echo "============================================================"
+echo " Adding tenant ${DOMAIN} (database '${DB_NAME}') to ${ODOO_SERVICE}"
+echo "============================================================"
+
+export ODOO_VERSION DOMAIN LETSENCRYPT_EMAIL DB_NAME ODOO_EXTRA_MODULES ODOO_TENANT_MODE REPO_ROOT
+
+run_tenant_step "install/09_init_database.sh" "Initializing database ${DB_NAME}"
+run_tenant_step "install/11_ngnix.sh"         "Nginx server block + SSL for ${DOMAIN}"
+run_tenant_step "install/09_cache_warmup.sh"  "Warming up Odoo caches for ${DOMAIN}"
+
+tenant_register "${DOMAIN}" "${DB_NAME}"
+
+echo
+echo "✅ Tenant ready: https://${DOMAIN} (database '${DB_NAME}')."
+echo "   Tenants on this instance: sudo $0 --list"
@@ -7,6 +7,57 @@ REPO_ROOT="${SCRIPT_DIR}"
 
 cd "${REPO_ROOT}"
 
+source "${REPO_ROOT}/install/lib/timeline.sh"
+
+usage() {
+  echo "Usage: $0 [--force STEP[,STEP...]]... [--force-all]"
+  echo "  Completed steps whose script and inputs did not change are skipped on re-run."
+  echo "  --force STEP  re-run STEP (id such as nginx, or script name such as 11_ngnix)"
+  echo "  --force-all   re-run every step"
+  echo "  --profile[=DIR]  run the configuration scripts of the steps that run (e.g. --force init_db)"
+  echo "                under the Odoo profiler; speedscope files per step in DIR (default"
+  echo "                /var/log/odoo/profile/install-<time>)"
+}
+
+FORCE_ALL="${ODOO_FORCE_ALL:-0}"
+FORCE_STEPS="${ODOO_FORCE_STEPS:-}"
+FORCE_STEPS="${FORCE_STEPS//,/ }"
+while (( $# > 0 )); do
+  case "$1" in
+    --force)
+      [[ -n "${2:-}" ]] || { usage; exit 1; }
+      FORCE_STEPS+=" ${2//,/ }"
+      shift 2
+      ;;
+    --force=*)
+      FORCE_STEPS+=" ${1#--force=}"
+      FORCE_STEPS="${FORCE_STEPS//,/ }"
+      shift
+      ;;
+    --force-all)
+      FORCE_ALL=1
+      shift
+      ;;
+    --profile)
+      export ODOO_SCRIPT_PROFILE="/var/log/odoo/profile/install-$(date +%Y%m%d-%H%M%S)"
+      shift
+      ;;
+    --profile=*)
+      export ODOO_SCRIPT_PROFILE="${1#--profile=}"
+      shift
+      ;;
+    -h|--help)
+      usage
+      exit 0
+      ;;
+    *)
+      echo "ERROR: unknown option: $1"
+      usage
+      exit 1
+      ;;
+  esac
+done
+
 echo "============================================================"
 echo " MBA - Odoo Community Install (v2)"
 echo " Repo: ${REPO_ROOT}"
@@ -69,11 +120,196 @@ run_step() {
   echo ">>> ${title}"
   echo "    Script: ${script_rel}"
 
+  local ret=0
+  export TL_STEP="$(basename "${script_rel}" .sh)"
+  tl_begin "${title}" step
+
   if [[ "${needs_apt}" == "1" ]]; then
-    wait_for_apt 300 5
+    # fd 9 stays open until this step's subshell exits, so the lock covers the whole step
+    exec 9>>"${APT_LOCK_FILE}"
+    tl_run "Waiting for apt/dpkg locks" acquire_apt_lock
   fi
 
-  ( cd "${REPO_ROOT}" && sudo -E bash "${REPO_ROOT}/${script_rel}" )
+  ( cd "${REPO_ROOT}" && sudo -E bash "${REPO_ROOT}/${script_rel}" ) || ret=$?
+  tl_end "${title}" "${ret}" step
+  return "${ret}"
+}
+
+# One apt-using step at a time (steps run in parallel), then wait for apt outside the installer
+acquire_apt_lock() {
+  flock 9
+  wait_for_apt 300 5
+}
+
+# -------------------------------------------------------------------
+# Step graph: add_step ID SCRIPT TITLE NEEDS_APT "DEPENDENCY IDS"
+# Dependencies must be declared before the steps that use them, so the
+# declaration order is a valid sequential order (ODOO_INSTALL_PARALLEL=0).
+# -------------------------------------------------------------------
+
+declare -a STEP_IDS=()
+declare -A STEP_SCRIPT=() STEP_TITLE=() STEP_APT=() STEP_DEPS=() STEP_STATE=()
+
+add_step() {
+  local id="$1"
+  local dep
+  for dep in ${5:-}; do
+    [[ -n "${STEP_STATE[${dep}]:-}" ]] || { echo "ERROR: step '${id}' depends on undeclared step '${dep}'."; exit 1; }
+  done
+  STEP_IDS+=("${id}")
+  STEP_SCRIPT[${id}]="$2"
+  STEP_TITLE[${id}]="$3"
+  STEP_APT[${id}]="$4"
+  STEP_DEPS[${id}]="${5:-}"
+  STEP_STATE[${id}]="pending"
+}
+
+# -------------------------------------------------------------------
+# Completion markers: ODOO_STEP_STATE_DIR/<id>.done holds a hash of the step script, its
+# inputs (step_inputs: env var names and repo files/globs) and its dependencies' hashes.
+# A step whose hash matches its marker is skipped; changing an input re-runs the step and
+# every step after it in the graph. --force ID / --force-all ignore the markers.
+# -------------------------------------------------------------------
+
+STEP_STATE_DIR="${ODOO_STEP_STATE_DIR:-/var/lib/odoo-install/steps}"
+declare -A STEP_INPUTS=() STEP_HASH=()
+
+step_inputs() {
+  STEP_INPUTS[$1]="${*:2}"
+}
+
+compute_step_hash() {
+  local id="$1"
+  local input f dep
+  {
+    echo "step ${id} ${STEP_SCRIPT[${id}]}"
+    cat "${REPO_ROOT}/${STEP_SCRIPT[${id}]}"
+    for input in ${STEP_INPUTS[${id}]:-}; do
+      if [[ "${input}" =~ ^[A-Z_][A-Z0-9_]*$ ]]; then
+        echo "env ${input}=${!input:-}"
+      else
+        for f in "${REPO_ROOT}"/${input}; do
+          [[ -f "${f}" ]] || continue
+          echo "file ${f#"${REPO_ROOT}"/}"
+          cat "${f}"
+        done
+      fi
+    done
+    for dep in ${STEP_DEPS[${id}]}; do
+      echo "dep ${dep} ${STEP_HASH[${dep}]}"
+    done
+  } | sha256sum | cut -d' ' -f1
+}
+
+# 0 = completed with the same hash and not forced (skip it)
+step_is_current() {
+  local id="$1"
+  local marker="${STEP_STATE_DIR}/${id}.done"
+  [[ "${FORCE_ALL}" != "1" ]] || return 1
+  [[ " ${FORCE_STEPS} " != *" ${id} "* ]] || return 1
+  [[ " ${STEP_ALWAYS} " != *" ${id} "* ]] || return 1
+  [[ -f "${marker}" ]] || return 1
+  [[ "$(head -n 1 "${marker}")" == "${STEP_HASH[${id}]}" ]]
+}
+
+mark_step_done() {
+  printf '%s\n%s %s\n' "${STEP_HASH[$1]}" "$(date -Is)" "${STEP_SCRIPT[$1]}" \
+    | sudo tee "${STEP_STATE_DIR}/$1.done" >/dev/null
+}
+
+clear_step_marker() {
+  sudo rm -f "${STEP_STATE_DIR}/$1.done"
+}
+
+# 0 = all dependencies done, 1 = still waiting
+step_ready() {
+  local dep
+  for dep in ${STEP_DEPS[$1]}; do
+    [[ "${STEP_STATE[${dep}]}" == "done" ]] || return 1
+  done
+  return 0
+}
+
+run_steps_sequential() {
+  local id
+  for id in "${STEP_IDS[@]}"; do
+    if step_is_current "${id}"; then
+      STEP_STATE[${id}]="done"
+      echo "--- skipped (completed, unchanged): ${id}"
+      continue
+    fi
+    clear_step_marker "${id}"
+    if ( run_step "${STEP_SCRIPT[${id}]}" "${STEP_TITLE[${id}]}" "${STEP_APT[${id}]}" ); then
+      STEP_STATE[${id}]="done"
+      mark_step_done "${id}"
+    else
+      STEP_STATE[${id}]="failed"
+      return 1
+    fi
+  done
+}
+
+# Start every step whose dependencies are done (up to MAX_JOBS at once); output lines are
+# prefixed with the step id. After a failure no new step starts; running ones are awaited.
+run_steps_parallel() {
+  local -A pid_step=()
+  local running=0 failed=0 progress id pid rc
+
+  while true; do
+    progress=1
+    while (( failed == 0 && progress == 1 )); do
+      progress=0
+      for id in "${STEP_IDS[@]}"; do
+        (( running < MAX_JOBS )) || break
+        [[ "${STEP_STATE[${id}]}" == "pending" ]] && step_ready "${id}" || continue
+        if step_is_current "${id}"; then
+          # Skipping may unblock steps earlier in the list: scan again
+          STEP_STATE[${id}]="done"
+          progress=1
+          echo "--- skipped (completed, unchanged): ${id}"
+          continue
+        fi
+        clear_step_marker "${id}"
+        (
+          set +e
+          run_step "${STEP_SCRIPT[${id}]}" "${STEP_TITLE[${id}]}" "${STEP_APT[${id}]}" 2>&1 \
+            | sed -u "s/^/[${id}] /"
+          exit "${PIPESTATUS[0]}"
+        ) </dev/null &
+        pid_step[$!]="${id}"
+        STEP_STATE[${id}]="running"
+        running=$((running + 1))
+      done
+    done
+
+    (( running > 0 )) || break
+
+    rc=0
+    wait -n -p pid || rc=$?
+    id="${pid_step[${pid}]:-}"
+    [[ -n "${id}" ]] || continue
+    unset "pid_step[${pid}]"
+    running=$((running - 1))
+
+    if (( rc == 0 )); then
+      STEP_STATE[${id}]="done"
+      mark_step_done "${id}"
+      echo "--- done: ${id}"
+    else
+      STEP_STATE[${id}]="failed"
+      failed=1
+      echo "❌ Step failed: ${id} (${STEP_SCRIPT[${id}]}, exit ${rc}). Waiting for running steps to finish..."
+    fi
+  done
+
+  (( failed == 0 ))
+}
+
+timeline_summary() {
+  [[ -n "${ODOO_TIMELINE_FILE:-}" && -s "${ODOO_TIMELINE_FILE}" ]] || return 0
+  echo
+  python3 "${REPO_ROOT}/install/scripts/timeline_report.py" "${ODOO_TIMELINE_FILE}" \
+    --top "${ODOO_TIMELINE_TOP:-10}" --json "${ODOO_TIMELINE_FILE%.jsonl}.json" || true
 }
 
 # -------------------------------------------------------------------
@@ -143,6 +379,32 @@ fi
 read -r -p "Odoo standard modules to install [sale,purchase,crm,stock,contacts,account]: " ODOO_EXTRA_MODULES
 ODOO_EXTRA_MODULES="${ODOO_EXTRA_MODULES:-sale,purchase,crm,stock,contacts,account}"
 
+# Multi-tenant mode: one Odoo instance serves one database per hostname (dbfilter ^%h$).
+# The first tenant is DOMAIN; add more later with ./add_tenant.sh NEW_DOMAIN.
+ODOO_TENANT_MODE="${ODOO_TENANT_MODE:-0}"
+if [[ "${ODOO_TENANT_MODE}" == "1" ]]; then
+  source "${REPO_ROOT}/install/lib/tenant.sh"
+  DB_NAME="$(tenant_db_name "${DOMAIN}")"
+  echo "Tenant mode: database '${DB_NAME}' for ${DOMAIN}."
+  export DB_NAME
+fi
+
+# Streaming read replica (opt-in, install/12_postgres_replica.sh): local cluster on
+# ODOO_PG_REPLICA_PORT (5433) unless ODOO_PG_REPLICA_HOST points to an existing one.
+ODOO_PG_REPLICA="${ODOO_PG_REPLICA:-0}"
+
+# Configuration daemon (opt-in, install/13_config_daemon.sh): keeps the Odoo registry loaded so
+# install/scripts/run_set_*.sh reapply a setting without importing Odoo again.
+ODOO_CONFIG_DAEMON="${ODOO_CONFIG_DAEMON:-0}"
+
+# PostgreSQL maintenance (install/14_db_maintenance.sh): autovacuum settings for the hot tables and
+# a nightly REINDEX CONCURRENTLY timer in ODOO_DB_MAINTENANCE_WINDOW. 0 = remove both.
+ODOO_DB_MAINTENANCE="${ODOO_DB_MAINTENANCE:-1}"
+
+export ODOO_TENANT_MODE
+export ODOO_PG_REPLICA
+export ODOO_CONFIG_DAEMON
+export ODOO_DB_MAINTENANCE
 export ODOO_SSL_STORAGE
 export ODOO_VERSION
 export DOMAIN
@@ -152,11 +414,50 @@ export ODOO_EXTRA_MODULES
 export ALLOW_ODOO_PORT
 export REPO_ROOT
 
+# -------------------------------------------------------------------
+# Provisioning timeline (every step + sub-phases; see install/lib/timeline.sh)
+# ODOO_TIMELINE=0 disables it.
+# -------------------------------------------------------------------
+
+if [[ "${ODOO_TIMELINE:-1}" == "1" ]]; then
+  ODOO_TIMELINE_DIR="${ODOO_TIMELINE_DIR:-/var/log/odoo-install}"
+  TL_RUN_ID="$(date -u +%Y%m%dT%H%M%SZ)-$(hostname -s)"
+  ODOO_TIMELINE_FILE="${ODOO_TIMELINE_DIR}/timeline-${TL_RUN_ID}.jsonl"
+  sudo mkdir -p "${ODOO_TIMELINE_DIR}"
+  sudo touch "${ODOO_TIMELINE_FILE}"
+  sudo chown "$(id -u):$(id -g)" "${ODOO_TIMELINE_FILE}"
+  export ODOO_TIMELINE_FILE
+  tl_meta \
+    run "${TL_RUN_ID}" \
+    host "$(hostname -f 2>/dev/null || hostname)" \
+    os "$(. /etc/os-release 2>/dev/null && echo "${PRETTY_NAME:-}")" \
+    kernel "$(uname -r)" \
+    cpus "$(nproc)" \
+    mem_mb "$(awk '/MemTotal/ {print int($2 / 1024)}' /proc/meminfo)" \
+    odoo_version "${ODOO_VERSION}" \
+    repo_rev "$(git -C "${REPO_ROOT}" rev-parse --short HEAD 2>/dev/null || echo unknown)"
+else
+  unset ODOO_TIMELINE_FILE
+fi
+
 # -------------------------------------------------------------------
 # Verify expected v2 filenames exist before running
 # -------------------------------------------------------------------
 
 REQUIRED_FILES=(
+  "install/lib/timeline.sh"
+  "install/lib/apt.sh"
+  "install/lib/tenant.sh"
+  "install/lib/resources.sh"
+  "config/odoo19.conf.template"
+  "config/odoo19.service.template"
+  "config/odoo19-cron.service.template"
+  "install/apt-packages.txt"
+  "install/scripts/timeline_report.py"
+  "install/scripts/run_common.sh"
+  "install/scripts/scriptlib/schema.py"
+  "install/scripts/scriptlib/checkpoint.py"
+  "install/scripts/config_daemon.py"
   "install/00_system_update.sh"
   "install/01_dependencies.sh"
   "install/02_postgres.sh"
@@ -168,9 +469,15 @@ REQUIRED_FILES=(
   "install/07_odoo_config.sh"
   "install/07_systemd_service.sh"
   "install/08_clone_custom_addons.sh"
+  "install/08_precompile_bytecode.sh"
   "install/09_init_database.sh"
+  "install/09_cache_warmup.sh"
   "install/10_ufw_firewall.sh"
   "install/11_ngnix.sh"
+  "install/12_postgres_replica.sh"
+  "install/13_config_daemon.sh"
+  "install/14_db_maintenance.sh"
+  "install/scripts/db_maintenance.py"
   "post/00_health_check.sh"
   "post/10_summary.sh"
 )
@@ -186,25 +493,115 @@ done
 chmod +x "${REPO_ROOT}"/install/*.sh "${REPO_ROOT}"/post/*.sh || true
 
 # -------------------------------------------------------------------
-# Run steps (with apt lock protection on apt-related ones)
-# -------------------------------------------------------------------
-
-run_step "install/00_system_update.sh"         "Installing system updates"                 1
-run_step "install/01_dependencies.sh"          "Installing system dependencies"            1
-run_step "install/02_postgres.sh"              "Installing PostgreSQL"                     1
-run_step "install/02_wkhtmltopdf.sh"           "Installing wkhtmltopdf (patched)"          1
-run_step "install/03_odoo_user_and_folders.sh" "Creating Odoo user and folders"            0
-run_step "install/04_clone_odoo.sh"            "Cloning Odoo ${ODOO_VERSION}"              1
-run_step "install/05_python_venv.sh"           "Creating Python venv"                      1
-run_step "install/06_python_dependencies.sh"   "Installing Python dependencies"            1
-run_step "install/07_odoo_config.sh"           "Configuring Odoo"                          0
-run_step "install/07_systemd_service.sh"       "Creating systemd service"                  0
-run_step "install/08_clone_custom_addons.sh"   "Cloning custom addons from Git"            1
-run_step "install/09_init_database.sh"          "Initializing database"                     0
-run_step "install/10_ufw_firewall.sh"          "Configuring firewall"                      1
-run_step "install/11_ngnix.sh"                 "Installing Nginx + SSL"                    1
-run_step "post/00_health_check.sh"             "Post install - health check"               0
-run_step "post/10_summary.sh"                  "Summary"                                   0
+# Run steps: dependency graph; apt-using steps (NEEDS_APT=1) hold one shared lock.
+# Steps without apt (git clone, pip, config, bytecode, database init) overlap with them,
+# so the total time approaches the critical path 00 → 01 → 04 → 05 → 06 → 08 → 09.
+# 01 installs every apt package (install/apt-packages.txt) in one transaction; the later
+# apt steps only find them installed. Downloaded .debs are kept in ODOO_APT_CACHE_DIR.
+# 10/11 flush iptables, so they wait for every download; warm-up runs after them.
+# ODOO_INSTALL_PARALLEL=0 runs the steps one by one in the order below.
+# -------------------------------------------------------------------
+
+#        ID           SCRIPT                                 TITLE                                 APT  DEPENDS ON
+add_step system       "install/00_system_update.sh"          "Installing system updates"           1
+add_step deps         "install/01_dependencies.sh"           "Installing system dependencies"      1    "system"
+add_step postgres     "install/02_postgres.sh"               "Installing PostgreSQL"               1    "deps"
+add_step wkhtmltopdf  "install/02_wkhtmltopdf.sh"            "Installing wkhtmltopdf (patched)"    1    "deps"
+add_step folders      "install/03_odoo_user_and_folders.sh"  "Creating Odoo user and folders"      0
+add_step clone_odoo   "install/04_clone_odoo.sh"             "Cloning Odoo ${ODOO_VERSION}"        0    "deps folders"
+add_step venv         "install/05_python_venv.sh"            "Creating Python venv"                0    "clone_odoo"
+add_step pydeps       "install/06_python_dependencies.sh"    "Installing Python dependencies"      0    "venv"
+add_step odoo_conf    "install/07_odoo_config.sh"            "Configuring Odoo"                    0    "folders"
+add_step systemd      "install/07_systemd_service.sh"        "Creating systemd service"            0    "pydeps odoo_conf postgres"
+add_step addons       "install/08_clone_custom_addons.sh"    "Cloning custom addons from Git"      0    "pydeps"
+add_step bytecode     "install/08_precompile_bytecode.sh"    "Precompiling Python bytecode"        0    "addons"
+add_step init_db      "install/09_init_database.sh"          "Initializing database"               0    "systemd bytecode postgres"
+add_step firewall     "install/10_ufw_firewall.sh"           "Configuring firewall"                1    "deps postgres wkhtmltopdf addons"
+add_step nginx        "install/11_ngnix.sh"                  "Installing Nginx + SSL"              1    "firewall"
+add_step replica      "install/12_postgres_replica.sh"       "PostgreSQL read replica (opt-in)"    0    "init_db"
+add_step configd      "install/13_config_daemon.sh"          "Configuration daemon (opt-in)"       0    "init_db"
+add_step dbmaint      "install/14_db_maintenance.sh"         "PostgreSQL autovacuum + reindex"     0    "init_db"
+add_step warmup       "install/09_cache_warmup.sh"           "Warming up Odoo caches"              0    "init_db nginx replica"
+add_step health       "post/00_health_check.sh"              "Post install - health check"         0    "${STEP_IDS[*]}"
+add_step summary      "post/10_summary.sh"                   "Summary"                             0    "health"
+
+# Inputs hashed into each step's completion marker (besides its script and dependencies)
+step_inputs system       "install/lib/apt.sh"
+step_inputs deps         "install/lib/apt.sh install/apt-packages.txt WKHTMLTOX_DEB_URL"
+step_inputs postgres     "install/lib/apt.sh DB_NAME"
+step_inputs wkhtmltopdf  "install/lib/apt.sh WKHTMLTOX_DEB_URL"
+step_inputs clone_odoo   "ODOO_VERSION"
+step_inputs venv         "ODOO_VERSION"
+step_inputs pydeps       "ODOO_VERSION"
+step_inputs odoo_conf    "ODOO_VERSION DB_NAME ODOO_TENANT_MODE ODOO_TENANT_DBFILTER ODOO_WORKERS ODOO_MAX_CRON_THREADS ODOO_MEMORY_PERCENT config/odoo19.conf.template install/lib/resources.sh"
+step_inputs systemd      "ODOO_VERSION ODOO_WORKERS ODOO_MAX_CRON_THREADS ODOO_MEMORY_PERCENT ODOO_CRON_SERVICE ODOO_READY_TIMEOUT config/odoo19*.service.template install/lib/resources.sh"
+step_inputs addons       "ODOO_VERSION custom_addons.txt GITHUB_TOKEN"
+step_inputs bytecode     "ODOO_VERSION ODOO_IMPORTTIME_MODULES install/scripts/importtime_report.py"
+step_inputs init_db      "ODOO_VERSION DB_NAME ODOO_EXTRA_MODULES ODOO_INIT_MODULES ODOO_LANG ODOO_COUNTRY_CODE ODOO_WITHOUT_DEMO install/scripts/set_*.py install/scripts/scriptlib/*.py install/scripts/run_common.sh"
+step_inputs firewall     "ALLOW_ODOO_PORT"
+step_inputs nginx        "DOMAIN LETSENCRYPT_EMAIL ODOO_SSL_STORAGE ODOO_WORKERS ODOO_MAX_CRON_THREADS ODOO_MEMORY_PERCENT install/lib/apt.sh install/lib/resources.sh templates/nginx-odoo*.conf.template"
+step_inputs replica      "ODOO_VERSION ODOO_PG_REPLICA ODOO_PG_REPLICA_HOST ODOO_PG_REPLICA_PORT ODOO_PG_REPLICA_REBUILD"
+step_inputs configd      "ODOO_VERSION DB_NAME ODOO_CONFIG_DAEMON install/scripts/config_daemon.py install/scripts/set_*.py install/scripts/scriptlib/*.py"
+step_inputs dbmaint      "ODOO_VERSION DB_NAME ODOO_DB_MAINTENANCE ODOO_DB_MAINTENANCE_WINDOW ODOO_REINDEX_BLOAT_PERCENT ODOO_REINDEX_MIN_MB install/scripts/db_maintenance.py install/scripts/run_common.sh"
+# Always run: caches are empty after every restart; the checks must reflect the current state
+STEP_ALWAYS="warmup health summary"
+
+for id in ${FORCE_STEPS}; do
+  [[ -n "${STEP_STATE[${id}]:-}" ]] && continue
+  for step in "${STEP_IDS[@]}"; do
+    [[ "$(basename "${STEP_SCRIPT[${step}]}" .sh)" == "${id}" ]] && FORCE_STEPS+=" ${step}" && continue 2
+  done
+  echo "ERROR: --force ${id}: unknown step. Steps: ${STEP_IDS[*]}"
+  exit 1
+done
+
+for id in "${STEP_IDS[@]}"; do
+  STEP_HASH[${id}]="$(compute_step_hash "${id}")"
+done
+sudo mkdir -p "${STEP_STATE_DIR}"
+
+APT_LOCK_FILE="$(mktemp -t odoo-install-apt.XXXXXX)"
+MAX_JOBS="${ODOO_INSTALL_JOBS:-4}"
+[[ "${ODOO_INSTALL_PARALLEL:-1}" == "1" ]] || MAX_JOBS=1
+if (( BASH_VERSINFO[0] < 5 || (BASH_VERSINFO[0] == 5 && BASH_VERSINFO[1] < 1) )); then
+  echo "bash ${BASH_VERSION} has no 'wait -n -p': running steps sequentially."
+  MAX_JOBS=1
+fi
+
+SUDO_KEEPALIVE_PID=""
+on_exit() {
+  [[ -n "${SUDO_KEEPALIVE_PID}" ]] && kill "${SUDO_KEEPALIVE_PID}" 2>/dev/null
+  rm -f "${APT_LOCK_FILE}"
+  timeline_summary
+}
+trap on_exit EXIT
+
+if (( MAX_JOBS > 1 )); then
+  echo
+  echo "Running steps in parallel (max ${MAX_JOBS} at once; ODOO_INSTALL_PARALLEL=0 for one by one)."
+  # Background steps cannot answer a sudo prompt: authenticate once and keep the ticket fresh
+  sudo -v
+  ( while true; do sudo -n true 2>/dev/null; sleep 60; done ) &
+  SUDO_KEEPALIVE_PID=$!
+  STEPS_OK=1
+  run_steps_parallel || STEPS_OK=0
+else
+  STEPS_OK=1
+  run_steps_sequential || STEPS_OK=0
+fi
+
+if [[ "${STEPS_OK}" != "1" ]]; then
+  echo
+  echo "❌ Install stopped. Step status:"
+  for id in "${STEP_IDS[@]}"; do
+    printf '    %-12s %-8s %s\n' "${id}" "${STEP_STATE[${id}]}" "${STEP_SCRIPT[${id}]}"
+  done
+  exit 1
+fi
+
+if [[ "${ODOO_TENANT_MODE}" == "1" ]]; then
+  tenant_register "${DOMAIN}" "${DB_NAME}"
+fi
 
 echo
 echo "✅ Done."
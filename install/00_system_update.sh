@@ -1,8 +1,10 @@
 #!/bin/bash
 set -e
 
+source "$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)/lib/apt.sh"
+
 echo "Updating system packages..."
-apt update -y
-apt upgrade -y
+apt_update_once
+apt_upgrade
 
 echo "System update completed."
@@ -1,45 +1,23 @@
 #!/bin/bash
 set -e
 
+source "$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)/lib/timeline.sh"
+source "$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)/lib/apt.sh"
+
 echo "Installing system dependencies..."
 
-apt update -y
+# Every package of install/apt-packages.txt (PostgreSQL, Nginx, certbot, ufw, fonts, ...) plus the
+# patched wkhtmltopdf .deb in a single apt transaction; later steps find them installed.
+mapfile -t PACKAGES < <(apt_manifest_packages)
+if [[ "$(dpkg --print-architecture)" == "amd64" ]]; then
+  PACKAGES+=("$(tl_run "Download wkhtmltox .deb" fetch_deb "${WKHTMLTOX_DEB_URL}")")
+fi
+echo "Packages (${#PACKAGES[@]}), cache: ${ODOO_APT_CACHE_DIR}"
 
-apt install -y \
-  git \
-  wget \
-  unzip \
-  openssl \
-  python3 \
-  python3-pip \
-  python3-dev \
-  python3-venv \
-  build-essential \
-  libxslt-dev \
-  libzip-dev \
-  libldap2-dev \
-  libsasl2-dev \
-  libpq-dev \
-  libxml2-dev \
-  libjpeg-dev \
-  zlib1g-dev \
-  libfreetype6-dev \
-  liblcms2-dev \
-  libblas-dev \
-  libatlas-base-dev \
-  libffi-dev \
-  libssl-dev \
-  fontconfig \
-  xfonts-75dpi \
-  xfonts-base \
-  libmagickwand-dev \
-  nodejs \
-  npm \
-  qml-module-qtquick2 \
-  qml-module-qtquick-controls \
-  qml-module-qtquick-layouts
+tl_run "apt update" apt_update_once
+tl_run "apt install (all packages, one transaction)" apt_install "${PACKAGES[@]}"
 
 echo "Installing rtlcss (Odoo asset requirement)..."
-npm install -g rtlcss
+tl_run "npm install rtlcss" npm install -g rtlcss
 
-echo "Dependencies installed."
\ No newline at end of file
+echo "Dependencies installed."
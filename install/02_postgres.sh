@@ -1,17 +1,25 @@
 #!/bin/bash
 set -e
 
+source "$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)/lib/apt.sh"
+
 DB_USER="odoo"
 DB_NAME="${DB_NAME:-odoo19}"
 
 echo "Installing PostgreSQL..."
-apt update -y
-apt install -y postgresql postgresql-contrib
+ensure_packages postgresql postgresql-contrib
 
 echo "Ensuring PostgreSQL service is running..."
 systemctl enable postgresql
 systemctl start postgresql
 
+# Lock waits over deadlock_timeout (1s) are logged with the session's application_name
+# (odoo-<pid>), so install/scripts/cron_report.py can charge them to the scheduled action
+echo "Enabling lock wait logging..."
+sudo -u postgres psql -qc "ALTER SYSTEM SET log_lock_waits = on;"
+sudo -u postgres psql -qc "ALTER SYSTEM SET log_line_prefix = '%m [%p] %q%u@%d %a ';"
+sudo -u postgres psql -qtAc "SELECT pg_reload_conf();" >/dev/null
+
 echo "Checking for existing PostgreSQL role '$DB_USER'..."
 if sudo -u postgres psql -tAc "SELECT 1 FROM pg_roles WHERE rolname='${DB_USER}'" | grep -q 1; then
   echo "Role '$DB_USER' already exists — skipping role creation."
@@ -25,7 +33,7 @@ if sudo -u postgres psql -tAc "SELECT 1 FROM pg_database WHERE datname='${DB_NAM
   echo "Database '${DB_NAME}' already exists — skipping creation."
 else
   echo "Creating database '${DB_NAME}' owned by '${DB_USER}'..."
-  sudo -u postgres psql -c "CREATE DATABASE ${DB_NAME} OWNER ${DB_USER};"
+  sudo -u postgres psql -c "CREATE DATABASE \"${DB_NAME}\" OWNER ${DB_USER};"
 fi
 
 echo "PostgreSQL role + database ready."
\ No newline at end of file
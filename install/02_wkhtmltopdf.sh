@@ -10,16 +10,17 @@ if [[ "${ARCH}" != "amd64" ]]; then
   exit 1
 fi
 
-TMP_DIR="/tmp/wkhtmltopdf"
-DEB="wkhtmltox_0.12.6.1-3.jammy_amd64.deb"
-URL="https://github.com/wkhtmltopdf/packaging/releases/download/0.12.6.1-3/${DEB}"
+source "$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)/lib/apt.sh"
 
-sudo rm -rf "${TMP_DIR}"
-mkdir -p "${TMP_DIR}"
-cd "${TMP_DIR}"
+# Normally installed by 01_dependencies.sh together with the other packages
+if command -v wkhtmltopdf >/dev/null 2>&1 && wkhtmltopdf --version 2>/dev/null | grep -qi "patched qt"; then
+  echo "wkhtmltopdf (patched Qt) already installed."
+  wkhtmltopdf --version
+  exit 0
+fi
 
-echo "Downloading: ${URL}"
-curl -fL --retry 5 --retry-delay 2 -o "${DEB}" "${URL}"
+# Cached in ODOO_APT_CACHE_DIR: downloaded only once per host / prepared cache
+DEB="$(fetch_deb "${WKHTMLTOX_DEB_URL}")"
 
 # Sanity check size
 SIZE_BYTES="$(stat -c%s "${DEB}")"
@@ -27,27 +28,19 @@ if (( SIZE_BYTES < 1000000 )); then
   echo "ERROR: Downloaded file is too small (${SIZE_BYTES} bytes). Not a valid .deb."
   echo "First 200 bytes:"
   head -c 200 "${DEB}" || true
+  rm -f "${DEB}"
   exit 1
 fi
 
 # Sanity check the deb structure
 if ! dpkg-deb -I "${DEB}" >/dev/null 2>&1; then
   echo "ERROR: Downloaded file is not a valid Debian package."
+  rm -f "${DEB}"
   exit 1
 fi
 
-echo "Installing dependencies..."
-sudo apt-get update -y
-sudo apt-get install -y xfonts-75dpi xfonts-base fontconfig
-
-echo "Installing wkhtmltopdf package..."
-# 1) Try dpkg
-if ! sudo dpkg -i "${DEB}"; then
-  echo "dpkg reported dependency issues; fixing with apt-get -f install..."
-  sudo apt-get install -f -y
-  # 2) Re-try dpkg to ensure package is actually configured
-  sudo dpkg -i "${DEB}"
-fi
+echo "Installing wkhtmltopdf package and its dependencies (one apt transaction)..."
+apt_install xfonts-75dpi xfonts-base fontconfig "${DEB}"
 
 echo "Verifying..."
 command -v wkhtmltopdf >/dev/null 2>&1 || { echo "ERROR: wkhtmltopdf not found after install."; exit 1; }
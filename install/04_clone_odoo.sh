@@ -1,6 +1,8 @@
 #!/bin/bash
 set -e
 
+source "$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)/lib/timeline.sh"
+
 ODOO_USER="odoo"
 ODOO_DIR="/opt/odoo/odoo${ODOO_VERSION}"
 ODOO_SRC="$ODOO_DIR/odoo"
@@ -12,10 +14,10 @@ chown -R "$ODOO_USER:$ODOO_USER" "$ODOO_DIR"
 
 if [ -d "$ODOO_SRC/.git" ]; then
   echo "Odoo repo exists. Fetching latest..."
-  sudo -u $ODOO_USER bash -c "cd '$ODOO_SRC' && git fetch --all --prune && git reset --hard origin/${ODOO_VERSION}.0"
+  tl_run "git fetch Odoo" sudo -u $ODOO_USER bash -c "cd '$ODOO_SRC' && git fetch --all --prune && git reset --hard origin/${ODOO_VERSION}.0"
 else
   echo "Cloning Odoo ${ODOO_VERSION}.0..."
-  sudo -u $ODOO_USER git clone --depth 1 --branch ${ODOO_VERSION}.0 https://github.com/odoo/odoo.git "$ODOO_SRC"
+  tl_run "git clone Odoo" sudo -u $ODOO_USER git clone --depth 1 --branch ${ODOO_VERSION}.0 https://github.com/odoo/odoo.git "$ODOO_SRC"
 fi
 
 echo "Current Odoo commit:"
@@ -1,6 +1,8 @@
 #!/bin/bash
 set -e
 
+source "$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)/lib/timeline.sh"
+
 ODOO_USER="odoo"
 ODOO_BASE="/opt/odoo/odoo${ODOO_VERSION}"
 ODOO_SRC="${ODOO_BASE}/odoo"
@@ -12,10 +14,10 @@ mkdir -p "$ODOO_BASE"
 chown -R $ODOO_USER:$ODOO_USER "$ODOO_BASE"
 
 echo "Creating Python virtual environment…"
-sudo -u $ODOO_USER python3 -m venv "$VENV_DIR"
+tl_run "python3 -m venv" sudo -u $ODOO_USER python3 -m venv "$VENV_DIR"
 
 echo "Upgrading pip, wheel, setuptools…"
-sudo -u $ODOO_USER "$VENV_DIR/bin/pip" install --upgrade pip wheel setuptools
+tl_run "pip upgrade tooling (venv)" sudo -u $ODOO_USER "$VENV_DIR/bin/pip" install --upgrade pip wheel setuptools
 
 if [ ! -f "$ODOO_SRC/requirements.txt" ]; then
   echo "❌ Could not find requirements.txt at $ODOO_SRC"
@@ -23,9 +25,9 @@ if [ ! -f "$ODOO_SRC/requirements.txt" ]; then
 fi
 
 echo "Installing Odoo Python dependencies…"
-sudo -u $ODOO_USER "$VENV_DIR/bin/pip" install -r "$ODOO_SRC/requirements.txt"
+tl_run "pip install requirements.txt (venv)" sudo -u $ODOO_USER "$VENV_DIR/bin/pip" install -r "$ODOO_SRC/requirements.txt"
 
 echo "Installing extra Python deps for custom addons..."
-sudo -u $ODOO_USER "$VENV_DIR/bin/pip" install qifparse
+tl_run "pip install qifparse" sudo -u $ODOO_USER "$VENV_DIR/bin/pip" install qifparse
 
 echo "Python virtual environment and requirements installed."
\ No newline at end of file
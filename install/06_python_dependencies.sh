@@ -3,6 +3,8 @@ set -euo pipefail
 
 : "${ODOO_VERSION:?ODOO_VERSION not set}"
 
+source "$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)/lib/timeline.sh"
+
 echo "Installing Python dependencies for Odoo ${ODOO_VERSION}..."
 
 ODOO_DIR="/opt/odoo/odoo${ODOO_VERSION}"
@@ -24,19 +26,22 @@ fi
 cd /tmp
 
 echo "Upgrading pip tooling..."
-sudo -u odoo "${VENV_PY}" -m pip install --upgrade pip setuptools wheel
+tl_run "pip upgrade tooling" sudo -u odoo "${VENV_PY}" -m pip install --upgrade pip setuptools wheel
 
 echo "Installing Odoo Python requirements (STANDARD MODE)..."
-sudo -u odoo "${VENV_PY}" -m pip install -r "${REQ_FILE}"
+tl_run "pip install requirements.txt" sudo -u odoo "${VENV_PY}" -m pip install -r "${REQ_FILE}"
 
 echo "Installing wand (for sale_product_image addon)..."
-sudo -u odoo "${VENV_PY}" -m pip install wand
+tl_run "pip install wand" sudo -u odoo "${VENV_PY}" -m pip install wand
 
 echo "Installing auto_database_backup dependencies..."
-sudo -u odoo "${VENV_PY}" -m pip install dropbox pyncclient boto3 nextcloud-api-wrapper paramiko
+tl_run "pip install backup addon deps" sudo -u odoo "${VENV_PY}" -m pip install dropbox pyncclient boto3 nextcloud-api-wrapper paramiko
 
 echo "Installing base_accounting_kit dependencies..."
-sudo -u odoo "${VENV_PY}" -m pip install openpyxl ofxparse qifparse
+tl_run "pip install accounting kit deps" sudo -u odoo "${VENV_PY}" -m pip install openpyxl ofxparse qifparse
+
+echo "Installing numpy (reference check of install/scripts/bench_tax_compute.py)..."
+tl_run "pip install numpy" sudo -u odoo "${VENV_PY}" -m pip install numpy
 sudo -u odoo "${VENV_PY}" - <<'EOF'
 import werkzeug, lxml
 print("OK: core imports successful")
@@ -14,8 +14,27 @@ if [[ ! -f "${ODOO_CONF_TEMPLATE}" ]]; then
   exit 1
 fi
 
+source "${SCRIPT_DIR}/lib/tenant.sh"
+source "${SCRIPT_DIR}/lib/resources.sh"
+
 ADMIN_PASSWD="${ADMIN_PASSWD:-$(openssl rand -hex 16)}"
-DB_NAME="odoo${ODOO_VERSION}"
+DB_NAME="${DB_NAME:-odoo${ODOO_VERSION}}"
+
+# Single database pinned by name, or (ODOO_TENANT_MODE=1) database chosen from the request hostname
+if [[ "${ODOO_TENANT_MODE:-0}" == "1" ]]; then
+  DB_FILTER="$(tenant_dbfilter)"
+  DB_NAME_OPTION="False"
+  echo "Tenant mode: dbfilter ${DB_FILTER} (one database per hostname; add more with ./add_tenant.sh)"
+else
+  DB_FILTER="^${DB_NAME}\$"
+  DB_NAME_OPTION="${DB_NAME}"
+fi
+
+resources_compute
+resources_summary
+if (( RES_WORKERS > 0 )); then
+  echo "workers=${RES_WORKERS}: the websocket (bus) is served on port 8072; step 11 (Nginx) routes /websocket there."
+fi
 
 export ADMIN_PASSWD DB_NAME ODOO_VERSION
 
@@ -23,8 +42,13 @@ sudo install -m 0640 -o odoo -g odoo /dev/null "${ODOO_CONF_OUT}"
 
 sudo bash -c "sed \
   -e 's|{{ADMIN_PASSWD}}|${ADMIN_PASSWD}|g' \
-  -e 's|{{DB_NAME}}|${DB_NAME}|g' \
+  -e 's|{{DB_NAME_OPTION}}|${DB_NAME_OPTION}|g' \
+  -e 's|{{DB_FILTER}}|${DB_FILTER}|g' \
   -e 's|{{ODOO_VERSION}}|${ODOO_VERSION}|g' \
+  -e 's|{{WORKERS}}|${RES_WORKERS}|g' \
+  -e 's|{{MAX_CRON_THREADS}}|${RES_CRON_THREADS}|g' \
+  -e 's|{{LIMIT_MEMORY_SOFT}}|${RES_LIMIT_MEMORY_SOFT}|g' \
+  -e 's|{{LIMIT_MEMORY_HARD}}|${RES_LIMIT_MEMORY_HARD}|g' \
   '${ODOO_CONF_TEMPLATE}' > '${ODOO_CONF_OUT}'"
 
 echo "✅ Wrote ${ODOO_CONF_OUT}"
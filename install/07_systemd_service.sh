@@ -3,10 +3,17 @@ set -euo pipefail
 
 echo "Installing systemd service for Odoo ${ODOO_VERSION}..."
 
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+REPO_ROOT="$(cd "${SCRIPT_DIR}/.." && pwd)"
+
 ODOO_USER="odoo"
 ODOO_HOME="/opt/odoo/odoo${ODOO_VERSION}"
 SERVICE_PATH="/etc/systemd/system/odoo${ODOO_VERSION}.service"
 CONF_PATH="/etc/odoo${ODOO_VERSION}.conf"
+SERVICE_TEMPLATE="${REPO_ROOT}/config/odoo19.service.template"
+CRON_SERVICE_TEMPLATE="${REPO_ROOT}/config/odoo19-cron.service.template"
+CRON_SERVICE_PATH="/etc/systemd/system/odoo${ODOO_VERSION}-cron.service"
+CRON_SLICE_PATH="/etc/systemd/system/odoo${ODOO_VERSION}-cron.slice"
 
 # Sanity checks (fail fast with clear errors)
 if ! id "${ODOO_USER}" >/dev/null 2>&1; then
@@ -29,38 +36,94 @@ if [[ ! -f "${CONF_PATH}" ]]; then
   exit 1
 fi
 
+for template in "${SERVICE_TEMPLATE}" "${CRON_SERVICE_TEMPLATE}"; do
+  if [[ ! -f "${template}" ]]; then
+    echo "ERROR: Missing template: ${template}"
+    exit 1
+  fi
+done
+
+# Same sizing as the workers / limit_memory_* written to odoo.conf by 07_odoo_config.sh
+source "${SCRIPT_DIR}/lib/resources.sh"
+resources_compute
+resources_summary
+
+READY_TIMEOUT="${ODOO_READY_TIMEOUT:-180}"
+if [[ "${RES_CRON_SERVICE}" == "1" ]]; then
+  CRON_WANTS="Wants=odoo${ODOO_VERSION}-cron.service"
+  HTTP_ARGS=" --max-cron-threads=0"
+else
+  CRON_WANTS=""
+  HTTP_ARGS=""
+fi
+
+render_unit() {
+  sed \
+    -e "s|{{ODOO_VERSION}}|${ODOO_VERSION}|g" \
+    -e "s|{{ODOO_USER}}|${ODOO_USER}|g" \
+    -e "s|{{ODOO_HOME}}|${ODOO_HOME}|g" \
+    -e "s|{{HTTP_ARGS}}|${HTTP_ARGS}|g" \
+    -e "s|{{MAX_CRON_THREADS}}|${RES_CRON_THREADS}|g" \
+    -e "s|{{READY_TIMEOUT}}|${READY_TIMEOUT}|g" \
+    -e "s|{{START_TIMEOUT}}|$((READY_TIMEOUT + 30))|g" \
+    -e "s|{{MEMORY_HIGH}}|${RES_HTTP_MEM_MB}|g" \
+    -e "s|{{MEMORY_MAX}}|${RES_HTTP_MEM_MAX_MB}|g" \
+    -e "s|{{CRON_WANTS}}|${CRON_WANTS}|g" \
+    -e '/^$/{N;/^\n$/D}' \
+    "$1" | sudo tee "$2" >/dev/null
+}
+
 echo "Writing ${SERVICE_PATH} ..."
+render_unit "${SERVICE_TEMPLATE}" "${SERVICE_PATH}"
 
-sudo tee "${SERVICE_PATH}" >/dev/null <<EOF
+if [[ "${RES_CRON_SERVICE}" == "1" ]]; then
+  echo "Writing ${CRON_SERVICE_PATH} (scheduled actions in odoo${ODOO_VERSION}-cron.slice)..."
+  render_unit "${CRON_SERVICE_TEMPLATE}" "${CRON_SERVICE_PATH}"
+  sudo tee "${CRON_SLICE_PATH}" >/dev/null <<EOF
 [Unit]
-Description=Odoo ${ODOO_VERSION} Community
-After=network.target postgresql.service
-Requires=postgresql.service
+Description=Odoo ${ODOO_VERSION} scheduled actions
+Before=slices.target
 
+[Slice]
+CPUWeight=25
+IOWeight=25
+MemoryHigh=${RES_CRON_MEM_MB}M
+MemoryMax=${RES_CRON_MEM_MAX_MB}M
+EOF
+elif [[ -f "${CRON_SERVICE_PATH}" ]]; then
+  echo "Removing odoo${ODOO_VERSION}-cron.service (cron runs in the main service again)..."
+  sudo systemctl disable --now "odoo${ODOO_VERSION}-cron.service" 2>/dev/null || true
+  sudo rm -f "${CRON_SERVICE_PATH}" "${CRON_SLICE_PATH}"
+fi
+
+# PostgreSQL ahead of Odoo for CPU and disk (Debian runs each cluster as postgresql@VERSION-main)
+for unit in postgresql.service postgresql@.service; do
+  sudo mkdir -p "/etc/systemd/system/${unit}.d"
+  sudo tee "/etc/systemd/system/${unit}.d/50-odoo-priority.conf" >/dev/null <<EOF
 [Service]
-Type=simple
-User=${ODOO_USER}
-Group=${ODOO_USER}
-WorkingDirectory=${ODOO_HOME}/odoo
-ExecStart=${ODOO_HOME}/venv/bin/python3 ${ODOO_HOME}/odoo/odoo-bin -c ${CONF_PATH}
-Restart=always
-RestartSec=3
-KillMode=mixed
-TimeoutStopSec=30
-StandardOutput=journal
-StandardError=journal
-
-[Install]
-WantedBy=multi-user.target
+CPUWeight=200
+IOWeight=500
 EOF
+done
 
 echo "Reloading systemd daemon..."
 sudo systemctl daemon-reload
 
+# Apply the PostgreSQL weights to the running clusters without restarting them
+for unit in $(systemctl list-units 'postgresql*' --type=service --plain --no-legend 2>/dev/null | awk '{print $1}'); do
+  sudo systemctl set-property --runtime "${unit}" CPUWeight=200 IOWeight=500 || true
+done
+
 echo "Enabling odoo${ODOO_VERSION} service on boot..."
 sudo systemctl enable "odoo${ODOO_VERSION}.service"
+if [[ "${RES_CRON_SERVICE}" == "1" ]]; then
+  sudo systemctl enable "odoo${ODOO_VERSION}-cron.service"
+fi
 
-echo "Starting odoo${ODOO_VERSION} service..."
+echo "Starting odoo${ODOO_VERSION} service (waits until /web/health answers)..."
 sudo systemctl restart "odoo${ODOO_VERSION}.service"
+if [[ "${RES_CRON_SERVICE}" == "1" ]]; then
+  sudo systemctl restart "odoo${ODOO_VERSION}-cron.service"
+fi
 
-echo "✅ systemd service installed and started."
\ No newline at end of file
+echo "✅ systemd service installed and started."
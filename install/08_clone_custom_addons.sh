@@ -13,13 +13,14 @@ fi
 REPO_ROOT="$(cd "$(dirname "$0")/.." && pwd)"
 ADDONS_FILE="$REPO_ROOT/custom_addons.txt"
 
+source "$REPO_ROOT/install/lib/apt.sh"
+
 echo "Installing custom addons from Git repositories..."
 
 # Ensure git is installed
 if ! command -v git >/dev/null 2>&1; then
   echo "🔧 git not found — installing..."
-  apt-get update -y
-  apt-get install -y git
+  ensure_packages git
 fi
 
 mkdir -p "$TARGET_DIR"
@@ -0,0 +1,36 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+: "${ODOO_VERSION:?ODOO_VERSION not set}"
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+
+DB_NAME="${DB_NAME:-odoo${ODOO_VERSION}}"
+ODOO_SERVICE="odoo${ODOO_VERSION}"
+WARMUP_SCRIPT="${SCRIPT_DIR}/scripts/warmup_cache.py"
+WARMUP_JSON="/var/log/odoo/warmup-${DB_NAME}.json"
+# Tenant mode: the dbfilter picks the database from the Host header
+if [[ "${ODOO_TENANT_MODE:-0}" == "1" ]]; then
+  export ODOO_WARMUP_HOST="${ODOO_WARMUP_HOST:-${DOMAIN:-${DB_NAME}}}"
+fi
+
+if [[ "${ODOO_WARMUP:-1}" == "0" ]]; then
+  echo "ODOO_WARMUP=0: skipping cache warm-up."
+  exit 0
+fi
+
+echo "Warming up Odoo caches for database '${DB_NAME}'..."
+
+if ! systemctl is-active --quiet "${ODOO_SERVICE}"; then
+  echo "⚠️  ${ODOO_SERVICE} is not active; skipping warm-up."
+  exit 0
+fi
+
+[[ -f "${WARMUP_SCRIPT}" ]] || { echo "ERROR: Missing ${WARMUP_SCRIPT}"; exit 1; }
+
+# Warm-up is best effort: a failure here must not fail the install
+if DB_NAME="${DB_NAME}" python3 "${WARMUP_SCRIPT}" --json "${WARMUP_JSON}"; then
+  echo "✅ Caches warmed (results: ${WARMUP_JSON})."
+else
+  echo "⚠️  Warm-up did not complete. Check: sudo journalctl -u ${ODOO_SERVICE} -n 200 --no-pager"
+fi
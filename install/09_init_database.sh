@@ -7,6 +7,8 @@ set -euo pipefail
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 REPO_ROOT="$(cd "${SCRIPT_DIR}/.." && pwd)"
 
+source "${SCRIPT_DIR}/lib/timeline.sh"
+
 DB_NAME="${DB_NAME:-odoo${ODOO_VERSION}}"
 ODOO_USER="odoo"
 ODOO_HOME="/opt/odoo/odoo${ODOO_VERSION}"
@@ -37,6 +39,9 @@ LANG_CODE="${ODOO_LANG:-es_PA}"
 WITHOUT_DEMO="${ODOO_WITHOUT_DEMO:-1}"
 # Default country by ISO code (PA = Panama); override with ODOO_COUNTRY_CODE=US etc.
 COUNTRY_CODE="${ODOO_COUNTRY_CODE:-PA}"
+
+# run_odoo_script: stages each configuration script with install/scripts/scriptlib and runs it as odoo
+source "${SCRIPT_DIR}/scripts/run_common.sh"
 # Modules to install after base: if ODOO_INIT_MODULES is set, use it; otherwise install ALL add-ons
 # present in custom-addons (so first login has everything from assets/oca-zips already installed).
 if [[ -n "${ODOO_INIT_MODULES:-}" ]]; then
@@ -100,22 +105,11 @@ run_config_script() {
   fi
 
   echo "${description}"
-  local run_path="/tmp/${script_name%.*}_odoo.py"
-  sudo cp "${script_path}" "${run_path}"
-  sudo chown "${ODOO_USER}:${ODOO_USER}" "${run_path}"
-
   local log_file="/tmp/odoo_script_${script_name}.log"
-  set +e
-  sudo -u "${ODOO_USER}" env \
-      ODOO_HOME="${ODOO_HOME}" \
-      ODOO_CONF="${ODOO_CONF}" \
-      DB_NAME="${DB_NAME}" \
-      ODOO_COUNTRY_CODE="${COUNTRY_CODE}" \
-      "${ODOO_PY}" "${run_path}" > "$log_file" 2>&1
-  local ret=$?
-  set -e
-
-  sudo rm -f "${run_path}"
+  tl_begin "${script_name}"
+  local ret=0
+  run_odoo_script "${script_path}" > "$log_file" 2>&1 || ret=$?
+  tl_end "${script_name}" "${ret}"
 
   if [[ $ret -eq 0 ]]; then
     record_result "$script_name" "SUCCESS" ""
@@ -214,11 +208,14 @@ if [[ "${INIT_OK}" == "1" ]]; then
   exit 0
 fi
 
-# Stop service
-sudo systemctl stop "${ODOO_SERVICE}" >/dev/null 2>&1 || true
+# Stop service (tenant mode: the instance serves other databases; a new one needs no stop)
+if [[ "${ODOO_TENANT_MODE:-0}" != "1" ]]; then
+  sudo systemctl stop "${ODOO_SERVICE}" >/dev/null 2>&1 || true
+fi
 
 # INIT BASE (VALID FLAGS ONLY)
 base_log="/tmp/odoo_base_install.log"
+tl_begin "odoo-bin -i base"
 set +e
 sudo -u "${ODOO_USER}" "${ODOO_PY}" "${ODOO_BIN}" \
   -c "${ODOO_CONF}" \
@@ -229,6 +226,7 @@ sudo -u "${ODOO_USER}" "${ODOO_PY}" "${ODOO_BIN}" \
   --stop-after-init > "$base_log" 2>&1
 ret=$?
 set -e
+tl_end "odoo-bin -i base" "${ret}"
 
 if [[ $ret -eq 0 ]]; then
   record_result "Init Base DB" "SUCCESS" ""
@@ -248,6 +246,7 @@ if [[ -n "${INIT_MODULES}" ]]; then
   echo "Installing modules: ${INIT_MODULES}..."
   echo "(RST/docstring warnings during load are usually harmless.)"
   mod_log="/tmp/odoo_mod_install.log"
+  tl_begin "odoo-bin -i (extra modules)"
   set +e
   sudo -u "${ODOO_USER}" "${ODOO_PY}" "${ODOO_BIN}" \
     -c "${ODOO_CONF}" \
@@ -256,6 +255,7 @@ if [[ -n "${INIT_MODULES}" ]]; then
     --stop-after-init > "$mod_log" 2>&1
   ret=$?
   set -e
+  tl_end "odoo-bin -i (extra modules)" "${ret}"
 
   if [[ $ret -eq 0 ]]; then
     record_result "Install Extra Modules" "SUCCESS" ""
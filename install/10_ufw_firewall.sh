@@ -1,13 +1,12 @@
 #!/usr/bin/env bash
 set -euo pipefail
 
+source "$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)/lib/apt.sh"
+
 echo "Configuring UFW firewall..."
 
-# Install ufw if missing
-if ! command -v ufw >/dev/null 2>&1; then
-  apt-get update -y
-  apt-get install -y ufw
-fi
+# Install ufw if missing (normally done by 01_dependencies.sh)
+ensure_packages ufw
 
 # Reset and configure rules
 ufw --force reset
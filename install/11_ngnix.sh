@@ -9,6 +9,14 @@ echo "Installing and configuring Nginx + SSL..."
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 REPO_ROOT="$(cd "${SCRIPT_DIR}/.." && pwd)"
 
+source "${SCRIPT_DIR}/lib/timeline.sh"
+source "${SCRIPT_DIR}/lib/apt.sh"
+source "${SCRIPT_DIR}/lib/resources.sh"
+
+# Same sizing as 07_odoo_config.sh: with workers > 0 the websocket is served on 8072
+resources_compute
+WEBSOCKET_PORT=$(( RES_WORKERS > 0 ? 8072 : 8069 ))
+
 NGINX_TEMPLATE="${REPO_ROOT}/templates/nginx-odoo.conf.template"
 NGINX_SSL_TEMPLATE="${REPO_ROOT}/templates/nginx-odoo-ssl.conf.template"
 NGINX_SITE="/etc/nginx/sites-available/${DOMAIN}"
@@ -53,21 +61,23 @@ fi
 # ------------------------------------------------------------
 # Install packages
 # ------------------------------------------------------------
-apt-get update -y
-apt-get install -y nginx certbot python3-certbot-nginx
+# Normally already installed by 01_dependencies.sh (install/apt-packages.txt)
+tl_run "apt-get install nginx certbot" ensure_packages nginx certbot python3-certbot-nginx
 # AWS CLI for S3/R2 (Ubuntu 24.04 has no awscli in apt; use official installer as fallback)
 if [[ "${SSL_STORAGE_TYPE}" == "s3" ]]; then
   if ! command -v aws >/dev/null 2>&1; then
-    apt-get install -y awscli 2>/dev/null || true
+    apt_install awscli 2>/dev/null || true
   fi
   if ! command -v aws >/dev/null 2>&1; then
     echo "Installing AWS CLI v2 for S3/R2..."
-    apt-get install -y curl unzip
+    tl_begin "Install AWS CLI v2"
+    ensure_packages curl unzip
     TMP_AWS="/tmp/awscliv2"
     curl -fsSL "https://awscli.amazonaws.com/awscli-exe-linux-x86_64.zip" -o "${TMP_AWS}.zip"
     unzip -o -q "${TMP_AWS}.zip" -d /tmp
     /tmp/aws/install -i /usr/local/aws-cli -b /usr/local/bin
     rm -rf "${TMP_AWS}.zip" /tmp/aws
+    tl_end "Install AWS CLI v2"
   fi
 fi
 
@@ -80,6 +90,7 @@ if [[ "${SSL_STORAGE_TYPE}" == "s3" && -n "${S3_BUCKET}" ]]; then
   if [[ ! -f "${FULLCHAIN}" || ! -f "${PRIVKEY}" ]]; then
     S3_URI="s3://${S3_BUCKET}/${S3_PREFIX}/${DOMAIN}/cert.tar.gz"
     echo "Trying to restore SSL certificate from ${S3_URI}..."
+    tl_begin "Restore certificate from S3"
     mkdir -p "${CERT_DIR}"
     AWS_OPTS=()
     [[ -n "${S3_ENDPOINT}" ]] && AWS_OPTS+=(--endpoint-url "${S3_ENDPOINT}")
@@ -94,6 +105,7 @@ if [[ "${SSL_STORAGE_TYPE}" == "s3" && -n "${S3_BUCKET}" ]]; then
     else
       echo "No certificate found in S3 (or download failed); will use Certbot if needed."
     fi
+    tl_end "Restore certificate from S3"
   fi
 fi
 
@@ -138,6 +150,7 @@ if [[ "${USE_STORED_CERT}" -eq 1 ]]; then
   sed \
     -e "s|{{DOMAIN}}|${DOMAIN}|g" \
     -e "s|{{ODOO_PORT}}|8069|g" \
+    -e "s|{{WEBSOCKET_PORT}}|${WEBSOCKET_PORT}|g" \
     -e "s|{{SSL_CERT_PATH}}|${FULLCHAIN}|g" \
     -e "s|{{SSL_KEY_PATH}}|${PRIVKEY}|g" \
     "${NGINX_SSL_TEMPLATE}" > "${NGINX_SITE}"
@@ -145,6 +158,7 @@ else
   sed \
     -e "s|{{DOMAIN}}|${DOMAIN}|g" \
     -e "s|{{ODOO_PORT}}|8069|g" \
+    -e "s|{{WEBSOCKET_PORT}}|${WEBSOCKET_PORT}|g" \
     "${NGINX_TEMPLATE}" > "${NGINX_SITE}"
 fi
 
@@ -170,9 +184,7 @@ fi
 # ------------------------------------------------------------
 echo "Stabilizing firewall / networking before Certbot..."
 
-if ! command -v ufw >/dev/null 2>&1; then
-  apt-get install -y ufw
-fi
+ensure_packages ufw
 
 ufw allow 80 || true
 ufw allow 443 || true
@@ -184,7 +196,7 @@ ip6tables -F || true
 ip6tables -X || true
 systemctl start ufw || true
 
-sleep 5
+tl_run "Network settle wait" sleep 5
 
 # ------------------------------------------------------------
 # Request cert with Certbot; on success, save copy to store
@@ -193,7 +205,7 @@ CERTBOT_OK=0
 if curl -fsS --connect-timeout 5 "http://${DOMAIN}" >/dev/null; then
   echo "Domain reachable over HTTP. Proceeding with Certbot..."
 
-  if certbot --nginx \
+  if tl_run "certbot --nginx" certbot --nginx \
     -d "${DOMAIN}" \
     -m "${LETSENCRYPT_EMAIL}" \
     --agree-tos \
@@ -246,6 +258,7 @@ if [[ "${CERTBOT_OK}" -eq 1 ]]; then
     sed \
       -e "s|{{DOMAIN}}|${DOMAIN}|g" \
       -e "s|{{ODOO_PORT}}|8069|g" \
+      -e "s|{{WEBSOCKET_PORT}}|${WEBSOCKET_PORT}|g" \
       -e "s|{{SSL_CERT_PATH}}|${FULLCHAIN}|g" \
       -e "s|{{SSL_KEY_PATH}}|${PRIVKEY}|g" \
       "${NGINX_SSL_TEMPLATE}" > "${NGINX_SITE}"
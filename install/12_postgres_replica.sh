@@ -0,0 +1,102 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+# Opt-in (ODOO_PG_REPLICA=1): streaming read replica for read-only traffic.
+# Odoo 19 sends read-only requests and cursors (reports, web_search_read, ...) to
+# db_replica_host/db_replica_port, so heavy report queries stop competing with invoice posting.
+#
+# - Local replica (default, also for testing): a second cluster "replica" of the same PostgreSQL
+#   major on ODOO_PG_REPLICA_PORT (5433), cloned with pg_basebackup -R and streaming from the
+#   primary through a physical replication slot (WAL kept until the replica has replayed it).
+# - Remote replica (ODOO_PG_REPLICA_HOST=host): provisioned elsewhere; only odoo.conf is set.
+# ODOO_PG_REPLICA_REBUILD=1 re-clones an existing local replica.
+
+: "${ODOO_VERSION:?ODOO_VERSION not set}"
+
+ODOO_CONF="/etc/odoo${ODOO_VERSION}.conf"
+ODOO_SERVICE="odoo${ODOO_VERSION}"
+REPLICA_HOST="${ODOO_PG_REPLICA_HOST:-}"
+REPLICA_PORT="${ODOO_PG_REPLICA_PORT:-5433}"
+REPLICA_CLUSTER="replica"
+SLOT_NAME="odoo_replica"
+PG_SOCKET_DIR="/var/run/postgresql"
+
+if [[ "${ODOO_PG_REPLICA:-0}" != "1" ]]; then
+  echo "ODOO_PG_REPLICA not set to 1: skipping read replica."
+  exit 0
+fi
+
+[[ -f "${ODOO_CONF}" ]] || { echo "ERROR: Missing ${ODOO_CONF}"; exit 1; }
+
+# Set (or add) "key = value" in the [options] section of odoo.conf
+set_conf_option() {
+  local key="$1"
+  local value="$2"
+  if grep -qE "^\s*${key}\s*=" "${ODOO_CONF}"; then
+    sed -i "s|^\s*${key}\s*=.*|${key} = ${value}|" "${ODOO_CONF}"
+  else
+    echo "${key} = ${value}" >> "${ODOO_CONF}"
+  fi
+}
+
+if [[ -z "${REPLICA_HOST}" ]]; then
+  echo "Provisioning local streaming replica on port ${REPLICA_PORT}..."
+
+  # Primary: the "main" cluster created by 02_postgres.sh
+  PG_VERSION="$(pg_lsclusters -h | awk '$2 == "main" { print $1; exit }')"
+  PRIMARY_PORT="$(pg_lsclusters -h | awk '$2 == "main" { print $3; exit }')"
+  [[ -n "${PG_VERSION}" ]] || { echo "ERROR: PostgreSQL cluster 'main' not found (pg_lsclusters)."; exit 1; }
+  REPLICA_DATA="/var/lib/postgresql/${PG_VERSION}/${REPLICA_CLUSTER}"
+
+  IN_RECOVERY=""
+  if pg_lsclusters -h | awk -v c="${REPLICA_CLUSTER}" '$2 == c { found = 1 } END { exit !found }'; then
+    IN_RECOVERY="$(sudo -u postgres psql -p "${REPLICA_PORT}" -tAc "SELECT pg_is_in_recovery()" 2>/dev/null || true)"
+  fi
+
+  if [[ "${IN_RECOVERY}" == "t" && "${ODOO_PG_REPLICA_REBUILD:-0}" != "1" ]]; then
+    echo "Replica cluster ${PG_VERSION}/${REPLICA_CLUSTER} already streaming; keeping it (ODOO_PG_REPLICA_REBUILD=1 to re-clone)."
+  else
+    if pg_lsclusters -h | awk -v c="${REPLICA_CLUSTER}" '$2 == c { found = 1 } END { exit !found }'; then
+      pg_ctlcluster "${PG_VERSION}" "${REPLICA_CLUSTER}" stop 2>/dev/null || true
+    else
+      # Config in /etc/postgresql/<ver>/replica (port, memory), data replaced by the base backup below
+      pg_createcluster "${PG_VERSION}" "${REPLICA_CLUSTER}" --port "${REPLICA_PORT}"
+    fi
+
+    sudo -u postgres psql -p "${PRIMARY_PORT}" -tAc \
+      "SELECT pg_drop_replication_slot('${SLOT_NAME}') FROM pg_replication_slots WHERE slot_name = '${SLOT_NAME}'" >/dev/null
+
+    echo "Cloning primary (${PG_VERSION}/main, port ${PRIMARY_PORT}) with pg_basebackup..."
+    rm -rf "${REPLICA_DATA:?}"/*
+    # -R writes standby.signal + primary_conninfo (local socket, peer auth); -C -S creates the slot
+    sudo -u postgres pg_basebackup \
+      -h "${PG_SOCKET_DIR}" -p "${PRIMARY_PORT}" -U postgres \
+      -D "${REPLICA_DATA}" -X stream -R -C -S "${SLOT_NAME}" -c fast -P
+  fi
+
+  systemctl enable "postgresql@${PG_VERSION}-${REPLICA_CLUSTER}" >/dev/null 2>&1 || true
+  pg_ctlcluster "${PG_VERSION}" "${REPLICA_CLUSTER}" start 2>/dev/null || true
+
+  for _ in $(seq 1 30); do
+    [[ "$(sudo -u postgres psql -p "${REPLICA_PORT}" -tAc "SELECT pg_is_in_recovery()" 2>/dev/null || true)" == "t" ]] && break
+    sleep 1
+  done
+  if [[ "$(sudo -u postgres psql -p "${REPLICA_PORT}" -tAc "SELECT pg_is_in_recovery()" 2>/dev/null || true)" != "t" ]]; then
+    echo "ERROR: replica on port ${REPLICA_PORT} is not running in recovery. Check: sudo pg_lsclusters; journalctl -u postgresql@${PG_VERSION}-${REPLICA_CLUSTER}"
+    exit 1
+  fi
+  sudo -u postgres psql -p "${PRIMARY_PORT}" -c \
+    "SELECT application_name, state, pg_size_pretty(pg_wal_lsn_diff(pg_current_wal_lsn(), replay_lsn)) AS lag FROM pg_stat_replication"
+
+  REPLICA_HOST="${PG_SOCKET_DIR}"
+fi
+
+echo "Setting db_replica_host / db_replica_port in ${ODOO_CONF}..."
+set_conf_option db_replica_host "${REPLICA_HOST}"
+set_conf_option db_replica_port "${REPLICA_PORT}"
+
+if systemctl is-active --quiet "${ODOO_SERVICE}"; then
+  systemctl restart "${ODOO_SERVICE}"
+fi
+
+echo "✅ Read replica configured: ${REPLICA_HOST}:${REPLICA_PORT} (read-only requests use it; writes stay on the primary)."
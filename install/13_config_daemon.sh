@@ -0,0 +1,88 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+# Opt-in (ODOO_CONFIG_DAEMON=1): configuration daemon (install/scripts/config_daemon.py).
+# A long-lived process running as odoo keeps the Odoo registry loaded and runs the set_*.py
+# scripts on request through a Unix socket, so install/scripts/run_set_*.sh (run_odoo_script)
+# return in milliseconds instead of importing Odoo and loading the registry for a few rows.
+#
+# The scripts, scriptlib and the daemon are copied to ${ODOO_HOME}/config-daemon and the service
+# odoo${ODOO_VERSION}-config is (re)started, so it always runs the current copy. Wrappers fall back
+# to running the script directly when the daemon is not running or its copy is outdated.
+# With ODOO_CONFIG_DAEMON=0 an existing daemon is stopped and disabled.
+
+: "${ODOO_VERSION:?ODOO_VERSION not set}"
+
+ODOO_USER="odoo"
+ODOO_HOME="/opt/odoo/odoo${ODOO_VERSION}"
+ODOO_PY="${ODOO_HOME}/venv/bin/python3"
+ODOO_CONF="/etc/odoo${ODOO_VERSION}.conf"
+DB_NAME="${DB_NAME:-odoo${ODOO_VERSION}}"
+SERVICE="odoo${ODOO_VERSION}-config"
+SERVICE_PATH="/etc/systemd/system/${SERVICE}.service"
+JOBS_DIR="${ODOO_HOME}/config-daemon"
+SOCKET="/run/${SERVICE}/config.sock"
+SCRIPTS_SRC="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)/scripts"
+
+if [[ "${ODOO_CONFIG_DAEMON:-0}" != "1" ]]; then
+  if [[ -f "${SERVICE_PATH}" ]]; then
+    echo "ODOO_CONFIG_DAEMON not set to 1: stopping and disabling ${SERVICE}."
+    systemctl disable --now "${SERVICE}.service" || true
+  else
+    echo "ODOO_CONFIG_DAEMON not set to 1: skipping configuration daemon."
+  fi
+  exit 0
+fi
+
+[[ -f "${ODOO_CONF}" ]] || { echo "ERROR: Missing ${ODOO_CONF}"; exit 1; }
+[[ -x "${ODOO_PY}" ]] || { echo "ERROR: Missing ${ODOO_PY}"; exit 1; }
+
+echo "Installing configuration jobs in ${JOBS_DIR}..."
+rm -rf "${JOBS_DIR}"
+install -d -o "${ODOO_USER}" -g "${ODOO_USER}" -m 750 "${JOBS_DIR}"
+cp "${SCRIPTS_SRC}"/set_*.py "${SCRIPTS_SRC}/config_daemon.py" "${JOBS_DIR}/"
+cp -r "${SCRIPTS_SRC}/scriptlib" "${JOBS_DIR}/scriptlib"
+find "${JOBS_DIR}" -name __pycache__ -prune -exec rm -rf {} +
+chown -R "${ODOO_USER}:${ODOO_USER}" "${JOBS_DIR}"
+
+echo "Writing ${SERVICE_PATH} ..."
+tee "${SERVICE_PATH}" >/dev/null <<UNIT
+[Unit]
+Description=Odoo ${ODOO_VERSION} configuration daemon (warm registry for install/scripts/run_set_*.sh)
+After=network.target postgresql.service
+Requires=postgresql.service
+
+[Service]
+Type=simple
+User=${ODOO_USER}
+Group=${ODOO_USER}
+RuntimeDirectory=${SERVICE}
+RuntimeDirectoryMode=0750
+WorkingDirectory=${JOBS_DIR}
+Environment=ODOO_HOME=${ODOO_HOME}
+Environment=ODOO_CONF=${ODOO_CONF}
+Environment=PYTHONDONTWRITEBYTECODE=1
+ExecStart=${ODOO_PY} ${JOBS_DIR}/config_daemon.py serve --socket ${SOCKET} --conf ${ODOO_CONF} --db ${DB_NAME}
+Restart=on-failure
+RestartSec=5
+StandardOutput=journal
+StandardError=journal
+
+[Install]
+WantedBy=multi-user.target
+UNIT
+
+systemctl daemon-reload
+systemctl enable "${SERVICE}.service"
+systemctl restart "${SERVICE}.service"
+
+# The registry load takes a few seconds; wait for the socket so the first wrapper call is fast
+for _ in $(seq 1 60); do
+  [[ -S "${SOCKET}" ]] && break
+  sleep 1
+done
+if [[ -S "${SOCKET}" ]]; then
+  echo "✅ Configuration daemon ${SERVICE} listening on ${SOCKET}."
+else
+  echo "⚠️  ${SOCKET} not there yet (journalctl -u ${SERVICE}); the wrappers run scripts directly until it is."
+fi
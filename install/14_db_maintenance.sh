@@ -0,0 +1,91 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+# PostgreSQL maintenance for the hot Odoo tables (install/scripts/db_maintenance.py):
+# - per-table autovacuum settings for account_move_line, account_move, mail_message,
+#   ir_attachment and bus_bus (db_maintenance.py tune), so they are vacuumed and analyzed at a few
+#   percent of dead rows instead of the 20 % default;
+# - timer odoo${ODOO_VERSION}-db-maintenance: every night at the start of ODOO_DB_MAINTENANCE_WINDOW,
+#   REINDEX CONCURRENTLY of the btree indexes past ODOO_REINDEX_BLOAT_PERCENT estimated bloat,
+#   stopping when the window closes.
+# The script is copied to ${ODOO_HOME}/maintenance so the timer does not depend on this checkout.
+# ODOO_DB_MAINTENANCE=0 removes the per-table settings and the timer.
+
+: "${ODOO_VERSION:?ODOO_VERSION not set}"
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+DB_NAME="${DB_NAME:-odoo${ODOO_VERSION}}"
+ODOO_USER="odoo"
+ODOO_HOME="/opt/odoo/odoo${ODOO_VERSION}"
+ODOO_PY="${ODOO_HOME}/venv/bin/python3"
+ODOO_CONF="/etc/odoo${ODOO_VERSION}.conf"
+SERVICE="odoo${ODOO_VERSION}-db-maintenance"
+SERVICE_PATH="/etc/systemd/system/${SERVICE}.service"
+TIMER_PATH="/etc/systemd/system/${SERVICE}.timer"
+MAINTENANCE_DIR="${ODOO_HOME}/maintenance"
+WINDOW="${ODOO_DB_MAINTENANCE_WINDOW:-02:00-05:00}"
+BLOAT_PERCENT="${ODOO_REINDEX_BLOAT_PERCENT:-40}"
+MIN_SIZE_MB="${ODOO_REINDEX_MIN_MB:-50}"
+
+source "${SCRIPT_DIR}/scripts/run_common.sh"
+
+if [[ ! "${WINDOW}" =~ ^[0-2][0-9]:[0-5][0-9]-[0-2][0-9]:[0-5][0-9]$ ]]; then
+  echo "ERROR: ODOO_DB_MAINTENANCE_WINDOW must look like 02:00-05:00 (got '${WINDOW}')."
+  exit 1
+fi
+
+if [[ "${ODOO_DB_MAINTENANCE:-1}" == "0" ]]; then
+  echo "ODOO_DB_MAINTENANCE=0: removing per-table autovacuum settings and ${SERVICE}.timer."
+  run_odoo_script "${SCRIPT_DIR}/scripts/db_maintenance.py" tune --reset
+  if [[ -f "${TIMER_PATH}" ]]; then
+    systemctl disable --now "${SERVICE}.timer" || true
+    rm -f "${TIMER_PATH}" "${SERVICE_PATH}"
+    systemctl daemon-reload
+  fi
+  exit 0
+fi
+
+echo "Applying per-table autovacuum settings to ${DB_NAME}..."
+run_odoo_script "${SCRIPT_DIR}/scripts/db_maintenance.py" tune
+
+echo "Installing ${MAINTENANCE_DIR}/db_maintenance.py..."
+install -d -o "${ODOO_USER}" -g "${ODOO_USER}" -m 750 "${MAINTENANCE_DIR}"
+install -o "${ODOO_USER}" -g "${ODOO_USER}" -m 640 "${SCRIPT_DIR}/scripts/db_maintenance.py" "${MAINTENANCE_DIR}/"
+
+echo "Writing ${SERVICE_PATH} and ${TIMER_PATH} (reindex window ${WINDOW})..."
+tee "${SERVICE_PATH}" >/dev/null <<UNIT
+[Unit]
+Description=Odoo ${ODOO_VERSION} off-hours REINDEX CONCURRENTLY of bloated indexes
+After=postgresql.service
+Requires=postgresql.service
+
+[Service]
+Type=oneshot
+User=${ODOO_USER}
+Group=${ODOO_USER}
+Environment=ODOO_HOME=${ODOO_HOME}
+Environment=ODOO_CONF=${ODOO_CONF}
+Environment=DB_NAME=${DB_NAME}
+Environment=PYTHONDONTWRITEBYTECODE=1
+ExecStart=${ODOO_PY} ${MAINTENANCE_DIR}/db_maintenance.py reindex --window ${WINDOW} --index-bloat ${BLOAT_PERCENT} --min-size-mb ${MIN_SIZE_MB}
+StandardOutput=journal
+StandardError=journal
+UNIT
+
+tee "${TIMER_PATH}" >/dev/null <<UNIT
+[Unit]
+Description=Nightly index maintenance for Odoo ${ODOO_VERSION} (${WINDOW})
+
+[Timer]
+OnCalendar=*-*-* ${WINDOW%-*}:00
+RandomizedDelaySec=10min
+Persistent=false
+
+[Install]
+WantedBy=timers.target
+UNIT
+
+systemctl daemon-reload
+systemctl enable --now "${SERVICE}.timer"
+
+echo "✅ Autovacuum settings applied; ${SERVICE}.timer next run: $(systemctl show -p NextElapseUSecRealtime --value "${SERVICE}.timer" 2>/dev/null || echo '?')"
@@ -0,0 +1,91 @@
+#!/usr/bin/env bash
+# apt helpers shared by the install steps (sourced; steps run as root).
+#
+#   apt_update_once                 apt-get update unless the index was refreshed recently
+#   apt_install PKG|./file.deb ...  apt-get install in one transaction, .debs kept in the cache
+#   ensure_packages PKG ...         install only the packages not installed yet (no-op otherwise)
+#   apt_manifest_packages [FILE]    package names from install/apt-packages.txt
+#   fetch_deb URL                   download a .deb into the cache once; prints its path
+#
+# Downloaded packages are kept in ODOO_APT_CACHE_DIR (default /var/cache/odoo-install/apt), so a
+# re-run on the same host, or a host whose cache dir was copied/mounted from a prepared one,
+# installs without downloading the same .deb twice.
+
+ODOO_APT_CACHE_DIR="${ODOO_APT_CACHE_DIR:-/var/cache/odoo-install/apt}"
+ODOO_APT_UPDATE_MAX_AGE="${ODOO_APT_UPDATE_MAX_AGE:-3600}"
+APT_LIB_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+APT_MANIFEST="${APT_LIB_DIR}/../apt-packages.txt"
+
+# Patched-Qt wkhtmltopdf (amd64 only); installed with the manifest in one transaction
+WKHTMLTOX_DEB_URL="${WKHTMLTOX_DEB_URL:-https://github.com/wkhtmltopdf/packaging/releases/download/0.12.6.1-3/wkhtmltox_0.12.6.1-3.jammy_amd64.deb}"
+
+export DEBIAN_FRONTEND=noninteractive
+
+APT_OPTS=(
+  -o "Dir::Cache::Archives=${ODOO_APT_CACHE_DIR}/"
+  -o APT::Keep-Downloaded-Packages=true
+  -o Binary::apt::APT::Keep-Downloaded-Packages=true
+)
+
+_apt_cache_dir() {
+  mkdir -p "${ODOO_APT_CACHE_DIR}/partial"
+  chown _apt:root "${ODOO_APT_CACHE_DIR}/partial" 2>/dev/null || true
+}
+
+apt_update_once() {
+  local stamp="${ODOO_APT_CACHE_DIR}/.last-update"
+  local max_age_min=$(( ODOO_APT_UPDATE_MAX_AGE / 60 ))
+  (( max_age_min >= 1 )) || max_age_min=1
+  _apt_cache_dir
+
+  # Fresh enough, and no apt source added since (e.g. a new repository list)
+  if [[ -f "${stamp}" && -n "$(find "${stamp}" -mmin "-${max_age_min}" 2>/dev/null)" \
+        && -z "$(find /etc/apt/sources.list /etc/apt/sources.list.d -newer "${stamp}" 2>/dev/null)" ]]; then
+    echo "apt index refreshed less than ${max_age_min} min ago; skipping apt-get update."
+    return 0
+  fi
+  apt-get update -y
+  touch "${stamp}"
+}
+
+apt_install() {
+  apt_update_once
+  apt-get "${APT_OPTS[@]}" install -y "$@"
+}
+
+apt_upgrade() {
+  apt_update_once
+  apt-get "${APT_OPTS[@]}" upgrade -y
+}
+
+ensure_packages() {
+  local pkg
+  local missing=()
+  for pkg in "$@"; do
+    dpkg-query -W -f='${Status}' "${pkg}" 2>/dev/null | grep -q "install ok installed" || missing+=("${pkg}")
+  done
+  if (( ${#missing[@]} == 0 )); then
+    echo "Packages already installed: $*"
+    return 0
+  fi
+  echo "Installing missing packages: ${missing[*]}"
+  apt_install "${missing[@]}"
+}
+
+apt_manifest_packages() {
+  sed -e 's/#.*//' "${1:-${APT_MANIFEST}}" | xargs -n1 | sort -u
+}
+
+fetch_deb() {
+  local url="$1"
+  local path="${ODOO_APT_CACHE_DIR}/$(basename "${url}")"
+  _apt_cache_dir
+  if [[ -f "${path}" ]] && dpkg-deb -I "${path}" >/dev/null 2>&1; then
+    echo "Using cached ${path}" >&2
+  else
+    echo "Downloading: ${url}" >&2
+    curl -fL --retry 5 --retry-delay 2 -o "${path}.part" "${url}" >&2
+    mv -f "${path}.part" "${path}"
+  fi
+  echo "${path}"
+}
@@ -0,0 +1,92 @@
+#!/usr/bin/env bash
+# Resource profile of the Odoo services, computed from the host size (sourced, not executed).
+# 07_odoo_config.sh writes the worker limits to odoo.conf and 07_systemd_service.sh the systemd
+# limits from the same numbers, so the cgroup never kills a worker Odoo itself would keep.
+#
+#   resources_compute    sets the RES_* variables below (ODOO_* variables override the sizing)
+#
+#   RES_CPUS, RES_MEM_MB         host CPUs and RAM
+#   RES_ODOO_MEM_MB              RAM for Odoo (ODOO_MEMORY_PERCENT of RAM); the rest is left to
+#                                PostgreSQL (shared buffers + page cache) and the system
+#   RES_WORKERS                  odoo.conf workers (ODOO_WORKERS: 0 = threaded, N, or auto)
+#   RES_CRON_THREADS             odoo.conf max_cron_threads
+#   RES_LIMIT_MEMORY_SOFT/HARD   odoo.conf per-worker limits (bytes)
+#   RES_CRON_SERVICE             1 = cron runs in its own unit (odoo19-cron) and slice
+#   RES_HTTP_MEM_MB / _MAX_MB    MemoryHigh / MemoryMax of odoo19.service
+#   RES_CRON_MEM_MB / _MAX_MB    MemoryHigh / MemoryMax of odoo19-cron.slice
+#                                (threaded: MemoryMax from RAM only, see below)
+
+RES_MAIN_PROCESS_MB=256     # prefork master (+ gevent process) outside the per-worker limits
+RES_MB=$((1024 * 1024))
+
+resources_compute() {
+  RES_CPUS="$(nproc)"
+  RES_MEM_MB="$(awk '/MemTotal/ {print int($2 / 1024)}' /proc/meminfo)"
+  RES_ODOO_MEM_MB=$((RES_MEM_MB * ${ODOO_MEMORY_PERCENT:-60} / 100))
+
+  RES_CRON_THREADS="${ODOO_MAX_CRON_THREADS:-$(( RES_CPUS >= 4 ? 2 : 1 ))}"
+
+  # auto: Odoo's 2 x CPU + 1, as far as ~768 MB per worker fits in the Odoo share
+  RES_WORKERS="${ODOO_WORKERS:-0}"
+  if [[ "${RES_WORKERS}" == "auto" ]]; then
+    local by_mem=$(( (RES_ODOO_MEM_MB - RES_MAIN_PROCESS_MB) / 768 - RES_CRON_THREADS ))
+    RES_WORKERS=$(( 2 * RES_CPUS + 1 ))
+    if (( by_mem < RES_WORKERS )); then RES_WORKERS="${by_mem}"; fi
+    if (( RES_WORKERS < 2 )); then RES_WORKERS=2; fi
+  fi
+
+  RES_CRON_SERVICE="${ODOO_CRON_SERVICE:-auto}"
+  if [[ "${RES_CRON_SERVICE}" == "auto" ]]; then
+    # A second Odoo process loads its own registry: only worth it with some RAM to spare
+    RES_CRON_SERVICE=$(( RES_MEM_MB >= 2048 ? 1 : 0 ))
+  fi
+  (( RES_CRON_THREADS > 0 )) || RES_CRON_SERVICE=0
+
+  local soft_mb=2048 hard_mb=2560   # Odoo defaults; only enforced in prefork mode
+  if (( RES_WORKERS > 0 )); then
+    hard_mb=$(( (RES_ODOO_MEM_MB - RES_MAIN_PROCESS_MB * (1 + RES_CRON_SERVICE)) / (RES_WORKERS + RES_CRON_THREADS) ))
+    if (( hard_mb > 2560 )); then hard_mb=2560; fi
+    if (( hard_mb < 384 )); then hard_mb=384; fi
+    soft_mb=$(( hard_mb * 4 / 5 ))
+  fi
+  RES_LIMIT_MEMORY_SOFT=$(( soft_mb * RES_MB ))
+  RES_LIMIT_MEMORY_HARD=$(( hard_mb * RES_MB ))
+
+  RES_CRON_MEM_MB=0
+  if (( RES_CRON_SERVICE == 1 )); then
+    if (( RES_WORKERS > 0 )); then
+      RES_CRON_MEM_MB=$(( RES_CRON_THREADS * hard_mb + RES_MAIN_PROCESS_MB ))
+    else
+      RES_CRON_MEM_MB=$(( RES_ODOO_MEM_MB / 4 ))
+    fi
+  fi
+  RES_HTTP_MEM_MB=$(( RES_ODOO_MEM_MB - RES_CRON_MEM_MB ))
+  if (( RES_WORKERS > 0 )); then
+    # Every HTTP worker at its hard limit must still fit under MemoryMax
+    local needed=$(( RES_WORKERS * hard_mb + RES_MAIN_PROCESS_MB ))
+    (( RES_CRON_SERVICE == 1 )) || needed=$(( needed + RES_CRON_THREADS * hard_mb ))
+    if (( RES_HTTP_MEM_MB < needed )); then RES_HTTP_MEM_MB="${needed}"; fi
+  fi
+  if (( RES_WORKERS > 0 )); then
+    RES_HTTP_MEM_MAX_MB="$(_resources_max "${RES_HTTP_MEM_MB}")"
+    RES_CRON_MEM_MAX_MB="$(_resources_max "${RES_CRON_MEM_MB}")"
+  else
+    # Threaded: limit_memory_* are not enforced, so no worker is recycled before the cgroup limit
+    # and an OOM kill takes down the whole server; MemoryHigh still throttles, MemoryMax only
+    # guards the host
+    RES_HTTP_MEM_MAX_MB=$(( RES_MEM_MB * 9 / 10 ))
+    RES_CRON_MEM_MAX_MB=$(( RES_MEM_MB * 9 / 10 ))
+  fi
+}
+
+# MemoryMax for a MemoryHigh: 25 % headroom (reclaim/throttle first, OOM kill last), at most 90 % of RAM
+_resources_max() {
+  local max=$(( $1 * 5 / 4 )) cap=$(( RES_MEM_MB * 9 / 10 ))
+  echo $(( max < cap ? max : cap ))
+}
+
+resources_summary() {
+  echo "Resources: ${RES_CPUS} CPU(s), ${RES_MEM_MB} MB RAM, ${RES_ODOO_MEM_MB} MB for Odoo;" \
+    "workers=${RES_WORKERS}, max_cron_threads=${RES_CRON_THREADS}," \
+    "limit_memory_hard=$(( RES_LIMIT_MEMORY_HARD / RES_MB )) MB, cron unit=${RES_CRON_SERVICE}"
+}
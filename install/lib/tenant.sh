@@ -0,0 +1,34 @@
+#!/usr/bin/env bash
+# Multi-tenant mode helpers (ODOO_TENANT_MODE=1): one Odoo instance, one database per hostname.
+#
+#   tenant_dbfilter           dbfilter for odoo.conf (ODOO_TENANT_DBFILTER, default ^%h$)
+#   tenant_db_name DOMAIN     database name the dbfilter selects for DOMAIN
+#   tenant_register DOMAIN DB record the tenant in ODOO_TENANTS_FILE (default /etc/odoo19.tenants)
+#
+# ^%h$ = database named like the full hostname (erp.client.com); ^%d$ = first label (client
+# for client.example.com; Odoo skips a leading "www").
+
+ODOO_TENANTS_FILE="${ODOO_TENANTS_FILE:-/etc/odoo${ODOO_VERSION:-19}.tenants}"
+
+tenant_dbfilter() {
+  echo "${ODOO_TENANT_DBFILTER:-^%h\$}"
+}
+
+tenant_db_name() {
+  local host="${1,,}"
+  if [[ "$(tenant_dbfilter)" == *"%d"* ]]; then
+    host="${host#www.}"
+    echo "${host%%.*}"
+  else
+    echo "${host}"
+  fi
+}
+
+tenant_register() {
+  local domain="$1"
+  local db="$2"
+  sudo touch "${ODOO_TENANTS_FILE}"
+  if ! awk -v d="${domain}" '$1 == d { found = 1 } END { exit !found }' "${ODOO_TENANTS_FILE}"; then
+    echo "${domain} ${db} $(date -Is)" | sudo tee -a "${ODOO_TENANTS_FILE}" >/dev/null
+  fi
+}
@@ -0,0 +1,63 @@
+#!/usr/bin/env bash
+# Provisioning timeline: append begin/end events to ODOO_TIMELINE_FILE (JSON lines).
+# Sourced by install.sh and by the step scripts; does nothing when ODOO_TIMELINE_FILE is unset
+# (e.g. a step run by hand). Summaries and exports: install/scripts/timeline_report.py.
+#
+#   tl_begin "label" [category]           start a phase (category: step | phase, default phase)
+#   tl_end   "label" [status] [category]  end it (status = exit code, default 0)
+#   tl_run   "label" cmd args...          time a simple command; returns its exit code
+#
+# TL_STEP (exported by run_step in install.sh) tags every event with the step it belongs to.
+
+_tl_now_us() {
+  if [[ -n "${EPOCHREALTIME:-}" ]]; then
+    local t="${EPOCHREALTIME}"
+    echo "${t/[.,]/}"
+  else
+    date +%s%6N
+  fi
+}
+
+_tl_escape() {
+  local s="${1//\\/\\\\}"
+  s="${s//\"/\\\"}"
+  printf '%s' "${s//$'\n'/ }"
+}
+
+_tl_event() {
+  local ph="$1" name="$2" cat="$3" status="${4:-}"
+  [[ -n "${ODOO_TIMELINE_FILE:-}" ]] || return 0
+  local line
+  line="{\"ph\":\"${ph}\",\"ts\":$(_tl_now_us),\"name\":\"$(_tl_escape "${name}")\",\"cat\":\"${cat}\",\"step\":\"$(_tl_escape "${TL_STEP:-}")\""
+  [[ -n "${status}" ]] && line+=",\"status\":${status}"
+  printf '%s}\n' "${line}" >> "${ODOO_TIMELINE_FILE}" 2>/dev/null || true
+}
+
+tl_begin() {
+  _tl_event B "$1" "${2:-phase}"
+}
+
+tl_end() {
+  _tl_event E "$1" "${3:-phase}" "${2:-0}"
+}
+
+tl_run() {
+  local label="$1"
+  shift
+  local ret=0
+  tl_begin "${label}"
+  "$@" || ret=$?
+  tl_end "${label}" "${ret}"
+  return "${ret}"
+}
+
+# Run metadata (host, versions) as string fields: tl_meta key value [key value ...]
+tl_meta() {
+  [[ -n "${ODOO_TIMELINE_FILE:-}" ]] || return 0
+  local line="{\"ph\":\"M\",\"ts\":$(_tl_now_us)"
+  while (( $# >= 2 )); do
+    line+=",\"$(_tl_escape "$1")\":\"$(_tl_escape "$2")\""
+    shift 2
+  done
+  printf '%s}\n' "${line}" >> "${ODOO_TIMELINE_FILE}" 2>/dev/null || true
+}
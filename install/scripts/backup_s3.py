@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Streaming database + filestore backups to S3-compatible storage (AWS S3, Cloudflare R2, MinIO).
+
+backup:
+  - `pg_dump -Fc` is piped through `zstd` straight into a parallel multipart upload (no temp files).
+  - The filestore is content-addressed (files never change once written), so only files not
+    uploaded by a previous backup are sent: they are streamed as one tar through `zstd` into a
+    "pack" object. An index of uploaded files is kept in the bucket.
+  - A manifest is written last; a backup without manifest is incomplete and ignored.
+restore:
+  - Streams the dump back through `zstd -d` into `pg_restore` (new database, owner odoo) and
+    extracts every filestore pack up to that backup into the new database's filestore.
+list:
+  - Lists complete backups for DB_NAME.
+
+Bucket layout (prefix default "odoo-backup"):
+  <prefix>/<db>/backups/<stamp>/db.dump.zst
+  <prefix>/<db>/backups/<stamp>/manifest.json
+  <prefix>/<db>/filestore/packs/<stamp>.tar.zst
+  <prefix>/<db>/filestore/index.json.gz
+
+Runs with the Odoo venv python (boto3 is installed by 06_python_dependencies.sh) as the odoo
+user. Uses env: ODOO_CONF, DB_NAME, ODOO_BACKUP_S3_BUCKET (fallback ODOO_SSL_S3_BUCKET),
+ODOO_BACKUP_S3_PREFIX, ODOO_BACKUP_S3_ENDPOINT_URL (fallback ODOO_SSL_S3_ENDPOINT_URL /
+AWS_ENDPOINT_URL), AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, ODOO_BACKUP_ZSTD_LEVEL (3),
+ODOO_BACKUP_PART_MB (64), ODOO_BACKUP_CONCURRENCY (4).
+"""
+from __future__ import annotations
+
+import argparse
+import configparser
+import datetime
+import gzip
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ODOO_CONF = os.environ.get("ODOO_CONF")
+DB_NAME = os.environ.get("DB_NAME")
+
+if not ODOO_CONF or not DB_NAME:
+    print("ERROR: ODOO_CONF and DB_NAME must be set.", file=sys.stderr)
+    sys.exit(1)
+
+BUCKET = os.environ.get("ODOO_BACKUP_S3_BUCKET") or os.environ.get("ODOO_SSL_S3_BUCKET") or ""
+PREFIX = (os.environ.get("ODOO_BACKUP_S3_PREFIX") or "odoo-backup").strip("/")
+ENDPOINT = (
+    os.environ.get("ODOO_BACKUP_S3_ENDPOINT_URL")
+    or os.environ.get("ODOO_SSL_S3_ENDPOINT_URL")
+    or os.environ.get("AWS_ENDPOINT_URL")
+    or None
+)
+ZSTD_LEVEL = int(os.environ.get("ODOO_BACKUP_ZSTD_LEVEL", "3"))
+PART_SIZE = int(os.environ.get("ODOO_BACKUP_PART_MB", "64")) * 1024 * 1024
+CONCURRENCY = int(os.environ.get("ODOO_BACKUP_CONCURRENCY", "4"))
+
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.exceptions import ClientError
+except ImportError:
+    print("ERROR: boto3 not installed in this Python. Run with the Odoo venv python.", file=sys.stderr)
+    sys.exit(1)
+
+
+def data_dir() -> str:
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.read(ODOO_CONF)
+    return parser.get("options", "data_dir", fallback="/var/lib/odoo")
+
+
+def filestore_dir(db: str) -> str:
+    return os.path.join(data_dir(), "filestore", db)
+
+
+class Store:
+    """Thin wrapper over the S3 client with the transfer settings used for streaming."""
+
+    def __init__(self, db: str):
+        self.db = db
+        self.client = boto3.client("s3", endpoint_url=ENDPOINT)
+        # Memory use is bounded by part size x concurrency; streams never touch the disk
+        self.transfer = TransferConfig(
+            multipart_threshold=PART_SIZE,
+            multipart_chunksize=PART_SIZE,
+            max_concurrency=CONCURRENCY,
+            use_threads=True,
+        )
+
+    def key(self, *parts: str) -> str:
+        return "/".join((PREFIX, self.db) + parts)
+
+    def upload_stream(self, fileobj, key: str) -> None:
+        self.client.upload_fileobj(fileobj, BUCKET, key, Config=self.transfer)
+
+    def download_stream(self, key: str, fileobj) -> None:
+        self.client.download_fileobj(BUCKET, key, fileobj, Config=self.transfer)
+
+    def get_json(self, key: str, gz: bool = False):
+        try:
+            body = self.client.get_object(Bucket=BUCKET, Key=key)["Body"].read()
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                return None
+            raise
+        return json.loads(gzip.decompress(body) if gz else body)
+
+    def put_json(self, key: str, data, gz: bool = False) -> None:
+        body = json.dumps(data, sort_keys=True).encode()
+        self.client.put_object(Bucket=BUCKET, Key=key, Body=gzip.compress(body) if gz else body)
+
+    def list_prefixes(self, prefix: str) -> list[str]:
+        found = []
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=BUCKET, Prefix=prefix, Delimiter="/"):
+            found += [p["Prefix"] for p in page.get("CommonPrefixes", [])]
+        return found
+
+    def list_keys(self, prefix: str) -> list[str]:
+        keys = []
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=BUCKET, Prefix=prefix):
+            keys += [o["Key"] for o in page.get("Contents", [])]
+        return keys
+
+
+def check_bucket(store: Store) -> None:
+    try:
+        store.client.head_bucket(Bucket=BUCKET)
+    except ClientError as e:
+        code = e.response.get("Error", {}).get("Code")
+        if code in ("404", "NoSuchBucket") and os.environ.get("ODOO_BACKUP_S3_CREATE_BUCKET") == "1":
+            store.client.create_bucket(Bucket=BUCKET)
+            print(f"Created bucket '{BUCKET}'.")
+            return
+        print(f"ERROR: bucket '{BUCKET}' not reachable ({code}). "
+              f"Set ODOO_BACKUP_S3_CREATE_BUCKET=1 to create it (e.g. on MinIO).", file=sys.stderr)
+        sys.exit(1)
+
+
+def spawn(args: list[str], **kwargs) -> subprocess.Popen:
+    """Popen with stderr in a temporary file: a full stderr pipe nobody reads would stall the stream."""
+    err_file = tempfile.TemporaryFile()
+    proc = subprocess.Popen(args, stderr=err_file, **kwargs)
+    proc.err_file = err_file
+    return proc
+
+
+def wait_ok(proc: subprocess.Popen, name: str) -> None:
+    ret = proc.wait()
+    with proc.err_file:
+        if ret != 0:
+            proc.err_file.seek(0)
+            err = proc.err_file.read().decode(errors="replace").strip()
+            raise RuntimeError(f"{name} exited with status {ret}: {err[-300:]}")
+
+
+def abort(*procs: subprocess.Popen) -> None:
+    """Kill and reap the processes of a failed pipeline."""
+    for proc in procs:
+        if proc.poll() is None:
+            proc.kill()
+        proc.wait()
+        proc.err_file.close()
+
+
+# ---------------------------------------------------------------------------
+# backup
+# ---------------------------------------------------------------------------
+
+def backup_database(store: Store, stamp: str) -> str:
+    """pg_dump -Fc | zstd | multipart upload. Returns the object key."""
+    key = store.key("backups", stamp, "db.dump.zst")
+    procs = []
+    try:
+        # -Z0: zstd does the compression (faster and smaller than pg_dump's built-in zlib)
+        dump = spawn(["pg_dump", "-Fc", "-Z0", "-d", store.db], stdout=subprocess.PIPE)
+        procs.append(dump)
+        zstd = spawn(["zstd", "-q", "-T0", f"-{ZSTD_LEVEL}", "-c"], stdin=dump.stdout, stdout=subprocess.PIPE)
+        procs.append(zstd)
+        dump.stdout.close()  # zstd owns the pipe now; pg_dump gets SIGPIPE if zstd dies
+        try:
+            store.upload_stream(zstd.stdout, key)
+        finally:
+            zstd.stdout.close()
+        wait_ok(dump, "pg_dump")
+        wait_ok(zstd, "zstd")
+    except BaseException:
+        abort(*procs)
+        raise
+    return key
+
+
+def backup_filestore(store: Store, stamp: str) -> tuple[str | None, int, int]:
+    """Upload the files not yet in the bucket as one tar.zst pack. Returns (pack key, new files, total files)."""
+    root = filestore_dir(store.db)
+    if not os.path.isdir(root):
+        return None, 0, 0
+
+    index_key = store.key("filestore", "index.json.gz")
+    uploaded = set(store.get_json(index_key, gz=True) or [])
+    current = []
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            current.append(os.path.relpath(os.path.join(dirpath, name), root))
+    new_files = sorted(set(current) - uploaded)
+    if not new_files:
+        return None, 0, len(current)
+
+    key = store.key("filestore", "packs", f"{stamp}.tar.zst")
+    zstd = spawn(["zstd", "-q", "-T0", f"-{ZSTD_LEVEL}", "-c"], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    errors = []
+
+    def write_tar():
+        try:
+            with tarfile.open(fileobj=zstd.stdin, mode="w|") as tar:
+                for rel in new_files:
+                    tar.add(os.path.join(root, rel), arcname=rel, recursive=False)
+        except Exception as e:  # reported after the upload finishes
+            errors.append(e)
+        finally:
+            zstd.stdin.close()
+
+    writer = threading.Thread(target=write_tar, daemon=True)
+    writer.start()
+    try:
+        try:
+            store.upload_stream(zstd.stdout, key)
+        finally:
+            zstd.stdout.close()   # on a failed upload zstd dies of SIGPIPE, which unblocks the writer
+            writer.join()
+        wait_ok(zstd, "zstd")
+    except BaseException:
+        abort(zstd)
+        raise
+    if errors:
+        raise errors[0]
+
+    # Index is updated only after the pack is safely uploaded
+    store.put_json(index_key, sorted(uploaded | set(new_files)), gz=True)
+    return key, len(new_files), len(current)
+
+
+def cmd_backup(store: Store) -> int:
+    check_bucket(store)
+    stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    print(f"Backing up '{store.db}' to s3://{BUCKET}/{store.key('backups', stamp)}/ ...")
+    start = time.monotonic()
+
+    # Database dump and filestore pack stream in parallel
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        db_future = pool.submit(backup_database, store, stamp)
+        fs_future = pool.submit(backup_filestore, store, stamp)
+        dump_key = db_future.result()
+        pack_key, new_files, total_files = fs_future.result()
+
+    head = store.client.head_object(Bucket=BUCKET, Key=dump_key)
+    manifest = {
+        "db": store.db,
+        "stamp": stamp,
+        "dump_key": dump_key,
+        "dump_bytes": head.get("ContentLength"),
+        "filestore_pack": pack_key,
+        "filestore_new_files": new_files,
+        "filestore_total_files": total_files,
+        "zstd_level": ZSTD_LEVEL,
+        "duration_s": round(time.monotonic() - start, 1),
+    }
+    store.put_json(store.key("backups", stamp, "manifest.json"), manifest)
+
+    print(f"Database dump: {dump_key} ({(manifest['dump_bytes'] or 0) / 1048576:.1f} MiB compressed)")
+    print(f"Filestore: {new_files} new file(s) uploaded, {total_files - new_files} unchanged skipped.")
+    print(f"✅ Backup {stamp} completed in {manifest['duration_s']}s.")
+    return 0
+
+
+# ---------------------------------------------------------------------------
+# list / restore
+# ---------------------------------------------------------------------------
+
+def complete_backups(store: Store) -> list[dict]:
+    manifests = []
+    for prefix in store.list_prefixes(store.key("backups") + "/"):
+        manifest = store.get_json(prefix + "manifest.json")
+        if manifest:
+            manifests.append(manifest)
+    return sorted(manifests, key=lambda m: m["stamp"])
+
+
+def cmd_list(store: Store) -> int:
+    backups = complete_backups(store)
+    if not backups:
+        print(f"No complete backups for '{store.db}' in s3://{BUCKET}/{store.key('backups')}/")
+        return 0
+    print(f"{'Backup':<18} | {'Dump MiB':>9} | {'New files':>9} | {'Files':>7} | Seconds")
+    for m in backups:
+        print(f"{m['stamp']:<18} | {(m.get('dump_bytes') or 0) / 1048576:>9.1f} | "
+              f"{m.get('filestore_new_files', 0):>9} | {m.get('filestore_total_files', 0):>7} | {m.get('duration_s')}")
+    return 0
+
+
+def database_exists(name: str) -> bool:
+    out = subprocess.run(
+        ["psql", "-d", "postgres", "-tAc", "SELECT 1 FROM pg_database WHERE datname = %s" % quote_literal(name)],
+        capture_output=True, text=True,
+    )
+    return out.stdout.strip() == "1"
+
+
+def quote_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def restore_database(store: Store, dump_key: str, target: str) -> None:
+    subprocess.run(["createdb", "-O", "odoo", target], check=True)
+    procs = []
+    try:
+        zstd = spawn(["zstd", "-q", "-d", "-c"], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        procs.append(zstd)
+        restore = spawn(["pg_restore", "--no-owner", "--role=odoo", "-d", target], stdin=zstd.stdout)
+        procs.append(restore)
+        zstd.stdout.close()
+        try:
+            store.download_stream(dump_key, zstd.stdin)
+        finally:
+            zstd.stdin.close()
+        wait_ok(zstd, "zstd")
+        wait_ok(restore, "pg_restore")
+    except BaseException:
+        abort(*procs)   # pg_restore must be gone (disconnected) before dropdb
+        print(f"Restore failed: dropping the partly restored database '{target}'.", file=sys.stderr)
+        subprocess.run(["dropdb", "--if-exists", target])
+        raise
+
+
+def restore_filestore(store: Store, stamp: str, target: str) -> int:
+    """Extract every pack up to (and including) the backup stamp. Returns the number of packs."""
+    packs_prefix = store.key("filestore", "packs") + "/"
+    packs = sorted(
+        k for k in store.list_keys(packs_prefix)
+        if k.endswith(".tar.zst") and k[len(packs_prefix):-len(".tar.zst")] <= stamp
+    )
+    dest = filestore_dir(target)
+    os.makedirs(dest, exist_ok=True)
+    for key in packs:
+        zstd = spawn(["zstd", "-q", "-d", "-c"], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        errors = []
+
+        def extract():
+            try:
+                with tarfile.open(fileobj=zstd.stdout, mode="r|") as tar:
+                    if hasattr(tarfile, "data_filter"):
+                        tar.extractall(dest, filter="data")
+                    else:
+                        tar.extractall(dest)
+            except Exception as e:
+                errors.append(e)
+
+        reader = threading.Thread(target=extract, daemon=True)
+        reader.start()
+        try:
+            try:
+                store.download_stream(key, zstd.stdin)
+            finally:
+                zstd.stdin.close()
+                reader.join()
+            wait_ok(zstd, "zstd")
+        except BaseException:
+            abort(zstd)
+            raise
+        if errors:
+            raise errors[0]
+        print(f"  extracted {key}")
+    return len(packs)
+
+
+def cmd_restore(store: Store, stamp: str | None, target: str, drop_existing: bool) -> int:
+    backups = complete_backups(store)
+    if not backups:
+        print(f"ERROR: no complete backups for '{store.db}'.", file=sys.stderr)
+        return 1
+    manifest = backups[-1] if not stamp else next((m for m in backups if m["stamp"] == stamp), None)
+    if not manifest:
+        print(f"ERROR: backup '{stamp}' not found (see: list).", file=sys.stderr)
+        return 1
+
+    if database_exists(target):
+        if not drop_existing:
+            print(f"ERROR: database '{target}' already exists. Use --target-db NAME or --drop-existing.",
+                  file=sys.stderr)
+            return 1
+        subprocess.run(["dropdb", target], check=True)
+
+    print(f"Restoring backup {manifest['stamp']} of '{store.db}' into '{target}'...")
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        db_future = pool.submit(restore_database, store, manifest["dump_key"], target)
+        fs_future = pool.submit(restore_filestore, store, manifest["stamp"], target)
+        db_future.result()
+        packs = fs_future.result()
+    print(f"✅ Restored database '{target}' and {packs} filestore pack(s) in {time.monotonic() - start:.1f}s.")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Streaming Odoo backups to S3-compatible storage.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("backup", help="dump database + new filestore files")
+    sub.add_parser("list", help="list complete backups")
+    restore = sub.add_parser("restore", help="restore a backup into a new database")
+    restore.add_argument("--backup", help="backup stamp (default: latest)")
+    restore.add_argument("--target-db", help="database to create (default: DB_NAME)")
+    restore.add_argument("--drop-existing", action="store_true", help="drop the target database first")
+    args = parser.parse_args()
+
+    if not BUCKET:
+        print("ERROR: ODOO_BACKUP_S3_BUCKET (or ODOO_SSL_S3_BUCKET) must be set.", file=sys.stderr)
+        return 1
+
+    store = Store(DB_NAME)
+    if args.command == "backup":
+        return cmd_backup(store)
+    if args.command == "list":
+        return cmd_list(store)
+    return cmd_restore(store, args.backup, args.target_db or DB_NAME, args.drop_existing)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
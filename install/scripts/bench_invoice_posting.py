@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Invoice posting contention benchmark for the sales journals set by the configuration scripts.
+
+set_default_sales_journal.py / set_default_credit_notes_journal.py send every customer invoice
+of a company to one journal (FE) and every credit note to another (NC). Posting takes the next
+number of the journal's sequence under a row lock held until commit, so concurrent cashiers
+queue behind each other. This benchmark posts invoices from N parallel worker processes (one
+transaction per invoice, retried on serialization failures like the web server does) and
+compares the journal layouts the scripts could apply:
+
+  dedicated   invoices in a copy of FE, credit notes in a copy of NC (what the scripts set up)
+  shared      invoices and credit notes in one copy of FE with a dedicated refund sequence
+  per-worker  one copy of FE per worker (e.g. one journal per cashier / point of sale)
+
+For every layout and worker count it reports posts/s, latency p50/p95, serialization retries
+and the time the workers spent waiting on locks (pg_stat_activity sampled every 20 ms).
+With ODOO_SCRIPT_PROFILE (run_bench_invoice_posting.sh --profile) the setup of each run and the
+posting loop of each worker are Odoo profiler steps (scriptlib/profiling.py).
+
+The journals are copies ("Sequence benchmark ...") of the configured ones, so real invoice
+numbers are never consumed; the benchmark moves, journals and partner are deleted afterwards
+(--keep to look at those of the last run). --real-journals posts into FE/NC themselves, which consumes real
+numbers: only use it on a copy of the database (DB_NAME=copy).
+
+Examples:
+  bench_invoice_posting.py --workers 1,4,8 --invoices 400
+  bench_invoice_posting.py --layouts dedicated,per-worker --refund-ratio 0.2 --json /tmp/seq.json
+
+Uses ODOO_CONF, DB_NAME, ODOO_HOME, ODOO_SALES_JOURNAL_CODE (FE), ODOO_CREDIT_NOTES_JOURNAL_CODE
+(NC) (see run_bench_invoice_posting.sh).
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import threading
+import time
+from queue import Empty
+
+ODOO_CONF = os.environ.get("ODOO_CONF")
+DB_NAME = os.environ.get("DB_NAME")
+SALES_CODE = (os.environ.get("ODOO_SALES_JOURNAL_CODE") or "FE").strip()
+REFUND_CODE = (os.environ.get("ODOO_CREDIT_NOTES_JOURNAL_CODE") or "NC").strip()
+
+if not ODOO_CONF or not DB_NAME:
+    print("ERROR: ODOO_CONF and DB_NAME must be set.", file=sys.stderr)
+    sys.exit(1)
+
+ODOO_HOME = os.environ.get("ODOO_HOME")
+if ODOO_HOME:
+    odoo_src = os.path.join(ODOO_HOME, "odoo")
+    if os.path.isdir(odoo_src):
+        sys.path.insert(0, odoo_src)
+    else:
+        sys.path.insert(0, ODOO_HOME)
+
+import odoo
+from odoo import api, sql_db
+from scriptlib import profiling
+
+odoo.tools.config.parse_config(["-c", ODOO_CONF])
+
+try:
+    import odoo.registry as _regmod
+    _registry = getattr(_regmod, "registry", None) or getattr(_regmod, "Registry", None)
+    if callable(_registry):
+        registry = _registry(DB_NAME)
+    else:
+        raise AttributeError("registry")
+except (AttributeError, ImportError):
+    print("ERROR: the Odoo registry is required to post invoices.", file=sys.stderr)
+    sys.exit(1)
+
+try:
+    from odoo.service.model import PG_CONCURRENCY_ERRORS_TO_RETRY as RETRY_PGCODES
+except ImportError:
+    RETRY_PGCODES = ("40001", "40P01", "55P03")   # serialization failure, deadlock, lock not available
+
+LAYOUTS = ("dedicated", "shared", "per-worker")
+BENCH_NAME = "Sequence benchmark"
+MAX_RETRIES = 5
+MONITOR_INTERVAL = 0.02
+WORKER_POLL_SECONDS = 1.0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,4,8", help="comma-separated worker counts (default: 1,4,8)")
+    parser.add_argument("--invoices", type=int, default=200, help="documents posted per run (default: 200)")
+    parser.add_argument("--refund-ratio", type=float, default=0.1, help="share of credit notes (default: 0.1)")
+    parser.add_argument("--layouts", default=",".join(LAYOUTS), help=f"comma-separated subset of: {', '.join(LAYOUTS)}")
+    parser.add_argument("--company", help="company id or exact name (default: main company)")
+    parser.add_argument("--real-journals", action="store_true",
+                        help="post into the configured FE/NC journals (consumes real numbers; database copies only)")
+    parser.add_argument("--keep", action="store_true", help="keep the moves and journals of the last run")
+    parser.add_argument("--seed", type=int, default=19, help="random seed for the invoice/refund mix (default 19)")
+    parser.add_argument("--json", help="also write the results to this file")
+    return parser.parse_args()
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))]
+
+
+def select_company(env, value: str | None):
+    if not value:
+        return env.company
+    company = env["res.company"].search([("id", "=", int(value))] if value.isdigit() else [("name", "=", value)], limit=1)
+    if not company:
+        print(f"ERROR: company '{value}' not found.", file=sys.stderr)
+        sys.exit(1)
+    return company
+
+
+def cleanup(env, company) -> None:
+    """Delete benchmark journals (and their moves) and partner, including leftovers of an interrupted run."""
+    journals = env["account.journal"].with_context(active_test=False).search(
+        [("company_id", "=", company.id), ("name", "=like", f"{BENCH_NAME}%")])
+    moves = env["account.move"].search([("journal_id", "in", journals.ids)]) if journals else env["account.move"]
+    moves.filtered(lambda m: m.state == "posted").button_draft()
+    moves.with_context(force_delete=True).unlink()
+    journals.unlink()
+    partners = env["res.partner"].with_context(active_test=False).search([("name", "=", BENCH_NAME)])
+    if not env["account.move"].search_count([("partner_id", "in", partners.ids)]):   # kept with --real-journals
+        partners.unlink()
+
+
+def copy_journal(env, journal, code: str, label: str, refund_sequence: bool):
+    vals = {"name": f"{BENCH_NAME} {label}", "code": code, "refund_sequence": refund_sequence}
+    if "restrict_mode_hash_table" in journal._fields:
+        vals["restrict_mode_hash_table"] = False   # benchmark moves are reset and deleted afterwards
+    return journal.copy(vals)
+
+
+def prepare_run(env, company, layout: str, workers: int, args, sales, refunds) -> list[list[int]]:
+    """Create the journals and draft documents of one run; returns the move ids of each worker."""
+    cleanup(env, company)   # journal codes are reused by every run
+    partner = env["res.partner"].search([("name", "=", BENCH_NAME)], limit=1) or env["res.partner"].create({"name": BENCH_NAME})
+    if args.real_journals:
+        if layout != "dedicated":
+            raise ValueError("--real-journals only applies to the dedicated layout")
+        invoice_journals, refund_journals = [sales] * workers, [refunds] * workers
+    elif layout == "dedicated":
+        inv, ref = copy_journal(env, sales, "BQFE", "FE", False), copy_journal(env, refunds, "BQNC", "NC", True)
+        invoice_journals, refund_journals = [inv] * workers, [ref] * workers
+    elif layout == "shared":
+        inv = copy_journal(env, sales, "BQFE", "FE+NC", True)
+        invoice_journals = refund_journals = [inv] * workers
+    else:
+        invoice_journals = refund_journals = [copy_journal(env, sales, f"BQ{i:03d}", f"FE worker {i}", True)
+                                              for i in range(1, workers + 1)]
+
+    rnd = random.Random(args.seed)
+    per_worker: list[list[int]] = []
+    for w in range(workers):
+        count = args.invoices // workers + (1 if w < args.invoices % workers else 0)
+        vals_list = []
+        for _ in range(count):
+            refund = rnd.random() < args.refund_ratio
+            vals_list.append({
+                "move_type": "out_refund" if refund else "out_invoice",
+                "journal_id": (refund_journals if refund else invoice_journals)[w].id,
+                "partner_id": partner.id,
+                "company_id": company.id,
+                "invoice_line_ids": [(0, 0, {"name": "Benchmark", "quantity": 1, "price_unit": round(rnd.uniform(1, 500), 2)})],
+            })
+        moves = env["account.move"].with_context(tracking_disable=True).create(vals_list)
+        per_worker.append(moves.ids)
+    env.cr.commit()
+    return per_worker
+
+
+def _post_worker(move_ids: list[int], pid_queue, go, queue, label: str) -> None:
+    """Worker process: post the moves (_post_moves) in one session and send back the stats.
+
+    The backend pid of the worker's session is sent through pid_queue before posting starts (the
+    session's application_name is the parent's odoo-<pid>, so it cannot identify the worker).
+    Whatever fails, the worker always sends a pid (None if it never connected) and its stats.
+    """
+    stats = {"posted": 0, "retries": 0, "errors": [], "latencies": []}
+    pid_sent = False
+    try:
+        with profiling.step(label), registry.cursor() as cr:
+            cr.execute("SELECT pg_backend_pid()")
+            pid_queue.put(cr.fetchone()[0])
+            pid_sent = True
+            cr.rollback()
+            go.wait()
+            _post_moves(cr, move_ids, stats)
+    except Exception as e:
+        stats["errors"].append("worker: " + (str(e).splitlines() or [repr(e)])[0][:150])
+    finally:
+        if not pid_sent:
+            pid_queue.put(None)
+        queue.put(stats)
+
+
+def _post_moves(cr, move_ids: list[int], stats: dict) -> None:
+    """Post each move in its own transaction, retrying concurrency errors (counted in stats)."""
+    import psycopg2
+
+    env = api.Environment(cr, odoo.SUPERUSER_ID, {"tracking_disable": True})
+    for move_id in move_ids:
+        started = time.monotonic()
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                env["account.move"].browse(move_id).action_post()
+                cr.commit()
+                stats["posted"] += 1
+                break
+            except psycopg2.Error as e:
+                cr.rollback()
+                env.invalidate_all()
+                if e.pgcode not in RETRY_PGCODES or attempt == MAX_RETRIES:
+                    stats["errors"].append(f"{e.pgcode}: {str(e).splitlines()[0][:150]}")
+                    break
+                stats["retries"] += 1
+                time.sleep(random.uniform(0.0, 0.05 * 2 ** attempt))   # like the HTTP retry backoff
+            except Exception as e:
+                cr.rollback()
+                env.invalidate_all()
+                stats["errors"].append((str(e).splitlines() or [repr(e)])[0][:150])
+                break
+        stats["latencies"].append(time.monotonic() - started)
+
+
+class LockMonitor(threading.Thread):
+    """Samples pg_stat_activity: seconds the worker sessions (backend pids) spent waiting on a lock."""
+
+    def __init__(self, backend_pids: list[int]):
+        super().__init__(daemon=True)
+        self.backend_pids = backend_pids
+        self.wait_seconds = 0.0
+        self.stop = threading.Event()
+
+    def run(self) -> None:
+        with contextlib.closing(sql_db.db_connect(DB_NAME).cursor()) as cr:
+            while not self.stop.is_set():
+                cr.execute("SELECT count(*) FROM pg_stat_activity WHERE wait_event_type = 'Lock' "
+                           "AND pid = ANY(%s)", [self.backend_pids])
+                self.wait_seconds += cr.fetchone()[0] * MONITOR_INTERVAL
+                cr.rollback()
+                self.stop.wait(MONITOR_INTERVAL)
+
+
+def _collect(queue, processes, what: str) -> list:
+    """One item per worker from queue; fails instead of waiting forever when a worker died without sending it."""
+    items = []
+    while len(items) < len(processes):
+        try:
+            items.append(queue.get(timeout=WORKER_POLL_SECONDS))
+        except Empty:
+            dead = [p for p in processes if p.exitcode not in (None, 0)]
+            if dead:
+                raise RuntimeError(f"posting worker {dead[0].pid} exited with status {dead[0].exitcode} "
+                                   f"before sending its {what}")
+    return items
+
+
+def run_posting(per_worker: list[list[int]], label: str) -> dict:
+    # Forked workers must not share the parent's connections: close them before forking
+    sql_db.close_all()
+    ctx = multiprocessing.get_context("fork")
+    pid_queue, go, queue = ctx.Queue(), ctx.Event(), ctx.Queue()
+    processes = [ctx.Process(target=_post_worker, args=(ids, pid_queue, go, queue, f"{label} post"))
+                 for ids in per_worker]
+    for p in processes:
+        p.start()
+    monitor = None
+    try:
+        # Workers wait for go once connected, so the monitor watches them from the first post
+        monitor = LockMonitor([pid for pid in _collect(pid_queue, processes, "backend pid") if pid])
+        monitor.start()
+        started = time.monotonic()
+        go.set()
+        results = _collect(queue, processes, "results")
+        elapsed = time.monotonic() - started
+    except BaseException:
+        for p in processes:
+            p.terminate()
+        raise
+    finally:
+        for p in processes:
+            p.join()
+        if monitor is not None:
+            monitor.stop.set()
+            monitor.join()
+
+    latencies = [lat for r in results for lat in r["latencies"]]
+    posted = sum(r["posted"] for r in results)
+    return {
+        "posted": posted,
+        "elapsed_s": round(elapsed, 3),
+        "posts_per_s": round(posted / max(elapsed, 1e-9), 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "retries": sum(r["retries"] for r in results),
+        "errors": [e for r in results for e in r["errors"]],
+        "lock_wait_s": round(monitor.wait_seconds, 2),
+        "lock_wait_share": round(monitor.wait_seconds / max(elapsed * len(processes), 1e-9), 3),
+    }
+
+
+def main() -> int:
+    args = parse_args()
+    worker_counts = [int(w) for w in args.workers.split(",") if w.strip()]
+    layouts = [l.strip() for l in args.layouts.split(",") if l.strip()]
+    if any(l not in LAYOUTS for l in layouts) or not worker_counts or min(worker_counts) < 1:
+        print(f"ERROR: --layouts must be among {', '.join(LAYOUTS)} and --workers positive integers.", file=sys.stderr)
+        return 1
+    if args.real_journals:
+        layouts = ["dedicated"]
+        print(f"WARNING: posting into the real {SALES_CODE}/{REFUND_CODE} journals of {DB_NAME}: "
+              f"this consumes invoice numbers.", file=sys.stderr)
+
+    with registry.cursor() as cr:
+        env = api.Environment(cr, odoo.SUPERUSER_ID, {})
+        if "account.move" not in env:
+            print("ERROR: account module not installed.", file=sys.stderr)
+            return 1
+        company = select_company(env, args.company)
+        env = env(context=dict(env.context, allowed_company_ids=[company.id]))
+        Journal = env["account.journal"]
+        sales = Journal.search([("company_id", "=", company.id), ("type", "=", "sale"), ("code", "=", SALES_CODE)], limit=1)
+        refunds = Journal.search([("company_id", "=", company.id), ("type", "=", "sale"), ("code", "=", REFUND_CODE)], limit=1)
+        if not sales or not refunds:
+            print(f"ERROR: journals {SALES_CODE} / {REFUND_CODE} not found for {company.name}; "
+                  f"run set_default_sales_journal.py and set_default_credit_notes_journal.py first.", file=sys.stderr)
+            return 1
+        company_id, sales_id, refunds_id = company.id, sales.id, refunds.id
+
+    results = []
+    print(f"{'layout':<11} {'workers':>7} {'posts/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'retries':>7} {'lock wait s':>11} {'wait %':>6}")
+    for layout in layouts:
+        for workers in worker_counts:
+            with profiling.step(f"{layout} {workers} workers setup"), registry.cursor() as cr:
+                env = api.Environment(cr, odoo.SUPERUSER_ID, {"allowed_company_ids": [company_id]})
+                per_worker = prepare_run(env, env["res.company"].browse(company_id), layout, workers, args,
+                                         env["account.journal"].browse(sales_id), env["account.journal"].browse(refunds_id))
+            result = run_posting(per_worker, f"{layout} {workers} workers")
+            result.update(layout=layout, workers=workers)
+            results.append(result)
+            print(f"{layout:<11} {workers:>7} {result['posts_per_s']:>8} {result['p50_ms']:>8} {result['p95_ms']:>8} "
+                  f"{result['retries']:>7} {result['lock_wait_s']:>11} {result['lock_wait_share']:>6.0%}")
+            for error in result["errors"][:5]:
+                print(f"  ERROR {error}", file=sys.stderr)
+
+    if not args.keep:
+        with registry.cursor() as cr:
+            env = api.Environment(cr, odoo.SUPERUSER_ID, {"allowed_company_ids": [company_id]})
+            cleanup(env, env["res.company"].browse(company_id))
+
+    top = max(worker_counts)
+    at_top = sorted((r for r in results if r["workers"] == top), key=lambda r: -r["posts_per_s"])
+    if len(at_top) > 1:
+        best, base = at_top[0], next((r for r in at_top if r["layout"] == "dedicated"), at_top[-1])
+        print(f"\nWith {top} concurrent workers: {best['layout']} posts {best['posts_per_s']}/s "
+              f"({best['posts_per_s'] / max(base['posts_per_s'], 1e-9):.1f}x the {base['layout']} layout).")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({"database": DB_NAME, "company_id": company_id, "invoices": args.invoices,
+                       "refund_ratio": args.refund_ratio, "results": results}, fh, indent=1)
+    return 1 if any(r["errors"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
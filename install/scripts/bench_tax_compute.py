@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of tax computation with the Panama taxes (ITBMS 7/10/15%, retention groups).
+
+Builds representative invoice line batches in memory (price, quantity, discount; seeded, so runs
+are comparable) of 1k to 100k lines and times, for each PA sale tax and each fiscal position
+mapping (source tax -> fiscal position -> mapped tax):
+
+  compute_all   account.tax.compute_all() once per line (onchange / per-line path)
+  batch         _add_tax_details_in_base_lines() + _round_base_lines_tax_details() on the whole
+                batch (path used by account.move in Odoo 18+; skipped when not available)
+  reference     independent vectorized NumPy calculation from the tax definitions
+                (percent / fixed / division, group children, include_base_amount/is_base_affected)
+
+Per-line totals and the batch total of both Odoo paths are checked against the reference; a line
+or a batch total off by more than --tolerance is a MISMATCH (exit code 1). Nothing is written: the
+cursor is rolled back. The check needs NumPy in the Odoo venv (install/06_python_dependencies.sh
+installs it); without it the script exits 1 instead of skipping the check.
+
+Examples:
+  bench_tax_compute.py
+  bench_tax_compute.py --sizes 1000,10000 --tax "Retención de impuestos 50%" --json /tmp/tax-bench.json
+
+With ODOO_SCRIPT_PROFILE (run_bench_tax_compute.sh --profile) every scenario and size is one
+Odoo profiler step (scriptlib/profiling.py); the profiler slows the timed loops down.
+
+Uses ODOO_CONF, DB_NAME, ODOO_HOME (see run_bench_tax_compute.sh).
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+ODOO_CONF = os.environ.get("ODOO_CONF")
+DB_NAME = os.environ.get("DB_NAME")
+COUNTRY_CODE = (os.environ.get("ODOO_COUNTRY_CODE") or "PA").strip().upper()
+
+if not ODOO_CONF or not DB_NAME:
+    print("ERROR: ODOO_CONF and DB_NAME must be set.", file=sys.stderr)
+    sys.exit(1)
+
+ODOO_HOME = os.environ.get("ODOO_HOME")
+if ODOO_HOME:
+    odoo_src = os.path.join(ODOO_HOME, "odoo")
+    if os.path.isdir(odoo_src):
+        sys.path.insert(0, odoo_src)
+    else:
+        sys.path.insert(0, ODOO_HOME)
+
+import odoo
+from odoo import api, sql_db
+from scriptlib import profiling
+
+odoo.tools.config.parse_config(["-c", ODOO_CONF])
+
+try:
+    import odoo.registry as _regmod
+    _registry = getattr(_regmod, "registry", None) or getattr(_regmod, "Registry", None)
+    if callable(_registry):
+        registry = _registry(DB_NAME)
+        cr_context = registry.cursor()
+    else:
+        raise AttributeError("registry")
+except (AttributeError, ImportError):
+    cr_context = contextlib.closing(sql_db.db_connect(DB_NAME).cursor())
+
+REFERENCE_TYPES = {"percent", "fixed", "division"}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000,100000",
+                        help="comma-separated batch sizes in lines (default: 1000,10000,100000)")
+    parser.add_argument("--company", help="company id or exact name (default: first company with fiscal country PA)")
+    parser.add_argument("--tax", action="append", default=[], help="sale tax name (repeatable; default: all PA sale taxes)")
+    parser.add_argument("--no-fiscal-positions", action="store_true", help="skip the fiscal position mappings")
+    parser.add_argument("--no-batch", action="store_true", help="skip the batch (base lines) path")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per measurement, best is kept (default 1)")
+    parser.add_argument("--tolerance", type=float, default=0.01,
+                        help="max per-line difference vs the reference, in currency units (default 0.01)")
+    parser.add_argument("--seed", type=int, default=19, help="random seed for the generated lines (default 19)")
+    parser.add_argument("--json", help="also write the results to this file")
+    return parser.parse_args()
+
+
+def generate_lines(n: int, seed: int) -> list[tuple[float, float, float]]:
+    """(price_unit, quantity, discount %) like real invoice lines: mostly small quantities, some discounts."""
+    rnd = random.Random(seed)
+    lines = []
+    for _ in range(n):
+        price = round(rnd.choice((rnd.uniform(0.25, 20), rnd.uniform(20, 500), rnd.uniform(500, 15000))), 2)
+        qty = rnd.choice((1.0, 1.0, 2.0, 3.0, 5.0, 10.0, 12.0, round(rnd.uniform(0.5, 100), 2)))
+        discount = rnd.choice((0.0, 0.0, 0.0, 5.0, 10.0, 15.0))
+        lines.append((price, qty, discount))
+    return lines
+
+
+def flatten_taxes(taxes) -> list:
+    """Leaf taxes in computation order (group taxes replaced by their children)."""
+    leaves = []
+    for tax in taxes.sorted(lambda t: (t.sequence, t.id)):
+        if tax.amount_type == "group":
+            leaves.extend(flatten_taxes(tax.children_tax_ids))
+        else:
+            leaves.append(tax)
+    return leaves
+
+
+def reference_supported(taxes) -> str:
+    """Empty string when the NumPy reference can compute these taxes, else the reason."""
+    for tax in flatten_taxes(taxes):
+        if tax.amount_type not in REFERENCE_TYPES:
+            return f"amount_type {tax.amount_type}"
+        if tax.price_include:
+            return "price-included tax"
+    return ""
+
+
+def round_half_up(values, digits: int):
+    """Odoo's HALF-UP rounding (float_round), vectorized; np.round would round half to even."""
+    factor = 10.0 ** digits
+    return np.sign(values) * np.floor(np.abs(values) * factor + 0.5 + 1e-9) / factor
+
+
+def reference_totals(leaves: list, lines_array, digits: int, round_per_line: bool):
+    """Vectorized (total_excluded, total_included) per line from the tax definitions only."""
+    price, qty, discount = lines_array[:, 0], lines_array[:, 1], lines_array[:, 2]
+    raw_base = price * (1.0 - discount / 100.0) * qty
+    rnd = (lambda v: round_half_up(v, digits)) if round_per_line else (lambda v: v)
+    added_to_base = np.zeros_like(raw_base)
+    total_tax = np.zeros_like(raw_base)
+    for tax in leaves:
+        base = raw_base + added_to_base if tax.is_base_affected else raw_base
+        if tax.amount_type == "percent":
+            amount = base * tax.amount / 100.0
+        elif tax.amount_type == "division":
+            amount = base / (1.0 - tax.amount / 100.0) - base if tax.amount != 100.0 else np.zeros_like(base)
+        else:  # fixed: per unit
+            amount = qty * tax.amount
+        amount = rnd(amount)
+        total_tax += amount
+        if tax.include_base_amount:
+            added_to_base += amount
+    excluded = round_half_up(raw_base, digits)
+    return excluded, excluded + total_tax
+
+
+def run_compute_all(taxes, currency, lines) -> tuple[float, list[float], list[float]]:
+    excluded, included = [], []
+    start = time.perf_counter()
+    for price, qty, discount in lines:
+        res = taxes.compute_all(price * (1.0 - discount / 100.0), currency=currency, quantity=qty)
+        excluded.append(res["total_excluded"])
+        included.append(res["total_included"])
+    return time.perf_counter() - start, excluded, included
+
+
+def run_batch(AccountTax, taxes, currency, company, lines) -> tuple[float, list[float], list[float]]:
+    start = time.perf_counter()
+    base_lines = [
+        AccountTax._prepare_base_line_for_taxes_computation(
+            None, price_unit=price, quantity=qty, discount=discount, currency_id=currency, tax_ids=taxes, rate=1.0,
+        )
+        for price, qty, discount in lines
+    ]
+    AccountTax._add_tax_details_in_base_lines(base_lines, company)
+    AccountTax._round_base_lines_tax_details(base_lines, company)
+    elapsed = time.perf_counter() - start
+    excluded, included = [], []
+    for base_line in base_lines:
+        details = base_line["tax_details"]
+        excl = details["total_excluded_currency"]
+        incl = details.get("total_included_currency")
+        if incl is None:
+            incl = excl + sum(t["tax_amount_currency"] for t in details.get("taxes_data", []))
+        excluded.append(excl)
+        included.append(incl)
+    return elapsed, excluded, included
+
+
+def best_of(repeat: int, fn, *args):
+    """Run fn repeat times; keep the fastest timing (and its results)."""
+    best = None
+    for _ in range(max(repeat, 1)):
+        res = fn(*args)
+        if best is None or res[0] < best[0]:
+            best = res
+    return best
+
+
+def max_diff(ref_excluded, ref_included, excluded, included) -> float:
+    return float(max(
+        np.max(np.abs(np.asarray(excluded) - ref_excluded)),
+        np.max(np.abs(np.asarray(included) - ref_included)),
+    ))
+
+
+def select_company(env, args: argparse.Namespace):
+    Company = env["res.company"]
+    if args.company:
+        domain = [("id", "=", int(args.company))] if args.company.isdigit() else [("name", "=", args.company)]
+        company = Company.search(domain, limit=1)
+    else:
+        company = next(
+            (c for c in Company.search([])
+             if (c.account_fiscal_country_id or c.country_id).code == COUNTRY_CODE),
+            Company.browse(),
+        )
+    if not company:
+        print(f"ERROR: No company found ({args.company or 'fiscal country ' + COUNTRY_CODE}).", file=sys.stderr)
+        sys.exit(1)
+    return company
+
+
+def build_scenarios(env, company, args: argparse.Namespace) -> tuple[list[tuple[str, object]], list]:
+    """(label, taxes) for every PA sale tax, then every fiscal position mapping that changes a tax;
+    plus the (fiscal position, source tax) pairs for timing map_tax()."""
+    Tax = env["account.tax"].with_company(company)
+    domain = [("company_id", "=", company.id), ("type_tax_use", "=", "sale")]
+    if args.tax:
+        domain.append(("name", "in", args.tax))
+    else:
+        domain.append(("country_id.code", "=", COUNTRY_CODE))
+    taxes = Tax.search(domain, order="sequence, id")
+
+    scenarios = [(tax.name, tax) for tax in taxes]
+    if args.no_fiscal_positions or "account.fiscal.position" not in env:
+        return scenarios, []
+    positions = env["account.fiscal.position"].with_company(company).search([("company_id", "=", company.id)])
+    pairs = []
+    for fp in positions:
+        for tax in taxes:
+            pairs.append((fp, tax))
+            mapped = fp.map_tax(tax)
+            if mapped != tax:
+                label = f"{fp.name}: {tax.name} -> {', '.join(mapped.mapped('name')) or '(none)'}"
+                scenarios.append((label, mapped))
+    return scenarios, pairs
+
+
+def time_map_tax(positions_taxes: list, calls: int) -> float:
+    """Microseconds per fiscal position map_tax() call (the per-line onchange cost)."""
+    if not positions_taxes:
+        return 0.0
+    start = time.perf_counter()
+    for i in range(calls):
+        fp, tax = positions_taxes[i % len(positions_taxes)]
+        fp.map_tax(tax)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main() -> int:
+    args = parse_args()
+    if np is None:
+        print("ERROR: numpy not installed in the Odoo venv, the reference check cannot run "
+              "(see install/06_python_dependencies.sh).", file=sys.stderr)
+        return 1
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    with cr_context as cr:
+        env = api.Environment(cr, odoo.SUPERUSER_ID, {})
+        if "account.tax" not in env:
+            print("ERROR: account module not installed.", file=sys.stderr)
+            return 1
+
+        company = select_company(env, args)
+        currency = company.currency_id
+        digits = currency.decimal_places
+        round_per_line = (company.tax_calculation_rounding_method or "round_per_line") == "round_per_line"
+        AccountTax = env["account.tax"].with_company(company)
+        has_batch = not args.no_batch and hasattr(AccountTax, "_add_tax_details_in_base_lines")
+
+        company_name = company.name
+        scenarios, positions_taxes = build_scenarios(env, company, args)
+        if not scenarios:
+            print(f"No sale taxes found for company {company.name}. Run the set_*_taxes scripts first.")
+            return 0
+
+        print(f"Company: {company.name} | currency {currency.name} ({digits} decimals) | "
+              f"{'round per line' if round_per_line else 'round globally'} | "
+              f"batch path {'on' if has_batch else 'n/a'}")
+
+        if positions_taxes:
+            print(f"Fiscal position map_tax(): {time_map_tax(positions_taxes, 10000):.1f} µs/call "
+                  f"({len(positions_taxes)} position/tax pairs)")
+
+        header = f"{'Scenario':<60} {'Lines':>7} {'compute_all/s':>14} {'batch/s':>10} {'numpy/s':>11} {'max diff':>9}  Check"
+        print(header)
+        print("-" * len(header))
+
+        results = []
+        mismatches = 0
+        for size in sizes:
+            lines = generate_lines(size, args.seed)
+            lines_array = np.asarray(lines, dtype=float)
+            for label, taxes in scenarios:
+                with profiling.step(f"{size} lines {label}"):
+                    row = {"scenario": label, "lines": size, "taxes": taxes.mapped("name")}
+                    elapsed, excluded, included = best_of(args.repeat, run_compute_all, taxes, currency, lines)
+                    row["compute_all_lines_per_s"] = size / max(elapsed, 1e-9)
+                    outputs = [(excluded, included)]
+
+                    row["batch_lines_per_s"] = None
+                    if has_batch:
+                        try:
+                            b_elapsed, b_excl, b_incl = best_of(args.repeat, run_batch, AccountTax, taxes, currency, company, lines)
+                            row["batch_lines_per_s"] = size / max(b_elapsed, 1e-9)
+                            outputs.append((b_excl, b_incl))
+                        except (AttributeError, KeyError, TypeError) as e:
+                            print(f"WARNING: batch path unavailable ({e!r}); disabled.", file=sys.stderr)
+                            has_batch = False
+
+                    row["numpy_lines_per_s"] = row["max_diff"] = None
+                    unsupported = reference_supported(taxes)
+                    if unsupported:
+                        row["check"] = f"n/a ({unsupported})"
+                    else:
+                        leaves = flatten_taxes(taxes)
+                        start = time.perf_counter()
+                        ref_excl, ref_incl = reference_totals(leaves, lines_array, digits, round_per_line)
+                        row["numpy_lines_per_s"] = size / max(time.perf_counter() - start, 1e-9)
+                        row["max_diff"] = max(max_diff(ref_excl, ref_incl, e, i) for e, i in outputs)
+                        # Totals over the whole batch must agree too (rounding drift would show up here)
+                        row["total_diff"] = float(max(abs(sum(i) - float(ref_incl.sum())) for _e, i in outputs))
+                        ok = row["max_diff"] <= args.tolerance and row["total_diff"] <= args.tolerance
+                        row["check"] = "OK" if ok else "MISMATCH"
+                        mismatches += 0 if ok else 1
+
+                    fmt = lambda v, spec: format(v, spec) if v is not None else "-"
+                    print(f"{label[:60]:<60} {size:>7} {fmt(row['compute_all_lines_per_s'], '14,.0f')} "
+                          f"{fmt(row['batch_lines_per_s'], '10,.0f')} {fmt(row['numpy_lines_per_s'], '11,.0f')} "
+                          f"{fmt(row['max_diff'], '9.4f')}  {row['check']}")
+                    results.append(row)
+
+        cr.rollback()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({"company": company_name, "round_per_line": round_per_line, "results": results}, fh, indent=2)
+        print(f"Results written to {args.json}")
+
+    if mismatches:
+        print(f"WARNING: {mismatches} scenario(s) differ from the reference by more than {args.tolerance}.",
+              file=sys.stderr)
+        return 1
+    print("Done.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Configuration daemon: runs the set_*.py configuration scripts in a long-lived process that keeps
+the Odoo registry loaded, so reapplying one setting does not pay the Odoo import and registry load.
+
+  serve   (odoo user, Odoo venv; see install/13_config_daemon.sh and the odoo19-config service)
+          Listens on a Unix socket (mode 0600, odoo and root only). Jobs are the set_*.py scripts
+          of its own directory, run one at a time in-process with runpy; their output is streamed
+          back and their exit code returned. Registries are loaded at start for --db and on first
+          use for any other database (tenant mode). Before every job the registry of the target
+          database is checked: a change signalled by another process (module install/upgrade from
+          odoo-bin or the web client) or a different set of installed module versions drops it
+          and loads a new one.
+  run     (client; system python3, standard library only, used by run_odoo_script in run_common.sh)
+          Sends job NAME with the DB_NAME and ODOO_* settings of the caller and prints its output.
+          The job is refused when the daemon's copy of the script (or of scriptlib) differs from
+          the caller's, so an outdated daemon never applies old logic. Exit code 75 means "daemon
+          not available or outdated": the caller falls back to running the script directly.
+
+Protocol: one JSON request line; JSON response lines {"stream": "stdout"|"stderr", "data": ...}
+followed by {"exit": code} (or {"status": "stale"|"error", "message": ...}).
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import socket
+import sys
+import time
+
+EX_UNAVAILABLE = 75
+JOB_RE = re.compile(r"^set_[a-z0-9_]+$")
+# Script settings forwarded by the client; paths and credentials of the daemon are its own
+FORWARDED_ENV_RE = re.compile(r"^ODOO_[A-Z0-9_]+$")
+# Query log and profiler hook the process once and write at exit: never forwarded to the
+# long-lived daemon (run_odoo_script runs those jobs directly)
+DAEMON_OWN_ENV = {"ODOO_CONF", "ODOO_HOME", "ODOO_SCRIPT_QUERY_LOG", "ODOO_SCRIPT_PROFILE"}
+
+
+def code_hash(script_path: str, scriptlib_dir: str) -> str:
+    """sha256 of a script plus the scriptlib package it imports."""
+    digest = hashlib.sha256()
+    with open(script_path, "rb") as fh:
+        digest.update(fh.read())
+    for name in sorted(os.listdir(scriptlib_dir)):
+        if name.endswith(".py"):
+            digest.update(name.encode())
+            with open(os.path.join(scriptlib_dir, name), "rb") as fh:
+                digest.update(fh.read())
+    return digest.hexdigest()
+
+
+# -------------------------------------------------------------------
+# Client
+# -------------------------------------------------------------------
+
+def run_client(args) -> int:
+    script = os.path.abspath(args.script)
+    job = os.path.splitext(os.path.basename(script))[0]
+    if not os.path.exists(args.socket):
+        return EX_UNAVAILABLE
+    request = {
+        "job": job,
+        "sha256": code_hash(script, os.path.join(os.path.dirname(script), "scriptlib")),
+        "db": args.db,
+        "args": args.script_args,
+        "env": {k: v for k, v in os.environ.items() if FORWARDED_ENV_RE.match(k) and k not in DAEMON_OWN_ENV},
+    }
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(args.socket)
+    except OSError:
+        return EX_UNAVAILABLE
+    with sock, sock.makefile("rwb") as stream:
+        stream.write(json.dumps(request).encode() + b"\n")
+        stream.flush()
+        for line in stream:
+            message = json.loads(line)
+            if "stream" in message:
+                out = sys.stderr if message["stream"] == "stderr" else sys.stdout
+                out.write(message["data"])
+                out.flush()
+            elif "exit" in message:
+                return int(message["exit"])
+            else:
+                print(f"config daemon: {message.get('message', message)}", file=sys.stderr)
+                return EX_UNAVAILABLE
+    # Connection closed without an exit code (daemon restarted mid-job): not known to be applied
+    print("config daemon: connection closed before the job finished.", file=sys.stderr)
+    return 1
+
+
+# -------------------------------------------------------------------
+# Daemon
+# -------------------------------------------------------------------
+
+class _StreamWriter:
+    """File-like object forwarding writes to the client as JSON lines."""
+
+    def __init__(self, conn_file, name: str):
+        self.conn_file = conn_file
+        self.name = name
+        self.broken = False
+
+    def write(self, data: str) -> int:
+        if data and not self.broken:
+            try:
+                self.conn_file.write(json.dumps({"stream": self.name, "data": data}).encode() + b"\n")
+                self.conn_file.flush()
+            except OSError:
+                # Client went away: the job still runs to completion (it commits on its own)
+                self.broken = True
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def isatty(self) -> bool:
+        return False
+
+
+class Daemon:
+    def __init__(self, jobs_dir: str, conf: str):
+        self.jobs_dir = jobs_dir
+        self.conf = conf
+        self.scriptlib_dir = os.path.join(jobs_dir, "scriptlib")
+        self.registry_keys: dict[str, str] = {}
+
+        import odoo
+
+        odoo.tools.config.parse_config(["-c", conf])
+        # scriptlib is imported once and shared by every job (13_config_daemon.sh restarts on updates)
+        from scriptlib import schema
+
+        self.schema = schema
+
+    def registry(self, db: str):
+        """Registry of db, reloaded when modules changed since it was loaded."""
+        import odoo
+        from odoo import api
+        from odoo.modules.registry import Registry
+
+        registry = Registry(db)
+        # Another process (odoo-bin -u, the web client) installed or upgraded modules
+        registry = registry.check_signaling() or registry
+        with registry.cursor() as cr:
+            key = self.schema.registry_key(api.Environment(cr, odoo.SUPERUSER_ID, {}))
+        if self.registry_keys.get(db, key) != key:
+            print(f"config daemon: modules changed in {db}, reloading the registry.", file=sys.stderr)
+            Registry.delete(db)
+            registry = Registry(db)
+        self.registry_keys[db] = key
+        return registry
+
+    def preload(self, dbs) -> None:
+        for db in dbs:
+            started = time.monotonic()
+            self.registry(db)
+            print(f"config daemon: registry of {db} loaded in {time.monotonic() - started:.1f}s.", file=sys.stderr)
+
+    def run_job(self, request: dict, conn_file) -> dict:
+        import contextlib
+        import runpy
+        import traceback
+
+        job = request.get("job") or ""
+        db = request.get("db") or ""
+        script = os.path.join(self.jobs_dir, f"{job}.py")
+        if not JOB_RE.match(job) or not os.path.isfile(script):
+            return {"status": "error", "message": f"unknown job {job!r}"}
+        if not db:
+            return {"status": "error", "message": "no database given"}
+        if request.get("sha256") != code_hash(script, self.scriptlib_dir):
+            return {"status": "stale", "message": f"{job} differs from the installed copy; re-run install/13_config_daemon.sh"}
+
+        started = time.monotonic()
+        self.registry(db)
+
+        env = {k: str(v) for k, v in (request.get("env") or {}).items()
+               if FORWARDED_ENV_RE.match(k) and k not in DAEMON_OWN_ENV}
+        env.update({"ODOO_CONF": self.conf, "DB_NAME": db})
+        saved_env = dict(os.environ)
+        saved_argv, saved_path = sys.argv, list(sys.path)
+        os.environ.update(env)
+        sys.argv = [script] + [str(a) for a in request.get("args") or []]
+        stdout, stderr = _StreamWriter(conn_file, "stdout"), _StreamWriter(conn_file, "stderr")
+        code = 0
+        try:
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                try:
+                    runpy.run_path(script, run_name="__main__")
+                except SystemExit as e:
+                    code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+                    if e.code is not None and not isinstance(e.code, int):
+                        print(e.code, file=sys.stderr)
+                except Exception:
+                    traceback.print_exc()
+                    code = 1
+        finally:
+            sys.argv, sys.path[:] = saved_argv, saved_path
+            os.environ.clear()
+            os.environ.update(saved_env)
+        print(f"config daemon: {job} on {db} exited {code} in {time.monotonic() - started:.2f}s.", file=sys.stderr)
+        return {"exit": code}
+
+    def serve(self, socket_path: str) -> None:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            server.bind(socket_path)
+        finally:
+            os.umask(old_umask)
+        server.listen(16)
+        print(f"config daemon: listening on {socket_path}.", file=sys.stderr)
+        # One job at a time: jobs change os.environ, sys.argv and the process-wide stdout
+        while True:
+            conn, _ = server.accept()
+            with conn, conn.makefile("rwb") as conn_file:
+                try:
+                    line = conn_file.readline()
+                    response = self.run_job(json.loads(line), conn_file) if line else None
+                except Exception as e:  # keep serving after a bad request or a failed registry load
+                    response = {"status": "error", "message": str(e)}
+                if response is not None:
+                    try:
+                        conn_file.write(json.dumps(response).encode() + b"\n")
+                        conn_file.flush()
+                    except OSError:
+                        pass
+
+
+def serve(args) -> int:
+    odoo_home = os.environ.get("ODOO_HOME")
+    if odoo_home:
+        odoo_src = os.path.join(odoo_home, "odoo")
+        sys.path.insert(0, odoo_src if os.path.isdir(odoo_src) else odoo_home)
+    jobs_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, jobs_dir)
+
+    daemon = Daemon(jobs_dir, args.conf)
+    daemon.preload(args.db)
+    daemon.serve(args.socket)
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_serve = sub.add_parser("serve", help="run the daemon (as the odoo user)")
+    p_serve.add_argument("--socket", required=True)
+    p_serve.add_argument("--conf", default=os.environ.get("ODOO_CONF", "/etc/odoo19.conf"))
+    p_serve.add_argument("--db", action="append", default=[], help="database to load at start (repeatable)")
+
+    p_run = sub.add_parser("run", help="run a configuration script through the daemon")
+    p_run.add_argument("--socket", required=True)
+    p_run.add_argument("--db", required=True)
+    p_run.add_argument("script", help="path of the set_*.py script in the repo")
+    p_run.add_argument("script_args", nargs=argparse.REMAINDER)
+
+    args = parser.parse_args()
+    return serve(args) if args.command == "serve" else run_client(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
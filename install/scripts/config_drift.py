@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Read-only configuration drift check across the databases of this host (tenants provisioned with
+the same PA scripts).
+
+For each database, every section below is fetched with one SQL query (no registry load), with
+ids replaced by natural keys (tax "sale:ITBMS 7%", account code, company #1, ...) so databases
+can be compared. The rows are sorted into a canonical snapshot and hashed per section; sections
+whose hash matches the reference database are not looked at further, and only the differences
+of the others are printed:
+
+  taxes, tax_repartition, tax_groups, fiscal_positions, fiscal_position_taxes, journals,
+  payment_terms, payment_term_lines, defaults (ir.default)
+
+Companies are numbered in creation order (#1 = main company), because their names differ per
+tenant. Translated values are compared in en_US (the value the install scripts write). Tables
+or columns this Odoo version does not have are left out.
+
+Examples:
+  config_drift.py                                  # every Odoo database, reference = first one
+  config_drift.py --reference erp.a.com erp.a.com erp.b.com --sections taxes,journals
+  config_drift.py --json /tmp/drift.json           # also write the snapshots
+
+Exit code: 0 no drift, 1 drift found, 2 a database could not be read. Uses ODOO_CONF,
+ODOO_HOME (see run_config_drift.sh).
+"""
+from __future__ import annotations
+
+import argparse
+import concurrent.futures
+import contextlib
+import hashlib
+import json
+import os
+import sys
+import time
+
+ODOO_CONF = os.environ.get("ODOO_CONF")
+if not ODOO_CONF:
+    print("ERROR: ODOO_CONF must be set.", file=sys.stderr)
+    sys.exit(2)
+
+ODOO_HOME = os.environ.get("ODOO_HOME")
+if ODOO_HOME:
+    odoo_src = os.path.join(ODOO_HOME, "odoo")
+    if os.path.isdir(odoo_src):
+        sys.path.insert(0, odoo_src)
+    else:
+        sys.path.insert(0, ODOO_HOME)
+
+import odoo
+from odoo import sql_db
+
+odoo.tools.config.parse_config(["-c", ODOO_CONF])
+
+# section: (table, key columns, compared columns). Columns missing in this version are dropped;
+# a section whose table or key columns are missing is skipped.
+SECTIONS = {
+    "taxes": ("account_tax", ["company_id", "type_tax_use", "name"],
+              ["amount_type", "amount", "price_include", "price_include_override", "include_base_amount",
+               "is_base_affected", "tax_group_id", "description", "invoice_label", "tax_scope", "country_id",
+               "sequence", "active"]),
+    "tax_repartition": ("account_tax_repartition_line", ["tax_id", "document_type", "repartition_type", "sequence"],
+                        ["factor_percent", "account_id", "use_in_tax_closing"]),
+    "tax_groups": ("account_tax_group", ["company_id", "name"], ["sequence", "country_id"]),
+    "fiscal_positions": ("account_fiscal_position", ["company_id", "name"],
+                         ["auto_apply", "vat_required", "country_id", "sequence", "note", "active"]),
+    "fiscal_position_taxes": ("account_fiscal_position_tax", ["position_id", "tax_src_id", "tax_dest_id"], []),
+    "journals": ("account_journal", ["company_id", "code"],
+                 ["name", "type", "default_account_id", "refund_sequence", "payment_sequence", "sequence", "active"]),
+    "payment_terms": ("account_payment_term", ["company_id", "name"],
+                      ["note", "early_discount", "discount_percentage", "discount_days", "sequence", "active"]),
+    "payment_term_lines": ("account_payment_term_line", ["payment_id", "nb_days", "value"],
+                           ["value_amount", "delay_type", "days_next_month"]),
+    "defaults": ("ir_default", ["field_id", "company_id", "user_id"], ["condition", "json_value"]),
+}
+# Foreign key column -> referenced table, shown through LABELS instead of the id
+REFERENCES = {
+    "company_id": "res_company",
+    "country_id": "res_country",
+    "tax_group_id": "account_tax_group",
+    "tax_id": "account_tax",
+    "tax_src_id": "account_tax",
+    "tax_dest_id": "account_tax",
+    "account_id": "account_account",
+    "default_account_id": "account_account",
+    "position_id": "account_fiscal_position",
+    "payment_id": "account_payment_term",
+    "field_id": "ir_model_fields",
+    "user_id": "res_users",
+}
+# Natural key of a referenced row; {a} = table alias, {name} = its (en_US) name
+LABELS = {
+    "res_company": "'#' || (SELECT count(*) FROM res_company c2 WHERE c2.id <= {a}.id)",
+    "res_country": "{a}.code",
+    "account_tax": "{a}.type_tax_use || ':' || {name}",
+    "account_account": "{code}",
+    "ir_model_fields": "{a}.model || '.' || {a}.name",
+    "res_users": "{a}.login",
+}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("databases", nargs="*", help="databases to compare (default: every Odoo database)")
+    parser.add_argument("--reference", help="database the others are compared with (default: the first one)")
+    parser.add_argument("--sections", help=f"comma-separated subset of: {', '.join(SECTIONS)}")
+    parser.add_argument("--jobs", type=int, default=8, help="databases read in parallel (default: 8)")
+    parser.add_argument("--show", type=int, default=20, help="differences printed per section and database (default: 20)")
+    parser.add_argument("--json", help="write the snapshots and section hashes to this file")
+    return parser.parse_args()
+
+
+@contextlib.contextmanager
+def cursor(db_name: str):
+    cr = sql_db.db_connect(db_name).cursor()
+    try:
+        yield cr
+    finally:
+        cr.rollback()   # read-only
+        cr.close()
+
+
+def odoo_databases() -> list[str]:
+    """Databases of this cluster that have the accounting tables."""
+    with cursor("postgres") as cr:
+        cr.execute("SELECT datname FROM pg_database WHERE NOT datistemplate AND datallowconn "
+                   "AND datname != 'postgres' ORDER BY datname")
+        names = [row[0] for row in cr.fetchall()]
+    found = []
+    for name in names:
+        try:
+            with cursor(name) as cr:
+                cr.execute("SELECT to_regclass('account_tax') IS NOT NULL")
+                if cr.fetchone()[0]:
+                    found.append(name)
+        except Exception:   # no access (other owner): not one of ours
+            continue
+    return found
+
+
+def _columns(cr) -> dict[str, dict[str, str]]:
+    tables = {table for table, _, _ in SECTIONS.values()} | set(REFERENCES.values())
+    cr.execute("SELECT table_name, column_name, data_type FROM information_schema.columns "
+               "WHERE table_schema = current_schema() AND table_name = ANY(%s)", [sorted(tables)])
+    columns: dict[str, dict[str, str]] = {}
+    for table, column, data_type in cr.fetchall():
+        columns.setdefault(table, {})[column] = data_type
+    return columns
+
+
+def _value(columns: dict, table: str, alias: str, column: str) -> str | None:
+    """SQL text value of alias.column (jsonb translations in en_US), None when it does not exist."""
+    data_type = columns.get(table, {}).get(column)
+    if data_type is None:
+        return None
+    if data_type == "jsonb" and column != "json_value":
+        return f"{alias}.{column} ->> 'en_US'"
+    return f"{alias}.{column}::text"
+
+
+def _label(columns: dict, table: str, alias: str) -> str:
+    template = LABELS.get(table, "{name}")
+    name = _value(columns, table, alias, "name") or f"{alias}.id::text"
+    code = _value(columns, table, alias, "code") or name   # account code is per company (code_store) in 18+
+    return template.format(a=alias, name=name, code=code)
+
+
+def section_query(columns: dict, table: str, keys: list[str], fields: list[str]) -> tuple[str, list[str]] | None:
+    """(SELECT, output column names) for one section; None when this database cannot provide it."""
+    if table not in columns or any(k not in columns[table] for k in keys):
+        return None
+    selects, joins, names = [], [], []
+    for column in keys + [f for f in fields if f in columns[table]]:
+        target = REFERENCES.get(column)
+        if target and target in columns:
+            alias = f"r{len(joins)}"
+            joins.append(f"LEFT JOIN {target} {alias} ON {alias}.id = t.{column}")
+            selects.append(_label(columns, target, alias))
+        else:
+            selects.append(_value(columns, table, "t", column))
+        names.append(column)
+    return f"SELECT {', '.join(selects)} FROM {table} t {' '.join(joins)}", names
+
+
+def snapshot(db_name: str, sections: list[str]) -> dict:
+    """{section: {"hash": ..., "rows": {key: {column: value}}}} for one database."""
+    result = {}
+    with cursor(db_name) as cr:
+        columns = _columns(cr)
+        for section in sections:
+            table, keys, fields = SECTIONS[section]
+            query = section_query(columns, table, keys, fields)
+            if query is None:
+                continue
+            sql, names = query
+            cr.execute(sql)
+            rows: dict[str, dict] = {}
+            for values in sorted(cr.fetchall(), key=lambda r: [(v is not None, v or "") for v in r]):
+                key = " | ".join("" if v is None else v for v in values[:len(keys)])
+                base, n = key, 1
+                while key in rows:   # duplicates (same name twice) stay distinguishable
+                    n += 1
+                    key = f"{base} ({n})"
+                rows[key] = dict(zip(names[len(keys):], values[len(keys):]))
+            canonical = json.dumps(rows, sort_keys=True, ensure_ascii=False)
+            result[section] = {"hash": hashlib.sha256(canonical.encode()).hexdigest()[:16], "rows": rows}
+    return result
+
+
+def differences(reference: dict, other: dict) -> list[str]:
+    lines = []
+    for key in sorted(reference.keys() | other.keys()):
+        if key not in other:
+            lines.append(f"- {key}")
+        elif key not in reference:
+            lines.append(f"+ {key}")
+        elif reference[key] != other[key]:
+            changed = [f"{c}: {reference[key].get(c)!r} -> {other[key].get(c)!r}"
+                       for c in sorted(reference[key].keys() | other[key].keys())
+                       if reference[key].get(c) != other[key].get(c)]
+            lines.append(f"~ {key}: {'; '.join(changed)}")
+    return lines
+
+
+def main() -> int:
+    args = parse_args()
+    sections = list(SECTIONS)
+    if args.sections:
+        sections = [s.strip() for s in args.sections.split(",") if s.strip()]
+        unknown = [s for s in sections if s not in SECTIONS]
+        if unknown:
+            print(f"ERROR: unknown section(s): {', '.join(unknown)}", file=sys.stderr)
+            return 2
+
+    databases = list(dict.fromkeys(args.databases)) or odoo_databases()
+    reference = args.reference or (databases[0] if databases else None)
+    if reference and reference not in databases:
+        databases.insert(0, reference)
+    if len(databases) < 2:
+        print(f"Nothing to compare: {len(databases)} database(s) ({', '.join(databases) or 'none found'}).")
+        return 0
+
+    started = time.monotonic()
+    snapshots: dict[str, dict] = {}
+    errors = 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(args.jobs, len(databases)))) as pool:
+        futures = {pool.submit(snapshot, db, sections): db for db in databases}
+        for future in concurrent.futures.as_completed(futures):
+            db = futures[future]
+            try:
+                snapshots[db] = future.result()
+            except Exception as e:
+                errors += 1
+                print(f"ERROR: {db}: {(str(e).splitlines() or [repr(e)])[0]}", file=sys.stderr)
+    if reference not in snapshots:
+        print(f"ERROR: reference database {reference} could not be read.", file=sys.stderr)
+        return 2
+
+    drifted = 0
+    ref = snapshots[reference]
+    for db in databases:
+        if db == reference or db not in snapshots:
+            continue
+        for section in sections:
+            mine, theirs = ref.get(section), snapshots[db].get(section)
+            if mine is None or theirs is None:
+                if (mine is None) != (theirs is None):
+                    print(f"{db} [{section}]: only available in {'the reference' if theirs is None else db}")
+                continue
+            if mine["hash"] == theirs["hash"]:
+                continue
+            drifted += 1
+            lines = differences(mine["rows"], theirs["rows"])
+            print(f"{db} [{section}]: {len(lines)} difference(s) from {reference}")
+            for line in lines[:args.show]:
+                print(f"  {line}")
+            if len(lines) > args.show:
+                print(f"  ... {len(lines) - args.show} more (--show)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({"reference": reference, "snapshots": snapshots}, fh, indent=1, sort_keys=True, ensure_ascii=False)
+    compared = len(snapshots) - 1
+    print(f"Compared {compared} database(s) with {reference} on {len(sections)} section(s) in "
+          f"{time.monotonic() - started:.1f}s: {drifted} drifted section(s)"
+          f"{'' if not errors else f', {errors} database(s) not readable'}.")
+    if errors:
+        return 2
+    return 1 if drifted else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+Scheduled-action (ir.cron) load report: which jobs run long, when, and against what.
+
+Reads, for one database:
+  - ir_cron (name, interval, next call, active) and, when present (Odoo 17+), ir_cron_progress,
+    whose rows give one entry per recent run;
+  - the Odoo log (default /var/log/odoo/odoo19.log and its rotated .1/.gz files, or --log):
+    "Job ... starting" / "Job ... done in ...s" lines give each run's start, end
+    and worker pid; cron errors are counted; werkzeug request lines give the user traffic per
+    hour of the day;
+  - optionally the PostgreSQL log (--pg-log), when log_lock_waits is on and log_line_prefix
+    contains %a (set by install/02_postgres.sh): "process N acquired ... after X ms" lines of
+    sessions named odoo-<pid> are charged to the job running in that Odoo process at the time,
+    only when it is the only job running there and the process serves no HTTP requests (threads
+    share the pid). Other waits are reported as unattributed: with workers = 0 and cron in the
+    main service, or with several cron threads busy at once, the lock column stays partial.
+
+and prints, per job: runs, failures, duration p50/p95/max, busy time, the share of its run time
+inside the peak traffic hours, lock wait time, and whether it overruns its own interval. It
+then recommends a max_cron_threads value (from the concurrency of the runs and the total cron
+busy time) and next-call times that move long daily jobs to the quietest hours and spread jobs
+sharing an interval so they do not start together.
+
+Read-only. Timestamps are compared in UTC (Odoo logs and ir_cron store UTC; --pg-tz-offset
+when the PostgreSQL log is in another zone).
+
+Examples:
+  cron_report.py --days 7
+  cron_report.py --log /var/log/odoo/odoo19.log --pg-log /tmp/postgresql-16-main.log --json /tmp/cron.json
+
+Uses ODOO_CONF, DB_NAME, ODOO_HOME (see run_cron_report.sh).
+"""
+from __future__ import annotations
+
+import argparse
+import configparser
+import contextlib
+import datetime
+import glob
+import gzip
+import json
+import math
+import os
+import re
+import sys
+
+ODOO_CONF = os.environ.get("ODOO_CONF")
+DB_NAME = os.environ.get("DB_NAME")
+
+if not ODOO_CONF or not DB_NAME:
+    print("ERROR: ODOO_CONF and DB_NAME must be set.", file=sys.stderr)
+    sys.exit(1)
+
+ODOO_HOME = os.environ.get("ODOO_HOME")
+if ODOO_HOME:
+    odoo_src = os.path.join(ODOO_HOME, "odoo")
+    if os.path.isdir(odoo_src):
+        sys.path.insert(0, odoo_src)
+    else:
+        sys.path.insert(0, ODOO_HOME)
+
+import odoo
+from odoo import sql_db
+
+odoo.tools.config.parse_config(["-c", ODOO_CONF])
+
+LOG_RE = re.compile(r"^(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d),\d+ (\d+) (\w+) (\S+) ([\w.]+): (.*)$")
+# Odoo 17+: Job 'name' (id) starting / done in 1.234s / fully done (...; 1.23s); Odoo 16: Starting job `name`.
+JOB_START_RE = re.compile(r"^Job (['\"])(.*)\1 \((\d+)\) starting|^Starting job `(.*)`")
+JOB_DONE_RE = re.compile(r"^Job (['\"])(.*)\1 \((\d+)\) (?:fully )?done\b.*?(\d+(?:\.\d+)?)s\)?$|^Job `(.*)` done")
+REQUEST_RE = re.compile(r'"(?:GET|POST|PUT|DELETE|PATCH) (\S+) HTTP/[\d.]+" \d{3}')
+IGNORED_PATHS = re.compile(r"^/(websocket|longpolling|web/static|web/assets|web/health|[^/]+/static)/?")
+PG_TS_RE = re.compile(r"^(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)(?:\.\d+)? (\S+)")
+PG_LOCK_RE = re.compile(r"process (\d+) acquired (\w+) on .* after (\d+(?:\.\d+)?) ms")
+PG_APP_RE = re.compile(r"\bodoo-(\d+)\b")
+INTERVAL_SECONDS = {"minutes": 60, "hours": 3600, "days": 86400, "weeks": 7 * 86400, "months": 30 * 86400}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    version = os.environ.get("ODOO_VERSION", "19")
+    parser.add_argument("--log", action="append", help=f"Odoo log file(s) (default: /var/log/odoo/odoo{version}.log*)")
+    parser.add_argument("--pg-log", action="append", default=[], help="PostgreSQL log file(s) for lock waits")
+    parser.add_argument("--pg-tz-offset", type=float, default=0.0, help="hours to subtract from PostgreSQL log times to get UTC")
+    parser.add_argument("--days", type=int, default=7, help="look at the last N days (default: 7)")
+    parser.add_argument("--peak-share", type=float, default=0.5,
+                        help="an hour is a peak hour when its traffic is at least this share of the busiest hour (default: 0.5)")
+    parser.add_argument("--json", help="also write the report as JSON to this file")
+    return parser.parse_args()
+
+
+def _open(path: str):
+    return gzip.open(path, "rt", errors="replace") if path.endswith(".gz") else open(path, errors="replace")
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))]
+
+
+class Job:
+    def __init__(self, cron_id: int | None, name: str):
+        self.id = cron_id
+        self.name = name
+        self.interval = None        # seconds
+        self.interval_label = ""
+        self.nextcall = None
+        self.active = True
+        self.runs: list[tuple[datetime.datetime, datetime.datetime, int]] = []   # (start, end, pid) from the log
+        self.progress_runs: list[float] = []      # durations from ir_cron_progress (no log)
+        self.failures = 0
+        self.lock_wait_ms = 0.0
+        self.lock_waits = 0
+        self.peak_seconds = 0.0
+
+    def durations(self) -> list[float]:
+        return [(end - start).total_seconds() for start, end, _ in self.runs] or self.progress_runs
+
+
+class Report:
+    def __init__(self, since: datetime.datetime):
+        self.since = since
+        self.jobs: dict[int | str, Job] = {}
+        self.traffic = [0] * 24               # requests per hour of the day
+        self.http_pids: set[int] = set()       # Odoo processes that logged HTTP requests
+        self.unattributed_lock_wait_ms = 0.0   # waits in cron processes that cannot be tied to one job
+        self.unattributed_lock_waits = 0
+        self.first = self.last = None
+
+    def job(self, cron_id: int | None, name: str) -> Job:
+        key = cron_id if cron_id is not None else name
+        if key not in self.jobs:
+            by_name = next((j for j in self.jobs.values() if j.name == name), None) if cron_id is None else None
+            if by_name:
+                return by_name
+            self.jobs[key] = Job(cron_id, name)
+        return self.jobs[key]
+
+    # --- database ---------------------------------------------------------------------------
+
+    def load_crons(self, cr) -> None:
+        cr.execute("SELECT table_name, data_type FROM information_schema.columns "
+                   "WHERE (table_name, column_name) IN (('ir_cron', 'cron_name'), ('ir_act_server', 'name'))")
+        types = dict(cr.fetchall())
+        table = "ir_cron" if "ir_cron" in types else "ir_act_server"
+        name = ("c.cron_name" if table == "ir_cron" else "a.name") + (" ->> 'en_US'" if types.get(table) == "jsonb" else "")
+        cr.execute(f"""
+            SELECT c.id, {name}, c.interval_number, c.interval_type, c.nextcall, c.active
+              FROM ir_cron c LEFT JOIN ir_act_server a ON a.id = c.ir_actions_server_id
+        """)
+        for cron_id, cron_name, number, unit, nextcall, active in cr.fetchall():
+            job = self.job(cron_id, cron_name or f"cron {cron_id}")
+            job.name = cron_name or job.name
+            job.interval = (number or 0) * INTERVAL_SECONDS.get(unit, 0) or None
+            job.interval_label = f"{number} {unit}"
+            job.nextcall = nextcall
+            job.active = active
+
+        cr.execute("SELECT to_regclass('ir_cron_progress') IS NOT NULL")
+        if cr.fetchone()[0]:
+            cr.execute("""
+                SELECT cron_id, extract(epoch FROM write_date - create_date)
+                  FROM ir_cron_progress WHERE create_date >= %s
+            """, [self.since])
+            for cron_id, seconds in cr.fetchall():
+                if cron_id in self.jobs:
+                    self.jobs[cron_id].progress_runs.append(float(seconds or 0))
+
+    # --- Odoo log ---------------------------------------------------------------------------
+
+    def load_odoo_log(self, path: str) -> None:
+        running: dict[tuple[int, str], datetime.datetime] = {}     # (pid, job key) -> start
+        current: dict[int, Job] = {}                              # pid -> job (for errors)
+        with _open(path) as fh:
+            for line in fh:
+                match = LOG_RE.match(line.rstrip())
+                if not match:
+                    continue
+                ts = datetime.datetime.strptime(match.group(1), "%Y-%m-%d %H:%M:%S")
+                if ts < self.since:
+                    continue
+                pid, level, db, logger, message = int(match.group(2)), match.group(3), match.group(4), match.group(5), match.group(6)
+                self.first = min(self.first or ts, ts)
+                self.last = max(self.last or ts, ts)
+                if logger == "werkzeug":
+                    self.http_pids.add(pid)
+                    request = REQUEST_RE.search(message)
+                    if request and not IGNORED_PATHS.match(request.group(1)):
+                        self.traffic[ts.hour] += 1
+                    continue
+                if db != DB_NAME or not logger.endswith("ir_cron"):
+                    continue
+                start = JOB_START_RE.match(message)
+                if start:
+                    job = self.job(int(start.group(3)) if start.group(3) else None, start.group(2) or start.group(4))
+                    running[(pid, job.name)] = ts
+                    current[pid] = job
+                    continue
+                done = JOB_DONE_RE.match(message)
+                if done:
+                    job = self.job(int(done.group(3)) if done.group(3) else None, done.group(2) or done.group(5))
+                    started = running.pop((pid, job.name), None)
+                    if started is None:
+                        continue   # "fully done" after the per-loop "done in", or run started before --days
+                    if done.group(4):
+                        started = ts - datetime.timedelta(seconds=float(done.group(4)))
+                    job.runs.append((started, ts, pid))
+                    current.pop(pid, None)
+                elif level in ("ERROR", "CRITICAL") and pid in current:
+                    current[pid].failures += 1
+
+    # --- PostgreSQL log ---------------------------------------------------------------------
+
+    def load_pg_log(self, path: str, tz_offset: float) -> None:
+        by_pid: dict[int, list[tuple[datetime.datetime, datetime.datetime, Job]]] = {}
+        for job in self.jobs.values():
+            for start, end, pid in job.runs:
+                by_pid.setdefault(pid, []).append((start, end, job))
+        with _open(path) as fh:
+            for line in fh:
+                lock = PG_LOCK_RE.search(line)
+                app = PG_APP_RE.search(line)
+                stamp = PG_TS_RE.match(line)
+                if not (lock and app and stamp):
+                    continue
+                ts = datetime.datetime.strptime(stamp.group(1), "%Y-%m-%d %H:%M:%S") - datetime.timedelta(hours=tz_offset)
+                pid = int(app.group(1))
+                running = [job for start, end, job in by_pid.get(pid, [])
+                           if start <= ts <= end + datetime.timedelta(seconds=1)]
+                if not running:
+                    continue
+                if len(running) == 1 and pid not in self.http_pids:
+                    running[0].lock_wait_ms += float(lock.group(3))
+                    running[0].lock_waits += 1
+                else:   # another cron thread or an HTTP thread of the same process may be the one waiting
+                    self.unattributed_lock_wait_ms += float(lock.group(3))
+                    self.unattributed_lock_waits += 1
+
+    # --- analysis ---------------------------------------------------------------------------
+
+    def peak_hours(self, share: float) -> set[int]:
+        busiest = max(self.traffic)
+        return {h for h, n in enumerate(self.traffic) if busiest and n >= busiest * share}
+
+    def quiet_hours(self) -> list[int]:
+        return sorted(range(24), key=lambda h: (self.traffic[h], h))
+
+    def compute_peak_overlap(self, peak: set[int]) -> None:
+        for job in self.jobs.values():
+            for start, end, _ in job.runs:
+                t = start
+                while t < end:
+                    step_end = min(end, t.replace(minute=0, second=0, microsecond=0) + datetime.timedelta(hours=1))
+                    if t.hour in peak:
+                        job.peak_seconds += (step_end - t).total_seconds()
+                    t = step_end
+
+    def concurrency(self) -> tuple[int, float, float]:
+        """(max concurrent runs, p95 concurrency while any job runs, average busy threads over the window)."""
+        events = []
+        busy = 0.0
+        for job in self.jobs.values():
+            for start, end, _ in job.runs:
+                events += [(start, 1), (end, -1)]
+                busy += (end - start).total_seconds()
+        events.sort(key=lambda e: (e[0], e[1]))
+        level, peak, previous = 0, 0, None
+        seconds_at: dict[int, float] = {}     # concurrency level -> seconds spent at it
+        for ts, delta in events:
+            if previous is not None and level > 0:
+                seconds_at[level] = seconds_at.get(level, 0.0) + max(1.0, (ts - previous).total_seconds())
+            level += delta
+            peak = max(peak, level)
+            previous = ts
+        p95, covered, total = 0, 0.0, sum(seconds_at.values())
+        for level in sorted(seconds_at):
+            covered += seconds_at[level]
+            p95 = level
+            if covered >= 0.95 * total:
+                break
+        window = ((self.last - self.first).total_seconds() if self.first and self.last else 0) or 1
+        return peak, p95, busy / window
+
+    def stagger(self, peak: set[int]) -> list[dict]:
+        """Suggested next calls: long daily jobs into the quietest hours, same-interval jobs spread out."""
+        suggestions = []
+        today = datetime.datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        quiet = [h for h in self.quiet_hours() if h not in peak] or self.quiet_hours()
+
+        daily = [j for j in self.jobs.values() if j.active and j.interval and j.interval >= 86400 and j.runs
+                 and j.peak_seconds > 0.25 * sum(j.durations())]
+        slot = today.replace(hour=quiet[0]) + datetime.timedelta(days=1)
+        for job in sorted(daily, key=lambda j: -percentile(j.durations(), 95)):
+            suggestions.append({"job": job.name, "id": job.id, "nextcall": slot.strftime("%Y-%m-%d %H:%M"),
+                                "reason": f"{job.peak_seconds / max(sum(job.durations()), 1):.0%} of its run time falls in peak hours"})
+            slot += datetime.timedelta(seconds=percentile(job.durations(), 95) + 300)
+
+        groups: dict[int, list[Job]] = {}
+        for job in self.jobs.values():
+            if job.active and job.interval and job.interval < 86400 and job.nextcall:
+                groups.setdefault(job.interval, []).append(job)
+        for interval, jobs in groups.items():
+            if len(jobs) < 2:
+                continue
+            phases = sorted((((j.nextcall - datetime.datetime(2000, 1, 1)).total_seconds() % interval, j) for j in jobs),
+                            key=lambda p: (p[0], p[1].name))
+            gaps = [(b[0] - a[0]) for a, b in zip(phases, phases[1:])]
+            if min(gaps, default=interval) >= max(60, interval / len(jobs) / 2):
+                continue   # already spread
+            base = min(j.nextcall for j in jobs)
+            for i, (_, job) in enumerate(sorted(phases, key=lambda p: (-percentile(p[1].durations(), 95), p[1].name))):
+                nextcall = base + datetime.timedelta(seconds=round(i * interval / len(jobs) / 60) * 60)
+                if abs((nextcall - job.nextcall).total_seconds()) >= 60:
+                    suggestions.append({"job": job.name, "id": job.id, "nextcall": nextcall.strftime("%Y-%m-%d %H:%M"),
+                                        "reason": f"{len(jobs)} jobs every {job.interval_label} start together; "
+                                                  f"offset {i}/{len(jobs)} of the interval"})
+        return suggestions
+
+
+def configured_cron_threads() -> str:
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.read(ODOO_CONF)
+    return parser.get("options", "max_cron_threads", fallback="2 (default)")
+
+
+def main() -> int:
+    args = parse_args()
+    version = os.environ.get("ODOO_VERSION", "19")
+    logs = args.log or sorted(glob.glob(f"/var/log/odoo/odoo{version}.log*"), reverse=True)
+    since = datetime.datetime.utcnow() - datetime.timedelta(days=args.days)
+    report = Report(since)
+
+    cr = sql_db.db_connect(DB_NAME).cursor()
+    with contextlib.closing(cr):
+        report.load_crons(cr)
+        cr.rollback()
+    for path in logs:
+        try:
+            report.load_odoo_log(path)
+        except OSError as e:
+            print(f"WARNING: cannot read {path}: {e}", file=sys.stderr)
+    for path in args.pg_log:
+        try:
+            report.load_pg_log(path, args.pg_tz_offset)
+        except OSError as e:
+            print(f"WARNING: cannot read {path}: {e}", file=sys.stderr)
+
+    peak = report.peak_hours(args.peak_share)
+    report.compute_peak_overlap(peak)
+    max_conc, p95_conc, avg_busy = report.concurrency()
+    cpus = os.cpu_count() or 1
+    recommended = max(1, min(cpus, math.ceil(max(p95_conc, avg_busy * 1.5))))
+    suggestions = report.stagger(peak)
+
+    rows = []
+    for job in report.jobs.values():
+        durations = job.durations()
+        if not durations and not job.active:
+            continue
+        total = sum(durations)
+        rows.append({
+            "id": job.id, "job": job.name, "interval": job.interval_label, "active": job.active,
+            "runs": len(durations), "failures": job.failures,
+            "p50_s": round(percentile(durations, 50), 2), "p95_s": round(percentile(durations, 95), 2),
+            "max_s": round(max(durations, default=0), 2), "busy_s": round(total, 1),
+            "peak_share": round(job.peak_seconds / total, 3) if total and job.runs else None,
+            "lock_wait_s": round(job.lock_wait_ms / 1000, 2), "lock_waits": job.lock_waits,
+            "overruns_interval": bool(job.interval and percentile(durations, 95) > job.interval),
+            "source": "log" if job.runs else ("ir_cron_progress" if durations else ""),
+        })
+    rows.sort(key=lambda r: -r["busy_s"])
+
+    print(f"Scheduled actions of {DB_NAME}, last {args.days} day(s); {len(logs)} Odoo log file(s), "
+          f"{len(args.pg_log)} PostgreSQL log file(s).")
+    print(f"Peak traffic hours (UTC): {', '.join(f'{h:02d}h' for h in sorted(peak)) or 'no request lines in the log'}")
+    print(f"{'Job':<44} {'runs':>5} {'fail':>4} {'p50 s':>8} {'p95 s':>8} {'max s':>8} {'busy s':>9} {'peak':>5} {'lock s':>7}")
+    for r in rows:
+        flag = "  OVERRUNS INTERVAL" if r["overruns_interval"] else ""
+        peak_share = f"{r['peak_share']:.0%}" if r["peak_share"] is not None else "-"
+        print(f"{r['job'][:44]:<44} {r['runs']:>5} {r['failures']:>4} {r['p50_s']:>8} {r['p95_s']:>8} "
+              f"{r['max_s']:>8} {r['busy_s']:>9} {peak_share:>5} {r['lock_wait_s']:>7}{flag}")
+    if report.unattributed_lock_waits:
+        print(f"Unattributed lock waits: {report.unattributed_lock_waits} "
+              f"({report.unattributed_lock_wait_ms / 1000:.2f}s) during cron runs in processes that also "
+              f"serve HTTP or ran several jobs at once (attribution needs workers > 0 or the cron unit, "
+              f"and one job per process).")
+
+    print(f"\nConcurrency: max {max_conc} job(s) at once, p95 {p95_conc:g}; cron busy time = {avg_busy:.2f} thread(s) on average.")
+    print(f"max_cron_threads: configured {configured_cron_threads()}, recommended {recommended} "
+          f"(p95 concurrency or 1.5 x average busy threads, at most {cpus} CPU(s)).")
+    if suggestions:
+        print("\nSuggested next calls (UTC; set in Settings > Technical > Scheduled Actions):")
+        for s in suggestions:
+            print(f"  {s['job']} (id {s['id']}): {s['nextcall']} - {s['reason']}")
+    else:
+        print("\nNo schedule changes suggested.")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({"database": DB_NAME, "days": args.days, "peak_hours_utc": sorted(peak),
+                       "traffic_by_hour": report.traffic, "jobs": rows,
+                       "unattributed_lock_wait": {"waits": report.unattributed_lock_waits,
+                                                  "seconds": round(report.unattributed_lock_wait_ms / 1000, 2)},
+                       "concurrency": {"max": max_conc, "p95": p95_conc, "average_busy": round(avg_busy, 3)},
+                       "max_cron_threads": {"configured": configured_cron_threads(), "recommended": recommended},
+                       "suggestions": suggestions}, fh, indent=1, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Autovacuum tuning, bloat report and off-hours reindexing for the Odoo database.
+
+Odoo rewrites some tables all day: account_move_line on every reconciliation, mail_message and
+ir_attachment with the chatter, bus_bus with every notification (inserted, then deleted by the
+bus garbage collector). With the default autovacuum settings (vacuum at 20 % dead rows) the big
+ones are vacuumed rarely and their indexes bloat. Three commands:
+
+  report   (default, read-only) per table: size, dead tuple ratio, estimated bloat, last
+           (auto)vacuum/analyze and the per-table settings; btree indexes past --index-bloat,
+           invalid indexes left by an interrupted REINDEX CONCURRENTLY, database XID age.
+           Exit code 1 when a threshold is exceeded. --json FILE writes the same report.
+  tune     apply the per-table autovacuum settings of AUTOVACUUM below (only the ones that
+           differ; --reset removes them). Run by install/14_db_maintenance.sh.
+  reindex  REINDEX INDEX CONCURRENTLY the indexes past --index-bloat (largest bloat first,
+           --max per run), only inside --window; invalid leftovers of earlier runs are dropped
+           first. Run nightly by the odoo19-db-maintenance timer.
+
+Bloat is estimated from pg_class and pg_stats (no extension needed, like check_pgsql / ioguix
+bloat queries), so it is only as good as the last ANALYZE; tables and indexes smaller than
+--min-size-mb are left out.
+
+Examples:
+  db_maintenance.py report --json /var/lib/odoo/db_maintenance.json
+  db_maintenance.py tune
+  db_maintenance.py reindex --window 02:00-05:00 --dry-run
+
+Uses ODOO_CONF, DB_NAME, ODOO_HOME (see run_db_maintenance.sh).
+"""
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import os
+import sys
+import time
+
+ODOO_CONF = os.environ.get("ODOO_CONF")
+DB_NAME = os.environ.get("DB_NAME")
+
+if not ODOO_CONF or not DB_NAME:
+    print("ERROR: ODOO_CONF and DB_NAME must be set.", file=sys.stderr)
+    sys.exit(2)
+
+ODOO_HOME = os.environ.get("ODOO_HOME")
+if ODOO_HOME:
+    odoo_src = os.path.join(ODOO_HOME, "odoo")
+    if os.path.isdir(odoo_src):
+        sys.path.insert(0, odoo_src)
+    else:
+        sys.path.insert(0, ODOO_HOME)
+
+import odoo
+import psycopg2
+from odoo import sql_db
+
+odoo.tools.config.parse_config(["-c", ODOO_CONF])
+
+# Per-table autovacuum storage parameters (ALTER TABLE ... SET). Tables missing in this
+# database are skipped; *_insert_* needs PostgreSQL 13+.
+AUTOVACUUM = {
+    # Updated by every reconciliation and payment: vacuum at 2 % dead rows instead of 20 %
+    "account_move_line": {"autovacuum_vacuum_scale_factor": 0.02, "autovacuum_analyze_scale_factor": 0.01,
+                          "autovacuum_vacuum_insert_scale_factor": 0.05},
+    "account_move": {"autovacuum_vacuum_scale_factor": 0.05, "autovacuum_analyze_scale_factor": 0.02},
+    # Mostly appended (chatter, tracking): insert-triggered vacuums keep the visibility map current
+    "mail_message": {"autovacuum_vacuum_scale_factor": 0.05, "autovacuum_analyze_scale_factor": 0.02,
+                     "autovacuum_vacuum_insert_scale_factor": 0.05},
+    "ir_attachment": {"autovacuum_vacuum_scale_factor": 0.05, "autovacuum_analyze_scale_factor": 0.02},
+    # Rows live for minutes: small table, vacuum by row count and without cost delay
+    "bus_bus": {"autovacuum_vacuum_scale_factor": 0, "autovacuum_vacuum_threshold": 5000,
+                "autovacuum_analyze_scale_factor": 0, "autovacuum_analyze_threshold": 5000,
+                "autovacuum_vacuum_cost_delay": 0},
+}
+PG13_OPTIONS = {"autovacuum_vacuum_insert_scale_factor", "autovacuum_vacuum_insert_threshold"}
+MB = 1024 * 1024
+
+# Estimated table bloat: expected pages from reltuples and the average row width in pg_stats
+TABLE_SQL = """
+WITH est AS (
+    SELECT c.oid, c.relname, c.reltuples, c.relpages, c.reloptions,
+           current_setting('block_size')::numeric AS bs,
+           coalesce(substring(array_to_string(c.reloptions, ' ') FROM 'fillfactor=([0-9]+)')::int, 100) AS fillfactor,
+           23 + CASE WHEN max(coalesce(s.null_frac, 0)) > 0 THEN (7 + count(*)) / 8 ELSE 0 END AS hdr,
+           sum((1 - coalesce(s.null_frac, 0)) * coalesce(s.avg_width, 0)) AS data_width,
+           count(s.attname) < count(*) AS no_stats
+      FROM pg_class c
+      JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+      LEFT JOIN pg_stats s ON s.schemaname = current_schema() AND s.tablename = c.relname AND s.attname = a.attname
+                          AND NOT s.inherited
+     WHERE c.relnamespace = current_schema()::regnamespace AND c.relkind = 'r'
+     GROUP BY c.oid, c.relname, c.reltuples, c.relpages, c.reloptions
+)
+SELECT e.relname, pg_table_size(e.oid), pg_indexes_size(e.oid), t.n_live_tup, t.n_dead_tup,
+       CASE WHEN e.no_stats OR e.relpages = 0 THEN NULL
+            ELSE greatest(e.relpages - ceil(e.reltuples / floor((e.bs - 24) * e.fillfactor / 100
+                          / (4 + ceil((e.hdr + e.data_width) / 8) * 8))), 0) * e.bs END,
+       e.relpages * e.bs, t.last_vacuum, t.last_autovacuum, t.last_analyze, t.last_autoanalyze,
+       t.autovacuum_count, age(c.relfrozenxid), e.reloptions
+  FROM est e
+  JOIN pg_class c ON c.oid = e.oid
+  JOIN pg_stat_user_tables t ON t.relid = e.oid
+ WHERE pg_table_size(e.oid) >= %(min_size)s OR e.relname = ANY(%(hot)s)
+ ORDER BY pg_table_size(e.oid) DESC
+"""
+
+# Estimated btree bloat: expected leaf pages from reltuples and the key width (index fillfactor 90)
+INDEX_SQL = """
+WITH cols AS (
+    SELECT i.indexrelid, i.indrelid, ci.relname AS idxname, ct.relname AS tblname, ci.reltuples, ci.relpages,
+           coalesce(substring(array_to_string(ci.reloptions, ' ') FROM 'fillfactor=([0-9]+)')::int, 90) AS fillfactor,
+           s.null_frac, s.avg_width, s.attname
+      FROM pg_index i
+      JOIN pg_class ci ON ci.oid = i.indexrelid
+      JOIN pg_class ct ON ct.oid = i.indrelid
+      JOIN pg_am am ON am.oid = ci.relam AND am.amname = 'btree'
+      CROSS JOIN LATERAL unnest(i.indkey::int2[]) AS k(attnum)
+      LEFT JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+      LEFT JOIN pg_stats s ON s.schemaname = current_schema() AND s.tablename = ct.relname AND s.attname = a.attname
+                          AND NOT s.inherited
+     WHERE ci.relnamespace = current_schema()::regnamespace AND i.indisvalid AND ci.relpages > 0
+       AND NOT EXISTS (SELECT 1 FROM pg_constraint x WHERE x.conindid = i.indexrelid AND x.contype = 'x')
+), est AS (
+    SELECT indexrelid, idxname, tblname, reltuples, relpages, fillfactor,
+           count(attname) < count(*) AS no_stats,
+           8 + CASE WHEN max(coalesce(null_frac, 0)) > 0 THEN 4 ELSE 0 END
+             + sum((1 - coalesce(null_frac, 0)) * coalesce(avg_width, 1024)) AS tuple_width
+      FROM cols
+     GROUP BY indexrelid, idxname, tblname, reltuples, relpages, fillfactor
+)
+SELECT idxname, tblname, relpages * current_setting('block_size')::numeric,
+       greatest(relpages - 1 - ceil(reltuples / floor((current_setting('block_size')::numeric - 24 - 16) * fillfactor / 100
+                / (4 + ceil(tuple_width / 8) * 8))), 0) * current_setting('block_size')::numeric
+  FROM est
+ WHERE NOT no_stats AND pg_relation_size(indexrelid) >= %(min_size)s
+ ORDER BY 4 DESC
+"""
+
+INVALID_SQL = """
+SELECT ci.relname, ct.relname, pg_relation_size(ci.oid)
+  FROM pg_index i
+  JOIN pg_class ci ON ci.oid = i.indexrelid
+  JOIN pg_class ct ON ct.oid = i.indrelid
+ WHERE ci.relnamespace = current_schema()::regnamespace AND NOT i.indisvalid
+"""
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", nargs="?", default="report", choices=("report", "tune", "reindex"))
+    parser.add_argument("--dead-ratio", type=float, default=0.2, help="dead tuple ratio reported as a problem (default 0.2)")
+    parser.add_argument("--table-bloat", type=float, default=50, help="estimated table bloat %% reported (default 50)")
+    parser.add_argument("--index-bloat", type=float, default=40, help="estimated index bloat %% to reindex (default 40)")
+    parser.add_argument("--min-size-mb", type=float, default=50, help="ignore smaller tables and indexes (default 50)")
+    parser.add_argument("--window", help="reindex only between HH:MM-HH:MM local time (e.g. 02:00-05:00)")
+    parser.add_argument("--max", type=int, default=10, help="indexes rebuilt per reindex run (default 10)")
+    parser.add_argument("--reset", action="store_true", help="tune: remove the per-table settings instead")
+    parser.add_argument("--dry-run", action="store_true", help="tune/reindex: print the statements only")
+    parser.add_argument("--json", help="report: also write the report to this file")
+    return parser.parse_args()
+
+
+def connect():
+    """Autocommit connection (REINDEX CONCURRENTLY cannot run in a transaction block)."""
+    _db, params = sql_db.connection_info_for(DB_NAME)
+    cnx = psycopg2.connect(**dict(params, application_name="odoo-db-maintenance"))
+    cnx.autocommit = True
+    return cnx
+
+
+def ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def mb(size) -> str:
+    return f"{float(size or 0) / MB:,.0f} MB"
+
+
+def ago(when: datetime.datetime | None) -> str:
+    if when is None:
+        return "never"
+    hours = (datetime.datetime.now(when.tzinfo) - when).total_seconds() / 3600
+    return f"{hours:.0f}h ago" if hours < 48 else f"{hours / 24:.0f}d ago"
+
+
+def reloptions(options: list[str] | None) -> dict[str, str]:
+    return dict(o.split("=", 1) for o in options or [])
+
+
+def wanted_options(cr) -> dict[str, dict]:
+    """AUTOVACUUM limited to the tables of this database and the options of this server."""
+    cr.execute("SELECT current_setting('server_version_num')::int")
+    pg13 = cr.fetchone()[0] >= 130000
+    cr.execute("SELECT relname FROM pg_class WHERE relnamespace = current_schema()::regnamespace "
+               "AND relkind = 'r' AND relname = ANY(%s)", [list(AUTOVACUUM)])
+    present = {row[0] for row in cr.fetchall()}
+    return {table: {k: v for k, v in options.items() if pg13 or k not in PG13_OPTIONS}
+            for table, options in AUTOVACUUM.items() if table in present}
+
+
+def build_report(cr, args) -> dict:
+    min_size = int(args.min_size_mb * MB)
+    cr.execute("SELECT pg_database_size(current_database()), age(datfrozenxid), "
+               "current_setting('autovacuum_freeze_max_age')::bigint, current_setting('autovacuum')::bool "
+               "FROM pg_database WHERE datname = current_database()")
+    db_size, xid_age, freeze_max_age, autovacuum_on = cr.fetchone()
+    problems = []
+    if not autovacuum_on:
+        problems.append("autovacuum is off")
+    if xid_age > freeze_max_age:
+        problems.append(f"database XID age {xid_age:,} > autovacuum_freeze_max_age {freeze_max_age:,}")
+
+    tables = []
+    cr.execute(TABLE_SQL, {"min_size": min_size, "hot": list(AUTOVACUUM)})
+    for (name, size, index_size, live, dead, bloat, heap, last_vacuum, last_autovacuum, last_analyze,
+         last_autoanalyze, autovacuum_count, table_xid_age, options) in cr.fetchall():
+        dead_ratio = dead / (live + dead) if live + dead else 0.0
+        bloat_pct = round(100 * float(bloat) / float(heap), 1) if bloat is not None and heap else None
+        issues = []
+        if dead_ratio > args.dead_ratio and dead >= 1000:
+            issues.append(f"dead tuples {dead_ratio:.0%}")
+        if bloat_pct is not None and bloat_pct > args.table_bloat and size >= min_size:
+            issues.append(f"estimated bloat {bloat_pct:.0f}%")
+        problems += [f"{name}: {issue}" for issue in issues]
+        tables.append({
+            "table": name, "size": size, "indexes_size": index_size, "live_tuples": live, "dead_tuples": dead,
+            "dead_ratio": round(dead_ratio, 4), "bloat_bytes": int(bloat) if bloat is not None else None,
+            "bloat_pct": bloat_pct, "last_vacuum": max(filter(None, [last_vacuum, last_autovacuum]), default=None),
+            "last_analyze": max(filter(None, [last_analyze, last_autoanalyze]), default=None),
+            "autovacuum_count": autovacuum_count, "xid_age": table_xid_age,
+            "options": reloptions(options), "issues": issues,
+        })
+
+    indexes = []
+    cr.execute(INDEX_SQL, {"min_size": min_size})
+    for name, table, size, bloat in cr.fetchall():
+        bloat_pct = round(100 * float(bloat) / float(size), 1) if size else 0.0
+        if bloat_pct >= args.index_bloat:
+            indexes.append({"index": name, "table": table, "size": int(size), "bloat_bytes": int(bloat),
+                            "bloat_pct": bloat_pct})
+    if indexes:
+        problems.append(f"{len(indexes)} index(es) past {args.index_bloat:.0f}% estimated bloat")
+
+    cr.execute(INVALID_SQL)
+    invalid = [{"index": name, "table": table, "size": size} for name, table, size in cr.fetchall()]
+    if invalid:
+        problems.append(f"{len(invalid)} invalid index(es): {', '.join(i['index'] for i in invalid)}")
+
+    return {
+        "database": DB_NAME, "generated_at": datetime.datetime.now().astimezone(), "size": db_size,
+        "xid_age": xid_age, "autovacuum_freeze_max_age": freeze_max_age,
+        "thresholds": {"dead_ratio": args.dead_ratio, "table_bloat_pct": args.table_bloat,
+                       "index_bloat_pct": args.index_bloat, "min_size_mb": args.min_size_mb},
+        "tables": tables, "reindex_candidates": indexes, "invalid_indexes": invalid, "problems": problems,
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"Database {report['database']}: {mb(report['size'])}, XID age {report['xid_age']:,}")
+    print(f"{'table':<32} {'size':>10} {'dead':>6} {'bloat':>14} {'vacuumed':>9} {'analyzed':>9}  settings")
+    for t in report["tables"]:
+        bloat = "-" if t["bloat_pct"] is None else f"{t['bloat_pct']:.0f}% {mb(t['bloat_bytes'])}"
+        tuned = "tuned" if any(k.startswith("autovacuum_") for k in t["options"]) else "default"
+        print(f"{t['table'][:32]:<32} {mb(t['size']):>10} {t['dead_ratio']:>6.1%} {bloat:>14} "
+              f"{ago(t['last_vacuum']):>9} {ago(t['last_analyze']):>9}  {tuned}")
+    for i in report["reindex_candidates"]:
+        print(f"  reindex candidate: {i['index']} on {i['table']}, {mb(i['size'])}, "
+              f"estimated bloat {i['bloat_pct']:.0f}% ({mb(i['bloat_bytes'])})")
+    for problem in report["problems"]:
+        print(f"⚠️  {problem}")
+    if not report["problems"]:
+        print("✅ No table or index past the thresholds")
+
+
+def tune(cnx, args) -> int:
+    with cnx.cursor() as cr:
+        wanted = wanted_options(cr)
+        cr.execute("SELECT relname, reloptions FROM pg_class WHERE relnamespace = current_schema()::regnamespace "
+                   "AND relname = ANY(%s)", [list(wanted)])
+        current = {name: reloptions(options) for name, options in cr.fetchall()}
+        for table, options in wanted.items():
+            if args.reset:
+                keys = [k for k in AUTOVACUUM[table] if k in current[table]]
+                statement = f"ALTER TABLE {ident(table)} RESET ({', '.join(keys)})" if keys else None
+            else:
+                changed = {k: v for k, v in options.items() if current[table].get(k) != str(v)}
+                statement = (f"ALTER TABLE {ident(table)} SET ({', '.join(f'{k} = {v}' for k, v in changed.items())})"
+                             if changed else None)
+            if statement is None:
+                print(f"{table}: unchanged")
+                continue
+            print(statement)
+            if not args.dry_run:
+                cr.execute(statement)
+    return 0
+
+
+def in_window(window: str | None) -> bool:
+    if not window:
+        return True
+    start, end = (datetime.time.fromisoformat(part.strip()) for part in window.split("-", 1))
+    now = datetime.datetime.now().time()
+    return start <= now < end if start <= end else (now >= start or now < end)   # 23:00-05:00 wraps
+
+
+def reindex(cnx, args) -> int:
+    if not in_window(args.window):
+        print(f"Outside the maintenance window {args.window}: nothing done.")
+        return 0
+    failed = 0
+    with cnx.cursor() as cr:
+        cr.execute("SET lock_timeout = '30s'")   # never queue behind (and block) a long transaction for long
+        cr.execute(INVALID_SQL)
+        for name, table, _size in cr.fetchall():
+            if "_ccnew" in name or "_ccold" in name:
+                # Left by an interrupted REINDEX CONCURRENTLY: the original index is still valid
+                print(f"DROP INDEX CONCURRENTLY {name} (invalid leftover on {table})")
+                if not args.dry_run:
+                    cr.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {ident(name)}")
+            else:
+                print(f"⚠️  invalid index {name} on {table} (not created by a reindex): left alone")
+
+        report = build_report(cr, args)
+        for candidate in report["reindex_candidates"][:args.max]:
+            if not in_window(args.window):
+                print(f"Maintenance window {args.window} closed: stopping.")
+                break
+            statement = f"REINDEX INDEX CONCURRENTLY {ident(candidate['index'])}"
+            print(f"{statement}  -- {mb(candidate['size'])}, estimated bloat {candidate['bloat_pct']:.0f}%")
+            if args.dry_run:
+                continue
+            started = time.monotonic()
+            try:
+                cr.execute(statement)
+            except psycopg2.Error as e:
+                failed += 1
+                print(f"  ERROR: {(str(e).splitlines() or [repr(e)])[0]}", file=sys.stderr)
+                continue
+            cr.execute("SELECT pg_relation_size(%s::regclass)", [ident(candidate["index"])])
+            print(f"  {mb(candidate['size'])} -> {mb(cr.fetchone()[0])} in {time.monotonic() - started:.0f}s")
+        if not report["reindex_candidates"]:
+            print(f"No index past {args.index_bloat:.0f}% estimated bloat.")
+    return 1 if failed else 0
+
+
+def main() -> int:
+    args = parse_args()
+    try:
+        cnx = connect()
+    except psycopg2.Error as e:
+        print(f"ERROR: {DB_NAME}: {(str(e).splitlines() or [repr(e)])[0]}", file=sys.stderr)
+        return 2
+    try:
+        if args.command == "tune":
+            return tune(cnx, args)
+        if args.command == "reindex":
+            return reindex(cnx, args)
+        with cnx.cursor() as cr:
+            report = build_report(cr, args)
+        print_report(report)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as fh:
+                json.dump(report, fh, indent=1, default=str)
+        return 1 if report["problems"] else 0
+    finally:
+        cnx.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Bulk importer for products and contacts from CSV or XLSX (client onboarding).
+
+The web importer runs inside one HTTP request and hits the nginx proxy timeout (720s) on a few
+thousand rows. This command streams the file instead, and:
+
+  - resolves taxes, tags, categories, states and countries from lookup tables built once at
+    start (one search_read per model), not one search per row;
+  - creates each chunk of rows with one multi-create (tracking and chatter logging disabled),
+    under a savepoint, committed with a checkpoint (scriptlib/checkpoint.py): after a failure,
+    running the same command again skips the chunks already imported;
+  - with --key (default: default_code for products, vat for contacts) rows whose key already
+    exists are updated instead of duplicated, with one write() per group of rows getting the same
+    values (scriptlib/batch.py); rows of one chunk sharing a key are merged, the last one wins;
+  - prints rows per second for every chunk and for the whole file.
+
+Rows with a value that cannot be resolved (unknown tax, state, ...) are skipped and listed;
+the exit code is then 1. --dry-run only resolves and validates, nothing is written.
+
+Columns (header row, case-insensitive; multiple taxes/tags separated by ";"):
+  products  name*, default_code, barcode, list_price, standard_price, type (consu/service/combo),
+            category, sale_taxes, purchase_taxes, description_sale
+  contacts  name*, is_company (1/0, yes/no), vat, email, phone, mobile, street, street2, city, zip,
+            state (code or name), country (code or name), tags, ref, website
+Taxes are matched on name or description (label), for the company given by --company.
+Fields this Odoo version does not have (e.g. mobile) are ignored.
+
+Examples:
+  import_records.py products /tmp/productos.xlsx --chunk 1000
+  import_records.py contacts /tmp/clientes.csv --create-tags --dry-run
+
+Uses ODOO_CONF, DB_NAME, ODOO_HOME (see run_import_records.sh). XLSX needs openpyxl (part of the
+Odoo requirements).
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import csv
+import hashlib
+import os
+import sys
+import time
+
+ODOO_CONF = os.environ.get("ODOO_CONF")
+DB_NAME = os.environ.get("DB_NAME")
+COUNTRY_CODE = (os.environ.get("ODOO_COUNTRY_CODE") or "PA").strip().upper()
+
+if not ODOO_CONF or not DB_NAME:
+    print("ERROR: ODOO_CONF and DB_NAME must be set.", file=sys.stderr)
+    sys.exit(1)
+
+ODOO_HOME = os.environ.get("ODOO_HOME")
+if ODOO_HOME:
+    odoo_src = os.path.join(ODOO_HOME, "odoo")
+    if os.path.isdir(odoo_src):
+        sys.path.insert(0, odoo_src)
+    else:
+        sys.path.insert(0, ODOO_HOME)
+
+import odoo
+from odoo import api, sql_db
+from scriptlib import schema
+from scriptlib.batch import WriteBatch
+from scriptlib.checkpoint import Checkpoints
+
+odoo.tools.config.parse_config(["-c", ODOO_CONF])
+
+try:
+    import odoo.registry as _regmod
+    _registry = getattr(_regmod, "registry", None) or getattr(_regmod, "Registry", None)
+    if callable(_registry):
+        registry = _registry(DB_NAME)
+        cr_context = registry.cursor()
+    else:
+        raise AttributeError("registry")
+except (AttributeError, ImportError):
+    cr_context = contextlib.closing(sql_db.db_connect(DB_NAME).cursor())
+
+# Per kind: target model, default --key, and required models/fields
+KINDS = {
+    "products": ("product.template", "default_code", {"product.template": ["name", "list_price", "taxes_id", "categ_id"],
+                                                      "account.tax": ["name", "description", "type_tax_use"]}),
+    "contacts": ("res.partner", "vat", {"res.partner": ["name", "vat", "state_id", "country_id", "category_id"]}),
+}
+# Context for bulk creation: no mail tracking / chatter messages per record
+BULK_CONTEXT = {"tracking_disable": True, "mail_create_nolog": True, "mail_notrack": True, "import_file": True}
+PLAIN_COLUMNS = {
+    "products": ["name", "default_code", "barcode", "description_sale"],
+    "contacts": ["name", "vat", "email", "phone", "mobile", "street", "street2", "city", "zip", "ref", "website"],
+}
+TRUE_VALUES = {"1", "true", "yes", "si", "sí", "x"}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("kind", choices=sorted(KINDS))
+    parser.add_argument("file", help="CSV (UTF-8, , or ; separated) or XLSX file")
+    parser.add_argument("--chunk", type=int, default=500, help="rows per create and commit (default: 500)")
+    parser.add_argument("--sheet", help="XLSX sheet name (default: the active sheet)")
+    parser.add_argument("--key", help="column used to update existing records instead of creating "
+                                      "(default: default_code / vat; 'none' = always create)")
+    parser.add_argument("--company", help="company id or exact name for taxes (default: main company)")
+    parser.add_argument("--create-tags", action="store_true", help="create unknown contact tags instead of skipping the row")
+    parser.add_argument("--dry-run", action="store_true", help="resolve and validate every row, write nothing")
+    return parser.parse_args()
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_rows(path: str, sheet: str | None = None):
+    """Yield one {lowercased header: value} dict per non-empty row, streaming the file."""
+    if os.path.splitext(path)[1].lower() in (".xlsx", ".xlsm"):
+        try:
+            import openpyxl
+        except ImportError:
+            print("ERROR: openpyxl is required for XLSX files (pip install openpyxl in the Odoo venv).", file=sys.stderr)
+            sys.exit(1)
+        workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        rows = (workbook[sheet] if sheet else workbook.active).iter_rows(values_only=True)
+        header = [str(h or "").strip().lower() for h in next(rows, ())]
+        for values in rows:
+            row = {h: ("" if v is None else v) for h, v in zip(header, values) if h}
+            if any(str(v).strip() for v in row.values()):
+                yield row
+        workbook.close()
+        return
+
+    with open(path, newline="", encoding="utf-8-sig") as fh:
+        header = fh.readline()
+        fh.seek(0)
+        # Delimiter from the header row only (data cells may contain ";" lists)
+        delimiter = max(",;\t", key=header.count)
+        for raw in csv.DictReader(fh, delimiter=delimiter):
+            row = {(k or "").strip().lower(): (v or "") for k, v in raw.items() if k}
+            if any(str(v).strip() for v in row.values()):
+                yield row
+
+
+def chunked(rows, size: int):
+    """(first row number, rows) per chunk; row numbers are 1-based data rows."""
+    chunk, start = [], 1
+    for number, row in enumerate(rows, start=1):
+        if not chunk:
+            start = number
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield start, chunk
+            chunk = []
+    if chunk:
+        yield start, chunk
+
+
+def _text(value) -> str:
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)   # XLSX numbers (codes, phones) come back as floats
+    return str(value).strip()
+
+
+def _list(value) -> list[str]:
+    return [v.strip() for v in _text(value).split(";") if v.strip()]
+
+
+class Lookups:
+    """Name/code -> id tables, built with one search_read per model."""
+
+    def __init__(self, env, company, kind: str, create_tags: bool):
+        self.env = env
+        self.create_tags = create_tags
+        self.countries: dict[str, int] = {}
+        for c in env["res.country"].search_read([], ["code", "name"]):
+            self.countries[(c["code"] or "").upper()] = c["id"]
+            self.countries[c["name"].lower()] = c["id"]
+        self.default_country = self.countries.get(COUNTRY_CODE)
+
+        self.states: dict[tuple[int, str], int] = {}
+        for s in env["res.country.state"].search_read([], ["code", "name", "country_id"]):
+            country_id = s["country_id"][0]
+            self.states[(country_id, (s["code"] or "").upper())] = s["id"]
+            self.states[(country_id, s["name"].lower())] = s["id"]
+
+        self.taxes: dict[tuple[str, str], int] = {}
+        self.categories: dict[str, int] = {}
+        self.tags: dict[str, int] = {}
+        if kind == "products":
+            domain = [("company_id", "=", company.id)]
+            for t in env["account.tax"].search_read(domain, ["name", "description", "type_tax_use"], order="sequence, id"):
+                for label in (t["name"], t["description"]):
+                    if label:
+                        self.taxes.setdefault((t["type_tax_use"], label.lower()), t["id"])
+            for c in env["product.category"].search_read([], ["name", "complete_name"]):
+                self.categories.setdefault(c["complete_name"].lower(), c["id"])
+                self.categories.setdefault(c["name"].lower(), c["id"])
+        else:
+            for t in env["res.partner.category"].search_read([], ["name"]):
+                self.tags.setdefault(t["name"].lower(), t["id"])
+
+    def country(self, value: str) -> int:
+        found = self.countries.get(value.upper()) or self.countries.get(value.lower())
+        if not found:
+            raise LookupError(f"unknown country '{value}'")
+        return found
+
+    def state(self, country_id: int | None, value: str) -> int:
+        found = self.states.get((country_id, value.upper())) or self.states.get((country_id, value.lower()))
+        if not found:
+            raise LookupError(f"unknown state '{value}'")
+        return found
+
+    def tax_ids(self, type_tax_use: str, values: list[str]) -> list[int]:
+        ids = []
+        for value in values:
+            found = self.taxes.get((type_tax_use, value.lower()))
+            if not found:
+                raise LookupError(f"unknown {type_tax_use} tax '{value}'")
+            ids.append(found)
+        return ids
+
+    def category(self, value: str) -> int:
+        found = self.categories.get(value.lower())
+        if not found:
+            raise LookupError(f"unknown product category '{value}'")
+        return found
+
+    def tag_ids(self, values: list[str], dry_run: bool) -> list[int]:
+        ids = []
+        for value in values:
+            found = self.tags.get(value.lower())
+            if not found and self.create_tags:
+                # Created once, then found in the table for the following rows
+                found = -1 if dry_run else self.env["res.partner.category"].create({"name": value}).id
+                self.tags[value.lower()] = found
+            if not found:
+                raise LookupError(f"unknown tag '{value}' (use --create-tags)")
+            ids.append(found)
+        return ids
+
+
+def product_vals(row: dict, lookups: Lookups) -> dict:
+    vals = {col: _text(row[col]) for col in PLAIN_COLUMNS["products"] if _text(row.get(col, ""))}
+    for col in ("list_price", "standard_price"):
+        if _text(row.get(col, "")):
+            try:
+                vals[col] = float(_text(row[col]).replace(",", ""))
+            except ValueError:
+                raise LookupError(f"invalid {col} '{row[col]}'") from None
+    if _text(row.get("type", "")):
+        vals["type"] = _text(row["type"]).lower()
+    if _text(row.get("category", "")):
+        vals["categ_id"] = lookups.category(_text(row["category"]))
+    if "sale_taxes" in row:
+        vals["taxes_id"] = [(6, 0, lookups.tax_ids("sale", _list(row["sale_taxes"])))]
+    if "purchase_taxes" in row:
+        vals["supplier_taxes_id"] = [(6, 0, lookups.tax_ids("purchase", _list(row["purchase_taxes"])))]
+    return vals
+
+
+def contact_vals(row: dict, lookups: Lookups, dry_run: bool) -> dict:
+    vals = {col: _text(row[col]) for col in PLAIN_COLUMNS["contacts"] if _text(row.get(col, ""))}
+    if _text(row.get("is_company", "")):
+        vals["is_company"] = _text(row["is_company"]).lower() in TRUE_VALUES
+    country_id = lookups.country(_text(row["country"])) if _text(row.get("country", "")) else None
+    if country_id:
+        vals["country_id"] = country_id
+    if _text(row.get("state", "")):
+        vals["state_id"] = lookups.state(country_id or lookups.default_country, _text(row["state"]))
+        vals.setdefault("country_id", country_id or lookups.default_country)
+    if "tags" in row:
+        vals["category_id"] = [(6, 0, lookups.tag_ids(_list(row["tags"]), dry_run))]
+    return vals
+
+
+def select_company(env, value: str | None):
+    if not value:
+        return env.company
+    Company = env["res.company"]
+    company = Company.search([("id", "=", int(value))] if value.isdigit() else [("name", "=", value)], limit=1)
+    if not company:
+        print(f"ERROR: company '{value}' not found.", file=sys.stderr)
+        sys.exit(1)
+    return company
+
+
+def main() -> int:
+    args = parse_args()
+    if args.chunk < 1:
+        print("ERROR: --chunk must be at least 1.", file=sys.stderr)
+        return 1
+    if not os.path.isfile(args.file):
+        print(f"ERROR: {args.file} not found.", file=sys.stderr)
+        return 1
+    model_name, default_key, requires = KINDS[args.kind]
+    key = None if (args.key or "").lower() == "none" else (args.key or default_key)
+
+    with cr_context as cr:
+        env = api.Environment(cr, odoo.SUPERUSER_ID, {})
+        snapshot = schema.require(env, requires)
+        if key and not snapshot.has_field(model_name, key):
+            print(f"ERROR: {model_name} has no field '{key}' for --key.", file=sys.stderr)
+            return 1
+
+        company = select_company(env, args.company)
+        Model = env[model_name].with_company(company).with_context(**BULK_CONTEXT)
+        started = time.monotonic()
+        lookups = Lookups(env, company, args.kind, args.create_tags)
+        print(f"Lookup tables built in {time.monotonic() - started:.2f}s "
+              f"({len(lookups.taxes)} tax labels, {len(lookups.tags)} tags, {len(lookups.states)} state keys).")
+
+        progress = None
+        if not args.dry_run:
+            progress = Checkpoints(env, f"import_records_{args.kind}",
+                                   inputs=[file_sha256(args.file), args.chunk, key, company.id, args.create_tags])
+
+        totals = {"rows": 0, "created": 0, "updated": 0, "merged": 0, "skipped": 0, "resumed": 0}
+        skipped_rows: list[str] = []
+        started = time.monotonic()
+        for first, rows in chunked(read_rows(args.file, args.sheet), args.chunk):
+            unit = f"rows {first}-{first + len(rows) - 1}"
+            totals["rows"] += len(rows)
+            if progress and progress.is_done(unit):
+                totals["resumed"] += len(rows)
+                continue
+
+            chunk_started = time.monotonic()
+            to_create, to_update = [], []
+            for number, row in enumerate(rows, start=first):
+                try:
+                    if not _text(row.get("name", "")):
+                        raise LookupError("empty name")
+                    vals = (product_vals(row, lookups) if args.kind == "products"
+                            else contact_vals(row, lookups, args.dry_run))
+                except LookupError as e:
+                    skipped_rows.append(f"row {number}: {e}")
+                    continue
+                (to_update if key and vals.get(key) else to_create).append(snapshot.filter_vals(model_name, vals))
+            totals["skipped"] += len(rows) - len(to_create) - len(to_update)
+            if args.dry_run:
+                continue
+
+            # Rows of the chunk sharing a key: one record, the last row wins
+            by_key = {}
+            for vals in to_update:
+                by_key[vals[key]] = vals
+            merged = len(to_update) - len(by_key)
+            to_update = list(by_key.values())
+
+            counts = {}
+            with progress.unit(unit):
+                existing = {}
+                writes = 0
+                if to_update:
+                    for rec in Model.with_context(active_test=False).search_read([(key, "in", list(by_key))], [key]):
+                        existing.setdefault(rec[key], rec["id"])
+                    to_create += [vals for vals in to_update if vals[key] not in existing]
+                    to_update = [vals for vals in to_update if vals[key] in existing]
+                    with WriteBatch(Model.env) as batch:
+                        for vals in to_update:
+                            batch.write(Model.browse(existing[vals[key]]), vals)
+                    writes = batch.writes
+                if to_create:
+                    Model.create(to_create)
+                counts = {"created": len(to_create), "updated": len(to_update), "writes": writes}
+            if counts:
+                totals["created"] += counts["created"]
+                totals["updated"] += counts["updated"]
+                totals["merged"] += merged
+                elapsed = time.monotonic() - chunk_started
+                print(f"{unit}: {counts['created']} created, {counts['updated']} updated in {counts['writes']} write(s)"
+                      f"{f', {merged} duplicate key row(s) merged' if merged else ''} "
+                      f"({len(rows) / max(elapsed, 1e-9):.0f} rows/s)")
+
+        elapsed = time.monotonic() - started
+        processed = totals["rows"] - totals["resumed"]
+        for line in skipped_rows[:50]:
+            print(f"SKIPPED {line}", file=sys.stderr)
+        if len(skipped_rows) > 50:
+            print(f"... and {len(skipped_rows) - 50} more skipped row(s).", file=sys.stderr)
+        print(f"{'Validated' if args.dry_run else 'Imported'} {args.file}: {totals['rows']} rows, "
+              f"{totals['created']} created, {totals['updated']} updated, {totals['merged']} merged "
+              f"(duplicate key), {totals['skipped']} skipped, "
+              f"{totals['resumed']} already imported in a previous run; "
+              f"{processed / max(elapsed, 1e-9):.0f} rows/s over {elapsed:.1f}s.")
+
+        if args.dry_run:
+            cr.rollback()
+            return 1 if skipped_rows else 0
+        failed = progress.finish()
+        return 1 if failed or skipped_rows else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Summarize a `python -X importtime` profile of starting Odoo as top-N tables.
+
+Input is the stderr captured by install/08_precompile_bytecode.sh (lines starting with
+"import time:"). Prints three tables:
+  - slowest imports by cumulative time (module + everything it imported)
+  - slowest imports by self time (module body only: import-time side effects)
+  - Odoo addons (odoo.addons.<name>) by cumulative time
+
+Standard library only; runs with the system python3. Usage:
+  python3 importtime_report.py /var/log/odoo/importtime-odoo19.log [--top 25] [--json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+
+LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)\s*$")
+
+
+def parse(path: str) -> list[dict]:
+    """Return one entry per import: module, self_us, cumulative_us, depth."""
+    entries = []
+    with open(path, encoding="utf-8", errors="replace") as fh:
+        for line in fh:
+            m = LINE_RE.match(line.rstrip("\n"))
+            if not m:
+                continue
+            self_us, cumulative_us, indent, module = m.groups()
+            entries.append({
+                "module": module,
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                # importtime indents nested imports by two spaces (one leading space at top level)
+                "depth": (len(indent) - 1) // 2,
+            })
+    return entries
+
+
+def addon_totals(entries: list[dict]) -> list[dict]:
+    """Cumulative time per addon package (odoo.addons.<name>, outermost import only)."""
+    totals: dict[str, int] = {}
+    for e in entries:
+        parts = e["module"].split(".")
+        if len(parts) == 3 and parts[0] == "odoo" and parts[1] == "addons":
+            totals[parts[2]] = max(totals.get(parts[2], 0), e["cumulative_us"])
+    return [{"module": k, "cumulative_us": v} for k, v in sorted(totals.items(), key=lambda kv: -kv[1])]
+
+
+def print_table(title: str, rows: list[dict], key: str, total_us: int) -> None:
+    print(title)
+    print(f"  {'ms':>9} | {'%':>5} | module")
+    print("  " + "-" * 60)
+    for row in rows:
+        pct = (100.0 * row[key] / total_us) if total_us else 0.0
+        print(f"  {row[key] / 1000:9.1f} | {pct:5.1f} | {row['module']}")
+    print()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("raw", help="file with the -X importtime stderr output")
+    parser.add_argument("--top", type=int, default=25, help="rows per table (default 25)")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of tables")
+    args = parser.parse_args()
+
+    entries = parse(args.raw)
+    if not entries:
+        print(f"ERROR: no 'import time:' lines found in {args.raw}", file=sys.stderr)
+        return 1
+
+    total_us = sum(e["cumulative_us"] for e in entries if e["depth"] == 0)
+    by_cumulative = sorted(entries, key=lambda e: -e["cumulative_us"])[: args.top]
+    by_self = sorted(entries, key=lambda e: -e["self_us"])[: args.top]
+    addons = addon_totals(entries)[: args.top]
+
+    if args.json:
+        json.dump({
+            "total_ms": round(total_us / 1000, 1),
+            "modules": len(entries),
+            "by_cumulative": by_cumulative,
+            "by_self": by_self,
+            "addons": addons,
+        }, sys.stdout, indent=2)
+        print()
+        return 0
+
+    print(f"Total import time: {total_us / 1000:.1f} ms across {len(entries)} modules")
+    print()
+    print_table(f"Top {args.top} imports by cumulative time:", by_cumulative, "cumulative_us", total_us)
+    print_table(f"Top {args.top} imports by self time (import-time side effects):", by_self, "self_us", total_us)
+    if addons:
+        print_table("Odoo addons by cumulative import time:", addons, "cumulative_us", total_us)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
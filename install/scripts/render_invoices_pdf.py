@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Batch-render posted invoices to PDF through Odoo's report engine (wkhtmltopdf).
+
+Selects posted customer invoices / credit notes by journal, date range and/or company, then
+renders them with a bounded pool of worker processes. Each worker opens its own cursor; the
+parent writes every PDF into a directory (one file per invoice) as soon as it is ready, and
+prints progress with documents/s and pages/s. For a .zip output the PDFs are staged in
+<out>.parts and the archive is written once the run ends.
+
+Resume: files already present in the output directory (or in the zip and its staging
+directory) are skipped, so re-running the same command after a failure or a kill only renders
+what is missing.
+Nothing is written to the database unless --save-attachments is given (then the PDF is also
+stored as the invoice attachment, like printing from the UI).
+
+Examples:
+  render_invoices_pdf.py --journal FE --date-from 2026-09-01 --date-to 2026-09-30 --out /var/lib/odoo/pdf/2026-09
+  render_invoices_pdf.py --company 1 --date-from 2026-09-01 --out /var/lib/odoo/pdf/sep.zip --workers 6
+
+Uses ODOO_CONF, DB_NAME, ODOO_HOME (see run_render_invoices_pdf.sh).
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import multiprocessing
+import os
+import re
+import shutil
+import sys
+import time
+import zipfile
+
+ODOO_CONF = os.environ.get("ODOO_CONF")
+DB_NAME = os.environ.get("DB_NAME")
+
+if not ODOO_CONF or not DB_NAME:
+    print("ERROR: ODOO_CONF and DB_NAME must be set.", file=sys.stderr)
+    sys.exit(1)
+
+ODOO_HOME = os.environ.get("ODOO_HOME")
+if ODOO_HOME:
+    odoo_src = os.path.join(ODOO_HOME, "odoo")
+    if os.path.isdir(odoo_src):
+        sys.path.insert(0, odoo_src)
+    else:
+        sys.path.insert(0, ODOO_HOME)
+
+import odoo
+from odoo import api, sql_db
+
+odoo.tools.config.parse_config(["-c", ODOO_CONF])
+
+try:
+    import odoo.registry as _regmod
+    _registry = getattr(_regmod, "registry", None) or getattr(_regmod, "Registry", None)
+    if callable(_registry):
+        registry = _registry(DB_NAME)
+    else:
+        raise AttributeError("registry")
+except (AttributeError, ImportError):
+    registry = None
+
+PAGE_RE = re.compile(rb"/Type\s*/Page(?!s)")
+UNSAFE_RE = re.compile(r"[^\w.-]+")
+
+# Set per worker process by _worker_init
+_report_ref = None
+_save_attachments = False
+
+
+def open_cursor():
+    """New cursor on DB_NAME: registry cursor when available, plain sql_db cursor otherwise."""
+    if registry is not None:
+        return registry.cursor()
+    return contextlib.closing(sql_db.db_connect(DB_NAME).cursor())
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", required=True, help="output directory, or a path ending in .zip")
+    parser.add_argument("--journal", action="append", default=[], help="journal code (repeatable)")
+    parser.add_argument("--company", action="append", default=[], help="company id or exact name (repeatable)")
+    parser.add_argument("--date-from", help="invoice date from (YYYY-MM-DD)")
+    parser.add_argument("--date-to", help="invoice date to (YYYY-MM-DD)")
+    parser.add_argument("--move-types", default="out_invoice,out_refund",
+                        help="comma-separated move types (default: out_invoice,out_refund)")
+    parser.add_argument("--report", default="account.account_invoices", help="report XML ID")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1),
+                        help="worker processes (default: min(4, CPUs))")
+    parser.add_argument("--chunk", type=int, default=10, help="invoices per worker task (default 10)")
+    parser.add_argument("--save-attachments", action="store_true",
+                        help="commit the rendered PDF as invoice attachment (default: read-only)")
+    return parser.parse_args()
+
+
+def select_invoices(args: argparse.Namespace) -> list[tuple[int, str, int]]:
+    """Return (id, filename, company_id) for the posted invoices matching the filters, oldest first."""
+    with open_cursor() as cr:
+        env = api.Environment(cr, odoo.SUPERUSER_ID, {})
+        if "account.move" not in env:
+            print("ERROR: account module not installed.", file=sys.stderr)
+            sys.exit(1)
+
+        domain = [
+            ("state", "=", "posted"),
+            ("move_type", "in", [t.strip() for t in args.move_types.split(",") if t.strip()]),
+        ]
+        if args.journal:
+            domain.append(("journal_id.code", "in", args.journal))
+        if args.company:
+            ids = [int(c) for c in args.company if c.isdigit()]
+            names = [c for c in args.company if not c.isdigit()]
+            companies = env["res.company"].search(["|", ("id", "in", ids), ("name", "in", names)])
+            if not companies:
+                print(f"ERROR: No company matches {args.company}.", file=sys.stderr)
+                sys.exit(1)
+            domain.append(("company_id", "in", companies.ids))
+        if args.date_from:
+            domain.append(("invoice_date", ">=", args.date_from))
+        if args.date_to:
+            domain.append(("invoice_date", "<=", args.date_to))
+
+        moves = env["account.move"].search_read(domain, ["name", "company_id"], order="invoice_date, id")
+        cr.rollback()
+
+    multi_company = len({m["company_id"][0] for m in moves}) > 1
+    selected = []
+    for m in moves:
+        filename = UNSAFE_RE.sub("_", m["name"] or f"move_{m['id']}") + ".pdf"
+        if multi_company:
+            filename = f"company_{m['company_id'][0]}/{filename}"
+        selected.append((m["id"], filename, m["company_id"][0]))
+    return selected
+
+
+def _worker_init(report_ref: str, save_attachments: bool) -> None:
+    global _report_ref, _save_attachments
+    _report_ref = report_ref
+    _save_attachments = save_attachments
+
+
+def _render_chunk(chunk: list[tuple[int, str]]) -> list[tuple[int, str, bytes | None, str]]:
+    """Worker: render each invoice of the chunk with its own cursor. Returns (id, filename, pdf, error)."""
+    results = []
+    with open_cursor() as cr:
+        env = api.Environment(cr, odoo.SUPERUSER_ID, {})
+        Report = env["ir.actions.report"]
+        for move_id, filename in chunk:
+            try:
+                pdf, _ = Report._render_qweb_pdf(_report_ref, [move_id])
+                if _save_attachments:
+                    cr.commit()
+                results.append((move_id, filename, pdf, ""))
+            except Exception as e:
+                cr.rollback()
+                results.append((move_id, filename, None, str(e).splitlines()[0][:200] if str(e) else repr(e)))
+        cr.rollback()
+    return results
+
+
+class Sink:
+    """Output directory, or a zip built from a staging directory; knows which files are already present (resume).
+
+    PDFs always go to a directory, each with an atomic rename. For a .zip output that directory is
+    <out>.parts, and finish() builds the archive from the previous one and the staged PDFs, also
+    with an atomic rename: a killed run never leaves a zip without its central directory behind,
+    and the next run resumes from the staged PDFs.
+    """
+
+    def __init__(self, out: str):
+        self.out = out
+        self.is_zip = out.lower().endswith(".zip")
+        self.zipped = set()
+        if self.is_zip:
+            self.dir = out + ".parts"
+            if os.path.isfile(out):
+                with zipfile.ZipFile(out) as zf:
+                    self.zipped = set(zf.namelist())
+        else:
+            self.dir = out
+        os.makedirs(self.dir, exist_ok=True)
+
+    def has(self, filename: str) -> bool:
+        return filename in self.zipped or os.path.isfile(os.path.join(self.dir, filename))
+
+    def write(self, filename: str, data: bytes) -> None:
+        path = os.path.join(self.dir, filename)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".part"
+        with open(tmp, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)  # atomic: a crash never leaves a truncated PDF behind
+
+    def finish(self) -> None:
+        """Zip output: write the archive (previous entries + staged PDFs) and remove the staging directory."""
+        if not self.is_zip:
+            return
+        staged = []
+        for dirpath, _, filenames in os.walk(self.dir):
+            staged.extend(os.path.relpath(os.path.join(dirpath, name), self.dir)
+                          for name in filenames if not name.endswith(".part"))
+        if staged or not os.path.isfile(self.out):
+            tmp, replaced = self.out + ".part", set(staged)
+            with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_STORED) as zf:
+                if self.zipped:
+                    with zipfile.ZipFile(self.out) as previous:
+                        for info in previous.infolist():
+                            if info.filename not in replaced:
+                                zf.writestr(info, previous.read(info))
+                for name in sorted(staged):
+                    zf.write(os.path.join(self.dir, name), arcname=name)
+            os.replace(tmp, self.out)
+        shutil.rmtree(self.dir)
+
+
+def main() -> int:
+    args = parse_args()
+    invoices = select_invoices(args)
+    if not invoices:
+        print("No posted invoices match the filters.")
+        return 0
+
+    sink = Sink(args.out)
+    pending = [(move_id, filename) for move_id, filename, _ in invoices if not sink.has(filename)]
+    skipped = len(invoices) - len(pending)
+    print(f"{len(invoices)} invoice(s) selected; {skipped} already rendered; {len(pending)} to render "
+          f"with {args.workers} worker(s) into {args.out}.")
+    if not pending:
+        sink.finish()
+        return 0
+
+    # Forked workers must not share the parent's connections: close them before forking
+    sql_db.close_all()
+
+    chunks = [pending[i:i + args.chunk] for i in range(0, len(pending), args.chunk)]
+    done = pages = 0
+    failures = []
+    start = time.monotonic()
+    ctx = multiprocessing.get_context("fork")
+    try:
+        with ctx.Pool(args.workers, initializer=_worker_init, initargs=(args.report, args.save_attachments)) as pool:
+            for results in pool.imap_unordered(_render_chunk, chunks):
+                for move_id, filename, pdf, error in results:
+                    if pdf is None:
+                        failures.append((move_id, filename, error))
+                        continue
+                    sink.write(filename, pdf)
+                    done += 1
+                    pages += len(PAGE_RE.findall(pdf))
+                elapsed = max(time.monotonic() - start, 1e-6)
+                print(f"\r  {done + len(failures)}/{len(pending)} | {done / elapsed:6.1f} docs/s | "
+                      f"{pages / elapsed:6.1f} pages/s | failed {len(failures)}", end="", file=sys.stderr, flush=True)
+    finally:
+        print(file=sys.stderr)
+    sink.finish()
+
+    elapsed = time.monotonic() - start
+    print(f"Done. {done} PDF(s), {pages} page(s) in {elapsed:.1f}s "
+          f"({done / max(elapsed, 1e-6):.1f} docs/s, {pages / max(elapsed, 1e-6):.1f} pages/s).")
+    if failures:
+        for move_id, filename, error in failures[:20]:
+            print(f"  FAILED {filename} (id={move_id}): {error}", file=sys.stderr)
+        print(f"WARNING: {len(failures)} invoice(s) failed; re-run the same command to retry them.", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
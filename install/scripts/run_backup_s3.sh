@@ -0,0 +1,45 @@
+#!/usr/bin/env bash
+# Run backup_s3.py: stream the database (pg_dump | zstd) and new filestore files to S3-compatible storage.
+# Usage from repo root (after exporting the variables from config/backup-storage.env.example):
+#   sudo -E bash install/scripts/run_backup_s3.sh backup
+#   sudo -E bash install/scripts/run_backup_s3.sh list
+#   sudo -E bash install/scripts/run_backup_s3.sh restore [--backup STAMP] [--target-db NAME] [--drop-existing]
+# No temp files are written; memory use is bounded by ODOO_BACKUP_PART_MB x ODOO_BACKUP_CONCURRENCY.
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+ODOO_VERSION="${ODOO_VERSION:-19}"
+DB_NAME="${DB_NAME:-odoo${ODOO_VERSION}}"
+ODOO_USER="odoo"
+ODOO_HOME="/opt/odoo/odoo${ODOO_VERSION}"
+ODOO_PY="${ODOO_HOME}/venv/bin/python3"
+ODOO_CONF="/etc/odoo${ODOO_VERSION}.conf"
+BACKUP_SCRIPT="${SCRIPT_DIR}/backup_s3.py"
+
+[[ -f "${ODOO_CONF}" ]] || { echo "Missing ${ODOO_CONF}"; exit 1; }
+[[ -x "${ODOO_PY}" ]] || { echo "Missing ${ODOO_PY}"; exit 1; }
+[[ -f "${BACKUP_SCRIPT}" ]] || { echo "Missing ${BACKUP_SCRIPT}"; exit 1; }
+command -v zstd >/dev/null 2>&1 || { echo "Missing zstd (apt install -y zstd)"; exit 1; }
+
+RUN_SCRIPT="/tmp/backup_s3_odoo.py"
+sudo cp "${BACKUP_SCRIPT}" "${RUN_SCRIPT}"
+sudo chown "${ODOO_USER}:${ODOO_USER}" "${RUN_SCRIPT}"
+set +e
+sudo -u "${ODOO_USER}" env \
+  ODOO_CONF="${ODOO_CONF}" \
+  DB_NAME="${DB_NAME}" \
+  ODOO_BACKUP_S3_BUCKET="${ODOO_BACKUP_S3_BUCKET:-${ODOO_SSL_S3_BUCKET:-}}" \
+  ODOO_BACKUP_S3_PREFIX="${ODOO_BACKUP_S3_PREFIX:-odoo-backup}" \
+  ODOO_BACKUP_S3_ENDPOINT_URL="${ODOO_BACKUP_S3_ENDPOINT_URL:-${ODOO_SSL_S3_ENDPOINT_URL:-${AWS_ENDPOINT_URL:-}}}" \
+  ODOO_BACKUP_S3_CREATE_BUCKET="${ODOO_BACKUP_S3_CREATE_BUCKET:-0}" \
+  ODOO_BACKUP_ZSTD_LEVEL="${ODOO_BACKUP_ZSTD_LEVEL:-3}" \
+  ODOO_BACKUP_PART_MB="${ODOO_BACKUP_PART_MB:-64}" \
+  ODOO_BACKUP_CONCURRENCY="${ODOO_BACKUP_CONCURRENCY:-4}" \
+  AWS_ACCESS_KEY_ID="${AWS_ACCESS_KEY_ID:-}" \
+  AWS_SECRET_ACCESS_KEY="${AWS_SECRET_ACCESS_KEY:-}" \
+  AWS_DEFAULT_REGION="${AWS_DEFAULT_REGION:-auto}" \
+  "${ODOO_PY}" "${RUN_SCRIPT}" "$@"
+ret=$?
+set -e
+sudo rm -f "${RUN_SCRIPT}"
+exit $ret
@@ -0,0 +1,13 @@
+#!/usr/bin/env bash
+# Run bench_invoice_posting.py: post invoices from N parallel workers into copies of the FE / NC journals
+# and compare journal layouts (dedicated, shared, per-worker) by posts/s, latency, retries and lock waits, e.g.:
+#   sudo -E bash install/scripts/run_bench_invoice_posting.sh --workers 1,4,8 --invoices 400
+#   sudo -E bash install/scripts/run_bench_invoice_posting.sh --workers 4 --layouts dedicated --profile
+# The copies and their moves are deleted afterwards; --real-journals posts into FE / NC (database copies only).
+# ODOO_SALES_JOURNAL_CODE / ODOO_CREDIT_NOTES_JOURNAL_CODE select the journals (default FE / NC).
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+source "${SCRIPT_DIR}/run_common.sh"
+
+run_odoo_script "${SCRIPT_DIR}/bench_invoice_posting.py" "$@"
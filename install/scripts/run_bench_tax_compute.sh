@@ -0,0 +1,12 @@
+#!/usr/bin/env bash
+# Run bench_tax_compute.py: time tax computation (compute_all / batch / NumPy reference) with the PA taxes
+# and fiscal position mappings on 1k-100k generated invoice lines. Read-only. Arguments are passed through, e.g.:
+#   sudo -E bash install/scripts/run_bench_tax_compute.sh --sizes 1000,10000 --json /tmp/tax-bench.json
+#   sudo -E bash install/scripts/run_bench_tax_compute.sh --sizes 1000 --profile   # speedscope file per scenario
+# The totals check needs NumPy in the Odoo venv (installed by install/06_python_dependencies.sh).
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+source "${SCRIPT_DIR}/run_common.sh"
+
+run_odoo_script "${SCRIPT_DIR}/bench_tax_compute.py" "$@"
@@ -0,0 +1,81 @@
+#!/usr/bin/env bash
+# Shared by the run_*.sh wrappers and install/09_init_database.sh (sourced, not executed).
+# run_odoo_script stages a configuration script together with the scriptlib package in a private
+# /tmp directory owned by the odoo user, runs it with the Odoo venv and removes the directory:
+#   source "${SCRIPT_DIR}/run_common.sh"
+#   run_odoo_script "${SCRIPT_DIR}/set_payment_terms_pa.py" [args...]   # returns the script's exit code
+# When the configuration daemon is running (install/13_config_daemon.sh) set_*.py scripts are sent
+# to it instead (warm registry, no staging); ODOO_CONFIG_DAEMON=0 always runs them directly.
+# Variables already set by the caller win over the defaults below. Script settings exported by the
+# caller (ODOO_SCRIPT_*, e.g. ODOO_SCRIPT_CHECKPOINT_RESET=1, ODOO_PAYMENT_TERMS_* and the journal
+# codes) are passed through.
+# --profile[=DIR] (any argument position, not passed to the script) runs the script under the Odoo
+# profiler and writes one speedscope file per step to DIR/<script>/ (default
+# ODOO_PROFILE_DIR/<timestamp>, see scriptlib/profiling.py); same as ODOO_SCRIPT_PROFILE=DIR.
+# Profiled runs, and runs with ODOO_SCRIPT_QUERY_LOG (scriptlib/querylog.py), never go through the
+# configuration daemon: both collect per process and write their file when the process exits.
+
+ODOO_VERSION="${ODOO_VERSION:-19}"
+DB_NAME="${DB_NAME:-odoo${ODOO_VERSION}}"
+ODOO_USER="${ODOO_USER:-odoo}"
+ODOO_HOME="${ODOO_HOME:-/opt/odoo/odoo${ODOO_VERSION}}"
+ODOO_PY="${ODOO_PY:-${ODOO_HOME}/venv/bin/python3}"
+ODOO_CONF="${ODOO_CONF:-/etc/odoo${ODOO_VERSION}.conf}"
+COUNTRY_CODE="${COUNTRY_CODE:-${ODOO_COUNTRY_CODE:-PA}}"
+SCRIPTLIB_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)/scriptlib"
+CONFIG_DAEMON_SOCKET="${ODOO_CONFIG_DAEMON_SOCKET:-/run/odoo${ODOO_VERSION}-config/config.sock}"
+PROFILE_DIR="${ODOO_PROFILE_DIR:-/var/log/odoo/profile}"
+
+run_odoo_script() {
+  local script="$1"
+  shift
+  local args=() arg profile="${ODOO_SCRIPT_PROFILE:-}"
+  for arg in "$@"; do
+    case "${arg}" in
+      --profile) profile="${PROFILE_DIR}/$(date +%Y%m%d-%H%M%S)" ;;
+      --profile=*) profile="${arg#--profile=}" ;;
+      *) args+=("${arg}") ;;
+    esac
+  done
+  set -- ${args[@]+"${args[@]}"}
+  [[ -f "${ODOO_CONF}" ]] || { echo "Missing ${ODOO_CONF}"; return 1; }
+  [[ -x "${ODOO_PY}" ]] || { echo "Missing ${ODOO_PY}"; return 1; }
+  [[ -f "${script}" ]] || { echo "Missing ${script}"; return 1; }
+
+  local passthrough=() var
+  for var in $(compgen -e | grep -E '^ODOO_(SCRIPT|PAYMENT_TERMS)_|^ODOO_(SALES|CREDIT_NOTES)_JOURNAL_CODE$' | grep -v '^ODOO_SCRIPT_PROFILE$' || true); do
+    passthrough+=("${var}=${!var}")
+  done
+  if [[ -n "${profile}" ]]; then
+    sudo -u "${ODOO_USER}" mkdir -p "${profile}" || { echo "Profile directory ${profile} not writable by ${ODOO_USER}"; return 1; }
+    passthrough+=("ODOO_SCRIPT_PROFILE=${profile}")
+  fi
+
+  local ret=0
+  if [[ -z "${profile}" && -z "${ODOO_SCRIPT_QUERY_LOG:-}" && "${ODOO_CONFIG_DAEMON:-}" != "0" && "$(basename "${script}")" == set_*.py ]] && sudo test -S "${CONFIG_DAEMON_SOCKET}"; then
+    # 75: daemon unavailable or its copy of the script is outdated -> run directly below
+    sudo env ODOO_COUNTRY_CODE="${COUNTRY_CODE}" ${passthrough[@]+"${passthrough[@]}"} \
+      python3 "$(dirname "${SCRIPTLIB_DIR}")/config_daemon.py" run \
+      --socket "${CONFIG_DAEMON_SOCKET}" --db "${DB_NAME}" "${script}" "$@" || ret=$?
+    [[ "${ret}" == "75" ]] || return "${ret}"
+    echo "Configuration daemon not usable, running $(basename "${script}") directly."
+    ret=0
+  fi
+
+  local stage
+  stage="$(sudo mktemp -d /tmp/odoo_script.XXXXXX)"
+  sudo cp "${script}" "${stage}/"
+  sudo cp -r "${SCRIPTLIB_DIR}" "${stage}/scriptlib"
+  sudo chown -R "${ODOO_USER}:${ODOO_USER}" "${stage}"
+
+  sudo -u "${ODOO_USER}" env \
+    ODOO_HOME="${ODOO_HOME}" \
+    ODOO_CONF="${ODOO_CONF}" \
+    DB_NAME="${DB_NAME}" \
+    ODOO_COUNTRY_CODE="${COUNTRY_CODE}" \
+    PYTHONDONTWRITEBYTECODE=1 \
+    ${passthrough[@]+"${passthrough[@]}"} \
+    "${ODOO_PY}" "${stage}/$(basename "${script}")" "$@" || ret=$?
+  sudo rm -rf "${stage}"
+  return "${ret}"
+}
@@ -0,0 +1,12 @@
+#!/usr/bin/env bash
+# Run config_drift.py: read-only comparison of taxes, fiscal positions, journals, payment terms and
+# defaults across the Odoo databases of this host. Arguments are passed through, e.g. from repo root:
+#   sudo -E bash install/scripts/run_config_drift.sh                       # every database
+#   sudo -E bash install/scripts/run_config_drift.sh --reference erp.a.com --sections taxes,journals
+# Exit code 0 = no drift, 1 = drift found, 2 = a database could not be read.
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+source "${SCRIPT_DIR}/run_common.sh"
+
+run_odoo_script "${SCRIPT_DIR}/config_drift.py" "$@"
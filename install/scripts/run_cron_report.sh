@@ -0,0 +1,24 @@
+#!/usr/bin/env bash
+# Run cron_report.py: per scheduled action run durations, overlap with peak traffic and lock waits,
+# with a max_cron_threads recommendation and staggered next calls. Read-only. From repo root, e.g.:
+#   sudo -E bash install/scripts/run_cron_report.sh --days 14 --json /tmp/cron-report.json
+# The PostgreSQL log (ODOO_CRON_PG_LOG, default /var/log/postgresql/postgresql-*-main.log) is copied
+# to a private directory readable by the odoo user and passed as --pg-log; other arguments are passed through.
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+source "${SCRIPT_DIR}/run_common.sh"
+
+PG_LOG_GLOB="${ODOO_CRON_PG_LOG:-/var/log/postgresql/postgresql-*-main.log}"
+PG_ARGS=()
+PG_DIR="$(sudo mktemp -d /tmp/odoo_cron_report.XXXXXX)"
+for f in $(sudo bash -c "ls ${PG_LOG_GLOB} 2>/dev/null" || true); do
+  sudo cp "${f}" "${PG_DIR}/"
+  PG_ARGS+=(--pg-log "${PG_DIR}/$(basename "${f}")")
+done
+sudo chown -R "${ODOO_USER}:${ODOO_USER}" "${PG_DIR}"
+
+ret=0
+run_odoo_script "${SCRIPT_DIR}/cron_report.py" ${PG_ARGS[@]+"${PG_ARGS[@]}"} "$@" || ret=$?
+sudo rm -rf "${PG_DIR}"
+exit $ret
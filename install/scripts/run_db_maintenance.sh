@@ -0,0 +1,14 @@
+#!/usr/bin/env bash
+# Run db_maintenance.py: autovacuum / bloat report, per-table autovacuum settings and off-hours
+# REINDEX CONCURRENTLY for the Odoo database. Arguments are passed through, e.g. from repo root:
+#   sudo -E bash install/scripts/run_db_maintenance.sh                         # read-only report
+#   sudo -E bash install/scripts/run_db_maintenance.sh report --json /var/lib/odoo/db_maintenance.json
+#   sudo -E bash install/scripts/run_db_maintenance.sh tune                    # hot table autovacuum settings
+#   sudo -E bash install/scripts/run_db_maintenance.sh reindex --window 02:00-05:00 --dry-run
+# report: exit code 1 when a table or index is past the thresholds.
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+source "${SCRIPT_DIR}/run_common.sh"
+
+run_odoo_script "${SCRIPT_DIR}/db_maintenance.py" "$@"
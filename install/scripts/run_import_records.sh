@@ -0,0 +1,24 @@
+#!/usr/bin/env bash
+# Run import_records.py: bulk import products or contacts from a CSV/XLSX file in chunks, with
+# resume after a failure (re-run the same command). From repo root, e.g.:
+#   sudo -E bash install/scripts/run_import_records.sh products /root/productos.xlsx --chunk 1000
+#   sudo -E bash install/scripts/run_import_records.sh contacts /root/clientes.csv --create-tags --dry-run
+# The file is copied to a private directory readable by the odoo user; other arguments are passed through.
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+source "${SCRIPT_DIR}/run_common.sh"
+
+[[ $# -ge 2 ]] || { echo "Usage: $0 products|contacts FILE [import_records.py options]"; exit 1; }
+KIND="$1"
+INPUT_FILE="$2"
+shift 2
+[[ -f "${INPUT_FILE}" ]] || { echo "Missing ${INPUT_FILE}"; exit 1; }
+
+INPUT_DIR="$(sudo mktemp -d /tmp/odoo_import.XXXXXX)"
+sudo cp "${INPUT_FILE}" "${INPUT_DIR}/"
+sudo chown -R "${ODOO_USER}:${ODOO_USER}" "${INPUT_DIR}"
+ret=0
+run_odoo_script "${SCRIPT_DIR}/import_records.py" "${KIND}" "${INPUT_DIR}/$(basename "${INPUT_FILE}")" "$@" || ret=$?
+sudo rm -rf "${INPUT_DIR}"
+exit $ret
@@ -0,0 +1,33 @@
+#!/usr/bin/env bash
+# Run render_invoices_pdf.py: batch-render posted invoices to PDF (directory or .zip) with a worker pool.
+# Arguments are passed through, e.g. from repo root:
+#   sudo -E bash install/scripts/run_render_invoices_pdf.sh --journal FE --date-from 2026-09-01 --date-to 2026-09-30 --out /var/lib/odoo/pdf/2026-09.zip
+# The output path must be writable by the odoo user. Re-run the same command to resume after a failure.
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+ODOO_VERSION="${ODOO_VERSION:-19}"
+DB_NAME="${DB_NAME:-odoo${ODOO_VERSION}}"
+ODOO_USER="odoo"
+ODOO_HOME="/opt/odoo/odoo${ODOO_VERSION}"
+ODOO_PY="${ODOO_HOME}/venv/bin/python3"
+ODOO_CONF="/etc/odoo${ODOO_VERSION}.conf"
+RENDER_SCRIPT="${SCRIPT_DIR}/render_invoices_pdf.py"
+
+[[ -f "${ODOO_CONF}" ]] || { echo "Missing ${ODOO_CONF}"; exit 1; }
+[[ -x "${ODOO_PY}" ]] || { echo "Missing ${ODOO_PY}"; exit 1; }
+[[ -f "${RENDER_SCRIPT}" ]] || { echo "Missing ${RENDER_SCRIPT}"; exit 1; }
+
+RUN_SCRIPT="/tmp/render_invoices_pdf_odoo.py"
+sudo cp "${RENDER_SCRIPT}" "${RUN_SCRIPT}"
+sudo chown "${ODOO_USER}:${ODOO_USER}" "${RUN_SCRIPT}"
+set +e
+sudo -u "${ODOO_USER}" env \
+  ODOO_HOME="${ODOO_HOME}" \
+  ODOO_CONF="${ODOO_CONF}" \
+  DB_NAME="${DB_NAME}" \
+  "${ODOO_PY}" "${RUN_SCRIPT}" "$@"
+ret=$?
+set -e
+sudo rm -f "${RUN_SCRIPT}"
+exit $ret
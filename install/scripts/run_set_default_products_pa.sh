@@ -5,26 +5,7 @@
 set -euo pipefail
 
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
-ODOO_VERSION="${ODOO_VERSION:-19}"
-DB_NAME="${DB_NAME:-odoo${ODOO_VERSION}}"
-ODOO_USER="odoo"
-ODOO_HOME="/opt/odoo/odoo${ODOO_VERSION}"
-ODOO_PY="${ODOO_HOME}/venv/bin/python3"
-ODOO_CONF="/etc/odoo${ODOO_VERSION}.conf"
-SET_SCRIPT="${SCRIPT_DIR}/set_default_products_pa.py"
+source "${SCRIPT_DIR}/run_common.sh"
 
-[[ -f "${ODOO_CONF}" ]] || { echo "Missing ${ODOO_CONF}"; exit 1; }
-[[ -x "${ODOO_PY}" ]] || { echo "Missing ${ODOO_PY}"; exit 1; }
-[[ -f "${SET_SCRIPT}" ]] || { echo "Missing ${SET_SCRIPT}"; exit 1; }
-
-RUN_SCRIPT="/tmp/set_default_products_pa_odoo.py"
-sudo cp "${SET_SCRIPT}" "${RUN_SCRIPT}"
-sudo chown "${ODOO_USER}:${ODOO_USER}" "${RUN_SCRIPT}"
-sudo -u "${ODOO_USER}" env \
-  ODOO_HOME="${ODOO_HOME}" \
-  ODOO_CONF="${ODOO_CONF}" \
-  DB_NAME="${DB_NAME}" \
-  ODOO_COUNTRY_CODE="${ODOO_COUNTRY_CODE:-PA}" \
-  "${ODOO_PY}" "${RUN_SCRIPT}"
-sudo rm -f "${RUN_SCRIPT}"
+run_odoo_script "${SCRIPT_DIR}/set_default_products_pa.py" "$@"
 echo "Done. Default service products (0% tax) are available."
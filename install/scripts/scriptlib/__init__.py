@@ -0,0 +1,7 @@
+"""
+Shared helpers for the configuration scripts in install/scripts (set_*.py).
+
+The scripts run as the odoo user from a staging directory (see run_common.sh), with this
+package copied next to them, so "from scriptlib import schema" works both there and when a
+script is run in place from the repo.
+"""
@@ -0,0 +1,122 @@
+"""
+Write coalescing for the configuration scripts.
+
+Record-by-record assignments (record.field = value, record.write(vals)) each go through a full
+write(): access checks, a flush of the pending values, recomputation of dependent fields. A
+WriteBatch collects the values instead and, on flush, groups the records of a model that get
+identical values into one write():
+
+    with WriteBatch(env) as batch:
+        for view in views:
+            batch.set(view, "sequence", 1)            # instead of view.sequence = 1
+        batch.write(company.paperformat_id, {"format": "Letter", "margin_top": 5.0})
+    # leaving the block flushes: one write per (model, values) group
+
+Later values for the same record and field replace earlier ones (last write wins, as with
+direct assignment). Values a record already has are dropped at flush (changed_vals), so a
+script run a second time issues no write at all. Records are written model by model in the
+order the models were first used; only use it where the writes of one step do not depend on
+each other's side effects. If the block raises, nothing is written.
+"""
+from __future__ import annotations
+
+
+def _freeze(value):
+    """Hashable form of a write value (x2many command lists, dicts, ...) to group identical values."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, set):
+        return tuple(sorted(_freeze(v) for v in value))
+    if hasattr(value, "_name") and hasattr(value, "ids"):
+        return (value._name, tuple(value.ids))
+    return value
+
+
+def _same_value(record, field, value) -> bool:
+    """True when record already holds value for field (scalar, many2one id or x2many commands)."""
+    current = record[field.name]
+    if field.type == "many2one":
+        return current.id == (value.id if hasattr(value, "_name") else (value or False))
+    if field.type in ("one2many", "many2many"):
+        if hasattr(value, "_name"):
+            return set(current.ids) == set(value.ids)
+        ids = set(current.ids)
+        for command in value or []:
+            if not isinstance(command, (list, tuple)):
+                return False
+            if command[0] == 6:
+                if ids != set(command[2]):
+                    return False
+            elif command[0] == 4:
+                if command[1] not in ids:
+                    return False
+            else:
+                return False  # create/update/unlink commands always write
+        return True
+    if field.type == "float" and isinstance(value, (int, float)) and not isinstance(value, bool):
+        return abs((current or 0.0) - value) < 1e-9
+    return current == value or (not current and not value and field.type not in ("integer", "float", "monetary"))
+
+
+def changed_vals(record, vals: dict) -> dict:
+    """vals without the fields record (a single record) already has."""
+    record.ensure_one()
+    return {
+        name: value for name, value in vals.items()
+        if name not in record._fields or not _same_value(record, record._fields[name], value)
+    }
+
+
+class WriteBatch:
+    """Pending values per model and record, flushed as one write() per group of identical values."""
+
+    def __init__(self, env):
+        self.env = env
+        # {model name: {record id: {field: value}}}; dicts keep first-use order
+        self.pending: dict[str, dict[int, dict]] = {}
+        self.writes = 0
+        self.records = 0
+
+    def set(self, records, field: str, value) -> None:
+        """Queue records.field = value."""
+        self.write(records, {field: value})
+
+    def write(self, records, vals: dict) -> None:
+        """Queue records.write(vals)."""
+        if not records or not vals:
+            return
+        by_id = self.pending.setdefault(records._name, {})
+        for record_id in records.ids:
+            by_id.setdefault(record_id, {}).update(vals)
+
+    def flush(self) -> int:
+        """Write everything queued; returns the number of write() calls issued."""
+        issued = 0
+        pending, self.pending = self.pending, {}
+        for model, by_id in pending.items():
+            groups: dict[tuple, tuple[dict, list[int]]] = {}
+            # Browsed together so comparing with the current values reads them in one prefetch
+            records = self.env[model].browse(list(by_id))
+            for record in records:
+                vals = changed_vals(record, by_id[record.id])
+                if not vals:
+                    continue
+                groups.setdefault(_freeze(vals), (vals, []))[1].append(record.id)
+            for vals, ids in groups.values():
+                self.env[model].browse(ids).write(vals)
+                issued += 1
+                self.records += len(ids)
+        self.writes += issued
+        return issued
+
+    def __enter__(self) -> "WriteBatch":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is None:
+            self.flush()
+        else:
+            self.pending = {}
+        return False
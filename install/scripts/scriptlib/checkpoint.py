@@ -0,0 +1,126 @@
+"""
+Per-unit savepoints and checkpoint/resume for the configuration scripts.
+
+A script splits its work into units (one company, one entity type, ...). Each unit runs under a
+savepoint and is committed together with its checkpoint row, so one bad record only rolls back
+its own unit; the others are kept and the script exits 1 at the end. A re-run skips the units
+already done and resumes from the first unfinished one:
+
+    progress = Checkpoints(env, "set_itbms_taxes_pa", inputs=[COUNTRY_CODE])
+    for company in companies:
+        unit = f"company {company.id}"
+        if progress.is_done(unit):
+            continue
+        with progress.unit(unit):
+            ...                                  # work for this company
+    sys.exit(progress.finish())
+
+Checkpoints live in the table install_script_checkpoint of the database. They are keyed by a
+hash of the running script and its inputs, so a changed script or setting starts over. A run
+where every unit succeeded clears them (running the script again re-applies everything);
+ODOO_SCRIPT_CHECKPOINT_RESET=1 clears them before the run.
+"""
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import os
+import sys
+
+from . import profiling, querylog
+
+TABLE = "install_script_checkpoint"
+
+
+def _script_fingerprint(inputs) -> str:
+    digest = hashlib.sha256()
+    try:
+        with open(os.path.abspath(sys.argv[0]), "rb") as fh:
+            digest.update(fh.read())
+    except OSError:
+        pass
+    digest.update(repr(list(inputs)).encode())
+    return digest.hexdigest()[:16]
+
+
+class Checkpoints:
+    """Done/failed units of one script in one database."""
+
+    def __init__(self, env, script: str, inputs=()):
+        self.env = env
+        self.cr = env.cr
+        self.script = script
+        self.fingerprint = _script_fingerprint(inputs)
+        self.done_count = 0
+        self.skipped = 0
+        self.failed: list[tuple[str, str]] = []
+
+        self.cr.execute(f"""
+            CREATE TABLE IF NOT EXISTS {TABLE} (
+                script varchar NOT NULL,
+                unit varchar NOT NULL,
+                fingerprint varchar NOT NULL,
+                state varchar NOT NULL,
+                error text,
+                write_date timestamp NOT NULL DEFAULT (now() AT TIME ZONE 'UTC'),
+                PRIMARY KEY (script, unit)
+            )
+        """)
+        if os.environ.get("ODOO_SCRIPT_CHECKPOINT_RESET") == "1":
+            self.cr.execute(f"DELETE FROM {TABLE} WHERE script = %s", [script])
+        # Checkpoints written by another version of the script (or other inputs) do not count
+        self.cr.execute(f"DELETE FROM {TABLE} WHERE script = %s AND fingerprint != %s", [script, self.fingerprint])
+        self.cr.execute(f"SELECT unit FROM {TABLE} WHERE script = %s AND state = 'done'", [script])
+        self._done = {row[0] for row in self.cr.fetchall()}
+        self.cr.commit()
+        if self._done:
+            print(f"Resuming {script}: {len(self._done)} unit(s) already done in a previous run.")
+
+    def is_done(self, unit: str) -> bool:
+        if unit in self._done:
+            self.skipped += 1
+            return True
+        return False
+
+    def _record(self, unit: str, state: str, error: str | None = None) -> None:
+        self.cr.execute(f"""
+            INSERT INTO {TABLE} (script, unit, fingerprint, state, error)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (script, unit) DO UPDATE
+               SET fingerprint = EXCLUDED.fingerprint, state = EXCLUDED.state, error = EXCLUDED.error,
+                   write_date = now() AT TIME ZONE 'UTC'
+        """, [self.script, unit, self.fingerprint, state, error])
+
+    @contextlib.contextmanager
+    def unit(self, unit: str):
+        """Run the block under a savepoint; commit it with its checkpoint, or roll it back and record the error."""
+        querylog.enter_unit(unit)
+        try:
+            with profiling.step(unit), self.cr.savepoint():   # savepoint flushes pending ORM writes before releasing
+                yield
+        except Exception as e:
+            self.env.invalidate_all()
+            error = (str(e).splitlines() or [repr(e)])[0][:500]
+            self.failed.append((unit, error))
+            print(f"ERROR: {self.script} [{unit}] rolled back: {error}", file=sys.stderr)
+            self._record(unit, "failed", error)
+            self.cr.commit()
+            return
+        finally:
+            querylog.leave_unit()
+        self._record(unit, "done")
+        self.cr.commit()
+        self._done.add(unit)
+        self.done_count += 1
+
+    def finish(self) -> int:
+        """Exit code for the script: 0 when every unit is done (checkpoints cleared), else 1."""
+        if self.failed:
+            print(f"WARNING: {len(self.failed)} unit(s) of {self.script} failed "
+                  f"({', '.join(u for u, _ in self.failed[:10])}); "
+                  f"{self.done_count + self.skipped} done are kept. Re-run to resume from the failed ones.",
+                  file=sys.stderr)
+            return 1
+        self.cr.execute(f"DELETE FROM {TABLE} WHERE script = %s", [self.script])
+        self.cr.commit()
+        return 0
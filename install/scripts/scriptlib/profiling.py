@@ -0,0 +1,139 @@
+"""
+Odoo profiler (odoo.tools.profiler) for the configuration and benchmark scripts.
+
+With ODOO_SCRIPT_PROFILE=<dir> (run_odoo_script --profile, see run_common.sh), every step of a
+script runs under the Odoo profiler with the SQL and periodic traceback collectors, and each step
+is written as a speedscope file (open it in https://www.speedscope.app):
+
+    <dir>/<script>/03-company_1.speedscope.json     SQL, Python frames, and both combined
+
+Steps are the checkpoint units (checkpoint.py), the blocks a script wraps in step(name), and the
+code between them ("script"). Profiling starts where querylog.py starts counting (after the
+registry load), so the files only show the script's own work. Steps without any query that took
+less than 50 ms are not written. ODOO_SCRIPT_PROFILE_INTERVAL sets the traceback sampling
+interval in seconds (default 0.005). In a forked worker the step files get the pid as suffix.
+"""
+from __future__ import annotations
+
+import atexit
+import contextlib
+import json
+import os
+import re
+import sys
+import time
+
+MIN_EMPTY_STEP_SECONDS = 0.05
+
+_session: "ProfileSession | None" = None
+
+
+class ProfileSession:
+    def __init__(self, directory: str, script: str):
+        self.directory = os.path.join(directory, script)
+        os.makedirs(self.directory, exist_ok=True)
+        self.interval = float(os.environ.get("ODOO_SCRIPT_PROFILE_INTERVAL") or 0.005)
+        self.root_pid = self.pid = os.getpid()
+        self.count = 0
+        self.written = 0
+        self.current = None   # (name, Profiler, start time)
+
+    def _check_fork(self) -> None:
+        """In a forked worker the parent's step is not ours (its sampling thread did not survive the fork)."""
+        if os.getpid() == self.pid:
+            return
+        self.pid, self.count = os.getpid(), 0
+        if self.current is not None:
+            with contextlib.suppress(Exception):
+                self.current[1].__exit__(None, None, None)   # unhook its SQL collector
+            self.current = None
+
+    def begin(self, name: str) -> None:
+        from odoo.tools.profiler import Profiler
+
+        self._check_fork()
+        profiler = Profiler(collectors=["sql", "traces_async"], db=None, description=name,
+                            params={"traces_async_interval": self.interval})
+        profiler.__enter__()
+        self.current = (name, profiler, time.monotonic())
+
+    def end(self) -> None:
+        self._check_fork()
+        if self.current is None:
+            return
+        name, profiler, started = self.current
+        self.current = None
+        profiler.__exit__(None, None, None)
+        entries = {c.name: json.loads(json.dumps(c.entries, default=str)) for c in profiler.collectors}
+        if not entries.get("sql") and time.monotonic() - started < MIN_EMPTY_STEP_SECONDS:
+            return
+        self.count += 1
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_")[:60] or "step"
+        suffix = "" if self.pid == self.root_pid else f"-{self.pid}"
+        path = os.path.join(self.directory, f"{self.count:02d}-{slug}{suffix}.speedscope.json")
+        try:
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write(speedscope(profiler, entries))
+        except OSError as e:
+            print(f"WARNING: could not write profile {path}: {e}", file=sys.stderr)
+            return
+        self.written += 1
+        print(f"profile: {path} ({len(entries.get('sql') or [])} queries, {time.monotonic() - started:.2f}s)",
+              file=sys.stderr)
+
+
+def speedscope(profiler, entries: dict) -> str:
+    """speedscope JSON of one step, built like ir.profile's "speedscope" view."""
+    try:
+        from odoo.tools.speedscope import Speedscope
+    except ImportError:   # no converter in this version: raw collector entries
+        return json.dumps({"name": profiler.description, "collectors": entries})
+    sp = Speedscope(init_stack_trace=json.loads(json.dumps(profiler.init_stack_trace or [], default=str)))
+    if entries.get("sql"):
+        sp.add("sql", entries["sql"])
+    if entries.get("traces_async"):
+        sp.add("frames", entries["traces_async"])
+    if hasattr(sp, "add_default"):
+        sp.add_default()
+    else:
+        names = [n for n in ("sql", "frames") if n in sp.profiles_raw]
+        for name in names:
+            sp.add_output([name], display_name=name)
+        if len(names) > 1:
+            sp.add_output(names, display_name="combined")
+    return json.dumps(sp.make())
+
+
+def _finish() -> None:
+    if _session is not None and os.getpid() == _session.pid:
+        _session.end()
+        if _session.written:
+            print(f"profile: {_session.written} step(s) in {_session.directory}", file=sys.stderr)
+
+
+def start() -> None:
+    """Start profiling if ODOO_SCRIPT_PROFILE is set (once per process)."""
+    global _session
+    directory = os.environ.get("ODOO_SCRIPT_PROFILE")
+    if not directory or _session is not None:
+        return
+    script = os.path.splitext(os.path.basename(sys.argv[0]))[0]
+    _session = ProfileSession(directory, script)
+    _session.begin("script")
+    atexit.register(_finish)
+
+
+@contextlib.contextmanager
+def step(name: str):
+    """Profile the block as its own step (no-op unless ODOO_SCRIPT_PROFILE is set)."""
+    start()
+    if _session is None:
+        yield
+        return
+    _session.end()
+    _session.begin(name)
+    try:
+        yield
+    finally:
+        _session.end()
+        _session.begin("script")
@@ -0,0 +1,99 @@
+"""
+SQL statement counting for the configuration scripts (used by tests/test_config_scripts.py).
+
+With ODOO_SCRIPT_QUERY_LOG=<file>, schema.require() starts counting every statement sent through
+Odoo cursors, and the counts are written to <file> as JSON when the script exits:
+
+    {"script": "set_itbms_taxes_pa", "queries": 182, "writes": 0,
+     "units": {"company 1": {"queries": 80, "writes": 0}, ...}, "write_samples": [...]}
+
+Statements are attributed to the checkpoint unit running them (see checkpoint.py); "writes" are
+INSERT/UPDATE/DELETE statements that changed at least one row (an upsert that finds everything
+in place is not a write), except on the checkpoint table itself. Counting starts after the
+registry is loaded (or with the SQL fast path of refdata.py), so the numbers only depend on the
+script's own work.
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import re
+import sys
+
+WRITE_RE = re.compile(r"^\s*(INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+\"?(\w+)", re.IGNORECASE)
+IGNORED_WRITE_TABLES = {"install_script_checkpoint"}
+MAX_WRITE_SAMPLES = 20
+
+_log: "QueryLog | None" = None
+
+
+class QueryLog:
+    def __init__(self, path: str, script: str):
+        self.path = path
+        self.script = script
+        self.queries = 0
+        self.writes = 0
+        self.units: dict[str, dict[str, int]] = {}
+        self.unit: str | None = None
+        self.write_samples: list[str] = []
+
+    def record(self, query, rowcount: int = -1) -> None:
+        sql = str(getattr(query, "code", query))
+        self.queries += 1
+        unit = self.units.setdefault(self.unit, {"queries": 0, "writes": 0}) if self.unit else None
+        if unit is not None:
+            unit["queries"] += 1
+        match = WRITE_RE.match(sql)
+        if match and rowcount != 0 and match.group(2).lower() not in IGNORED_WRITE_TABLES:
+            self.writes += 1
+            if unit is not None:
+                unit["writes"] += 1
+            if len(self.write_samples) < MAX_WRITE_SAMPLES:
+                self.write_samples.append(" ".join(sql.split())[:200])
+
+    def dump(self) -> None:
+        data = {
+            "script": self.script,
+            "queries": self.queries,
+            "writes": self.writes,
+            "units": self.units,
+            "write_samples": self.write_samples,
+        }
+        try:
+            with open(self.path, "w", encoding="utf-8") as fh:
+                json.dump(data, fh, indent=1, sort_keys=True)
+        except OSError as e:
+            print(f"WARNING: could not write query log {self.path}: {e}", file=sys.stderr)
+
+
+def start() -> None:
+    """Start counting if ODOO_SCRIPT_QUERY_LOG is set (once per process)."""
+    global _log
+    path = os.environ.get("ODOO_SCRIPT_QUERY_LOG")
+    if not path or _log is not None:
+        return
+    from odoo import sql_db
+
+    script = os.path.splitext(os.path.basename(sys.argv[0]))[0]
+    _log = QueryLog(path, script)
+    execute = sql_db.Cursor.execute
+
+    def counting_execute(self, query, *args, **kwargs):
+        result = execute(self, query, *args, **kwargs)
+        if _log is not None:
+            _log.record(query, self.rowcount)
+        return result
+
+    sql_db.Cursor.execute = counting_execute
+    atexit.register(_log.dump)
+
+
+def enter_unit(unit: str) -> None:
+    if _log is not None:
+        _log.unit = unit
+
+
+def leave_unit() -> None:
+    if _log is not None:
+        _log.unit = None
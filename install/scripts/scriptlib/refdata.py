@@ -0,0 +1,156 @@
+"""
+Set-based SQL fast path for static reference data (Panama states, partner tags).
+
+Loading the registry costs seconds; applying 13 states or 24 tags through the ORM then costs one
+search and one create per row. For such plain lists the scripts first try one statement through
+a bare sql_db cursor (no registry):
+
+    applied = refdata.upsert_states(DB_NAME, "PA", [("01", "Bocas del Toro"), ...])
+    if applied is not None:
+        ...                       # done; None = fast path not usable, continue with the ORM
+
+Translated name columns (jsonb, Odoo 16+) are handled like an ORM write without language: the
+en_US value is set, and other languages are only updated where they still hold the old en_US
+text (real translations are kept). Plain varchar columns are written as is.
+
+The fast path steps aside (returns None) when ODOO_SCRIPT_SQL_FAST_PATH=0, when the table has a
+NOT NULL column without default it does not know how to fill (a module added one), or when the
+state upsert has no unique (country_id, code) constraint to rely on.
+"""
+from __future__ import annotations
+
+import contextlib
+import os
+import sys
+
+from . import profiling, querylog
+
+NOW = "(now() AT TIME ZONE 'UTC')"
+# Columns the ORM fills on create (create_uid/write_uid = superuser)
+AUDIT_COLUMNS = {"create_uid": "1", "write_uid": "1", "create_date": NOW, "write_date": NOW}
+
+
+def enabled() -> bool:
+    return os.environ.get("ODOO_SCRIPT_SQL_FAST_PATH", "1") != "0"
+
+
+@contextlib.contextmanager
+def cursor(db_name: str):
+    """Plain cursor on db_name (odoo.tools.config must be parsed); committed when the block succeeds."""
+    from odoo import sql_db
+
+    querylog.start()
+    profiling.start()
+    cr = sql_db.db_connect(db_name).cursor()
+    try:
+        yield cr
+        cr.commit()
+    except Exception:
+        cr.rollback()
+        raise
+    finally:
+        cr.close()
+
+
+def columns(cr, table: str) -> dict[str, tuple[str, bool]]:
+    """{column: (data type, required without default)} of table."""
+    cr.execute(
+        "SELECT column_name, data_type, is_nullable = 'NO' AND column_default IS NULL "
+        "FROM information_schema.columns WHERE table_schema = current_schema() AND table_name = %s",
+        [table],
+    )
+    return {name: (data_type, required) for name, data_type, required in cr.fetchall()}
+
+
+def _unfilled(info: dict, filled) -> list[str]:
+    return sorted(c for c, (_, required) in info.items() if required and c != "id" and c not in filled)
+
+
+def _has_unique(cr, table: str, cols) -> bool:
+    """True when table has a unique index on exactly cols (what ON CONFLICT (cols) needs)."""
+    cr.execute("""
+        SELECT array_agg(a.attname::text ORDER BY a.attname)
+          FROM pg_index i
+          JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+         WHERE i.indrelid = %s::regclass AND i.indisunique AND i.indpred IS NULL
+         GROUP BY i.indexrelid
+    """, [table])
+    return any(sorted(row[0]) == sorted(cols) for row in cr.fetchall())
+
+
+def _name_exprs(info: dict, table_alias: str, new: str) -> tuple[str, str, str]:
+    """(value to insert, merged value on update, "differs" condition) for the name column."""
+    if info["name"][0] == "jsonb":
+        merged = (
+            f"COALESCE((SELECT jsonb_object_agg(e.key, CASE WHEN e.value = {table_alias}.name -> 'en_US' "
+            f"THEN {new} -> 'en_US' ELSE e.value END) FROM jsonb_each({table_alias}.name) e), '{{}}'::jsonb) || {new}"
+        )
+        return "jsonb_build_object('en_US', v.name)", merged, f"{table_alias}.name ->> 'en_US' IS DISTINCT FROM {new} ->> 'en_US'"
+    return "v.name", new, f"{table_alias}.name IS DISTINCT FROM {new}"
+
+
+def upsert_states(db_name: str, country_code: str, states) -> tuple[list[str], list[str]] | None:
+    """Create or rename the states (code, name) of a country in one INSERT ... ON CONFLICT.
+    Returns (created codes, renamed codes); None when the fast path cannot be used."""
+    if not enabled():
+        return None
+    with cursor(db_name) as cr:
+        info = columns(cr, "res_country_state")
+        filled = {"country_id", "code", "name", *AUDIT_COLUMNS}
+        if "name" not in info or _unfilled(info, filled) or not _has_unique(cr, "res_country_state", ["country_id", "code"]):
+            return None
+        cr.execute("SELECT id FROM res_country WHERE code = %s", [country_code])
+        row = cr.fetchone()
+        if not row:
+            print(f"WARNING: Country {country_code} not found. Skipping.", file=sys.stderr)
+            return [], []
+
+        insert_name, merged, differs = _name_exprs(info, "s", "EXCLUDED.name")
+        audit = {c: v for c, v in AUDIT_COLUMNS.items() if c in info}
+        cr.execute(f"""
+            INSERT INTO res_country_state AS s (country_id, code, name{"".join(f", {c}" for c in audit)})
+            SELECT %s, v.code, {insert_name}{"".join(f", {v}" for v in audit.values())}
+              FROM unnest(%s::varchar[], %s::varchar[]) AS v(code, name)
+            ON CONFLICT (country_id, code) DO UPDATE
+               SET name = {merged}{", write_uid = 1, write_date = EXCLUDED.write_date" if "write_date" in audit else ""}
+             WHERE {differs}
+            RETURNING s.code, (xmax = 0) AS inserted
+        """, [row[0], [code for code, _ in states], [name for _, name in states]])
+        changed = cr.fetchall()
+    return [code for code, inserted in changed if inserted], [code for code, inserted in changed if not inserted]
+
+
+def insert_missing_tags(db_name: str, names) -> list[str] | None:
+    """Create the partner tags (res.partner.category) whose en_US name does not exist yet, in one
+    INSERT ... SELECT. Returns the created names; None when the fast path cannot be used."""
+    if not enabled():
+        return None
+    with cursor(db_name) as cr:
+        info = columns(cr, "res_partner_category")
+        if "name" not in info:
+            return None
+        extra = dict(AUDIT_COLUMNS)
+        if "active" in info:
+            extra["active"] = "true"
+        if "color" in info:
+            extra["color"] = "(floor(random() * 11) + 1)::int"   # same range as the ORM default
+        if "parent_path" in info:
+            extra["parent_path"] = "n.id::text || '/'"           # _parent_store: top-level tag
+        extra = {c: v for c, v in extra.items() if c in info}
+        if _unfilled(info, {"name", *extra}):
+            return None
+
+        insert_name, _, _ = _name_exprs(info, "c", "v.name")
+        en_name = "{}.name ->> 'en_US'" if info["name"][0] == "jsonb" else "{}.name"
+        # nextval in a subquery so parent_path can reuse the new id in the same statement
+        cr.execute(f"""
+            INSERT INTO res_partner_category AS t (id, name{"".join(f", {c}" for c in extra)})
+            SELECT n.id, n.name_value{"".join(f", {v}" for v in extra.values())}
+              FROM (SELECT nextval(pg_get_serial_sequence('res_partner_category', 'id')) AS id,
+                           {insert_name} AS name_value, v.pos
+                      FROM unnest(%s::varchar[]) WITH ORDINALITY AS v(name, pos)
+                     WHERE NOT EXISTS (SELECT 1 FROM res_partner_category c WHERE {en_name.format("c")} = v.name)
+                     ORDER BY v.pos) AS n
+            RETURNING {en_name.format("t")}
+        """, [list(dict.fromkeys(names))])
+        return [row[0] for row in cr.fetchall()]
@@ -0,0 +1,211 @@
+"""
+Cached model-schema snapshot for the configuration scripts.
+
+The snapshot holds every model of the registry with its fields (type, relation, required,
+stored) plus the XML IDs the scripts asked for. It is computed once per registry version and
+saved as JSON in ODOO_SCRIPT_SCHEMA_DIR/<db>/ (default <data_dir>/script-schema), keyed by the
+installed module versions and the custom-field count, so the next script (or the next run of the
+pipeline) reads it instead of probing models with env[...] / fields_get().
+
+A script declares what it relies on and is rejected before any database work when the database
+does not have it:
+
+    REQUIRES = {"account.tax": ["amount", "tax_group_id"], "account.tax.group": ["name"]}
+
+    with cr_context as cr:
+        env = api.Environment(cr, odoo.SUPERUSER_ID, {})
+        snapshot = schema.require(env, REQUIRES, skip_message="account module not installed. Skipping.")
+        vals = snapshot.filter_vals("account.tax", vals)   # drop fields this version does not have
+
+Missing models: with skip_message the script prints a WARNING and exits 0 (module simply not
+installed), without it an ERROR and exit 1. Missing fields or XML IDs are always an ERROR.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+
+from . import profiling, querylog
+
+SNAPSHOT_FORMAT = 2
+
+
+class Snapshot:
+    """Models, fields and resolved XML IDs of one database at one registry version."""
+
+    def __init__(self, data: dict, path: str | None = None):
+        self.data = data
+        self.path = path
+        self._dirty = False
+
+    @property
+    def key(self) -> str:
+        return self.data["key"]
+
+    def has_model(self, model: str) -> bool:
+        return model in self.data["models"]
+
+    def fields(self, model: str) -> dict:
+        """{field name: {"type", "relation", "required", "store", "company_dependent"}} ({} for an unknown model)."""
+        return self.data["models"].get(model, {})
+
+    def has_field(self, model: str, field: str) -> bool:
+        return field in self.fields(model)
+
+    def references(self, comodel: str) -> list[tuple[str, str, bool]]:
+        """(model, field, company_dependent) of every many2one pointing to comodel that has a value
+        in the database: stored columns and company-dependent fields (ir.property / jsonb)."""
+        return sorted(
+            (model, fname, info.get("company_dependent", False))
+            for model, fields in self.data["models"].items()
+            for fname, info in fields.items()
+            if info["type"] == "many2one" and info["relation"] == comodel
+            and (info["store"] or info.get("company_dependent", False))
+        )
+
+    def filter_vals(self, model: str, vals: dict) -> dict:
+        """vals without the keys that are not fields of model (fields differ across Odoo versions)."""
+        fields = self.fields(model)
+        return {k: v for k, v in vals.items() if k in fields}
+
+    def xmlid(self, env, xmlid: str) -> tuple[str, int] | None:
+        """(model, res_id) of xmlid, or None. Unknown XML IDs are resolved in one query and cached."""
+        self.resolve_xmlids(env, [xmlid])
+        found = self.data["xmlids"].get(xmlid)
+        return tuple(found) if found else None
+
+    def resolve_xmlids(self, env, xmlids) -> None:
+        """Resolve every XML ID not cached yet with a single query on ir_model_data."""
+        pending = sorted({x for x in xmlids if x not in self.data["xmlids"]})
+        if not pending:
+            return
+        pairs = [tuple(x.split(".", 1)) for x in pending if "." in x]
+        found = {}
+        if pairs:
+            env.cr.execute(
+                "SELECT module, name, model, res_id FROM ir_model_data WHERE (module, name) IN %s",
+                [tuple(pairs)],
+            )
+            found = {f"{module}.{name}": [model, res_id] for module, name, model, res_id in env.cr.fetchall()}
+        for xmlid in pending:
+            self.data["xmlids"][xmlid] = found.get(xmlid)
+        self._dirty = True
+        self.save()
+
+    def missing(self, requires: dict, xmlids=(), env=None) -> tuple[list[str], list[str]]:
+        """(missing models, missing "model.field" / XML IDs) for a REQUIRES declaration."""
+        missing_models = [model for model in requires if not self.has_model(model)]
+        missing_other = [
+            f"{model}.{field}"
+            for model, fields in requires.items() if self.has_model(model)
+            for field in fields if not self.has_field(model, field)
+        ]
+        if xmlids and env is not None:
+            self.resolve_xmlids(env, xmlids)
+            missing_other += [x for x in xmlids if not self.data["xmlids"].get(x)]
+        return missing_models, missing_other
+
+    def save(self) -> None:
+        """Write the snapshot atomically; a read-only or missing cache dir only disables caching."""
+        if not self.path or not self._dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(self.data, fh, separators=(",", ":"), sort_keys=True)
+            os.replace(tmp, self.path)
+            self._dirty = False
+        except OSError as e:
+            print(f"WARNING: could not write schema cache {self.path}: {e}", file=sys.stderr)
+            self.path = None
+
+
+def cache_dir() -> str:
+    """ODOO_SCRIPT_SCHEMA_DIR, else <Odoo data_dir>/script-schema."""
+    configured = os.environ.get("ODOO_SCRIPT_SCHEMA_DIR")
+    if configured:
+        return configured
+    from odoo.tools import config
+
+    return os.path.join(config.get("data_dir") or "/var/lib/odoo", "script-schema")
+
+
+def registry_key(env) -> str:
+    """Hash of the installed module versions + custom fields: changes whenever the registry does."""
+    env.cr.execute("SELECT name, latest_version FROM ir_module_module WHERE state = 'installed' ORDER BY name")
+    modules = env.cr.fetchall()
+    env.cr.execute("SELECT count(*), max(id) FROM ir_model_fields")
+    field_stats = env.cr.fetchone()
+    payload = json.dumps([SNAPSHOT_FORMAT, modules, list(field_stats)], default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:20]
+
+
+def compute(env, key: str) -> dict:
+    """Snapshot of the loaded registry (no SQL: models and fields come from env.registry)."""
+    models = {}
+    for name in env.registry:
+        model = env.registry[name]
+        models[name] = {
+            fname: {
+                "type": field.type,
+                "relation": getattr(field, "comodel_name", None),
+                "required": bool(field.required),
+                "store": bool(field.store),
+                "company_dependent": bool(getattr(field, "company_dependent", False)),
+            }
+            for fname, field in model._fields.items()
+        }
+    return {"format": SNAPSHOT_FORMAT, "db": env.cr.dbname, "key": key, "models": models, "xmlids": {}}
+
+
+def load(env) -> Snapshot:
+    """Snapshot of env's database: from the disk cache when the registry key matches, else computed."""
+    key = registry_key(env)
+    directory = os.path.join(cache_dir(), env.cr.dbname)
+    path = os.path.join(directory, f"{key}.json")
+    try:
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+        if data.get("format") == SNAPSHOT_FORMAT and data.get("key") == key:
+            return Snapshot(data, path)
+    except (OSError, ValueError):
+        pass
+
+    snapshot = Snapshot(compute(env, key), path)
+    snapshot._dirty = True
+    snapshot.save()
+    # Older snapshots of this database belong to a previous registry version
+    try:
+        for entry in os.listdir(directory):
+            if entry.endswith(".json") and entry != os.path.basename(path):
+                os.remove(os.path.join(directory, entry))
+    except OSError:
+        pass
+    return snapshot
+
+
+def require(env, requires: dict, xmlids=(), skip_message: str | None = None) -> Snapshot:
+    """Load the snapshot and exit the script (rolled back) if a required model, field or XML ID is missing."""
+    querylog.start()   # ODOO_SCRIPT_QUERY_LOG: count the statements of the script from here on
+    profiling.start()  # ODOO_SCRIPT_PROFILE: profile it from here on
+    snapshot = load(env)
+    missing_models, missing_other = snapshot.missing(requires, xmlids, env)
+    if missing_models:
+        if skip_message:
+            print(f"WARNING: {skip_message} (missing model(s): {', '.join(missing_models)})", file=sys.stderr)
+            env.cr.rollback()
+            sys.exit(0)
+        print(f"ERROR: missing model(s): {', '.join(missing_models)}. Install the module that provides them.",
+              file=sys.stderr)
+        env.cr.rollback()
+        sys.exit(1)
+    if missing_other:
+        print(f"ERROR: this database has no {', '.join(missing_other)} "
+              f"(schema {snapshot.key}); the script targets another Odoo version or module set.", file=sys.stderr)
+        env.cr.rollback()
+        sys.exit(1)
+    return snapshot
+
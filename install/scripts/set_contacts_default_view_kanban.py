@@ -33,6 +33,8 @@ if ODOO_HOME:
 
 import odoo
 from odoo import api, sql_db
+from scriptlib import schema
+from scriptlib.batch import WriteBatch
 
 odoo.tools.config.parse_config(["-c", ODOO_CONF])
 
@@ -47,35 +49,39 @@ try:
 except (AttributeError, ImportError):
     cr_context = contextlib.closing(sql_db.db_connect(DB_NAME).cursor())
 
+# Models and fields this script relies on (checked against the cached schema before any write)
+REQUIRES = {
+    "ir.actions.act_window": ["res_model", "view_mode", "name"],
+}
+
 with cr_context as cr:
     env = api.Environment(cr, odoo.SUPERUSER_ID, {})
 
-    if "ir.actions.act_window" not in env:
-        print("WARNING: ir.actions.act_window not found. Skipping.", file=sys.stderr)
-        cr.rollback()
-        sys.exit(0)
+    snapshot = schema.require(env, REQUIRES, skip_message="ir.actions.act_window not found. Skipping.")
 
     actions = env["ir.actions.act_window"].search([("res_model", "=", "res.partner")])
     updated_actions = 0
     updated_views = 0
-    
+    # Sequences and view_mode are queued and written once at the end, grouped by value
+    batch = WriteBatch(env)
+
     for action in actions:
         # Method 1: Set sequence on view_ids (this is what actually controls default view)
-        if hasattr(action, "view_ids") and action.view_ids:
+        if snapshot.has_field("ir.actions.act_window", "view_ids") and action.view_ids:
             kanban_view = action.view_ids.filtered(lambda v: v.view_mode == "kanban")
             tree_view = action.view_ids.filtered(lambda v: v.view_mode == "tree")
             
             if kanban_view:
                 for kv in kanban_view:
                     if kv.sequence != 1:
-                        kv.sequence = 1
+                        batch.set(kv, "sequence", 1)
                         updated_views += 1
                         print(f"Set Kanban view sequence=1 for action '{action.name}' (id={action.id}).")
             
             if tree_view:
                 for tv in tree_view:
                     if tv.sequence < 10:
-                        tv.sequence = 10
+                        batch.set(tv, "sequence", 10)
                         updated_views += 1
                         print(f"Set List (tree) view sequence=10 for action '{action.name}' (id={action.id}).")
         
@@ -87,11 +93,13 @@ with cr_context as cr:
                 # Put kanban first; keep other modes in order (add kanban if missing)
                 rest = [m for m in modes if m != "kanban"]
                 new_modes = ["kanban"] + rest
-                action.write({"view_mode": ",".join(new_modes)})
+                batch.write(action, {"view_mode": ",".join(new_modes)})
                 updated_actions += 1
                 print(f"Set view_mode to start with Kanban for action '{action.name}' (id={action.id}).")
 
+    batch.flush()
     cr.commit()
+    print(f"({batch.records} record(s) written in {batch.writes} write(s).)")
     if updated_views > 0:
         print(f"Done. Updated {updated_views} view sequence(s) and {updated_actions} view_mode(s) to default to Kanban.")
     else:
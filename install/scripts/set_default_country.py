@@ -35,6 +35,7 @@ if ODOO_HOME:
 
 import odoo
 from odoo import api, sql_db
+from scriptlib import schema
 
 odoo.tools.config.parse_config(["-c", ODOO_CONF])
 
@@ -50,8 +51,17 @@ try:
 except (AttributeError, ImportError):
     cr_context = contextlib.closing(sql_db.db_connect(DB_NAME).cursor())
 
+# Models and fields this script relies on (checked against the cached schema before any write)
+REQUIRES = {
+    "res.country": ["code", "name"],
+    "res.company": ["country_id"],
+    "res.partner": ["country_id"],
+    "ir.default": [],
+}
+
 with cr_context as cr:
     env = api.Environment(cr, odoo.SUPERUSER_ID, {})
+    schema.require(env, REQUIRES)
     country = env["res.country"].search([("code", "=", COUNTRY_CODE)], limit=1)
     if not country:
         print(f"WARNING: Country with code '{COUNTRY_CODE}' not found. Skipping.", file=sys.stderr)
@@ -60,7 +70,7 @@ with cr_context as cr:
 
     # 1) Set country for all companies (res.company.country_id)
     companies = env["res.company"].search([])
-    companies.write({"country_id": country.id})
+    companies.filtered(lambda c: c.country_id != country).write({"country_id": country.id})
     print(f"Set default country to {country.name} ({COUNTRY_CODE}) for {len(companies)} company(ies).")
 
     # 2) Set global default for new contacts (res.partner.country_id) via ir.default.
@@ -36,6 +36,8 @@ if ODOO_HOME:
 
 import odoo
 from odoo import api, sql_db
+from scriptlib import schema
+from scriptlib.checkpoint import Checkpoints
 
 odoo.tools.config.parse_config(["-c", ODOO_CONF])
 
@@ -50,78 +52,90 @@ try:
 except (AttributeError, ImportError):
     cr_context = contextlib.closing(sql_db.db_connect(DB_NAME).cursor())
 
+# Models and fields this script relies on (checked against the cached schema before any write)
+REQUIRES = {
+    "account.journal": ["name", "code", "type", "company_id", "default_account_id", "refund_sequence"],
+    "account.account": ["company_id", "account_type"],
+    "account.move": ["journal_id"],
+    "ir.default": [],
+}
+
 with cr_context as cr:
     env = api.Environment(cr, odoo.SUPERUSER_ID, {})
 
-    if "account.journal" not in env:
-        print("WARNING: account module not installed. Skipping default credit notes journal.", file=sys.stderr)
-        cr.rollback()
-        sys.exit(0)
+    snapshot = schema.require(env, REQUIRES, skip_message="account module not installed. Skipping default credit notes journal.")
 
     Journal = env["account.journal"]
     Account = env["account.account"]
     companies = env["res.company"].search([])
     condition = "move_type=out_refund"
 
+    # One savepoint + checkpoint per company: a failure only rolls back that company and a re-run resumes
+    progress = Checkpoints(env, "set_default_credit_notes_journal", inputs=[JOURNAL_CODE, JOURNAL_NAME])
     for company in companies:
-        journal = Journal.search(
-            [
-                ("company_id", "=", company.id),
-                ("type", "=", "sale"),
-                "|",
-                ("code", "=", JOURNAL_CODE),
-                ("name", "ilike", JOURNAL_NAME),
-            ],
-            limit=1,
-        )
-        if not journal:
-            income = (
-                company.income_account_id
-                if hasattr(company, "income_account_id") and company.income_account_id
-                else None
+        unit = f"company {company.id}"
+        if progress.is_done(unit):
+            continue
+        with progress.unit(unit):
+            journal = Journal.search(
+                [
+                    ("company_id", "=", company.id),
+                    ("type", "=", "sale"),
+                    "|",
+                    ("code", "=", JOURNAL_CODE),
+                    ("name", "ilike", JOURNAL_NAME),
+                ],
+                limit=1,
             )
-            if not income:
-                income = Account.search(
-                    [
-                        ("company_id", "=", company.id),
-                        ("account_type", "=", "income"),
-                    ],
-                    limit=1,
+            if not journal:
+                income = (
+                    company.income_account_id
+                    if snapshot.has_field("res.company", "income_account_id") and company.income_account_id
+                    else None
                 )
-            if not income:
-                print(
-                    f"WARNING: No income account for company {company.name}. "
-                    f"Install chart of accounts (e.g. l10n_pa) first. Skipping company.",
-                    file=sys.stderr,
+                if not income:
+                    income = Account.search(
+                        [
+                            ("company_id", "=", company.id),
+                            ("account_type", "=", "income"),
+                        ],
+                        limit=1,
+                    )
+                if not income:
+                    print(
+                        f"WARNING: No income account for company {company.name}. "
+                        f"Install chart of accounts (e.g. l10n_pa) first. Skipping company.",
+                        file=sys.stderr,
+                    )
+                    continue
+                journal = Journal.create(
+                    {
+                        "name": JOURNAL_NAME,
+                        "code": JOURNAL_CODE,
+                        "type": "sale",
+                        "company_id": company.id,
+                        "default_account_id": income.id,
+                        "refund_sequence": True,  # Secuencia de notas de crédito dedicada (NC-0001, ...)
+                    }
                 )
-                continue
-            journal = Journal.create(
-                {
-                    "name": JOURNAL_NAME,
-                    "code": JOURNAL_CODE,
-                    "type": "sale",
-                    "company_id": company.id,
-                    "default_account_id": income.id,
-                    "refund_sequence": True,  # Secuencia de notas de crédito dedicada (NC-0001, ...)
-                }
-            )
-            print(f"Created journal '{journal.name}' (code {journal.code}) for company {company.name}.")
-        else:
-            if not journal.refund_sequence:
-                journal.refund_sequence = True
-                print(f"Enabled 'Secuencia de notas de crédito dedicada' for existing journal '{journal.name}' in company {company.name}.")
+                print(f"Created journal '{journal.name}' (code {journal.code}) for company {company.name}.")
             else:
-                print(f"Using existing journal '{journal.name}' (code {journal.code}) for company {company.name}.")
-
-        env["ir.default"].set(
-            "account.move",
-            "journal_id",
-            journal.id,
-            user_id=False,
-            company_id=company.id,
-            condition=condition,
-        )
-        print(f"Set default credit notes (notas de crédito) journal to '{journal.name}' for company {company.name} (condition: {condition}).")
-
-    cr.commit()
+                if not journal.refund_sequence:
+                    journal.refund_sequence = True
+                    print(f"Enabled 'Secuencia de notas de crédito dedicada' for existing journal '{journal.name}' in company {company.name}.")
+                else:
+                    print(f"Using existing journal '{journal.name}' (code {journal.code}) for company {company.name}.")
+
+            env["ir.default"].set(
+                "account.move",
+                "journal_id",
+                journal.id,
+                user_id=False,
+                company_id=company.id,
+                condition=condition,
+            )
+            print(f"Set default credit notes (notas de crédito) journal to '{journal.name}' for company {company.name} (condition: {condition}).")
+
+    if progress.finish():
+        sys.exit(1)
     print("Done. New customer credit notes will use the 'Notas de crédito' journal by default.")
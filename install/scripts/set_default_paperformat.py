@@ -31,6 +31,8 @@ if ODOO_HOME:
 
 import odoo
 from odoo import api, sql_db
+from scriptlib import schema
+from scriptlib.batch import WriteBatch
 
 odoo.tools.config.parse_config(["-c", ODOO_CONF])
 
@@ -45,40 +47,42 @@ try:
 except (AttributeError, ImportError):
     cr_context = contextlib.closing(sql_db.db_connect(DB_NAME).cursor())
 
+# Models and fields this script relies on (checked against the cached schema before any write)
+REQUIRES = {
+    "report.paperformat": ["name", "format", "margin_top", "margin_bottom"],
+    "res.company": ["paperformat_id"],
+}
+
 with cr_context as cr:
     env = api.Environment(cr, odoo.SUPERUSER_ID, {})
 
-    if "report.paperformat" not in env:
-        print("WARNING: report.paperformat not found. Skipping.", file=sys.stderr)
-        cr.rollback()
-        sys.exit(0)
+    schema.require(env, REQUIRES, skip_message="report.paperformat not found. Skipping.")
 
     # We update both base paperformats to be safe, or just check the company's paperformat
     us_format = env.ref('base.paperformat_us', raise_if_not_found=False)
     euro_format = env.ref('base.paperformat_euro', raise_if_not_found=False)
 
-    for pf in [us_format, euro_format]:
-        if pf:
-            pf.write({
-                'format': 'Letter',
-                'margin_top': 5.0,
-                'margin_bottom': 5.0,
-            })
-            print(f"Updated paperformat '{pf.name}' to Letter with 5mm margins (ID: {pf.id}).")
-
-    # Update company default paper formats
-    companies = env["res.company"].search([])
-    for company in companies:
-        if company.paperformat_id:
-            company.paperformat_id.write({
-                'format': 'Letter',
-                'margin_top': 5.0,
-                'margin_bottom': 5.0,
-            })
-            print(f"Updated assigned paperformat for company '{company.name}'.")
-        elif us_format:
-            company.paperformat_id = us_format.id
-            print(f"Assigned US Letter paperformat to company '{company.name}'.")
+    letter_5mm = {
+        'format': 'Letter',
+        'margin_top': 5.0,
+        'margin_bottom': 5.0,
+    }
+    # Identical values: every paperformat (and every company) ends up in a single write
+    with WriteBatch(env) as batch:
+        for pf in [us_format, euro_format]:
+            if pf:
+                batch.write(pf, letter_5mm)
+                print(f"Updated paperformat '{pf.name}' to Letter with 5mm margins (ID: {pf.id}).")
+
+        # Update company default paper formats
+        companies = env["res.company"].search([])
+        for company in companies:
+            if company.paperformat_id:
+                batch.write(company.paperformat_id, letter_5mm)
+                print(f"Updated assigned paperformat for company '{company.name}'.")
+            elif us_format:
+                batch.set(company, "paperformat_id", us_format.id)
+                print(f"Assigned US Letter paperformat to company '{company.name}'.")
 
     cr.commit()
     print("Done. Default paper format configured.")
@@ -34,6 +34,8 @@ if ODOO_HOME:
 
 import odoo
 from odoo import api, sql_db
+from scriptlib import schema
+from scriptlib.checkpoint import Checkpoints
 
 odoo.tools.config.parse_config(["-c", ODOO_CONF])
 
@@ -55,18 +57,19 @@ PRODUCT_NAMES = [
     "Seguro",
 ]
 
+# Models and fields this script relies on (checked against the cached schema before any write)
+REQUIRES = {
+    "product.template": ["name", "type", "company_id", "taxes_id", "supplier_taxes_id"],
+    "account.tax": ["type_tax_use", "amount_type", "amount", "company_id", "country_id"],
+}
+
 with cr_context as cr:
     env = api.Environment(cr, odoo.SUPERUSER_ID, {})
 
-    if "product.template" not in env:
-        print("WARNING: product module not installed. Skipping default products.", file=sys.stderr)
-        cr.rollback()
-        sys.exit(0)
-
-    if "account.tax" not in env:
-        print("WARNING: account module not installed. Run set_default_taxes_pa.py first.", file=sys.stderr)
-        cr.rollback()
-        sys.exit(0)
+    schema.require(
+        env, REQUIRES,
+        skip_message="product or account module not installed. Run set_default_taxes_pa.py after installing them.",
+    )
 
     ProductTemplate = env["product.template"]
     Tax = env["account.tax"]
@@ -79,58 +82,65 @@ with cr_context as cr:
     companies = env["res.company"].search([])
     created = 0
 
+    # One savepoint + checkpoint per company: a failure only rolls back that company and a re-run resumes
+    progress = Checkpoints(env, "set_default_products_pa", inputs=[COUNTRY_CODE])
     for company in companies:
-        fiscal_country = company.account_fiscal_country_id or company.country_id
-        if fiscal_country and fiscal_country.code != COUNTRY_CODE:
-            continue
-
-        # Find 0% sale and purchase taxes for this company
-        tax_sale = Tax.search(
-            [
-                ("company_id", "=", company.id),
-                ("country_id", "=", country.id),
-                ("type_tax_use", "=", "sale"),
-                ("amount", "=", 0.0),
-                ("amount_type", "=", "percent"),
-            ],
-            limit=1,
-        )
-        tax_purchase = Tax.search(
-            [
-                ("company_id", "=", company.id),
-                ("country_id", "=", country.id),
-                ("type_tax_use", "=", "purchase"),
-                ("amount", "=", 0.0),
-                ("amount_type", "=", "percent"),
-            ],
-            limit=1,
-        )
-        if not tax_sale:
-            print(f"WARNING: 0%% sale tax not found for company {company.name}. Run set_default_taxes_pa.py first.", file=sys.stderr)
-            continue
-        if not tax_purchase:
-            print(f"WARNING: 0%% purchase tax not found for company {company.name}. Run set_default_taxes_pa.py first.", file=sys.stderr)
+        unit = f"company {company.id}"
+        if progress.is_done(unit):
             continue
+        with progress.unit(unit):
+            fiscal_country = company.account_fiscal_country_id or company.country_id
+            if fiscal_country and fiscal_country.code != COUNTRY_CODE:
+                continue
 
-        for name in PRODUCT_NAMES:
-            existing = ProductTemplate.search(
+            # Find 0% sale and purchase taxes for this company
+            tax_sale = Tax.search(
+                [
+                    ("company_id", "=", company.id),
+                    ("country_id", "=", country.id),
+                    ("type_tax_use", "=", "sale"),
+                    ("amount", "=", 0.0),
+                    ("amount_type", "=", "percent"),
+                ],
+                limit=1,
+            )
+            tax_purchase = Tax.search(
                 [
-                    ("company_id", "in", (False, company.id)),
-                    ("name", "=", name),
+                    ("company_id", "=", company.id),
+                    ("country_id", "=", country.id),
+                    ("type_tax_use", "=", "purchase"),
+                    ("amount", "=", 0.0),
+                    ("amount_type", "=", "percent"),
                 ],
                 limit=1,
             )
-            if existing:
+            if not tax_sale:
+                print(f"WARNING: 0%% sale tax not found for company {company.name}. Run set_default_taxes_pa.py first.", file=sys.stderr)
                 continue
-            ProductTemplate.create({
-                "name": name,
-                "type": "service",
-                "taxes_id": [(6, 0, [tax_sale.id])],
-                "supplier_taxes_id": [(6, 0, [tax_purchase.id])],
-                "company_id": company.id,
-            })
-            created += 1
-            print(f"Created product '{name}' (service, 0%% tax) for company {company.name}.")
-
-    cr.commit()
+            if not tax_purchase:
+                print(f"WARNING: 0%% purchase tax not found for company {company.name}. Run set_default_taxes_pa.py first.", file=sys.stderr)
+                continue
+
+            for name in PRODUCT_NAMES:
+                existing = ProductTemplate.search(
+                    [
+                        ("company_id", "in", (False, company.id)),
+                        ("name", "=", name),
+                    ],
+                    limit=1,
+                )
+                if existing:
+                    continue
+                ProductTemplate.create({
+                    "name": name,
+                    "type": "service",
+                    "taxes_id": [(6, 0, [tax_sale.id])],
+                    "supplier_taxes_id": [(6, 0, [tax_purchase.id])],
+                    "company_id": company.id,
+                })
+                created += 1
+                print(f"Created product '{name}' (service, 0%% tax) for company {company.name}.")
+
+    if progress.finish():
+        sys.exit(1)
     print(f"Done. {created} default service product(s) created.")
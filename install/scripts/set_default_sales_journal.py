@@ -36,6 +36,8 @@ if ODOO_HOME:
 
 import odoo
 from odoo import api, sql_db
+from scriptlib import schema
+from scriptlib.checkpoint import Checkpoints
 
 odoo.tools.config.parse_config(["-c", ODOO_CONF])
 
@@ -51,73 +53,85 @@ try:
 except (AttributeError, ImportError):
     cr_context = contextlib.closing(sql_db.db_connect(DB_NAME).cursor())
 
+# Models and fields this script relies on (checked against the cached schema before any write)
+REQUIRES = {
+    "account.journal": ["name", "code", "type", "company_id", "default_account_id"],
+    "account.account": ["company_id", "account_type"],
+    "account.move": ["journal_id"],
+    "ir.default": [],
+}
+
 with cr_context as cr:
     env = api.Environment(cr, odoo.SUPERUSER_ID, {})
 
-    if "account.journal" not in env:
-        print("WARNING: account module not installed. Skipping default sales journal.", file=sys.stderr)
-        cr.rollback()
-        sys.exit(0)
+    snapshot = schema.require(env, REQUIRES, skip_message="account module not installed. Skipping default sales journal.")
 
     Journal = env["account.journal"]
     Account = env["account.account"]
     companies = env["res.company"].search([])
     condition = "move_type=out_invoice"
 
+    # One savepoint + checkpoint per company: a failure only rolls back that company and a re-run resumes
+    progress = Checkpoints(env, "set_default_sales_journal", inputs=[JOURNAL_CODE, JOURNAL_NAME])
     for company in companies:
-        journal = Journal.search(
-            [
-                ("company_id", "=", company.id),
-                ("type", "=", "sale"),
-                "|",
-                ("code", "=", JOURNAL_CODE),
-                ("name", "ilike", JOURNAL_NAME),
-            ],
-            limit=1,
-        )
-        if not journal:
-            income = (
-                company.income_account_id
-                if hasattr(company, "income_account_id") and company.income_account_id
-                else None
+        unit = f"company {company.id}"
+        if progress.is_done(unit):
+            continue
+        with progress.unit(unit):
+            journal = Journal.search(
+                [
+                    ("company_id", "=", company.id),
+                    ("type", "=", "sale"),
+                    "|",
+                    ("code", "=", JOURNAL_CODE),
+                    ("name", "ilike", JOURNAL_NAME),
+                ],
+                limit=1,
             )
-            if not income:
-                income = Account.search(
-                    [
-                        ("company_id", "=", company.id),
-                        ("account_type", "=", "income"),
-                    ],
-                    limit=1,
+            if not journal:
+                income = (
+                    company.income_account_id
+                    if snapshot.has_field("res.company", "income_account_id") and company.income_account_id
+                    else None
                 )
-            if not income:
-                print(
-                    f"WARNING: No income account for company {company.name}. "
-                    f"Install chart of accounts (e.g. l10n_pa) first. Skipping company.",
-                    file=sys.stderr,
+                if not income:
+                    income = Account.search(
+                        [
+                            ("company_id", "=", company.id),
+                            ("account_type", "=", "income"),
+                        ],
+                        limit=1,
+                    )
+                if not income:
+                    print(
+                        f"WARNING: No income account for company {company.name}. "
+                        f"Install chart of accounts (e.g. l10n_pa) first. Skipping company.",
+                        file=sys.stderr,
+                    )
+                    continue
+                journal = Journal.create(
+                    {
+                        "name": JOURNAL_NAME,
+                        "code": JOURNAL_CODE,
+                        "type": "sale",
+                        "company_id": company.id,
+                        "default_account_id": income.id,
+                    }
                 )
-                continue
-            journal = Journal.create(
-                {
-                    "name": JOURNAL_NAME,
-                    "code": JOURNAL_CODE,
-                    "type": "sale",
-                    "company_id": company.id,
-                    "default_account_id": income.id,
-                }
+                print(f"Created journal '{journal.name}' (code {journal.code}) for company {company.name}.")
+            else:
+                print(f"Using existing journal '{journal.name}' (code {journal.code}) for company {company.name}.")
+
+            env["ir.default"].set(
+                "account.move",
+                "journal_id",
+                journal.id,
+                user_id=False,
+                company_id=company.id,
+                condition=condition,
             )
-            print(f"Created journal '{journal.name}' (code {journal.code}) for company {company.name}.")
-        else:
-            print(f"Using existing journal '{journal.name}' (code {journal.code}) for company {company.name}.")
-
-        env["ir.default"].set(
-            "account.move",
-            "journal_id",
-            journal.id,
-            user_id=False,
-            company_id=company.id,
-            condition=condition,
-        )
-        print(f"Set default customer invoice journal to '{journal.name}' for company {company.name} (condition: {condition}).")
-
-    cr.commit()
+            print(f"Set default customer invoice journal to '{journal.name}' for company {company.name} (condition: {condition}).")
+
+    if progress.finish():
+        sys.exit(1)
     print("Done. New customer invoices will use the configured sales journal by default.")
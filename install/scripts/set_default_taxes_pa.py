@@ -33,6 +33,8 @@ if ODOO_HOME:
 
 import odoo
 from odoo import api, sql_db
+from scriptlib import schema
+from scriptlib.checkpoint import Checkpoints
 
 odoo.tools.config.parse_config(["-c", ODOO_CONF])
 
@@ -48,13 +50,17 @@ try:
 except (AttributeError, ImportError):
     cr_context = contextlib.closing(sql_db.db_connect(DB_NAME).cursor())
 
+# Models and fields this script relies on (checked against the cached schema before any write)
+REQUIRES = {
+    "account.tax": ["name", "description", "type_tax_use", "amount_type", "amount", "company_id", "country_id", "tax_group_id"],
+    "account.tax.group": ["name", "company_id", "country_id"],
+    "res.company": ["account_fiscal_country_id", "country_id"],
+}
+
 with cr_context as cr:
     env = api.Environment(cr, odoo.SUPERUSER_ID, {})
 
-    if "account.tax" not in env:
-        print("WARNING: account module not installed. Skipping Panama 0% taxes.", file=sys.stderr)
-        cr.rollback()
-        sys.exit(0)
+    schema.require(env, REQUIRES, skip_message="account module not installed. Skipping Panama 0% taxes.")
 
     country = env["res.country"].search([("code", "=", COUNTRY_CODE)], limit=1)
     if not country:
@@ -66,88 +72,95 @@ with cr_context as cr:
     Tax = env["account.tax"]
     companies = env["res.company"].search([])
 
+    # One savepoint + checkpoint per company: a failure only rolls back that company and a re-run resumes
+    progress = Checkpoints(env, "set_default_taxes_pa", inputs=[COUNTRY_CODE])
     for company in companies:
-        # Only create taxes for companies whose fiscal country is PA (or all if single company)
-        fiscal_country = company.account_fiscal_country_id or company.country_id
-        if fiscal_country and fiscal_country.code != COUNTRY_CODE:
+        unit = f"company {company.id}"
+        if progress.is_done(unit):
             continue
-
-        # 1) Tax group "Exento 0%" for this company/country
-        group = TaxGroup.search(
-            [
-                ("company_id", "=", company.id),
-                ("country_id", "=", country.id),
-                "|",
-                ("name", "ilike", "Exento"),
-                ("name", "ilike", "Excento"),
-            ],
-            limit=1,
-        )
-        if not group:
-            group = TaxGroup.create(
-                {
-                    "name": "Exento 0%",
-                    "company_id": company.id,
-                    "country_id": country.id,
-                }
+        with progress.unit(unit):
+            # Only create taxes for companies whose fiscal country is PA (or all if single company)
+            fiscal_country = company.account_fiscal_country_id or company.country_id
+            if fiscal_country and fiscal_country.code != COUNTRY_CODE:
+                continue
+
+            # 1) Tax group "Exento 0%" for this company/country
+            group = TaxGroup.search(
+                [
+                    ("company_id", "=", company.id),
+                    ("country_id", "=", country.id),
+                    "|",
+                    ("name", "ilike", "Exento"),
+                    ("name", "ilike", "Excento"),
+                ],
+                limit=1,
             )
-            print(f"Created tax group '{group.name}' for company {company.name}.")
-
-        # 2) 0% tax Ventas
-        tax_sale = Tax.search(
-            [
-                ("company_id", "=", company.id),
-                ("country_id", "=", country.id),
-                ("type_tax_use", "=", "sale"),
-                ("amount", "=", 0.0),
-                ("name", "=", "0%"),
-            ],
-            limit=1,
-        )
-        if not tax_sale:
-            tax_sale = Tax.create(
-                {
-                    "name": "0%",
-                    "description": "Exento 0% Venta",
-                    "type_tax_use": "sale",
-                    "amount_type": "percent",
-                    "amount": 0.0,
-                    "company_id": company.id,
-                    "country_id": country.id,
-                    "tax_group_id": group.id,
-                }
+            if not group:
+                group = TaxGroup.create(
+                    {
+                        "name": "Exento 0%",
+                        "company_id": company.id,
+                        "country_id": country.id,
+                    }
+                )
+                print(f"Created tax group '{group.name}' for company {company.name}.")
+
+            # 2) 0% tax Ventas
+            tax_sale = Tax.search(
+                [
+                    ("company_id", "=", company.id),
+                    ("country_id", "=", country.id),
+                    ("type_tax_use", "=", "sale"),
+                    ("amount", "=", 0.0),
+                    ("name", "=", "0%"),
+                ],
+                limit=1,
             )
-            print(f"Created 0% tax (Ventas) for company {company.name}.")
-        else:
-            print(f"0% tax (Ventas) already exists for company {company.name}.")
-
-        # 3) 0% tax Compras
-        tax_purchase = Tax.search(
-            [
-                ("company_id", "=", company.id),
-                ("country_id", "=", country.id),
-                ("type_tax_use", "=", "purchase"),
-                ("amount", "=", 0.0),
-                ("name", "=", "0%"),
-            ],
-            limit=1,
-        )
-        if not tax_purchase:
-            tax_purchase = Tax.create(
-                {
-                    "name": "0%",
-                    "description": "Exento 0% Compra",
-                    "type_tax_use": "purchase",
-                    "amount_type": "percent",
-                    "amount": 0.0,
-                    "company_id": company.id,
-                    "country_id": country.id,
-                    "tax_group_id": group.id,
-                }
+            if not tax_sale:
+                tax_sale = Tax.create(
+                    {
+                        "name": "0%",
+                        "description": "Exento 0% Venta",
+                        "type_tax_use": "sale",
+                        "amount_type": "percent",
+                        "amount": 0.0,
+                        "company_id": company.id,
+                        "country_id": country.id,
+                        "tax_group_id": group.id,
+                    }
+                )
+                print(f"Created 0% tax (Ventas) for company {company.name}.")
+            else:
+                print(f"0% tax (Ventas) already exists for company {company.name}.")
+
+            # 3) 0% tax Compras
+            tax_purchase = Tax.search(
+                [
+                    ("company_id", "=", company.id),
+                    ("country_id", "=", country.id),
+                    ("type_tax_use", "=", "purchase"),
+                    ("amount", "=", 0.0),
+                    ("name", "=", "0%"),
+                ],
+                limit=1,
             )
-            print(f"Created 0% tax (Compras) for company {company.name}.")
-        else:
-            print(f"0% tax (Compras) already exists for company {company.name}.")
-
-    cr.commit()
+            if not tax_purchase:
+                tax_purchase = Tax.create(
+                    {
+                        "name": "0%",
+                        "description": "Exento 0% Compra",
+                        "type_tax_use": "purchase",
+                        "amount_type": "percent",
+                        "amount": 0.0,
+                        "company_id": company.id,
+                        "country_id": country.id,
+                        "tax_group_id": group.id,
+                    }
+                )
+                print(f"Created 0% tax (Compras) for company {company.name}.")
+            else:
+                print(f"0% tax (Compras) already exists for company {company.name}.")
+
+    if progress.finish():
+        sys.exit(1)
     print("Done. Two 0% taxes (Ventas and Compras) are available for Panama.")
@@ -33,6 +33,8 @@ if ODOO_HOME:
 
 import odoo
 from odoo import api, sql_db
+from scriptlib import schema
+from scriptlib.checkpoint import Checkpoints
 
 odoo.tools.config.parse_config(["-c", ODOO_CONF])
 
@@ -47,40 +49,49 @@ try:
 except (AttributeError, ImportError):
     cr_context = contextlib.closing(sql_db.db_connect(DB_NAME).cursor())
 
+# Models and fields this script relies on (checked against the cached schema before any write)
+REQUIRES = {
+    "account.fiscal.position": ["name", "company_id", "auto_apply"],
+}
+
 with cr_context as cr:
     env = api.Environment(cr, odoo.SUPERUSER_ID, {})
 
-    if "account.fiscal.position" not in env:
-        print("WARNING: account module not installed. Skipping fiscal position.", file=sys.stderr)
-        cr.rollback()
-        sys.exit(0)
+    schema.require(env, REQUIRES, skip_message="account module not installed. Skipping fiscal position.")
 
     FiscalPosition = env["account.fiscal.position"]
     companies = env["res.company"].search([])
 
+    # One savepoint + checkpoint per company: a failure only rolls back that company and a re-run resumes
+    progress = Checkpoints(env, "set_fiscal_position_retencion", inputs=[FP_NAME, AUTO_APPLY])
     for company in companies:
-        fp = FiscalPosition.search(
-            [
-                ("company_id", "=", company.id),
-                ("name", "=", FP_NAME),
-            ],
-            limit=1,
-        )
-        if fp:
-            if fp.auto_apply != AUTO_APPLY:
-                fp.auto_apply = AUTO_APPLY
-                print(f"Updated '{FP_NAME}' auto_apply={AUTO_APPLY} in company {company.name}.")
-            else:
-                print(f"Fiscal position '{FP_NAME}' already exists in company {company.name}.")
-        else:
-            FiscalPosition.create(
-                {
-                    "name": FP_NAME,
-                    "company_id": company.id,
-                    "auto_apply": AUTO_APPLY,
-                }
+        unit = f"company {company.id}"
+        if progress.is_done(unit):
+            continue
+        with progress.unit(unit):
+            fp = FiscalPosition.search(
+                [
+                    ("company_id", "=", company.id),
+                    ("name", "=", FP_NAME),
+                ],
+                limit=1,
             )
-            print(f"Created fiscal position '{FP_NAME}' for company {company.name} (auto_apply={AUTO_APPLY}).")
+            if fp:
+                if fp.auto_apply != AUTO_APPLY:
+                    fp.auto_apply = AUTO_APPLY
+                    print(f"Updated '{FP_NAME}' auto_apply={AUTO_APPLY} in company {company.name}.")
+                else:
+                    print(f"Fiscal position '{FP_NAME}' already exists in company {company.name}.")
+            else:
+                FiscalPosition.create(
+                    {
+                        "name": FP_NAME,
+                        "company_id": company.id,
+                        "auto_apply": AUTO_APPLY,
+                    }
+                )
+                print(f"Created fiscal position '{FP_NAME}' for company {company.name} (auto_apply={AUTO_APPLY}).")
 
-    cr.commit()
+    if progress.finish():
+        sys.exit(1)
     print("Done. Fiscal position 'Retención de impuestos' is available.")
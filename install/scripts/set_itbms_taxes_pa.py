@@ -33,6 +33,8 @@ if ODOO_HOME:
 
 import odoo
 from odoo import api, sql_db
+from scriptlib import schema
+from scriptlib.checkpoint import Checkpoints
 
 odoo.tools.config.parse_config(["-c", ODOO_CONF])
 
@@ -54,13 +56,17 @@ ITBMS_SPECS = [
     (15.0, "ITBMS 15%", "ITBMS 15% Venta", "ITBMS 15% Compra"),
 ]
 
+# Models and fields this script relies on (checked against the cached schema before any write)
+REQUIRES = {
+    "account.tax": ["name", "description", "type_tax_use", "amount_type", "amount", "company_id", "country_id", "tax_group_id"],
+    "account.tax.group": ["name", "company_id", "country_id"],
+    "res.company": ["account_fiscal_country_id", "country_id"],
+}
+
 with cr_context as cr:
     env = api.Environment(cr, odoo.SUPERUSER_ID, {})
 
-    if "account.tax" not in env:
-        print("WARNING: account module not installed. Skipping ITBMS taxes.", file=sys.stderr)
-        cr.rollback()
-        sys.exit(0)
+    schema.require(env, REQUIRES, skip_message="account module not installed. Skipping ITBMS taxes.")
 
     country = env["res.country"].search([("code", "=", COUNTRY_CODE)], limit=1)
     if not country:
@@ -72,58 +78,65 @@ with cr_context as cr:
     Tax = env["account.tax"]
     companies = env["res.company"].search([])
 
+    # One savepoint + checkpoint per company: a failure only rolls back that company and a re-run resumes
+    progress = Checkpoints(env, "set_itbms_taxes_pa", inputs=[COUNTRY_CODE])
     for company in companies:
-        fiscal_country = company.account_fiscal_country_id or company.country_id
-        if fiscal_country and fiscal_country.code != COUNTRY_CODE:
+        unit = f"company {company.id}"
+        if progress.is_done(unit):
             continue
+        with progress.unit(unit):
+            fiscal_country = company.account_fiscal_country_id or company.country_id
+            if fiscal_country and fiscal_country.code != COUNTRY_CODE:
+                continue
 
-        for amount, group_name, sale_desc, purchase_desc in ITBMS_SPECS:
-            group = TaxGroup.search(
-                [
-                    ("company_id", "=", company.id),
-                    ("country_id", "=", country.id),
-                    ("name", "=", group_name),
-                ],
-                limit=1,
-            )
-            if not group:
-                group = TaxGroup.create(
-                    {
-                        "name": group_name,
-                        "company_id": company.id,
-                        "country_id": country.id,
-                    }
-                )
-                print(f"Created tax group '{group.name}' for company {company.name}.")
-
-            for type_tax_use, desc in [("sale", sale_desc), ("purchase", purchase_desc)]:
-                tax = Tax.search(
+            for amount, group_name, sale_desc, purchase_desc in ITBMS_SPECS:
+                group = TaxGroup.search(
                     [
                         ("company_id", "=", company.id),
                         ("country_id", "=", country.id),
-                        ("type_tax_use", "=", type_tax_use),
-                        ("amount", "=", amount),
-                        ("name", "=", f"{int(amount)}%"),
-                        ("tax_group_id", "=", group.id),
+                        ("name", "=", group_name),
                     ],
                     limit=1,
                 )
-                if not tax:
-                    Tax.create(
+                if not group:
+                    group = TaxGroup.create(
                         {
-                            "name": f"{int(amount)}%",
-                            "description": desc,
-                            "type_tax_use": type_tax_use,
-                            "amount_type": "percent",
-                            "amount": amount,
+                            "name": group_name,
                             "company_id": company.id,
                             "country_id": country.id,
-                            "tax_group_id": group.id,
                         }
                     )
-                    print(f"Created {int(amount)}% tax ({desc}) for company {company.name}.")
-                else:
-                    print(f"{int(amount)}% tax ({desc}) already exists for company {company.name}.")
-
-    cr.commit()
+                    print(f"Created tax group '{group.name}' for company {company.name}.")
+
+                for type_tax_use, desc in [("sale", sale_desc), ("purchase", purchase_desc)]:
+                    tax = Tax.search(
+                        [
+                            ("company_id", "=", company.id),
+                            ("country_id", "=", country.id),
+                            ("type_tax_use", "=", type_tax_use),
+                            ("amount", "=", amount),
+                            ("name", "=", f"{int(amount)}%"),
+                            ("tax_group_id", "=", group.id),
+                        ],
+                        limit=1,
+                    )
+                    if not tax:
+                        Tax.create(
+                            {
+                                "name": f"{int(amount)}%",
+                                "description": desc,
+                                "type_tax_use": type_tax_use,
+                                "amount_type": "percent",
+                                "amount": amount,
+                                "company_id": company.id,
+                                "country_id": country.id,
+                                "tax_group_id": group.id,
+                            }
+                        )
+                        print(f"Created {int(amount)}% tax ({desc}) for company {company.name}.")
+                    else:
+                        print(f"{int(amount)}% tax ({desc}) already exists for company {company.name}.")
+
+    if progress.finish():
+        sys.exit(1)
     print("Done. ITBMS 10% and 15% taxes (Ventas and Compras) are available for Panama.")
@@ -33,20 +33,11 @@ if ODOO_HOME:
 
 import odoo
 from odoo import api, sql_db
+from scriptlib import refdata, schema
+from scriptlib.batch import WriteBatch
 
 odoo.tools.config.parse_config(["-c", ODOO_CONF])
 
-try:
-    import odoo.registry as _regmod
-    _registry = getattr(_regmod, "registry", None) or getattr(_regmod, "Registry", None)
-    if callable(_registry):
-        registry = _registry(DB_NAME)
-        cr_context = registry.cursor()
-    else:
-        raise AttributeError("registry")
-except (AttributeError, ImportError):
-    cr_context = contextlib.closing(sql_db.db_connect(DB_NAME).cursor())
-
 # Code (PA-XX) -> Name (province/comarca)
 PANAMA_STATES = [
     ("01", "Bocas del Toro"),
@@ -64,13 +55,43 @@ PANAMA_STATES = [
     ("13", "Comarca Ngäbe-Buglé"),
 ]
 
+# Fast path: the whole list in one INSERT ... ON CONFLICT through a plain cursor, without
+# loading the registry (scriptlib/refdata.py). None = not usable here, use the ORM below.
+try:
+    applied = refdata.upsert_states(DB_NAME, COUNTRY_CODE, PANAMA_STATES)
+except Exception as e:
+    print(f"WARNING: SQL fast path failed ({e}); using the ORM.", file=sys.stderr)
+    applied = None
+if applied is not None:
+    names = dict(PANAMA_STATES)
+    created_codes, renamed_codes = applied
+    for code in created_codes:
+        print(f"Created state {code} -> {names[code]}")
+    for code in renamed_codes:
+        print(f"Updated state {code} -> {names[code]}")
+    print(f"Done. Created {len(created_codes)}, updated {len(renamed_codes)} states for {COUNTRY_CODE} (SQL fast path).")
+    sys.exit(0)
+
+try:
+    import odoo.registry as _regmod
+    _registry = getattr(_regmod, "registry", None) or getattr(_regmod, "Registry", None)
+    if callable(_registry):
+        registry = _registry(DB_NAME)
+        cr_context = registry.cursor()
+    else:
+        raise AttributeError("registry")
+except (AttributeError, ImportError):
+    cr_context = contextlib.closing(sql_db.db_connect(DB_NAME).cursor())
+
+# Models and fields this script relies on (checked against the cached schema before any write)
+REQUIRES = {
+    "res.country.state": ["name", "code", "country_id"],
+}
+
 with cr_context as cr:
     env = api.Environment(cr, odoo.SUPERUSER_ID, {})
 
-    if "res.country.state" not in env:
-        print("WARNING: res.country.state not available. Skipping.", file=sys.stderr)
-        cr.rollback()
-        sys.exit(0)
+    schema.require(env, REQUIRES, skip_message="res.country.state not available. Skipping.")
 
     country = env["res.country"].search([("code", "=", COUNTRY_CODE)], limit=1)
     if not country:
@@ -82,29 +103,29 @@ with cr_context as cr:
     created = 0
     updated = 0
 
-    for code, name in PANAMA_STATES:
-        state = State.search(
-            [
-                ("country_id", "=", country.id),
-                ("code", "=", code),
-            ],
-            limit=1,
-        )
-        if state:
-            if state.name != name:
-                state.name = name
-                updated += 1
-                print(f"Updated state {code} -> {name}")
-        else:
-            State.create(
-                {
-                    "country_id": country.id,
-                    "code": code,
-                    "name": name,
-                }
-            )
-            created += 1
-            print(f"Created state {code} -> {name}")
+    # One search for all states of the country; renames queued, new states created together
+    states_by_code = {s.code: s for s in State.search([("country_id", "=", country.id)])}
+    to_create = []
+    with WriteBatch(env) as batch:
+        for code, name in PANAMA_STATES:
+            state = states_by_code.get(code)
+            if state:
+                if state.name != name:
+                    batch.set(state, "name", name)
+                    updated += 1
+                    print(f"Updated state {code} -> {name}")
+            else:
+                to_create.append(
+                    {
+                        "country_id": country.id,
+                        "code": code,
+                        "name": name,
+                    }
+                )
+                created += 1
+                print(f"Created state {code} -> {name}")
+    if to_create:
+        State.create(to_create)
 
     cr.commit()
     print(f"Done. Created {created}, updated {updated} states for {country.name} ({COUNTRY_CODE}).")
@@ -30,20 +30,11 @@ if ODOO_HOME:
 
 import odoo
 from odoo import api, sql_db
+from scriptlib import refdata, schema
+from scriptlib.checkpoint import Checkpoints
 
 odoo.tools.config.parse_config(["-c", ODOO_CONF])
 
-try:
-    import odoo.registry as _regmod
-    _registry = getattr(_regmod, "registry", None) or getattr(_regmod, "Registry", None)
-    if callable(_registry):
-        registry = _registry(DB_NAME)
-        cr_context = registry.cursor()
-    else:
-        raise AttributeError("registry")
-except (AttributeError, ImportError):
-    cr_context = contextlib.closing(sql_db.db_connect(DB_NAME).cursor())
-
 # Edit this list: add or remove tag names. Each will be created if missing.
 TAG_NAMES = [
     "Cliente",
@@ -75,54 +66,65 @@ TAG_NAMES = [
     # "Legal",
 ]
 
+# Fast path: the missing tags in one INSERT ... SELECT through a plain cursor, without loading
+# the registry (scriptlib/refdata.py). None = not usable here, use the ORM below.
+try:
+    created_names = refdata.insert_missing_tags(DB_NAME, [n.strip() for n in TAG_NAMES if (n or "").strip()])
+except Exception as e:
+    print(f"WARNING: SQL fast path failed ({e}); using the ORM.", file=sys.stderr)
+    created_names = None
+if created_names is not None:
+    for name in created_names:
+        print(f"Created tag '{name}'.")
+    print(f"Done. {len(created_names)} new tag(s) created (SQL fast path).")
+    sys.exit(0)
+
+try:
+    import odoo.registry as _regmod
+    _registry = getattr(_regmod, "registry", None) or getattr(_regmod, "Registry", None)
+    if callable(_registry):
+        registry = _registry(DB_NAME)
+        cr_context = registry.cursor()
+    else:
+        raise AttributeError("registry")
+except (AttributeError, ImportError):
+    cr_context = contextlib.closing(sql_db.db_connect(DB_NAME).cursor())
+
+# Models and fields this script relies on (checked against the cached schema before any write)
+REQUIRES = {
+    "res.partner.category": ["name"],
+}
+
 with cr_context as cr:
     env = api.Environment(cr, odoo.SUPERUSER_ID, {})
-    
-    # Debug: list available models (optional, can be removed later)
-    # print(f"DEBUG: Available models: {sorted(env.keys())[:10]}...", file=sys.stderr)
-
-    # Check if model exists by trying to access it
-    try:
-        Category = env["res.partner.category"]
-        print(f"DEBUG: Found res.partner.category model. Total tags before: {Category.search_count([])}", file=sys.stderr)
-    except KeyError:
-        print("ERROR: res.partner.category model not found. Make sure 'contacts' or 'base' module is installed.", file=sys.stderr)
-        print(f"DEBUG: Available models containing 'partner': {[m for m in env.keys() if 'partner' in m.lower()]}", file=sys.stderr)
-        cr.rollback()
-        sys.exit(1)
-    except Exception as e:
-        print(f"ERROR: Failed to access res.partner.category: {e}", file=sys.stderr)
-        import traceback
-        traceback.print_exc(file=sys.stderr)
-        cr.rollback()
-        sys.exit(1)
+
+    schema.require(env, REQUIRES)
+    Category = env["res.partner.category"]
+    print(f"DEBUG: Found res.partner.category model. Total tags before: {Category.search_count([])}", file=sys.stderr)
 
     created = 0
     skipped = 0
-    errors = 0
-    
+
+    # One savepoint + checkpoint per tag: a failing tag no longer rolls back the others and a re-run resumes
+    progress = Checkpoints(env, "set_partner_tags", inputs=TAG_NAMES)
     for name in TAG_NAMES:
         name = (name or "").strip()
         if not name:
             continue
-        
-        try:
+        unit = f"tag {name}"
+        if progress.is_done(unit):
+            continue
+
+        with progress.unit(unit):
             existing = Category.search([("name", "=", name)], limit=1)
             if existing:
                 skipped += 1
                 continue
-            
+
             Category.create({"name": name})
             created += 1
             print(f"Created tag '{name}'.")
-        except Exception as e:
-            errors += 1
-            print(f"ERROR: Failed to create tag '{name}': {e}", file=sys.stderr)
 
-    if errors > 0:
-        print(f"WARNING: {errors} tag(s) failed to create.", file=sys.stderr)
-        cr.rollback()
+    if progress.finish():
         sys.exit(1)
-    
-    cr.commit()
     print(f"Done. {created} new tag(s) created, {skipped} already existed.")
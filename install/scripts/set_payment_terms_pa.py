@@ -2,8 +2,13 @@
 """
 Create default payment terms for Panama (Términos de pago).
 
-- Creates any term from PAYMENT_TERMS that does not exist.
-- Removes any payment term that is NOT in PAYMENT_TERMS (only terms in the list are kept).
+Set-based reconciliation against PAYMENT_TERMS, in a constant number of queries however many
+terms exist:
+- Creates every missing term (with its line) in one multi-create; reactivates archived ones.
+- Sets the sequence (list order) of the wanted terms in one UPDATE.
+- Terms NOT in PAYMENT_TERMS: usage (invoices, orders, partner defaults, ...) is found in one
+  aggregate query; unused extras are archived in one batch (ODOO_PAYMENT_TERMS_DELETE_UNUSED=1
+  deletes them instead); extras still referenced are left alone and listed.
 
 Default terms (in order): Efectivo(contado), Crédito, Crédito a 30/60/90 días, Crédito Otro,
   Tarjeta Crédito/Débito/Fidelización, Vale, Tarjeta de Regalo, Transf./Depósito a cta. Bancaria,
@@ -35,6 +40,7 @@ if ODOO_HOME:
 
 import odoo
 from odoo import api, sql_db
+from scriptlib import schema
 
 odoo.tools.config.parse_config(["-c", ODOO_CONF])
 
@@ -76,52 +82,118 @@ def _line_balance_days(days: int) -> dict:
         "nb_days": days,
     }
 
+# Models and fields this script relies on (checked against the cached schema before any write)
+REQUIRES = {
+    "account.payment.term": ["name", "active", "line_ids"],
+    "account.payment.term.line": ["value", "value_amount", "delay_type", "nb_days"],
+}
+DELETE_UNUSED = os.environ.get("ODOO_PAYMENT_TERMS_DELETE_UNUSED", "0") == "1"
+
+
+def referenced_term_ids(env, snapshot, term_ids: list[int]) -> set[int]:
+    """Ids among term_ids used anywhere (stored many2one or company-dependent default), in one query."""
+    if not term_ids:
+        return set()
+    parts = []
+    params = []
+    property_fields = False
+    for model, field, company_dependent in snapshot.references("account.payment.term"):
+        if model == "account.payment.term.line" or model not in env:
+            continue  # the terms' own lines
+        if env[model]._abstract or env[model]._transient or not env[model]._auto:
+            continue  # wizards, SQL views (reports) and models without a table
+        table = env[model]._table
+        if company_dependent and snapshot.has_model("ir.property"):
+            property_fields = True  # Odoo <= 17: values live in ir_property
+        elif company_dependent:
+            # Odoo 18+: jsonb {company_id: term_id}
+            parts.append(f'SELECT (jsonb_each_text("{field}")).value::int FROM "{table}" WHERE "{field}" IS NOT NULL')
+        else:
+            parts.append(f'SELECT "{field}" FROM "{table}" WHERE "{field}" = ANY(%s)')
+            params.append(term_ids)
+    if property_fields:
+        parts.append(
+            "SELECT split_part(value_reference, ',', 2)::int FROM ir_property "
+            "WHERE value_reference LIKE 'account.payment.term,%%'"
+        )
+    if not parts:
+        return set()
+    query = "SELECT DISTINCT id FROM (" + " UNION ALL ".join(parts) + ") AS used(id) WHERE id = ANY(%s)"
+    env.cr.execute(query, params + [term_ids])
+    return {row[0] for row in env.cr.fetchall()}
+
+
 with cr_context as cr:
     env = api.Environment(cr, odoo.SUPERUSER_ID, {})
 
-    if "account.payment.term" not in env:
-        print("WARNING: account module not installed. Skipping payment terms.", file=sys.stderr)
-        cr.rollback()
-        sys.exit(0)
-
-    PaymentTerm = env["account.payment.term"]
-    allowed_names = {name for name, _ in PAYMENT_TERMS}
-
-    # Remove any payment terms that are NOT in PAYMENT_TERMS (only keep terms from the list)
-    deleted = 0
-    skipped_deletions = 0
-    extra = PaymentTerm.search([("name", "not in", list(allowed_names))])
-    for term in extra:
-        term_name = term.name  # capture before unlink (record may be deleted)
-        try:
-            term.unlink()
-            deleted += 1
-            print(f"Removed payment term '{term_name}'.")
-        except Exception as e:
-            skipped_deletions += 1
-            print(f"WARNING: Could not remove '{term_name}' (may be in use on invoices/partners): {e}", file=sys.stderr)
-
-    created = 0
-    for seq, (name, days) in enumerate(PAYMENT_TERMS, start=1):
-        existing = PaymentTerm.search([("name", "=", name)], limit=1)
-        if existing:
-            if hasattr(existing, "sequence"):
-                existing.sequence = seq
-            continue
-        PaymentTerm.create({
+    snapshot = schema.require(env, REQUIRES, skip_message="account module not installed. Skipping payment terms.")
+    has_sequence = snapshot.has_field("account.payment.term", "sequence")
+
+    PaymentTerm = env["account.payment.term"].with_context(active_test=False)
+    wanted = {name: (seq, days) for seq, (name, days) in enumerate(PAYMENT_TERMS, start=1)}
+
+    # 1) Current state: every term (archived included) in one query
+    fields = ["name", "active"] + (["sequence"] if has_sequence else [])
+    existing = {}
+    extra_ids = []
+    for row in PaymentTerm.search_read([], fields, order="id"):
+        if row["name"] in wanted and row["name"] not in existing:
+            existing[row["name"]] = row
+        elif row["active"]:
+            extra_ids.append(row["id"])
+
+    # 2) Missing terms with their lines: one multi-create
+    to_create = [
+        {
             "name": name,
-            "sequence": seq,
+            **({"sequence": seq} if has_sequence else {}),
             "line_ids": [(0, 0, _line_balance_days(days))],
-        })
-        created += 1
-        due = f"due in {days} days" if days else "immediate"
-        print(f"Created payment term '{name}' (sequence {seq}, {due}).")
+        }
+        for name, (seq, days) in wanted.items() if name not in existing
+    ]
+    if to_create:
+        PaymentTerm.create(to_create)
+        for vals in to_create:
+            days = wanted[vals["name"]][1]
+            due = f"due in {days} days" if days else "immediate"
+            print(f"Created payment term '{vals['name']}' (sequence {wanted[vals['name']][0]}, {due}).")
+
+    # 3) Existing wanted terms: reactivate in one write, fix the order in one UPDATE
+    to_activate = [row["id"] for row in existing.values() if not row["active"]]
+    if to_activate:
+        PaymentTerm.browse(to_activate).write({"active": True})
+        print(f"Reactivated {len(to_activate)} archived payment term(s).")
+    if has_sequence:
+        resequence = [(row["id"], wanted[name][0]) for name, row in existing.items() if row["sequence"] != wanted[name][0]]
+        if resequence:
+            PaymentTerm.flush_model()
+            cr.execute(
+                "UPDATE account_payment_term AS t SET sequence = v.seq "
+                "FROM (SELECT unnest(%s::int[]) AS id, unnest(%s::int[]) AS seq) AS v WHERE t.id = v.id",
+                [[r[0] for r in resequence], [r[1] for r in resequence]],
+            )
+            PaymentTerm.invalidate_model(["sequence"])
+            print(f"Updated the sequence of {len(resequence)} payment term(s).")
+
+    # 4) Extras: usage in one aggregate query; archive (or delete) the unused ones in one batch
+    used = referenced_term_ids(env, snapshot, extra_ids)
+    unused = PaymentTerm.browse([i for i in extra_ids if i not in used])
+    kept = PaymentTerm.browse(sorted(used))
+    if unused:
+        names = ", ".join(unused.mapped("name"))
+        if DELETE_UNUSED:
+            unused.unlink()
+            print(f"Removed {len(unused)} unused payment term(s): {names}.")
+        else:
+            unused.write({"active": False})
+            print(f"Archived {len(unused)} unused payment term(s): {names}.")
+    for term in kept:
+        print(f"Kept '{term.name}' (not in PAYMENT_TERMS but used on documents/partners).")
 
     cr.commit()
-    msg = f"Done. {created} new term(s) added."
-    if deleted:
-        msg += f" {deleted} extra term(s) removed."
-    if skipped_deletions:
-        msg += f" {skipped_deletions} term(s) could not be removed (in use)."
-    msg += " Only payment terms from PAYMENT_TERMS list remain."
+    msg = f"Done. {len(to_create)} new term(s) added."
+    if unused:
+        msg += f" {len(unused)} unused extra term(s) {'removed' if DELETE_UNUSED else 'archived'}."
+    if kept:
+        msg += f" {len(kept)} extra term(s) still in use left unchanged."
     print(msg)
@@ -34,6 +34,7 @@ if ODOO_HOME:
 
 import odoo
 from odoo import api, sql_db
+from scriptlib import schema
 
 odoo.tools.config.parse_config(["-c", ODOO_CONF])
 
@@ -55,24 +56,27 @@ GROUP_XMLIDS = [
     "product.group_stock_packaging",     # Product packaging (embalajes)
 ]
 
+# Models and fields this script relies on (checked against the cached schema before any write)
+REQUIRES = {
+    "res.groups": ["implied_ids"],
+}
+
 with cr_context as cr:
     env = api.Environment(cr, odoo.SUPERUSER_ID, {})
 
-    if "res.groups" not in env:
-        print("WARNING: res.groups not found. Skipping.", file=sys.stderr)
-        cr.rollback()
-        sys.exit(0)
+    snapshot = schema.require(env, REQUIRES, xmlids=["base.group_user"], skip_message="res.groups not found. Skipping.")
+    snapshot.resolve_xmlids(env, GROUP_XMLIDS)
 
     base_user = env.ref("base.group_user")
     added = []
     for xmlid in GROUP_XMLIDS:
-        try:
-            group = env.ref(xmlid)
-            if group not in base_user.implied_ids:
-                base_user.write({"implied_ids": [(4, group.id)]})
-                added.append(group.name)
-        except ValueError:
-            pass
+        found = snapshot.xmlid(env, xmlid)
+        if not found:
+            continue  # module not installed
+        group = env["res.groups"].browse(found[1]).exists()
+        if group and group not in base_user.implied_ids:
+            base_user.write({"implied_ids": [(4, group.id)]})
+            added.append(group.name)
 
     cr.commit()
     if added:
@@ -43,6 +43,9 @@ if ODOO_HOME:
 
 import odoo
 from odoo import api, sql_db
+from scriptlib import schema
+from scriptlib.batch import changed_vals
+from scriptlib.checkpoint import Checkpoints
 
 odoo.tools.config.parse_config(["-c", ODOO_CONF])
 
@@ -57,18 +60,21 @@ try:
 except (AttributeError, ImportError):
     cr_context = contextlib.closing(sql_db.db_connect(DB_NAME).cursor())
 
+# Models and fields this script relies on (checked against the cached schema before any write).
+# Optional account.tax fields (invoice_label, is_base_affected, price_include, ...) differ across
+# Odoo versions and are dropped from the values by snapshot.filter_vals instead.
+REQUIRES = {
+    "account.tax": ["name", "type_tax_use", "amount_type", "amount", "company_id", "country_id",
+                    "tax_group_id", "children_tax_ids", "original_tax_ids", "fiscal_position_ids"],
+    "account.tax.group": ["name", "company_id", "country_id"],
+    "account.fiscal.position": ["name", "company_id", "country_id", "auto_apply"],
+}
+
 with cr_context as cr:
     env = api.Environment(cr, odoo.SUPERUSER_ID, {})
 
-    # Check if account module is installed
-    try:
-        TaxModel = env["account.tax"]
-        FiscalPositionModel = env["account.fiscal.position"]
-    except KeyError as e:
-        print(f"ERROR: account module not installed. Missing model: {e}", file=sys.stderr)
-        print("Make sure 'account' module is installed before running this script.", file=sys.stderr)
-        cr.rollback()
-        sys.exit(1)
+    # Rejects the run (exit 1) when the account module or one of the fields above is missing
+    snapshot = schema.require(env, REQUIRES)
 
     country = env["res.country"].search([("code", "=", COUNTRY_CODE)], limit=1)
     if not country:
@@ -88,205 +94,215 @@ with cr_context as cr:
     
     print(f"DEBUG: Processing {len(companies)} company/companies for country {COUNTRY_CODE}...", file=sys.stderr)
 
-    # Helper to check for existing fields to avoid crashes on different Odoo versions
-    valid_tax_fields = set(env["account.tax"].fields_get().keys())
-    
     def safe_tax_vals(vals):
-        """Prepares a dictionary of vals, removing keys that do not exist in the model."""
-        return {k: v for k, v in vals.items() if k in valid_tax_fields}
+        """Prepares a dictionary of vals, removing keys that do not exist in the model (cached schema)."""
+        return snapshot.filter_vals("account.tax", vals)
 
+    # One savepoint + checkpoint per company: a failure only rolls back that company and a re-run resumes
+    progress = Checkpoints(env, "set_tax_retencion_impuestos", inputs=[COUNTRY_CODE])
     for company in companies:
-        fiscal_country = company.account_fiscal_country_id or company.country_id
-        if fiscal_country and fiscal_country.code != COUNTRY_CODE:
+        unit = f"company {company.id}"
+        if progress.is_done(unit):
             continue
+        with progress.unit(unit):
+            fiscal_country = company.account_fiscal_country_id or company.country_id
+            if fiscal_country and fiscal_country.code != COUNTRY_CODE:
+                continue
         
-        print(f"--- Processing Company: {company.name} ---")
-
-        # ---------------------------------------------------------------------
-        # Paso 1: Creación de grupo de impuestos (Tax Group) Category
-        # ---------------------------------------------------------------------
-        group = TaxGroup.search([
-            ("company_id", "=", company.id),
-            ("country_id", "=", country.id),
-            ("name", "=", TAX_GROUP_NAME),
-        ], limit=1)
-        if not group:
-            group = TaxGroup.create({
-                "name": TAX_GROUP_NAME,
-                "company_id": company.id,
-                "country_id": country.id,
-            })
-            print(f"  [CREATE] Tax Group Category '{TAX_GROUP_NAME}'")
-        else:
-             print(f"  [EXISTS] Tax Group Category '{TAX_GROUP_NAME}'")
-
-        # ---------------------------------------------------------------------
-        # Paso 2: Creación de Impuestos Base (Componentes)
-        # ---------------------------------------------------------------------
-        # Dictionary of taxes to ensure they exist
-        base_taxes_data = {
-            "ITBMS 0% (Operacion Exento de Impuesto)": {
-                "amount": 0.0,
-                "description": "ITBMS 0% Venta",
-                "invoice_label": "ITBMS 0% Venta",
-                "is_base_affected": False
-            },
-            "ITBMS 7% (Operaciones con Retención)": {
-                "amount": 7.0,
-                "description": "ITBMS 7% Venta",
-                "invoice_label": "7%",  # Was '7%', could be ITBMS 7% Venta, sticking to previous script implementation
-                "is_base_affected": True
-            },
-            "ITBMS 50% (Operaciones con Retención)": {
-                "amount": -3.5,
-                "description": "ITBMS -50% Venta",
-                "invoice_label": "-3.5%",
-                "is_base_affected": False
-            },
-            "ITBMS 100% (Operaciones con Retención)": {
-                "amount": -7.0,
-                "description": "ITBMS -100% Venta",
-                "invoice_label": "-7.0%",
-                "is_base_affected": False
-            }
-        }
+            print(f"--- Processing Company: {company.name} ---")
 
-        created_base_taxes = {}
-        for b_name, b_data in base_taxes_data.items():
-            tax = Tax.search([
+            # ---------------------------------------------------------------------
+            # Paso 1: Creación de grupo de impuestos (Tax Group) Category
+            # ---------------------------------------------------------------------
+            group = TaxGroup.search([
                 ("company_id", "=", company.id),
-                ("type_tax_use", "=", "sale"),
-                ("name", "=", b_name),
+                ("country_id", "=", country.id),
+                ("name", "=", TAX_GROUP_NAME),
             ], limit=1)
-            
-            vals = {
-                "name": b_name,
-                "type_tax_use": "sale",
-                "amount_type": "percent",
-                "amount": b_data["amount"],
-                "description": b_data["description"],
-                "tax_group_id": group.id,
-                "country_id": country.id,
-                "company_id": company.id,
-                "price_include": False,
-                "include_base_amount": False,
-                "is_base_affected": b_data["is_base_affected"],
-                "invoice_label": b_data["invoice_label"],
+            if not group:
+                group = TaxGroup.create({
+                    "name": TAX_GROUP_NAME,
+                    "company_id": company.id,
+                    "country_id": country.id,
+                })
+                print(f"  [CREATE] Tax Group Category '{TAX_GROUP_NAME}'")
+            else:
+                 print(f"  [EXISTS] Tax Group Category '{TAX_GROUP_NAME}'")
+
+            # ---------------------------------------------------------------------
+            # Paso 2: Creación de Impuestos Base (Componentes)
+            # ---------------------------------------------------------------------
+            # Dictionary of taxes to ensure they exist
+            base_taxes_data = {
+                "ITBMS 0% (Operacion Exento de Impuesto)": {
+                    "amount": 0.0,
+                    "description": "ITBMS 0% Venta",
+                    "invoice_label": "ITBMS 0% Venta",
+                    "is_base_affected": False
+                },
+                "ITBMS 7% (Operaciones con Retención)": {
+                    "amount": 7.0,
+                    "description": "ITBMS 7% Venta",
+                    "invoice_label": "7%",  # Was '7%', could be ITBMS 7% Venta, sticking to previous script implementation
+                    "is_base_affected": True
+                },
+                "ITBMS 50% (Operaciones con Retención)": {
+                    "amount": -3.5,
+                    "description": "ITBMS -50% Venta",
+                    "invoice_label": "-3.5%",
+                    "is_base_affected": False
+                },
+                "ITBMS 100% (Operaciones con Retención)": {
+                    "amount": -7.0,
+                    "description": "ITBMS -100% Venta",
+                    "invoice_label": "-7.0%",
+                    "is_base_affected": False
+                }
             }
-            vals = safe_tax_vals(vals)
 
-            if not tax:
-                tax = Tax.create(vals)
-                print(f"  [CREATE] Base Tax: '{b_name}'")
-            else:
-                tax.write(vals)
-                print(f"  [UPDATE] Base Tax: '{b_name}'")
-            created_base_taxes[b_name] = tax
-
-
-        # ---------------------------------------------------------------------
-        # Paso 3. Creación de Objetos Grupo de Impuestos (Objects with children)
-        # ---------------------------------------------------------------------
-        group_taxes_data = {
-            "Retención de impuestos 50%": {
-                "children": ["ITBMS 7% (Operaciones con Retención)", "ITBMS 50% (Operaciones con Retención)"],
-                "invoice_label": "ITBMS 7% (Operaciones con Retención)"
-            },
-            "Retención de impuestos 100%": {
-                "children": ["ITBMS 7% (Operaciones con Retención)", "ITBMS 100% (Operaciones con Retención)"],
-                "invoice_label": "ITBMS 7% (Operaciones con Retención)" # same label according to sheet
-            },
-            "Exento de Impuestos 100%": {
-                "children": ["ITBMS 0% (Operacion Exento de Impuesto)"],
-                "invoice_label": "ITBMS 7% (Operaciones con Exento)" # Requested from sheet
+            created_base_taxes = {}
+            for b_name, b_data in base_taxes_data.items():
+                tax = Tax.search([
+                    ("company_id", "=", company.id),
+                    ("type_tax_use", "=", "sale"),
+                    ("name", "=", b_name),
+                ], limit=1)
+            
+                vals = {
+                    "name": b_name,
+                    "type_tax_use": "sale",
+                    "amount_type": "percent",
+                    "amount": b_data["amount"],
+                    "description": b_data["description"],
+                    "tax_group_id": group.id,
+                    "country_id": country.id,
+                    "company_id": company.id,
+                    "price_include": False,
+                    "include_base_amount": False,
+                    "is_base_affected": b_data["is_base_affected"],
+                    "invoice_label": b_data["invoice_label"],
+                }
+                vals = safe_tax_vals(vals)
+
+                if not tax:
+                    tax = Tax.create(vals)
+                    print(f"  [CREATE] Base Tax: '{b_name}'")
+                else:
+                    # Only the values that differ, so a second run writes nothing
+                    changes = changed_vals(tax, vals)
+                    if changes:
+                        tax.write(changes)
+                        print(f"  [UPDATE] Base Tax: '{b_name}'")
+                created_base_taxes[b_name] = tax
+
+
+            # ---------------------------------------------------------------------
+            # Paso 3. Creación de Objetos Grupo de Impuestos (Objects with children)
+            # ---------------------------------------------------------------------
+            group_taxes_data = {
+                "Retención de impuestos 50%": {
+                    "children": ["ITBMS 7% (Operaciones con Retención)", "ITBMS 50% (Operaciones con Retención)"],
+                    "invoice_label": "ITBMS 7% (Operaciones con Retención)"
+                },
+                "Retención de impuestos 100%": {
+                    "children": ["ITBMS 7% (Operaciones con Retención)", "ITBMS 100% (Operaciones con Retención)"],
+                    "invoice_label": "ITBMS 7% (Operaciones con Retención)" # same label according to sheet
+                },
+                "Exento de Impuestos 100%": {
+                    "children": ["ITBMS 0% (Operacion Exento de Impuesto)"],
+                    "invoice_label": "ITBMS 7% (Operaciones con Exento)" # Requested from sheet
+                }
             }
-        }
         
-        main_tax_50 = None
+            main_tax_50 = None
 
-        for g_name, g_data in group_taxes_data.items():
-            g_tax = Tax.search([
-                ("company_id", "=", company.id),
-                ("country_id", "=", country.id),
-                ("name", "=", g_name),
-                ("type_tax_use", "=", "sale"),
-            ], limit=1)
+            for g_name, g_data in group_taxes_data.items():
+                g_tax = Tax.search([
+                    ("company_id", "=", company.id),
+                    ("country_id", "=", country.id),
+                    ("name", "=", g_name),
+                    ("type_tax_use", "=", "sale"),
+                ], limit=1)
 
-            child_ids = [created_base_taxes[c_name].id for c_name in g_data["children"]]
-
-            vals = {
-                "name": g_name,
-                "type_tax_use": "sale",
-                "amount_type": "group",
-                "company_id": company.id,
-                "country_id": country.id,
-                "tax_group_id": group.id,
-                "children_tax_ids": [(6, 0, child_ids)],
-                "description": False,
-                "invoice_label": g_data["invoice_label"],
-            }
-            vals = safe_tax_vals(vals)
+                child_ids = [created_base_taxes[c_name].id for c_name in g_data["children"]]
 
-            if not g_tax:
-                g_tax = Tax.create(vals)
-                print(f"  [CREATE] Group Tax Container: '{g_name}'")
-            else:
-                g_tax.write(vals)
-                print(f"  [UPDATE] Group Tax Container: '{g_name}'")
+                vals = {
+                    "name": g_name,
+                    "type_tax_use": "sale",
+                    "amount_type": "group",
+                    "company_id": company.id,
+                    "country_id": country.id,
+                    "tax_group_id": group.id,
+                    "children_tax_ids": [(6, 0, child_ids)],
+                    "description": False,
+                    "invoice_label": g_data["invoice_label"],
+                }
+                vals = safe_tax_vals(vals)
+
+                if not g_tax:
+                    g_tax = Tax.create(vals)
+                    print(f"  [CREATE] Group Tax Container: '{g_name}'")
+                else:
+                    # Only the values that differ, so a second run writes nothing
+                    changes = changed_vals(g_tax, vals)
+                    if changes:
+                        g_tax.write(changes)
+                        print(f"  [UPDATE] Group Tax Container: '{g_name}'")
             
-            if g_name == "Retención de impuestos 50%":
-                main_tax_50 = g_tax
-
-
-        # ---------------------------------------------------------------------
-        # 4) Fiscal position "Retención de impuestos"
-        # ---------------------------------------------------------------------
-        fp = FiscalPosition.search([
-            ("company_id", "=", company.id),
-            ("name", "=", FP_NAME),
-        ], limit=1)
-        if not fp:
-            print(f"  [ERROR] Fiscal position '{FP_NAME}' not found. Run set_fiscal_position_retencion.py first.", file=sys.stderr)
-            fp = FiscalPosition.create({
-                "name": FP_NAME,
-                "company_id": company.id,
-                "country_id": country.id,
-                "auto_apply": False,
-            })
-            print(f"  [CREATE] Fiscal position '{FP_NAME}' (fallback created)")
-
-        # Map 0% base tax to our 50% Group Tax Default
-        tax_0_sale = Tax.search([
-            ("company_id", "=", company.id),
-            ("country_id", "=", country.id),
-            ("type_tax_use", "=", "sale"),
-            ("amount", "=", 0.0),
-            ("amount_type", "=", "percent"),
-        ], limit=1)
-        
-        if not tax_0_sale:
+                if g_name == "Retención de impuestos 50%":
+                    main_tax_50 = g_tax
+
+
+            # ---------------------------------------------------------------------
+            # 4) Fiscal position "Retención de impuestos"
+            # ---------------------------------------------------------------------
+            fp = FiscalPosition.search([
+                ("company_id", "=", company.id),
+                ("name", "=", FP_NAME),
+            ], limit=1)
+            if not fp:
+                print(f"  [ERROR] Fiscal position '{FP_NAME}' not found. Run set_fiscal_position_retencion.py first.", file=sys.stderr)
+                fp = FiscalPosition.create({
+                    "name": FP_NAME,
+                    "company_id": company.id,
+                    "country_id": country.id,
+                    "auto_apply": False,
+                })
+                print(f"  [CREATE] Fiscal position '{FP_NAME}' (fallback created)")
+
+            # Map 0% base tax to our 50% Group Tax Default
             tax_0_sale = Tax.search([
                 ("company_id", "=", company.id),
+                ("country_id", "=", country.id),
                 ("type_tax_use", "=", "sale"),
-                "|",
-                ("name", "ilike", "Exento"),
-                ("name", "=", "0%"),
+                ("amount", "=", 0.0),
+                ("amount_type", "=", "percent"),
             ], limit=1)
+        
+            if not tax_0_sale:
+                tax_0_sale = Tax.search([
+                    ("company_id", "=", company.id),
+                    ("type_tax_use", "=", "sale"),
+                    "|",
+                    ("name", "ilike", "Exento"),
+                    ("name", "=", "0%"),
+                ], limit=1)
 
-        if not tax_0_sale:
-            print(f"  [ERROR] source 0% sale tax not found. Cannot set mapping.", file=sys.stderr)
-        elif main_tax_50:
-            print(f"  [MAPPING] Configuring {main_tax_50.name} to replace {tax_0_sale.name} when '{fp.name}' is applied...")
+            if not tax_0_sale:
+                print(f"  [ERROR] source 0% sale tax not found. Cannot set mapping.", file=sys.stderr)
+            elif main_tax_50:
+                print(f"  [MAPPING] Configuring {main_tax_50.name} to replace {tax_0_sale.name} when '{fp.name}' is applied...")
             
-            if tax_0_sale.id not in main_tax_50.original_tax_ids.ids:
-                main_tax_50.write({"original_tax_ids": [(4, tax_0_sale.id)]})
-                print(f"    - Added {tax_0_sale.name} to replaced taxes (original_tax_ids)")
+                if tax_0_sale.id not in main_tax_50.original_tax_ids.ids:
+                    main_tax_50.write({"original_tax_ids": [(4, tax_0_sale.id)]})
+                    print(f"    - Added {tax_0_sale.name} to replaced taxes (original_tax_ids)")
             
-            if fp.id not in main_tax_50.fiscal_position_ids.ids:
-                main_tax_50.write({"fiscal_position_ids": [(4, fp.id)]})
-                print(f"    - Added {fp.name} to linked fiscal positions (fiscal_position_ids)")
+                if fp.id not in main_tax_50.fiscal_position_ids.ids:
+                    main_tax_50.write({"fiscal_position_ids": [(4, fp.id)]})
+                    print(f"    - Added {fp.name} to linked fiscal positions (fiscal_position_ids)")
             
-            print(f"  [MAPPING] Complete: {tax_0_sale.name} -> {main_tax_50.name} in '{fp.name}'")
+                print(f"  [MAPPING] Complete: {tax_0_sale.name} -> {main_tax_50.name} in '{fp.name}'")
 
-    cr.commit()
+    if progress.finish():
+        sys.exit(1)
     print("Done.")
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Summarize and export a provisioning timeline written by install.sh (install/lib/timeline.sh).
+
+The timeline is a JSON-lines file of begin/end events (one file per run, default directory
+/var/log/odoo-install). This script pairs the events into spans (steps and their sub-phases) and:
+
+  - prints the steps with their duration, the slowest phases and the time per kind of work
+    (apt, git, pip, Odoo module install, configuration scripts, certbot);
+  - --json FILE          writes the normalized timeline (meta + spans) as JSON;
+  - --chrome-trace FILE  writes a Chrome trace (chrome://tracing, https://ui.perfetto.dev);
+  - --gantt FILE         writes a Mermaid Gantt chart (renders on GitHub / in Markdown);
+  - --compare OTHER      compares steps and phases with another run (.jsonl or --json output),
+                         e.g. the same release on another host, or the previous release.
+
+Examples:
+  timeline_report.py                                   # latest run in /var/log/odoo-install
+  timeline_report.py run.jsonl --chrome-trace run.trace.json --gantt run.mmd
+  timeline_report.py new.jsonl --compare old.json
+
+Standard library only; runs with the system python3.
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+
+DEFAULT_DIR = "/var/log/odoo-install"
+
+# Kind of work, matched against phase names (first match wins)
+BUCKETS = [
+    ("apt", re.compile(r"\bapt(-get)?\b|dpkg", re.I)),
+    ("git", re.compile(r"\bgit\b", re.I)),
+    ("pip / venv", re.compile(r"\bpip\b|venv", re.I)),
+    ("Odoo module install", re.compile(r"odoo-bin", re.I)),
+    ("Odoo config scripts", re.compile(r"\.py$")),
+    ("certbot", re.compile(r"certbot", re.I)),
+]
+
+
+def load_events(path: str) -> tuple[dict, list[dict]]:
+    meta, events = {}, []
+    with open(path, encoding="utf-8") as fh:
+        for lineno, line in enumerate(fh, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                event = json.loads(line)
+            except ValueError:
+                print(f"WARNING: {path}:{lineno}: invalid JSON line skipped", file=sys.stderr)
+                continue
+            if event.get("ph") == "M":
+                meta.update({k: v for k, v in event.items() if k not in ("ph", "ts")})
+                meta.setdefault("started_us", event.get("ts"))
+            else:
+                events.append(event)
+    events.sort(key=lambda e: e.get("ts", 0))
+    return meta, events
+
+
+def build_spans(events: list[dict]) -> list[dict]:
+    """Pair B/E events into spans. Spans left open (failed step) end at the next event of their step."""
+    if not events:
+        return []
+    origin = events[0]["ts"]
+    stacks: dict[str, list[dict]] = {}
+    spans: list[dict] = []
+
+    def close(span: dict, ts: int, status) -> None:
+        span["end_s"] = round((ts - origin) / 1e6, 3)
+        span["dur_s"] = round(span["end_s"] - span["start_s"], 3)
+        span["status"] = status
+        spans.append(span)
+
+    for e in events:
+        stack = stacks.setdefault(e.get("step", ""), [])
+        if e["ph"] == "B":
+            stack.append({
+                "name": e["name"], "cat": e.get("cat", "phase"), "step": e.get("step", ""),
+                "start_s": round((e["ts"] - origin) / 1e6, 3), "depth": len(stack),
+            })
+        elif e["ph"] == "E":
+            if not any(s["name"] == e["name"] for s in stack):
+                continue
+            while stack:
+                span = stack.pop()
+                if span["name"] == e["name"]:
+                    close(span, e["ts"], e.get("status", 0))
+                    break
+                close(span, e["ts"], "unfinished")
+
+    last_ts = events[-1]["ts"]
+    for stack in stacks.values():
+        while stack:
+            close(stack.pop(), last_ts, "unfinished")
+    spans.sort(key=lambda s: (s["start_s"], s["depth"]))
+    return spans
+
+
+def assign_lanes(spans: list[dict]) -> None:
+    """Give every step a lane (first free one), so steps running in parallel get their own row."""
+    lane_free_at: list[float] = []
+    lanes: dict[str, int] = {}
+    for span in spans:
+        if span["cat"] != "step":
+            continue
+        for lane, free_at in enumerate(lane_free_at):
+            if free_at <= span["start_s"]:
+                break
+        else:
+            lane = len(lane_free_at)
+            lane_free_at.append(0.0)
+        lane_free_at[lane] = span["end_s"]
+        lanes[span["step"]] = lane
+    for span in spans:
+        span["lane"] = lanes.get(span["step"], 0)
+
+
+def load_run(path: str) -> dict:
+    """Load a run from the raw .jsonl or from the --json export."""
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as fh:
+            run = json.load(fh)
+        run.setdefault("source", path)
+        return run
+    meta, events = load_events(path)
+    spans = build_spans(events)
+    assign_lanes(spans)
+    total = max((s["end_s"] for s in spans), default=0.0)
+    return {"source": path, "meta": meta, "total_s": total, "spans": spans}
+
+
+def fmt_s(seconds: float) -> str:
+    seconds = float(seconds)
+    if seconds >= 60:
+        return f"{int(seconds // 60)}m{seconds % 60:04.1f}s"
+    return f"{seconds:.1f}s"
+
+
+def status_label(status) -> str:
+    return "ok" if status == 0 else ("unfinished" if status == "unfinished" else f"exit {status}")
+
+
+def bucket_totals(run: dict) -> list[tuple[str, float]]:
+    totals = {name: 0.0 for name, _ in BUCKETS}
+    for span in run["spans"]:
+        if span["cat"] == "step" or span["depth"] != 1:
+            continue
+        for name, pattern in BUCKETS:
+            if pattern.search(span["name"]):
+                totals[name] += span["dur_s"]
+                break
+    return [(name, round(total, 3)) for name, total in totals.items()]
+
+
+def print_summary(run: dict, top: int) -> None:
+    meta, spans, total = run["meta"], run["spans"], run["total_s"] or 1e-9
+    print("=== PROVISIONING TIMELINE ===")
+    if meta:
+        print(f"Run {meta.get('run', '?')} on {meta.get('host', '?')} ({meta.get('os', '?')}, "
+              f"{meta.get('cpus', '?')} CPU, {meta.get('mem_mb', '?')} MB) - Odoo {meta.get('odoo_version', '?')}, "
+              f"repo {meta.get('repo_rev', '?')}")
+    print(f"Total: {fmt_s(run['total_s'])}")
+    print()
+    print(f"{'Step':<50} | {'Duration':>10} | {'Share':>6} | Status")
+    print("-" * 84)
+    for span in (s for s in spans if s["cat"] == "step"):
+        print(f"{span['name'][:50]:<50} | {fmt_s(span['dur_s']):>10} | {100 * span['dur_s'] / total:>5.1f}% | "
+              f"{status_label(span['status'])}")
+
+    phases = sorted((s for s in spans if s["cat"] != "step"), key=lambda s: s["dur_s"], reverse=True)[:top]
+    if phases:
+        print()
+        print(f"Slowest {len(phases)} phase(s):")
+        print(f"{'Phase':<45} | {'Step':<28} | {'Duration':>10} | {'Share':>6}")
+        print("-" * 98)
+        for span in phases:
+            print(f"{span['name'][:45]:<45} | {span['step'][:28]:<28} | {fmt_s(span['dur_s']):>10} | "
+                  f"{100 * span['dur_s'] / total:>5.1f}%")
+
+    buckets = bucket_totals(run)
+    tracked = sum(t for _, t in buckets)
+    print()
+    print("Time by kind of work:")
+    for name, seconds in buckets + [("other (not in a phase)", max(run["total_s"] - tracked, 0.0))]:
+        print(f"  {name:<26} {fmt_s(seconds):>10}  {100 * seconds / total:>5.1f}%")
+    print("=============================")
+
+
+def chrome_trace(run: dict) -> dict:
+    events = []
+    for span in run["spans"]:
+        events.append({
+            "name": span["name"], "cat": span["cat"], "ph": "X",
+            "ts": int(span["start_s"] * 1e6), "dur": int(span["dur_s"] * 1e6),
+            "pid": 1, "tid": span.get("lane", 0) + 1,
+            "args": {"step": span["step"], "status": span["status"]},
+        })
+    events.append({"name": "process_name", "ph": "M", "pid": 1,
+                   "args": {"name": f"install {run['meta'].get('run', '')}".strip()}})
+    return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": run["meta"]}
+
+
+def mermaid_gantt(run: dict) -> str:
+    def label(text: str) -> str:
+        return re.sub(r"[:#;]", " ", text).strip() or "?"
+
+    lines = ["gantt", f"    title Provisioning {label(run['meta'].get('run', ''))}",
+             "    dateFormat x", "    axisFormat %H:%M:%S"]
+    for i, step in enumerate(s for s in run["spans"] if s["cat"] == "step"):
+        lines.append(f"    section {label(step['name'])}")
+        members = [step] + [s for s in run["spans"] if s["cat"] != "step" and s["step"] == step["step"]
+                            and step["start_s"] <= s["start_s"] <= step["end_s"]]
+        for j, span in enumerate(members):
+            tag = "crit, " if span["status"] != 0 else ("active, " if span is step else "")
+            start_ms = int(span["start_s"] * 1000)
+            end_ms = max(int(span["end_s"] * 1000), start_ms + 1)
+            lines.append(f"    {label(span['name'])} ({fmt_s(span['dur_s'])}) :{tag}t{i}_{j}, {start_ms}, {end_ms}")
+    return "\n".join(lines) + "\n"
+
+
+def print_compare(run: dict, other: dict, top: int) -> None:
+    def durations(r: dict, cat: str) -> dict[str, float]:
+        out: dict[str, float] = {}
+        for span in r["spans"]:
+            if (span["cat"] == "step") == (cat == "step"):
+                key = span["name"] if cat == "step" else f"{span['step']}: {span['name']}"
+                out[key] = out.get(key, 0.0) + span["dur_s"]
+        return out
+
+    a_label = other["meta"].get("run") or os.path.basename(other["source"])
+    b_label = run["meta"].get("run") or os.path.basename(run["source"])
+    print()
+    print(f"=== COMPARE: A = {a_label} ({other['meta'].get('host', '?')})  vs  B = {b_label} "
+          f"({run['meta'].get('host', '?')}) ===")
+    for cat, title in (("step", "Step"), ("phase", "Phase")):
+        a, b = durations(other, cat), durations(run, cat)
+        keys = sorted(set(a) | set(b), key=lambda k: abs(b.get(k, 0.0) - a.get(k, 0.0)), reverse=True)
+        if cat == "phase":
+            keys = keys[:top]
+        print(f"{title:<55} | {'A':>9} | {'B':>9} | {'Delta':>9} | {'Change':>7}")
+        print("-" * 101)
+        for k in keys:
+            da, db = a.get(k), b.get(k)
+            change = f"{100 * (db - da) / da:+6.0f}%" if da and db is not None else "    n/a"
+            print(f"{k[:55]:<55} | {fmt_s(da) if da is not None else '-':>9} | "
+                  f"{fmt_s(db) if db is not None else '-':>9} | "
+                  f"{((db or 0.0) - (da or 0.0)):>+8.1f}s | {change:>7}")
+        print()
+    delta = run["total_s"] - other["total_s"]
+    print(f"Total: A {fmt_s(other['total_s'])}  B {fmt_s(run['total_s'])}  ({delta:+.1f}s)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("timeline", nargs="?", help=f"timeline .jsonl or .json (default: latest in {DEFAULT_DIR})")
+    parser.add_argument("--top", type=int, default=10, help="number of slowest phases to show (default 10)")
+    parser.add_argument("--json", metavar="FILE", help="write the normalized timeline (meta + spans)")
+    parser.add_argument("--chrome-trace", metavar="FILE", help="write a Chrome trace event file")
+    parser.add_argument("--gantt", metavar="FILE", help="write a Mermaid Gantt chart")
+    parser.add_argument("--compare", metavar="OTHER", help="compare with another run (.jsonl or .json)")
+    args = parser.parse_args()
+
+    path = args.timeline
+    if not path:
+        candidates = sorted(glob.glob(os.path.join(DEFAULT_DIR, "timeline-*.jsonl")), key=os.path.getmtime)
+        if not candidates:
+            print(f"ERROR: no timeline-*.jsonl in {DEFAULT_DIR}", file=sys.stderr)
+            return 1
+        path = candidates[-1]
+
+    run = load_run(path)
+    if not run["spans"]:
+        print(f"No events in {path}.")
+        return 0
+    print_summary(run, args.top)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({k: run[k] for k in ("meta", "total_s", "spans")}, fh, indent=2)
+        print(f"Timeline JSON: {args.json}")
+    if args.chrome_trace:
+        with open(args.chrome_trace, "w", encoding="utf-8") as fh:
+            json.dump(chrome_trace(run), fh)
+        print(f"Chrome trace: {args.chrome_trace}")
+    if args.gantt:
+        with open(args.gantt, "w", encoding="utf-8") as fh:
+            fh.write(mermaid_gantt(run))
+        print(f"Mermaid Gantt: {args.gantt}")
+    if args.compare:
+        print_compare(run, load_run(args.compare), args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
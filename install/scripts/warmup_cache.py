@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Warm up Odoo caches right after the service starts (asset bundles, QWeb/views, ORM caches).
+
+1. Wait until /web/health answers (service ready).
+2. Log in through JSON-RPC (/web/session/authenticate) with ODOO_WARMUP_LOGIN / ODOO_WARMUP_PASSWORD.
+3. Hit the web client, its backend asset bundles, menus/translations, and a representative set
+   of list/kanban/form views: Contacts kanban (set by set_contacts_default_view_kanban.py),
+   customer invoice form, sales, products.
+4. Request every URL twice and report the cold (first) and warm (second) latency.
+
+If login fails (e.g. the admin password was changed), only the anonymous pages are warmed.
+Standard library only; runs with the system python3. Uses env: DB_NAME, ODOO_WARMUP_URL
+(default http://127.0.0.1:8069), ODOO_WARMUP_LOGIN (admin), ODOO_WARMUP_PASSWORD (admin),
+ODOO_WARMUP_TIMEOUT (readiness wait in seconds, default 180), ODOO_LANG (default es_PA),
+ODOO_WARMUP_HOST (Host header; needed in tenant mode, where the dbfilter uses the hostname).
+"""
+from __future__ import annotations
+
+import argparse
+import http.cookiejar
+import json
+import os
+import re
+import sys
+import time
+import urllib.error
+import urllib.request
+
+ASSET_RE = re.compile(r"""(?:src|href)=["'](/web/assets/[^"']+)["']""")
+
+# (label, model, views, context) -- get_views compiles the arch of every view type listed
+VIEW_TARGETS = [
+    ("Contacts (kanban/list/form)", "res.partner",
+     [[False, "kanban"], [False, "list"], [False, "form"], [False, "search"]], {}),
+    ("Customer invoice form", "account.move",
+     [[False, "list"], [False, "form"], [False, "search"]], {"default_move_type": "out_invoice"}),
+    ("Sales orders", "sale.order",
+     [[False, "list"], [False, "form"], [False, "search"]], {}),
+    ("Products", "product.template",
+     [[False, "kanban"], [False, "list"], [False, "form"], [False, "search"]], {}),
+]
+
+# (label, model, fields) -- first page of records, as the web client loads it
+SEARCH_READ_TARGETS = [
+    ("Contacts kanban records", "res.partner", ["display_name", "email", "phone", "category_id"]),
+    ("Customer invoices records", "account.move", ["name", "partner_id", "invoice_date", "amount_total", "state"]),
+]
+
+ACTION_TARGETS = [
+    ("Contacts action", "contacts.action_contacts"),
+    ("Invoices action", "account.action_move_out_invoice_type"),
+]
+
+
+class Client:
+    """Minimal cookie-aware HTTP client for Odoo's web and JSON-RPC routes."""
+
+    def __init__(self, base_url: str, timeout: float = 120.0, host: str = ""):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.headers = {"Host": host} if host else {}
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+        )
+
+    def get(self, path: str) -> tuple[int, bytes]:
+        req = urllib.request.Request(self.base_url + path, headers=self.headers)
+        return self._open(req)
+
+    def jsonrpc(self, path: str, params: dict) -> tuple[int, dict]:
+        body = json.dumps({"jsonrpc": "2.0", "method": "call", "id": 1, "params": params}).encode()
+        req = urllib.request.Request(
+            self.base_url + path, data=body, headers={"Content-Type": "application/json", **self.headers}
+        )
+        status, raw = self._open(req)
+        try:
+            payload = json.loads(raw or b"{}")
+        except ValueError:
+            payload = {"error": {"message": raw[:200].decode(errors="replace")}}
+        if status == 200 and payload.get("error"):
+            status = 500
+        return status, payload
+
+    def _open(self, req: urllib.request.Request) -> tuple[int, bytes]:
+        try:
+            with self.opener.open(req, timeout=self.timeout) as resp:
+                return resp.status, resp.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+        except (urllib.error.URLError, OSError):
+            return 0, b""
+
+
+def wait_ready(client: Client, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status, _ = client.get("/web/health")
+        if status == 200:
+            return True
+        time.sleep(2)
+    return False
+
+
+def timed(fn) -> tuple[int, float]:
+    start = time.perf_counter()
+    status = fn()
+    return status, (time.perf_counter() - start) * 1000.0
+
+
+def call_kw(client: Client, model: str, method: str, args: list, kwargs: dict) -> int:
+    status, _ = client.jsonrpc(
+        f"/web/dataset/call_kw/{model}/{method}",
+        {"model": model, "method": method, "args": args, "kwargs": kwargs},
+    )
+    return status
+
+
+def measure(targets: list[tuple[str, object]]) -> list[dict]:
+    """Call every target twice: first call = cold latency, second call = warm latency."""
+    results = []
+    for label, fn in targets:
+        status, cold_ms = timed(fn)
+        _, warm_ms = timed(fn)
+        results.append({"target": label, "status": status, "cold_ms": round(cold_ms, 1), "warm_ms": round(warm_ms, 1)})
+    return results
+
+
+def backend_targets(client: Client, lang: str, webclient_page: bytes) -> list[tuple[str, object]]:
+    """Targets that need a session: asset bundles, menus, translations, actions, views, records."""
+    targets: list[tuple[str, object]] = []
+
+    # Backend asset bundles referenced by the web client page (hash-versioned URLs)
+    for asset in sorted(set(ASSET_RE.findall(webclient_page.decode(errors="replace")))):
+        targets.append((asset, lambda a=asset: client.get(a)[0]))
+
+    _, info = client.jsonrpc("/web/session/get_session_info", {})
+    hashes = (info.get("result") or {}).get("cache_hashes") or {}
+    if hashes.get("load_menus"):
+        path = f"/web/webclient/load_menus/{hashes['load_menus']}"
+        targets.append(("Menus", lambda p=path: client.get(p)[0]))
+    if hashes.get("translations"):
+        path = f"/web/webclient/translations/{hashes['translations']}?lang={lang}"
+        targets.append(("Translations", lambda p=path: client.get(p)[0]))
+
+    for label, xmlid in ACTION_TARGETS:
+        targets.append((label, lambda x=xmlid: client.jsonrpc("/web/action/load", {"action_id": x})[0]))
+
+    for label, model, views, context in VIEW_TARGETS:
+        kwargs = {"views": views, "options": {"load_filters": True, "toolbar": True}, "context": context}
+        targets.append((f"{label} views", lambda m=model, k=kwargs: call_kw(client, m, "get_views", [], k)))
+
+    for label, model, fields in SEARCH_READ_TARGETS:
+        kwargs = {"specification": {f: {} for f in fields}, "domain": [], "limit": 80}
+        targets.append((label, lambda m=model, k=kwargs: call_kw(client, m, "web_search_read", [], k)))
+
+    return targets
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Warm up Odoo caches and report cold/warm latency.")
+    parser.add_argument("--url", default=os.environ.get("ODOO_WARMUP_URL", "http://127.0.0.1:8069"))
+    parser.add_argument("--host", default=os.environ.get("ODOO_WARMUP_HOST", ""),
+                        help="Host header (tenant mode: the tenant's domain)")
+    parser.add_argument("--db", default=os.environ.get("DB_NAME", ""))
+    parser.add_argument("--login", default=os.environ.get("ODOO_WARMUP_LOGIN", "admin"))
+    parser.add_argument("--password", default=os.environ.get("ODOO_WARMUP_PASSWORD", "admin"))
+    parser.add_argument("--lang", default=os.environ.get("ODOO_LANG", "es_PA"))
+    parser.add_argument("--timeout", type=float, default=float(os.environ.get("ODOO_WARMUP_TIMEOUT", "180")),
+                        help="seconds to wait for /web/health")
+    parser.add_argument("--json", metavar="FILE", help="also write results as JSON to FILE")
+    args = parser.parse_args()
+
+    client = Client(args.url, host=args.host)
+    print(f"Waiting for Odoo at {args.url} (max {int(args.timeout)}s)...")
+    if not wait_ready(client, args.timeout):
+        print(f"ERROR: Odoo did not become ready at {args.url}/web/health", file=sys.stderr)
+        return 1
+
+    authenticated = False
+    if args.db:
+        status, payload = client.jsonrpc(
+            "/web/session/authenticate",
+            {"db": args.db, "login": args.login, "password": args.password},
+        )
+        authenticated = status == 200 and bool((payload.get("result") or {}).get("uid"))
+    if not authenticated:
+        print(f"WARNING: could not log in as '{args.login}' on '{args.db}'; warming anonymous pages only.",
+              file=sys.stderr)
+
+    results = measure([("/web/login", lambda: client.get("/web/login")[0])])
+    if authenticated:
+        # The web client page is measured first so its cold latency includes the bundle lookups
+        page = {}
+
+        def webclient() -> int:
+            status, page["body"] = client.get("/web")
+            return status
+
+        results += measure([("/web (web client)", webclient)])
+        results += measure(backend_targets(client, args.lang, page.get("body", b"")))
+
+    print()
+    print(f"{'Target':<60} | {'Status':>6} | {'Cold ms':>9} | {'Warm ms':>9}")
+    print("-" * 94)
+    for r in results:
+        print(f"{r['target'][:60]:<60} | {r['status']:>6} | {r['cold_ms']:>9.1f} | {r['warm_ms']:>9.1f}")
+    total_cold = sum(r["cold_ms"] for r in results)
+    total_warm = sum(r["warm_ms"] for r in results)
+    print("-" * 94)
+    print(f"{'Total':<60} | {'':>6} | {total_cold:>9.1f} | {total_warm:>9.1f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({"url": args.url, "db": args.db, "authenticated": authenticated, "results": results}, fh, indent=2)
+
+    failed = [r for r in results if r["status"] != 200]
+    if failed:
+        print(f"WARNING: {len(failed)} target(s) did not answer 200 (module not installed or access denied).",
+              file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -25,6 +25,16 @@ else
   echo "❌ $SERVICE is NOT running"
   echo "   Check: sudo journalctl -u $SERVICE -n 200 --no-pager"
 fi
+if systemctl cat "$SERVICE-cron.service" >/dev/null 2>&1; then
+  if systemctl is-active --quiet "$SERVICE-cron"; then
+    echo "✅ $SERVICE-cron is running (scheduled actions, slice $SERVICE-cron.slice)"
+  else
+    echo "❌ $SERVICE-cron is NOT running: scheduled actions are not executed"
+    echo "   Check: sudo journalctl -u $SERVICE-cron -n 200 --no-pager"
+  fi
+fi
+MEM_MAX="$(systemctl show -p MemoryMax --value "$SERVICE" 2>/dev/null || true)"
+[[ -n "$MEM_MAX" && "$MEM_MAX" != "infinity" ]] && echo "   MemoryMax $((MEM_MAX / 1024 / 1024)) MB, LimitNOFILE $(systemctl show -p LimitNOFILE --value "$SERVICE")"
 
 echo ""
 echo "2) wkhtmltopdf version:"
@@ -122,6 +132,67 @@ else
   echo "   Check your odoo config python3= setting in $CONF"
 fi
 
+echo ""
+echo "9) PostgreSQL read replica (db_replica_host / db_replica_port):"
+REPLICA_HOST="$(grep -E '^\s*db_replica_host\s*=' "$CONF" 2>/dev/null | cut -d'=' -f2 | xargs || true)"
+REPLICA_PORT="$(grep -E '^\s*db_replica_port\s*=' "$CONF" 2>/dev/null | cut -d'=' -f2 | xargs || true)"
+MAX_LAG_BYTES="${ODOO_PG_REPLICA_MAX_LAG_BYTES:-16777216}"
+if [ -z "$REPLICA_HOST" ] || [ "$REPLICA_HOST" = "False" ]; then
+  echo "No replica configured (opt-in: ODOO_PG_REPLICA=1)"
+else
+  echo "Replica: $REPLICA_HOST:${REPLICA_PORT:-5432}"
+  # Primary side: one row per connected standby (lag = WAL not yet replayed)
+  REPL_ROWS="$(sudo -u postgres psql -tA -F ' ' -c "SELECT application_name, state, COALESCE(pg_wal_lsn_diff(pg_current_wal_lsn(), replay_lsn)::bigint, 0), COALESCE(replay_lag::text, '-') FROM pg_stat_replication" 2>/dev/null || true)"
+  if [ -z "$REPL_ROWS" ]; then
+    echo "❌ No standby connected to the primary (pg_stat_replication is empty)"
+  else
+    while read -r APP STATE LAG_BYTES LAG_TIME; do
+      if [ "${LAG_BYTES:-0}" -le "$MAX_LAG_BYTES" ] 2>/dev/null; then
+        echo "✅ $APP: $STATE, replay lag $LAG_BYTES bytes ($LAG_TIME)"
+      else
+        echo "⚠️ $APP: $STATE, replay lag $LAG_BYTES bytes ($LAG_TIME) > $MAX_LAG_BYTES"
+      fi
+    done <<< "$REPL_ROWS"
+  fi
+  # Slot: WAL the primary keeps for the replica (grows if the replica is down)
+  SLOT_ROWS="$(sudo -u postgres psql -tA -F ' ' -c "SELECT slot_name, active, pg_size_pretty(pg_wal_lsn_diff(pg_current_wal_lsn(), restart_lsn)) FROM pg_replication_slots WHERE slot_type = 'physical'" 2>/dev/null || true)"
+  if [ -n "$SLOT_ROWS" ]; then
+    while read -r SLOT ACTIVE RETAINED; do
+      if [ "$ACTIVE" = "t" ]; then
+        echo "✅ Slot $SLOT active, WAL retained: $RETAINED"
+      else
+        echo "⚠️ Slot $SLOT inactive, WAL retained: $RETAINED (disk grows until the replica reconnects)"
+      fi
+    done <<< "$SLOT_ROWS"
+  fi
+  # Replica side (local socket replicas only): time since the last replayed transaction
+  if [ "${REPLICA_HOST#/}" != "$REPLICA_HOST" ]; then
+    REPLAY="$(sudo -u postgres psql -p "${REPLICA_PORT:-5432}" -tA -F ' ' -c "SELECT pg_is_in_recovery(), COALESCE((now() - pg_last_xact_replay_timestamp())::text, '-')" 2>/dev/null || true)"
+    if [ "${REPLAY%% *}" = "t" ]; then
+      echo "✅ Replica in recovery; last replayed transaction: ${REPLAY#* } ago (grows while the primary is idle)"
+    else
+      echo "❌ Replica on port ${REPLICA_PORT:-5432} not reachable or not in recovery"
+      echo "   Check: sudo pg_lsclusters"
+    fi
+  fi
+fi
+
+echo ""
+echo "10) PostgreSQL autovacuum and bloat (install/scripts/db_maintenance.py):"
+DB_REPORT_JSON="${ODOO_DB_REPORT_JSON:-/var/lib/odoo/db_maintenance.json}"
+DB_MAINTENANCE="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)/install/scripts/run_db_maintenance.sh"
+if bash "$DB_MAINTENANCE" report --json "$DB_REPORT_JSON"; then
+  echo "   JSON report: $DB_REPORT_JSON"
+else
+  echo "   JSON report: $DB_REPORT_JSON"
+  echo "   Fix: sudo -E bash install/scripts/run_db_maintenance.sh tune (settings) / reindex --dry-run (bloated indexes)"
+fi
+if systemctl cat "$SERVICE-db-maintenance.timer" >/dev/null 2>&1; then
+  echo "   Reindex timer: $(systemctl show -p NextElapseUSecRealtime --value "$SERVICE-db-maintenance.timer") (next run)"
+else
+  echo "⚠️ $SERVICE-db-maintenance.timer not installed (ODOO_DB_MAINTENANCE=0?)"
+fi
+
 echo ""
 echo "==================================="
 echo " ✅ Health check finished"
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+SQL query budgets and idempotency of the configuration scripts (install/scripts/set_*.py).
+
+Creates a disposable database (ODOO_TEST_DB, default script_budget_test) with the modules step 09
+installs and a second Panama company, then runs every script twice, in the order of
+install/09_init_database.sh, with ODOO_SCRIPT_QUERY_LOG (see scriptlib/querylog.py). For each
+script it checks that:
+
+  - both runs exit 0;
+  - the statements outside the per-company units and the statements of each company stay within
+    the budget declared in STEPS, so a change that turns O(companies) queries into
+    O(companies x records) fails here instead of on a large production database;
+  - the second run performs no write at all (no INSERT/UPDATE/DELETE changing a row).
+
+Run as the odoo user (it creates and drops the database) with the system python3, from the repo:
+
+    sudo -u odoo python3 -m unittest discover -s tests -v
+
+ODOO_TEST_HOME (/opt/odoo/odoo19), ODOO_TEST_CONF (/etc/odoo19.conf), ODOO_TEST_MODULES,
+ODOO_TEST_KEEP_DB=1 (keep the database afterwards, and reuse it when it exists), and
+ODOO_TEST_BUDGET_REPORT=1 (print the measured counts, to set or tighten a budget).
+The tests are skipped when Odoo is not installed.
+"""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(REPO_ROOT, "install", "scripts")
+
+ODOO_HOME = os.environ.get("ODOO_TEST_HOME", "/opt/odoo/odoo19")
+ODOO_CONF = os.environ.get("ODOO_TEST_CONF", "/etc/odoo19.conf")
+ODOO_PY = os.path.join(ODOO_HOME, "venv", "bin", "python3")
+ODOO_BIN = os.path.join(ODOO_HOME, "odoo", "odoo-bin")
+DB_NAME = os.environ.get("ODOO_TEST_DB", "script_budget_test")
+MODULES = os.environ.get("ODOO_TEST_MODULES", "l10n_pa,sale,purchase,crm,stock,contacts,account")
+KEEP_DB = os.environ.get("ODOO_TEST_KEEP_DB") == "1"
+REPORT = os.environ.get("ODOO_TEST_BUDGET_REPORT") == "1"
+
+# (script, statements outside the company units, statements per company unit or None)
+# Budgets cover the first run (creates everything); the second run must stay within them too.
+STEPS = [
+    ("set_default_country", 60, None),
+    ("set_default_taxes_pa", 40, 120),
+    ("set_itbms_taxes_pa", 40, 250),
+    ("set_default_sales_journal", 40, 120),
+    ("set_default_credit_notes_journal", 40, 120),
+    ("set_fiscal_position_exento", 40, 60),
+    ("set_fiscal_position_retencion", 40, 60),
+    ("set_tax_retencion_impuestos", 40, 400),
+    ("set_panama_states", 60, None),
+    ("set_payment_terms_pa", 120, None),
+    ("set_partner_tags", 80, None),        # SQL fast path; per-tag units only on the ORM fallback
+    ("set_contacts_default_view_kanban", 60, None),
+    ("set_sale_uom_packaging", 60, None),
+    ("set_default_products_pa", 40, 200),
+    ("set_default_paperformat", 60, None),
+]
+
+# Second company, so the per-company units are exercised more than once
+MAKE_SECOND_COMPANY = """
+import os, sys
+sys.path.insert(0, os.path.join(os.environ["ODOO_HOME"], "odoo"))
+import odoo
+from odoo import api
+odoo.tools.config.parse_config(["-c", os.environ["ODOO_CONF"]])
+from odoo.modules.registry import Registry
+with Registry(os.environ["DB_NAME"]).cursor() as cr:
+    env = api.Environment(cr, odoo.SUPERUSER_ID, {})
+    if not env["res.company"].search([("name", "=", "Budget Test 2")]):
+        pa = env.ref("base.pa")
+        company = env["res.company"].create({"name": "Budget Test 2", "country_id": pa.id})
+        chart = env["account.chart.template"]
+        if hasattr(chart, "try_loading"):
+            chart.try_loading("pa", company=company, install_demo=False)
+"""
+
+
+def _env(query_log: str | None = None) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "ODOO_HOME": ODOO_HOME,
+        "ODOO_CONF": ODOO_CONF,
+        "DB_NAME": DB_NAME,
+        "ODOO_COUNTRY_CODE": "PA",
+        "PYTHONDONTWRITEBYTECODE": "1",
+    })
+    env.pop("ODOO_SCRIPT_CHECKPOINT_RESET", None)
+    if query_log:
+        env["ODOO_SCRIPT_QUERY_LOG"] = query_log
+    return env
+
+
+def _db_exists() -> bool:
+    out = subprocess.run(["psql", "-d", "postgres", "-tAc", f"SELECT 1 FROM pg_database WHERE datname = '{DB_NAME}'"],
+                         capture_output=True, text=True)
+    return out.stdout.strip() == "1"
+
+
+@unittest.skipUnless(os.path.isfile(ODOO_BIN) and os.path.isfile(ODOO_CONF), "Odoo is not installed")
+class ConfigScriptBudgetTest(unittest.TestCase):
+    runs: dict[str, list[tuple[int, dict, str]]] = {}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp(prefix="script_budget_")
+        if not (KEEP_DB and _db_exists()):
+            subprocess.run(["dropdb", "--if-exists", DB_NAME], check=True)
+            subprocess.run(
+                [ODOO_PY, ODOO_BIN, "-c", ODOO_CONF, "-d", DB_NAME, "-i", MODULES,
+                 "--without-demo=all", "--stop-after-init", "--no-http"],
+                check=True, stdout=subprocess.DEVNULL, env=_env(),
+            )
+            subprocess.run([ODOO_PY, "-c", MAKE_SECOND_COMPANY], check=True, env=_env())
+
+        cls.runs = {script: [] for script, _, _ in STEPS}
+        for run in (1, 2):
+            for script, _, _ in STEPS:
+                log = os.path.join(cls.tmp, f"{script}.{run}.json")
+                proc = subprocess.run(
+                    [ODOO_PY, os.path.join(SCRIPTS_DIR, f"{script}.py")],
+                    capture_output=True, text=True, env=_env(log),
+                )
+                counts = {}
+                if os.path.exists(log):
+                    with open(log, encoding="utf-8") as fh:
+                        counts = json.load(fh)
+                cls.runs[script].append((proc.returncode, counts, proc.stdout + proc.stderr))
+                if REPORT:
+                    units = counts.get("units", {})
+                    print(f"run {run} {script}: {counts.get('queries')} statements, {counts.get('writes')} writes, "
+                          f"max per unit {max((u['queries'] for u in units.values()), default=0)}", file=sys.stderr)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+        if not KEEP_DB:
+            subprocess.run(["dropdb", "--if-exists", DB_NAME], check=False)
+
+    def check_step(self, script: str, setup_budget: int, unit_budget: int | None):
+        for run, (code, counts, output) in enumerate(self.runs[script], start=1):
+            with self.subTest(run=run):
+                self.assertEqual(code, 0, f"{script} run {run} failed:\n{output[-2000:]}")
+                self.assertTrue(counts, f"{script} run {run} wrote no query log (no schema.require() or refdata fast path?)")
+                units = counts["units"]
+                outside = counts["queries"] - sum(u["queries"] for u in units.values())
+                self.assertLessEqual(outside, setup_budget,
+                                     f"{script} run {run}: {outside} statements outside the units")
+                if unit_budget is not None:
+                    self.assertTrue(units, f"{script} run {run}: no unit ran (checkpoint units missing?)")
+                    for unit, unit_counts in units.items():
+                        self.assertLessEqual(unit_counts["queries"], unit_budget,
+                                             f"{script} run {run}: {unit_counts['queries']} statements in {unit}")
+        _, counts, _ = self.runs[script][1]
+        self.assertEqual(counts.get("writes"), 0,
+                         f"{script} is not idempotent, second run wrote:\n" + "\n".join(counts.get("write_samples", [])))
+
+
+def _make_test(script, setup_budget, unit_budget):
+    def test(self):
+        self.check_step(script, setup_budget, unit_budget)
+    test.__doc__ = f"{script}: query budget and idempotency"
+    return test
+
+
+for _index, (_script, _setup, _unit) in enumerate(STEPS):
+    setattr(ConfigScriptBudgetTest, f"test_{_index:02d}_{_script}", _make_test(_script, _setup, _unit))
+
+
+if __name__ == "__main__":
+    unittest.main()